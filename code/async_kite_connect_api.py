@@ -0,0 +1,235 @@
+"""
+Async Kite Connect API
+
+asyncio front end of KiteConnectAPI with the same method surface. Calls run on a
+small thread pool over the one KiteConnect client, and all calls still go through the
+shared request scheduler (rate limits, priorities, GTT book cache). The workers reuse
+keep-alive connections only when the client is on a pooled session, as clients built
+by kite_utils.initialize_kite are (see http_session); a bare KiteConnect opens a new
+connection per call.
+
+Independent calls are issued together with asyncio.gather: get_account_details
+fetches profile, margins, holdings and positions concurrently, and get_market_snapshot
+fetches quotes of many symbols and the GTT book in one round-trip of latency.
+
+Example:
+    async def run():
+        async with AsyncKiteConnectAPI("ITC") as kite_api:
+            await kite_api.connect()
+            details = await kite_api.get_account_details()
+            snapshot = await kite_api.get_market_snapshot(["ITC", "HINDALCO"])
+
+    asyncio.run(run())
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from kite_connect_api import KiteConnectAPI
+from kite_request_scheduler import KiteRequestScheduler
+
+# At most http_session.DEFAULT_POOL_MAXSIZE; more workers would open throwaway connections
+DEFAULT_MAX_WORKERS = 8
+
+
+class AsyncKiteConnectAPI:
+    """Class to handle Kite Connect API operations from asyncio code"""
+
+    def __init__(self, trading_symbol: str = "", gtt_cache_max_age: float = 2.0,
+                 request_scheduler: Optional[KiteRequestScheduler] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, api: Optional[KiteConnectAPI] = None):
+        """
+        Initialize the async Kite Connect API
+
+        Parameters:
+        - trading_symbol: Trading symbol of the stock (required unless api is given)
+        - gtt_cache_max_age: Seconds a fetched GTT order book may be reused (default: 2.0)
+        - request_scheduler: Scheduler for the REST calls (default: the shared scheduler)
+        - max_workers: Maximum number of calls in flight at once
+        - api: Existing KiteConnectAPI to share its client, caches and order history
+
+        Raises:
+        - ValueError: If trading_symbol is not provided or is empty
+        """
+        self.api = api or KiteConnectAPI(trading_symbol, gtt_cache_max_age=gtt_cache_max_age,
+                                         request_scheduler=request_scheduler)
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kite-async")
+
+    async def __aenter__(self) -> 'AsyncKiteConnectAPI':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop the worker threads once the calls in flight have finished"""
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+
+    async def _run(self, func, *args, **kwargs) -> Any:
+        """Run a blocking call on the worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    @property
+    def kite(self) -> Any:
+        """Scheduled Kite client of the underlying KiteConnectAPI"""
+        return self.api.kite
+
+    @kite.setter
+    def kite(self, client: Any) -> None:
+        self.api.kite = client
+
+    @property
+    def trading_symbol(self) -> str:
+        return self.api.trading_symbol
+
+    @property
+    def exchange(self) -> str:
+        return self.api.exchange
+
+    @property
+    def order_history(self) -> List[Dict[str, Any]]:
+        return self.api.order_history
+
+    async def connect(self) -> None:
+        """Initialize connection to Kite"""
+        await self._run(self.api.connect)
+
+    async def get_account_details(self) -> Dict[str, Any]:
+        """Get account details and other information (the four REST calls are made concurrently)"""
+        try:
+            if not self.kite:
+                raise Exception("Not connected to Kite. Call connect() first.")
+
+            profile, balance, holdings, positions = await asyncio.gather(
+                self._run(self.kite.profile),
+                self._run(self.kite.margins),
+                self._run(self.kite.holdings),
+                self._run(self.kite.positions)
+            )
+            stock_holdings = [h for h in holdings if h['tradingsymbol'] == self.trading_symbol]
+            stock_positions = [p for p in positions.get('net', []) if p['tradingsymbol'] == self.trading_symbol]
+            logging.info(f"Account details for {self.trading_symbol} retrieved successfully")
+
+            return {
+                "profile": profile,
+                "balance": balance,
+                "holdings": stock_holdings,
+                "positions": stock_positions
+            }
+        except Exception as e:
+            logging.error(f"Error fetching account details: {e}")
+            raise
+
+    async def place_order(self, quantity: int, order_type: str = "MARKET",
+                          product: str = "CNC", transaction_type: str = "BUY") -> str:
+        """Place an order for the configured stock (see KiteConnectAPI.place_order)"""
+        return await self._run(self.api.place_order, quantity, order_type=order_type, product=product,
+                               transaction_type=transaction_type)
+
+    async def sell_order(self, quantity: int, order_type: str = "MARKET", product: str = "CNC") -> str:
+        """Place a sell order for the configured stock (see KiteConnectAPI.sell_order)"""
+        return await self._run(self.api.sell_order, quantity, order_type=order_type, product=product)
+
+    async def get_live_data(self) -> Dict[str, Any]:
+        """Get live market data for the configured stock"""
+        return await self._run(self.api.get_live_data)
+
+    async def get_multiple_live_data(self, trading_symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get live market data for multiple stocks (one quote call)"""
+        return await self._run(self.api.get_multiple_live_data, trading_symbols)
+
+    async def get_market_snapshot(self, trading_symbols: List[str],
+                                  max_age_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get live market data of several stocks and the GTT order book concurrently
+
+        Parameters:
+        - trading_symbols: List of trading symbols to poll
+        - max_age_seconds: Optional GTT book staleness override (0 forces a fresh fetch)
+
+        Returns:
+        Dictionary with 'live_data' (by symbol) and 'gtt_orders'
+        """
+        live_data, gtt_orders = await asyncio.gather(
+            self.get_multiple_live_data(trading_symbols),
+            self.get_gtt_orders(max_age_seconds)
+        )
+        return {'live_data': live_data, 'gtt_orders': gtt_orders}
+
+    def save_order_history(self) -> None:
+        """Save the current order history to file"""
+        self.api.save_order_history()
+
+    async def place_gtt_order(self, trading_symbol: str, exchange: str, transaction_type: str,
+                              quantity: int, price: float, trigger_price: float,
+                              order_type: str = "LIMIT", validity: str = "DAY", current_price: float = None,
+                              verbose: bool = True) -> str:
+        """Place a GTT order (see KiteConnectAPI.place_gtt_order)"""
+        return await self._run(self.api.place_gtt_order, trading_symbol, exchange, transaction_type, quantity,
+                               price, trigger_price, order_type=order_type, validity=validity,
+                               current_price=current_price, verbose=verbose)
+
+    async def place_gtt_batch(self, orders: List[Dict[str, Any]], max_workers: int = 10,
+                              max_retries: int = 3) -> List[Dict[str, Any]]:
+        """Place several GTT orders concurrently (see KiteConnectAPI.place_gtt_batch)"""
+        return await self._run(self.api.place_gtt_batch, orders, max_workers=max_workers, max_retries=max_retries)
+
+    async def get_gtt_orders(self, max_age_seconds: Optional[float] = None) -> list:
+        """Get all GTT orders (served from the GTT book cache while fresh)"""
+        return await self._run(self.api.get_gtt_orders, max_age_seconds)
+
+    def get_gtt_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters of the GTT book cache"""
+        return self.api.get_gtt_cache_stats()
+
+    def get_request_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the request scheduler metrics"""
+        return self.api.get_request_stats()
+
+    async def modify_gtt_order(self, gtt_order_id: str, trading_symbol: str, exchange: str,
+                               transaction_type: str, quantity: int, price: float,
+                               trigger_price: float, order_type: str = "LIMIT",
+                               validity: str = "DAY") -> str:
+        """Modify an existing GTT order (see KiteConnectAPI.modify_gtt_order)"""
+        return await self._run(self.api.modify_gtt_order, gtt_order_id, trading_symbol, exchange, transaction_type,
+                               quantity, price, trigger_price, order_type=order_type, validity=validity)
+
+    async def delete_gtt_order(self, gtt_order_id: str) -> bool:
+        """Delete a GTT order"""
+        return await self._run(self.api.delete_gtt_order, gtt_order_id)
+
+    async def delete_gtt_orders(self, gtt_order_ids: List[str]) -> List[Any]:
+        """
+        Delete several GTT orders concurrently
+
+        Parameters:
+        - gtt_order_ids: IDs of the GTT orders to delete
+
+        Returns:
+        List in the order of the IDs: True for each deleted order, the exception otherwise
+        """
+        return await asyncio.gather(*(self.delete_gtt_order(gtt_order_id) for gtt_order_id in gtt_order_ids),
+                                    return_exceptions=True)
+
+    async def place_gtt_order_with_stop_loss(self, trading_symbol: str, exchange: str,
+                                             quantity: int, price: float, trigger_price: float,
+                                             stop_loss_price: float, order_type: str = "LIMIT",
+                                             validity: str = "DAY") -> str:
+        """Place a GTT order with stop loss (see KiteConnectAPI.place_gtt_order_with_stop_loss)"""
+        return await self._run(self.api.place_gtt_order_with_stop_loss, trading_symbol, exchange, quantity, price,
+                               trigger_price, stop_loss_price, order_type=order_type, validity=validity)
+
+    async def place_regular_order(self, trading_symbol: str, exchange: str, transaction_type: str,
+                                  quantity: int, price: float, order_type: str = "MARKET",
+                                  product: str = "CNC", validity: str = "DAY") -> str:
+        """Place a regular (non-GTT) order (see KiteConnectAPI.place_regular_order)"""
+        return await self._run(self.api.place_regular_order, trading_symbol, exchange, transaction_type, quantity,
+                               price, order_type=order_type, product=product, validity=validity)
+
+    async def cancel_order(self, order_id: str) -> bool:
+        """Cancel a regular order"""
+        return await self._run(self.api.cancel_order, order_id)
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+GTT Fall-Buy Backtester
+
+Replays the GTT fall-buy ladder against stored daily OHLC history (the history store
+kept by tests/breeze_history.py, or its older JSON download) for many parameter combinations at once. All combinations
+are simulated together as NumPy arrays, one loop step per bar, so thousands of
+combinations run in seconds.
+
+Strategy model (per parameter combination):
+- A ladder of num_levels GTT buy orders is placed below the anchor price: the first
+  order first_drop_pct below the anchor, every next order step_drop_pct below the
+  previous order's limit price (calculate_gtt_prices, limit = trigger + 2 ticks);
+  order n buys n shares
+- After buy fills the ladder is topped up to num_levels active orders below the
+  lowest active one, as refill_buy_ladder does: each new order triggers 1% below the
+  previous order's limit price with its limit 1% below the trigger, and every order of
+  one refill buys one share more than the largest active order. Like the live strategy,
+  nothing is refilled once no buy order is left. --no-refill keeps the fixed ladder.
+- A buy fills when the bar's low reaches both its trigger and its limit, at the limit
+  price (or at the open if the bar gaps below both). A refill order whose trigger is
+  reached but not its limit expires at the end of the day (DAY validity)
+- The sell target is avg price * (1 + sell_target_small_pct%) while holding at most
+  small_position_shares shares, else avg price * (1 + sell_target_large_pct%), rounded
+  to the tick size (as in manage_sell_orders_based_on_history)
+- The position is sold when a later bar's high reaches the sell target; the remaining
+  buy orders are cancelled and a new ladder is anchored at that bar's close
+- Realised P&L is net of the sell-side Zerodha charges (calculate_zerodha_charges)
+
+Daily bars cannot tell whether a buy or the sell happened first within a bar, so a
+sell is only allowed on bars after the last buy fill (the conservative ordering).
+
+Usage:
+    python backtest_gtt_fall_buy.py <symbol> [--step-drops 0.5,1.0,1.5] [--levels 3:15:2] ...
+
+Examples:
+    python backtest_gtt_fall_buy.py ITC
+    python backtest_gtt_fall_buy.py ITC --step-drops 0.5:2.5:0.25 --levels 3:15 --output itc.csv
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from charges import sell_charges_array
+from tick_math import nse_tick_size_for_price
+
+# Default parameter grid (first value of each list is the live strategy's setting)
+DEFAULT_FIRST_DROPS = [0.27]
+DEFAULT_STEP_DROPS = [1.0, 0.5, 0.75, 1.25, 1.5, 2.0]
+DEFAULT_LEVELS = [5, 3, 8, 10, 15]
+DEFAULT_SMALL_TARGETS = [3.0, 2.0, 2.5, 3.5, 4.0]
+DEFAULT_LARGE_TARGETS = [2.0, 1.5, 2.5, 3.0]
+DEFAULT_SMALL_POSITION_SHARES = [3]
+
+# refill_buy_ladder: trigger 1% below the previous order's limit, limit 1% below the trigger
+REFILL_DROP_PCT = 1.0
+
+RESULT_COLUMNS = [
+    'first_drop_pct', 'step_drop_pct', 'num_levels', 'sell_target_small_pct',
+    'sell_target_large_pct', 'small_position_shares', 'cycles', 'buy_fills',
+    'refill_orders', 'expired_orders', 'shares_bought', 'gross_pnl', 'charges', 'net_pnl', 'open_shares', 'open_cost',
+    'unrealised_pnl', 'max_capital_at_risk', 'max_drawdown', 'return_on_capital_pct'
+]
+
+
+def load_history_bars(symbol: str, history_dir: str = os.path.join('workdir', 'history'),
+                      file_path: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Load stored daily OHLC history into NumPy arrays
+
+    Parameters:
+    - symbol: Stock symbol (e.g., "ITC")
+    - history_dir: Directory holding the Breeze history store ({symbol}_breeze_1day.npz)
+      or {symbol}_breeze_history_3years.json
+    - file_path: Explicit history JSON file (overrides history_dir)
+
+    Returns:
+    Dictionary with 'datetime' and float arrays 'open', 'high', 'low', 'close',
+    sorted by datetime with duplicate bars removed
+    """
+    if file_path is None:
+        from history_store import HistoryStore
+
+        stored = HistoryStore(history_dir, source='breeze').read(symbol)
+        if stored is not None and len(stored['datetime']):
+            return {column: stored[column] for column in ('datetime', 'open', 'high', 'low', 'close')}
+
+    file_path = file_path or os.path.join(history_dir, f'{symbol}_breeze_history_3years.json')
+    with open(file_path, 'r') as f:
+        history_data = json.load(f)
+
+    bars = {}
+    for bar in history_data.get('data', []):
+        try:
+            bars[bar['datetime']] = (float(bar['open']), float(bar['high']),
+                                     float(bar['low']), float(bar['close']))
+        except (KeyError, TypeError, ValueError):
+            logging.warning(f"Skipping invalid bar in {file_path}: {bar}")
+
+    if not bars:
+        raise ValueError(f"No usable bars found in {file_path}")
+
+    dates = sorted(bars)
+    ohlc = np.array([bars[d] for d in dates], dtype=np.float64)
+    return {
+        'datetime': np.array(dates),
+        'open': ohlc[:, 0],
+        'high': ohlc[:, 1],
+        'low': ohlc[:, 2],
+        'close': ohlc[:, 3]
+    }
+
+
+def get_backtest_tick_size(symbol: str, price: float, instruments_file: str = "instruments.csv") -> float:
+    """
+    Get the tick size used for the backtest
+
+    Parameters:
+    - symbol: Stock symbol
+    - price: Representative price (used when the symbol is not in the instrument master)
+    - instruments_file: Path to instruments.csv
+
+    Returns:
+    - float: Tick size from the instrument master, else from the NSE price bands
+    """
+    try:
+        from instrument_master import get_shared_instrument_master
+
+        instrument = get_shared_instrument_master(instruments_file).get_instrument('NSE', symbol)
+        if instrument and instrument['tick_size'] > 0:
+            return instrument['tick_size']
+    except Exception as e:
+        logging.warning(f"Could not read tick size for {symbol} from instrument master: {e}")
+
+    return nse_tick_size_for_price(price)
+
+
+def _tick_decimals(tick_size: float) -> int:
+    """Number of decimals of the tick size (as in round_to_tick)"""
+    return len(str(tick_size).split('.')[-1]) if '.' in str(tick_size) else 0
+
+
+def round_to_tick_array(prices: np.ndarray, tick_size: float) -> np.ndarray:
+    """
+    Vectorised round_to_tick
+
+    Parameters:
+    - prices: Array of raw prices
+    - tick_size: Minimum price increment
+
+    Returns:
+    Array of prices rounded to the nearest tick
+    """
+    return np.round(np.round(prices / tick_size) * tick_size, _tick_decimals(tick_size))
+
+
+def build_parameter_grid(first_drops: Sequence[float] = DEFAULT_FIRST_DROPS,
+                         step_drops: Sequence[float] = DEFAULT_STEP_DROPS,
+                         levels: Sequence[int] = DEFAULT_LEVELS,
+                         small_targets: Sequence[float] = DEFAULT_SMALL_TARGETS,
+                         large_targets: Sequence[float] = DEFAULT_LARGE_TARGETS,
+                         small_position_shares: Sequence[int] = DEFAULT_SMALL_POSITION_SHARES) -> Dict[str, np.ndarray]:
+    """
+    Build the cartesian product of parameter values
+
+    Returns:
+    Dictionary of equally long parameter arrays, one entry per combination
+    """
+    combos = list(itertools.product(first_drops, step_drops, levels, small_targets,
+                                    large_targets, small_position_shares))
+    columns = list(zip(*combos))
+    return {
+        'first_drop_pct': np.array(columns[0], dtype=np.float64),
+        'step_drop_pct': np.array(columns[1], dtype=np.float64),
+        'num_levels': np.array(columns[2], dtype=np.int64),
+        'sell_target_small_pct': np.array(columns[3], dtype=np.float64),
+        'sell_target_large_pct': np.array(columns[4], dtype=np.float64),
+        'small_position_shares': np.array(columns[5], dtype=np.int64)
+    }
+
+
+def _place_ladders(anchor: np.ndarray, first_drop: np.ndarray, step_drop: np.ndarray,
+                   max_levels: int, tick_size: float) -> tuple:
+    """
+    Compute trigger and limit prices of the buy ladders, as place_buy_ladder does
+
+    Returns:
+    - tuple: (triggers, limits), arrays of shape (len(anchor), max_levels)
+    """
+    triggers = np.empty((len(anchor), max_levels))
+    limits = np.empty((len(anchor), max_levels))
+    previous_price = anchor
+    for level in range(max_levels):
+        drop = first_drop if level == 0 else step_drop
+        triggers[:, level] = round_to_tick_array(previous_price * (1 - drop / 100), tick_size)
+        limits[:, level] = round_to_tick_array(triggers[:, level] + 2 * tick_size, tick_size)
+        previous_price = limits[:, level]
+    return triggers, limits
+
+
+def _refill_ladders(rows: np.ndarray, triggers: np.ndarray, limits: np.ndarray, quantities: np.ndarray,
+                    pending: np.ndarray, level_enabled: np.ndarray, tick_size: float) -> np.ndarray:
+    """
+    Top up the ladders of the given combinations below their lowest pending order, as
+    refill_buy_ladder does (triggers, limits, quantities and pending are updated in place)
+
+    Returns:
+    Number of orders placed per combination
+    """
+    free = level_enabled & ~pending & rows[:, None]
+    placed = free.sum(axis=1)
+    if not placed.any():
+        return placed
+
+    previous_limit = np.where(pending, limits, np.inf).min(axis=1)
+    # Every order of one refill gets the same quantity: one more than the largest active order
+    refill_quantity = np.where(pending, quantities, 0).max(axis=1) + 1
+    for level in range(free.shape[1]):
+        slot = free[:, level]
+        if not slot.any():
+            continue
+        new_triggers = round_to_tick_array(previous_limit[slot] * (1 - REFILL_DROP_PCT / 100), tick_size)
+        new_limits = round_to_tick_array(new_triggers * (1 - REFILL_DROP_PCT / 100), tick_size)
+        triggers[slot, level] = new_triggers
+        limits[slot, level] = new_limits
+        quantities[slot, level] = refill_quantity[slot]
+        pending[slot, level] = True
+        previous_limit[slot] = new_limits
+    return placed
+
+
+def run_backtest(bars: Dict[str, np.ndarray], params: Dict[str, np.ndarray], tick_size: float,
+                 refill: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Simulate the fall-buy ladder for every parameter combination over the bars
+
+    Parameters:
+    - bars: OHLC arrays from load_history_bars
+    - params: Parameter arrays from build_parameter_grid
+    - tick_size: Tick size of the instrument
+    - refill: Top the ladder up after buy fills like the live strategy (False keeps the
+      num_levels orders placed after each exit)
+
+    Returns:
+    Dictionary of result arrays (one value per combination), keyed like RESULT_COLUMNS
+    """
+    open_, high, low, close = bars['open'], bars['high'], bars['low'], bars['close']
+    first_drop = params['first_drop_pct']
+    step_drop = params['step_drop_pct']
+    num_levels = params['num_levels']
+    small_target = params['sell_target_small_pct']
+    large_target = params['sell_target_large_pct']
+    small_shares = params['small_position_shares']
+
+    n_combos = len(first_drop)
+    max_levels = int(num_levels.max())
+    ladder_quantities = np.arange(1, max_levels + 1, dtype=np.float64)
+    level_enabled = np.arange(max_levels)[None, :] < num_levels[:, None]
+
+    # Ladder state
+    triggers, limits = _place_ladders(np.full(n_combos, close[0]), first_drop, step_drop, max_levels, tick_size)
+    quantities = np.tile(ladder_quantities, (n_combos, 1))
+    pending = level_enabled.copy()
+    shares = np.zeros(n_combos)
+    cost = np.zeros(n_combos)
+    sell_price = np.full(n_combos, np.inf)
+
+    # Results
+    cycles = np.zeros(n_combos, dtype=np.int64)
+    buy_fills = np.zeros(n_combos, dtype=np.int64)
+    refill_orders = np.zeros(n_combos, dtype=np.int64)
+    expired_orders = np.zeros(n_combos, dtype=np.int64)
+    shares_bought = np.zeros(n_combos)
+    gross_pnl = np.zeros(n_combos)
+    charges = np.zeros(n_combos)
+    max_capital = np.zeros(n_combos)
+    peak_equity = np.zeros(n_combos)
+    max_drawdown = np.zeros(n_combos)
+
+    for t in range(1, len(close)):
+        # Sell first, with the position held at the start of the bar
+        sold = (shares > 0) & (high[t] >= sell_price)
+        if sold.any():
+            fill_price = np.maximum(sell_price[sold], open_[t])
+            proceeds = shares[sold] * fill_price
+            trade_charges = sell_charges_array(proceeds)
+            gross_pnl[sold] += proceeds - cost[sold]
+            charges[sold] += trade_charges
+            cycles[sold] += 1
+            shares[sold] = 0
+            cost[sold] = 0
+            sell_price[sold] = np.inf
+
+        # Buy fills on the remaining combinations (a resting buy order fills at its limit price)
+        can_buy = ~sold
+        triggered = pending & can_buy[:, None] & (low[t] <= triggers)
+        fill_levels = np.minimum(triggers, limits)
+        filled = triggered & (low[t] <= fill_levels)
+        expired = triggered & ~filled
+        bought_this_bar = filled.any(axis=1)
+        if expired.any():
+            expired_orders += expired.sum(axis=1)
+            pending &= ~expired
+        if bought_this_bar.any():
+            fill_prices = np.where(open_[t] <= fill_levels, open_[t], limits)
+            filled_quantity = filled * quantities
+            new_shares = filled_quantity.sum(axis=1)
+            cost += (filled_quantity * fill_prices).sum(axis=1)
+            shares += new_shares
+            shares_bought += new_shares
+            buy_fills += filled.sum(axis=1)
+            pending &= ~filled
+
+            target_pct = np.where(shares <= small_shares, small_target, large_target)
+            new_targets = round_to_tick_array(cost / np.where(shares > 0, shares, 1) * (1 + target_pct / 100), tick_size)
+            sell_price = np.where(bought_this_bar, new_targets, sell_price)
+
+        # Orders placed after the bar's fills can fill from the next bar on
+        if refill:
+            consumed = can_buy & (bought_this_bar | expired.any(axis=1)) & pending.any(axis=1)
+            if consumed.any():
+                refill_orders += _refill_ladders(consumed, triggers, limits, quantities, pending,
+                                                 level_enabled, tick_size)
+
+        # Mark to market at the close
+        max_capital = np.maximum(max_capital, cost)
+        equity = gross_pnl - charges + shares * close[t] - cost
+        peak_equity = np.maximum(peak_equity, equity)
+        max_drawdown = np.maximum(max_drawdown, peak_equity - equity)
+
+        # New ladders anchored at the close after every exit
+        if sold.any():
+            new_triggers, new_limits = _place_ladders(np.full(int(sold.sum()), close[t]), first_drop[sold],
+                                                      step_drop[sold], max_levels, tick_size)
+            triggers[sold] = new_triggers
+            limits[sold] = new_limits
+            quantities[sold] = ladder_quantities
+            pending[sold] = level_enabled[sold]
+
+    net_pnl = gross_pnl - charges
+    unrealised_pnl = shares * close[-1] - cost
+    return_on_capital = np.where(max_capital > 0, net_pnl / np.where(max_capital > 0, max_capital, 1) * 100, 0.0)
+
+    results = dict(params)
+    results.update({
+        'cycles': cycles,
+        'buy_fills': buy_fills,
+        'refill_orders': refill_orders,
+        'expired_orders': expired_orders,
+        'shares_bought': shares_bought.astype(np.int64),
+        'gross_pnl': gross_pnl,
+        'charges': charges,
+        'net_pnl': net_pnl,
+        'open_shares': shares.astype(np.int64),
+        'open_cost': cost,
+        'unrealised_pnl': unrealised_pnl,
+        'max_capital_at_risk': max_capital,
+        'max_drawdown': max_drawdown,
+        'return_on_capital_pct': return_on_capital
+    })
+    return results
+
+
+def rank_results(results: Dict[str, np.ndarray], sort_by: str = 'net_pnl') -> List[Dict[str, Any]]:
+    """
+    Convert result arrays to rows sorted best first
+
+    Parameters:
+    - results: Result arrays from run_backtest
+    - sort_by: Result column to sort by (descending)
+
+    Returns:
+    List of result dictionaries
+    """
+    order = np.argsort(-results[sort_by], kind='stable')
+    rows = []
+    for i in order:
+        row = {}
+        for column in RESULT_COLUMNS:
+            value = results[column][i].item()
+            row[column] = round(value, 2) if isinstance(value, float) else value
+        rows.append(row)
+    return rows
+
+
+def save_results_to_csv(rows: List[Dict[str, Any]], file_path: str, columns: List[str] = RESULT_COLUMNS) -> None:
+    """
+    Save ranked backtest results to a CSV file
+
+    Parameters:
+    - rows: Rows from rank_results
+    - file_path: Output CSV path
+    - columns: Column order of the CSV
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_values(text: str, value_type=float) -> List:
+    """
+    Parse a comma separated list ("0.5,1,1.5") or an inclusive range ("0.5:2:0.25", "3:15")
+
+    Returns:
+    List of values
+    """
+    if ':' in text:
+        parts = [float(part) for part in text.split(':')]
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) > 2 else 1
+        values = np.arange(start, stop + step / 2, step)
+        return [value_type(round(value, 6)) for value in values]
+    return [value_type(value) for value in text.split(',') if value.strip()]
+
+
+def main():
+    """Main function to parse arguments and run the backtest"""
+    parser = argparse.ArgumentParser(
+        description="Backtest the GTT fall-buy ladder over stored daily history",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('symbol', help='Trading symbol of the company (e.g., ITC)')
+    parser.add_argument('--history-file', help='History JSON file (default: the history store, else workdir/history/{symbol}_breeze_history_3years.json)')
+    parser.add_argument('--first-drops', default=','.join(map(str, DEFAULT_FIRST_DROPS)), help='First order drop %% values')
+    parser.add_argument('--step-drops', default=','.join(map(str, DEFAULT_STEP_DROPS)), help='Drop %% between orders')
+    parser.add_argument('--levels', default=','.join(map(str, DEFAULT_LEVELS)), help='Number of ladder orders')
+    parser.add_argument('--small-targets', default=','.join(map(str, DEFAULT_SMALL_TARGETS)),
+                        help='Sell target %% for small positions')
+    parser.add_argument('--large-targets', default=','.join(map(str, DEFAULT_LARGE_TARGETS)),
+                        help='Sell target %% for larger positions')
+    parser.add_argument('--small-position-shares', default=','.join(map(str, DEFAULT_SMALL_POSITION_SHARES)),
+                        help='Largest position (shares) that uses the small-position target')
+    parser.add_argument('--no-refill', action='store_true',
+                        help='Keep the fixed ladder instead of topping it up after fills like the live strategy')
+    parser.add_argument('--tick-size', type=float, help='Tick size (default: from instruments.csv or NSE price bands)')
+    parser.add_argument('--sort-by', default='net_pnl', choices=RESULT_COLUMNS, help='Column to rank results by')
+    parser.add_argument('--output', help='Output CSV (default: workdir/backtests/{symbol}_gtt_fall_buy_backtest.csv)')
+    parser.add_argument('--top', type=int, default=10, help='Number of best combinations to print')
+
+    args = parser.parse_args()
+    symbol = args.symbol.upper()
+
+    try:
+        bars = load_history_bars(symbol, file_path=args.history_file)
+        tick_size = args.tick_size or get_backtest_tick_size(symbol, float(np.median(bars['close'])))
+        params = build_parameter_grid(
+            first_drops=parse_values(args.first_drops),
+            step_drops=parse_values(args.step_drops),
+            levels=parse_values(args.levels, int),
+            small_targets=parse_values(args.small_targets),
+            large_targets=parse_values(args.large_targets),
+            small_position_shares=parse_values(args.small_position_shares, int)
+        )
+
+        start_time = time.perf_counter()
+        results = run_backtest(bars, params, tick_size, refill=not args.no_refill)
+        elapsed = time.perf_counter() - start_time
+
+        rows = rank_results(results, args.sort_by)
+        output = args.output or os.path.join('workdir', 'backtests', f'{symbol}_gtt_fall_buy_backtest.csv')
+        save_results_to_csv(rows, output)
+
+        print(f"{symbol}: {len(bars['close'])} bars {bars['datetime'][0]} to {bars['datetime'][-1]}, tick size {tick_size}")
+        print(f"Simulated {len(rows)} parameter combinations in {elapsed:.2f}s -> {output}")
+        for row in rows[:args.top]:
+            print(f"  first {row['first_drop_pct']}% step {row['step_drop_pct']}% levels {row['num_levels']} "
+                  f"targets {row['sell_target_small_pct']}%/{row['sell_target_large_pct']}%: "
+                  f"net P&L {row['net_pnl']:.2f} over {row['cycles']} cycles, "
+                  f"max capital {row['max_capital_at_risk']:.2f}, max drawdown {row['max_drawdown']:.2f}")
+
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Cold Start to First Order Benchmark
+
+Measures how long a short-lived script (delete_gtt_orders.py, schedule_gtt_sell_order.py,
+...) takes from building its Kite client to its first GTT order, against a localhost
+FakeKiteServer that charges --connect-latency on every new connection (standing in for
+the TCP + TLS handshake to api.kite.trade):
+
+- per_call_connections: KiteConnect without a session (a new connection per call) and
+  a margins() token check on every start, as before http_session
+- shared_session: KiteConnect on a fresh pooled keep-alive session (one per simulated
+  process) with the token check skipped once the session cache recorded it for the
+  trading day
+
+Each timed start makes the token check (if any), an ltp call and a place_gtt call.
+
+Usage:
+    python code/benchmarks/bench_cold_start.py
+    python code/benchmarks/bench_cold_start.py --connect-latency 0.03 --latency 0.01
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+from typing import Dict, Any
+
+# Add parent directory and tests/ to path to allow imports from code/
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(CODE_DIR)
+sys.path.append(os.path.join(CODE_DIR, 'tests'))
+
+from kiteconnect import KiteConnect
+
+from bench_utils import measure, save_results
+from fake_kite import FakeKiteConnect, FakeKiteServer
+from http_session import create_session
+from session_cache import get_session_cache
+
+SYMBOL = 'ITC'
+START_PRICE = 430.0
+ACCESS_TOKEN = 'bench-token'
+DEFAULT_OUTPUT = os.path.join('workdir', 'benchmarks', 'cold_start.json')
+
+
+def first_order(root: str, pooled: bool) -> None:
+    """
+    Simulate one script start up to its first GTT order
+
+    Parameters:
+    - root: Root URL of the fake Kite server
+    - pooled: Use a fresh shared-style session and the daily session cache
+    """
+    kite = KiteConnect(api_key='bench', root=root)
+    kite.set_access_token(ACCESS_TOKEN)
+    if pooled:
+        kite.reqsession = create_session()
+        session_cache = get_session_cache()
+        if not session_cache.is_valid('kite', kite.api_key, ACCESS_TOKEN):
+            kite.margins()
+            session_cache.record_valid('kite', kite.api_key, ACCESS_TOKEN)
+    else:
+        kite.margins()
+
+    last_price = kite.ltp(f"NSE:{SYMBOL}")[f"NSE:{SYMBOL}"]['last_price']
+    trigger_price = round(last_price * 0.99, 2)
+    kite.place_gtt(trigger_type=kite.GTT_TYPE_SINGLE, tradingsymbol=SYMBOL, exchange='NSE',
+                   trigger_values=[trigger_price], last_price=last_price,
+                   orders=[{'exchange': 'NSE', 'tradingsymbol': SYMBOL, 'transaction_type': 'BUY', 'quantity': 1,
+                            'order_type': 'LIMIT', 'product': 'CNC', 'price': trigger_price}])
+    if pooled:
+        kite.reqsession.close()
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """
+    Run both start modes against one fake server
+
+    Parameters:
+    - args: Parsed command line arguments
+
+    Returns:
+    Dictionary of benchmark name -> measurements (with new connections per start)
+    """
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='bench_cold_start_')
+    server = FakeKiteServer(FakeKiteConnect(prices={SYMBOL: START_PRICE}, latency=args.latency),
+                            connect_latency=args.connect_latency)
+    try:
+        # The session cache is written under workdir/ of the current directory
+        os.chdir(work_dir)
+        root = server.start()
+
+        results = {}
+        for name, pooled in (('per_call_connections', False), ('shared_session', True)):
+            print(f"Running {name}...", file=sys.stderr)
+            connections_before = server.connections
+            result = measure(lambda: first_order(root, pooled), iterations=args.iterations, warmup=1,
+                             max_seconds=args.max_seconds)
+            starts = result['iterations'] + 1
+            result['connections_per_start'] = round((server.connections - connections_before) / starts, 2)
+            results[name] = result
+        return results
+    finally:
+        server.stop()
+        os.chdir(original_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark cold start to first GTT order with and without the shared HTTP session",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--connect-latency", type=float, default=0.05,
+                        help="Seconds charged per new connection (handshake stand-in, default: 0.05)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds charged per request (default: 0.02)")
+    parser.add_argument("--iterations", type=int, default=20, help="Maximum timed starts per mode")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Time budget per mode")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Result JSON file (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args()
+
+    try:
+        output = os.path.abspath(args.output)
+        results = run_benchmarks(args)
+        settings = {key: value for key, value in vars(args).items() if key != 'output'}
+        save_results(results, output, settings)
+
+        print(f"{'mode':<24} {'p50 ms':>10} {'p99 ms':>10} {'connections/start':>18}")
+        for name, result in results.items():
+            print(f"{name:<24} {result['p50_us'] / 1000:>10.1f} {result['p99_us'] / 1000:>10.1f} "
+                  f"{result['connections_per_start']:>18.2f}")
+        print(f"\nResults saved to {output}")
+
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}\n{traceback.format_exc()}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Tick-to-Decision Hot Path Benchmarks
+
+Measures p50/p99 latency and ops/s of the code run on every tick and writes them to a
+JSON file that can be diffed between commits:
+- round_to_tick and calculate_gtt_prices in tight loops
+- detect_and_update_triggered_orders_from_history, manage_sell_orders_based_on_history
+  and handle_tick_data against a FakeKiteConnect account, for GTT histories of 10 to
+  10k orders
+- FallBuy.get_tick in demo mode on a seeded random walk
+
+The benchmarks run in a temporary working directory (history journals and logs are
+written there, instruments.csv is linked in), with the strategy loggers writing at the
+given log level like they do in production.
+
+Usage:
+    python code/benchmarks/bench_hot_path.py
+    python code/benchmarks/bench_hot_path.py --sizes 10,100,1000 --output bench.json
+    python code/benchmarks/bench_hot_path.py --filter history --compare old_bench.json
+"""
+import argparse
+import atexit
+import contextlib
+import io
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import traceback
+from typing import Dict, Any, Callable, List
+
+# Add parent directory and tests/ to path to allow imports from code/
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(CODE_DIR)
+sys.path.append(os.path.join(CODE_DIR, 'tests'))
+
+from bench_utils import measure, save_results, load_results, compare_results
+from fake_kite import FakeKiteConnect
+from kite_connect_api import KiteConnectAPI
+from kite_utils import setup_logger
+import fall_buy
+from gtt_fall_buy import (round_to_tick, calculate_gtt_prices, detect_and_update_triggered_orders_from_history,
+                          manage_sell_orders_based_on_history, handle_tick_data)
+from fall_buy import FallBuy
+
+SYMBOL = 'ITC'
+START_PRICE = 430.0
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_OUTPUT = os.path.join('workdir', 'benchmarks', 'hot_path.json')
+
+# Share of the history orders that are executed buys (the rest are active buy GTTs)
+EXECUTED_SHARE = 0.2
+
+
+def build_history(kite_api: KiteConnectAPI, size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Create a GTT history of active and executed buy orders on the fake account
+
+    Active orders get a buy GTT below the current price on the fake account; executed
+    ones are missing from the GTT book, as after a trigger.
+
+    Parameters:
+    - kite_api: KiteConnectAPI with a FakeKiteConnect client
+    - size: Number of history orders
+    - seed: Random seed of the order prices
+
+    Returns:
+    List of history orders in the gtt_fall_buy format
+    """
+    rng = random.Random(seed)
+    orders = []
+    executed_count = int(size * EXECUTED_SHARE)
+    for i in range(size):
+        price = round_to_tick(START_PRICE * (1 - rng.uniform(0.005, 0.2)), 0.05)
+        trigger_price = round_to_tick(price - 0.1, 0.05)
+        order = {
+            'trading_symbol': SYMBOL,
+            'exchange': 'NSE',
+            'transaction_type': 'BUY',
+            'quantity': 1 + i % 5,
+            'price': price,
+            'trigger_price': trigger_price,
+            'order_type': 'LIMIT',
+            'validity': 'DAY',
+            'date_placed': '2026-01-01T09:15:00'
+        }
+        if i < executed_count:
+            order.update({'trigger_id': 900000000 + i, 'status': 'COMPLETE', 'triggered_at': '2026-01-01T10:00:00'})
+        else:
+            response = kite_api.kite.place_gtt(
+                trigger_type=kite_api.kite.GTT_TYPE_SINGLE, tradingsymbol=SYMBOL, exchange='NSE',
+                trigger_values=[trigger_price], last_price=START_PRICE,
+                orders=[{'transaction_type': 'BUY', 'quantity': order['quantity'], 'price': price,
+                         'order_type': 'LIMIT', 'product': 'CNC'}])
+            order.update({'trigger_id': response['trigger_id'], 'status': 'ACTIVE'})
+        orders.append(order)
+    return orders
+
+
+def create_kite_api(gtt_cache_max_age: float) -> KiteConnectAPI:
+    """Create a KiteConnectAPI backed by a fresh FakeKiteConnect account"""
+    kite_api = KiteConnectAPI(trading_symbol=SYMBOL, gtt_cache_max_age=gtt_cache_max_age)
+    kite_api.kite = FakeKiteConnect(prices={SYMBOL: START_PRICE}, seed=0)
+    return kite_api
+
+
+def tick_math_benchmarks(args: argparse.Namespace) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Benchmarks of the tick size arithmetic (1000 prices per call)"""
+    rng = random.Random(args.seed)
+    prices = [rng.uniform(100, 2000) for _ in range(1000)]
+
+    def run_round_to_tick():
+        for price in prices:
+            round_to_tick(price, 0.05)
+
+    def run_calculate_gtt_prices():
+        for price in prices:
+            calculate_gtt_prices(price, 1.2, 0.05, "BUY", 2)
+
+    return {
+        'round_to_tick[x1000]': lambda: measure(run_round_to_tick, args.iterations, max_seconds=args.max_seconds),
+        'calculate_gtt_prices[x1000]': lambda: measure(run_calculate_gtt_prices, args.iterations,
+                                                       max_seconds=args.max_seconds)
+    }
+
+
+def history_benchmarks(args: argparse.Namespace, logger: logging.Logger) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Benchmarks of the history-driven order management for each history size"""
+    benchmarks = {}
+    rng = random.Random(args.seed)
+    tick_prices = [round_to_tick(START_PRICE + rng.uniform(-2, 2), 0.05) for _ in range(1000)]
+
+    for size in args.sizes:
+        def run_case(case: str, size: int = size) -> Dict[str, Any]:
+            kite_api = create_kite_api(args.gtt_cache_max_age)
+            gtt_orders = build_history(kite_api, size, args.seed)
+            # Place the sell order once so the measured calls see the steady state of a session
+            manage_sell_orders_based_on_history(kite_api, SYMBOL, 'NSE', gtt_orders, START_PRICE, logger)
+            ticks = iter(tick_prices * (args.iterations // len(tick_prices) + 2))
+
+            if case == 'detect':
+                func = lambda: detect_and_update_triggered_orders_from_history(kite_api, SYMBOL, 'NSE',
+                                                                               gtt_orders, logger)
+            elif case == 'manage_sell':
+                func = lambda: manage_sell_orders_based_on_history(kite_api, SYMBOL, 'NSE', gtt_orders,
+                                                                   START_PRICE, logger)
+            else:
+                func = lambda: handle_tick_data({'symbol': SYMBOL, 'last': next(ticks)}, kite_api, None,
+                                                SYMBOL, 'NSE', gtt_orders, logger)
+            return measure(func, args.iterations, warmup=2, max_seconds=args.max_seconds)
+
+        benchmarks[f'detect_and_update_triggered_orders_from_history[{size}]'] = \
+            lambda run_case=run_case: run_case('detect')
+        benchmarks[f'manage_sell_orders_based_on_history[{size}]'] = lambda run_case=run_case: run_case('manage_sell')
+        benchmarks[f'handle_tick_data[{size}]'] = lambda run_case=run_case: run_case('tick')
+    return benchmarks
+
+
+def fall_buy_benchmarks(args: argparse.Namespace) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Benchmark of FallBuy.get_tick in demo mode on a seeded random walk"""
+    def run_get_tick() -> Dict[str, Any]:
+        strategy = FallBuy('NSE', 'BENCH', demo_mode=True)
+        # The benchmark state must not be saved to workdir/orders on exit
+        atexit.unregister(strategy.save_stock_history)
+        strategy.first_share_price = START_PRICE
+        strategy.pending_orders = [{'order_id': 'DEMO_BUY_0', 'quantity': 1, 'price': START_PRICE,
+                                    'date': '2026-01-01 09:15:00', 'type': 'buy'}]
+
+        rng = random.Random(args.seed)
+        price = START_PRICE
+
+        def next_tick() -> Dict[str, Any]:
+            nonlocal price
+            price = max(0.05, round_to_tick(price * (1 + rng.gauss(0, 0.001)), 0.05))
+            return {'symbol': 'BENCH', 'last': price}
+
+        # get_tick prints every new price
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            def get_tick(tick: Dict[str, Any]) -> None:
+                strategy.get_tick(tick)
+                output.seek(0)
+                output.truncate()
+            return measure(get_tick, args.iterations, max_seconds=args.max_seconds, setup=next_tick)
+
+    return {'FallBuy.get_tick': run_get_tick}
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print a result table"""
+    print(f"{'benchmark':<58} {'p50 us':>12} {'p99 us':>12} {'ops/s':>12} {'n':>6}")
+    for name in sorted(results):
+        result = results[name]
+        print(f"{name:<58} {result['p50_us']:>12.1f} {result['p99_us']:>12.1f} "
+              f"{result['ops_per_second']:>12.1f} {result['iterations']:>6}")
+
+
+def print_comparison(comparison: Dict[str, Dict[str, Any]]) -> None:
+    """Print the p50 change of each benchmark against a baseline"""
+    print(f"\n{'benchmark':<58} {'old p50 us':>12} {'new p50 us':>12} {'change':>9}")
+    for name in sorted(comparison):
+        item = comparison[name]
+        print(f"{name:<58} {item['old']:>12.1f} {item['new']:>12.1f} {item['change_percent']:>+8.1f}%")
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the selected benchmarks in a temporary working directory
+
+    Returns:
+    Measurements by benchmark name
+    """
+    original_dir = os.getcwd()
+    instruments_file = os.path.abspath(args.instruments) if args.instruments else None
+    work_dir = tempfile.mkdtemp(prefix='bench_hot_path_')
+    os.chdir(work_dir)
+    try:
+        if instruments_file and os.path.exists(instruments_file):
+            os.symlink(instruments_file, os.path.join(work_dir, 'instruments.csv'))
+
+        # Module level log calls are still created at the log level but not written to the console
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(logging.NullHandler())
+        root_logger.setLevel(args.log_level)
+        logger = setup_logger('bench_hot_path', SYMBOL)
+        logger.setLevel(args.log_level)
+        setup_logger(fall_buy.__name__, 'BENCH').setLevel(args.log_level)
+
+        benchmarks = {}
+        benchmarks.update(tick_math_benchmarks(args))
+        benchmarks.update(history_benchmarks(args, logger))
+        benchmarks.update(fall_buy_benchmarks(args))
+        if args.filter:
+            benchmarks = {name: run for name, run in benchmarks.items() if args.filter in name}
+
+        results = {}
+        for name, run in benchmarks.items():
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = run()
+        return results
+    finally:
+        os.chdir(original_dir)
+        logging.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the tick-to-decision hot path",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma separated GTT history sizes (default: 10,100,1000,10000)")
+    parser.add_argument("--iterations", type=int, default=200, help="Maximum timed calls per benchmark")
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="Time budget per benchmark")
+    parser.add_argument("--gtt-cache-max-age", type=float, default=2.0,
+                        help="GTT book cache staleness window of the Kite API (0 fetches on every lookup)")
+    parser.add_argument("--log-level", default="INFO", help="Level of the strategy loggers (default: INFO)")
+    parser.add_argument("--instruments", default="instruments.csv",
+                        help="Instrument master CSV used for tick sizes (default: instruments.csv)")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Result JSON file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--compare", help="Baseline result JSON file to compare against")
+    args = parser.parse_args()
+
+    try:
+        args.sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+        args.log_level = args.log_level.upper()
+        output = os.path.abspath(args.output)
+        baseline = os.path.abspath(args.compare) if args.compare else None
+
+        results = run_benchmarks(args)
+        settings = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+        save_results(results, output, settings)
+
+        print_results(results)
+        print(f"\nResults saved to {output}")
+        if baseline:
+            print_comparison(compare_results(load_results(baseline), load_results(output)))
+
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}\n{traceback.format_exc()}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark Helpers
+
+Timing loop, latency percentiles and the JSON result files written by the benchmark
+scripts. Result files carry the git commit and interpreter they were measured with,
+so two runs can be compared with compare_results (or bench_hot_path.py --compare).
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+import numpy as np
+
+
+def measure(func: Callable[[], Any], iterations: int = 1000, warmup: int = 10, max_seconds: float = 5.0,
+            min_iterations: int = 5, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    Time repeated calls of a function
+
+    Parameters:
+    - func: Function to time (called without arguments, or with the result of setup)
+    - iterations: Maximum number of timed calls
+    - warmup: Untimed calls made first (caches, lazy loads)
+    - max_seconds: Stop after this much timed time once min_iterations calls were made
+    - min_iterations: Minimum number of timed calls
+    - setup: Optional untimed function called before every call; its result is passed to func
+
+    Returns:
+    Dictionary with the call count, p50/p99/mean/min/max latency in microseconds and ops/s
+    """
+    for _ in range(warmup):
+        func(setup()) if setup else func()
+
+    samples = []
+    total = 0.0
+    for i in range(iterations):
+        if i >= min_iterations and total >= max_seconds:
+            break
+        if setup:
+            argument = setup()
+            started = time.perf_counter()
+            func(argument)
+        else:
+            started = time.perf_counter()
+            func()
+        elapsed = time.perf_counter() - started
+        samples.append(elapsed)
+        total += elapsed
+
+    latencies = np.array(samples) * 1e6
+    return {
+        'iterations': len(samples),
+        'p50_us': round(float(np.percentile(latencies, 50)), 3),
+        'p99_us': round(float(np.percentile(latencies, 99)), 3),
+        'mean_us': round(float(latencies.mean()), 3),
+        'min_us': round(float(latencies.min()), 3),
+        'max_us': round(float(latencies.max()), 3),
+        'ops_per_second': round(len(samples) / total, 1) if total > 0 else 0.0
+    }
+
+
+def get_git_commit(path: str = '.') -> Optional[str]:
+    """Get the commit hash of the checkout the benchmarks run from (None outside git)"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=path, capture_output=True,
+                                text=True, timeout=10)
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def save_results(results: Dict[str, Dict[str, Any]], file_path: str, settings: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Write benchmark results to a JSON file
+
+    Parameters:
+    - results: Measurements by benchmark name (see measure)
+    - file_path: Output JSON file
+    - settings: Benchmark settings recorded with the results
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = {
+        'created_at': datetime.now().isoformat(),
+        'commit': get_git_commit(os.path.dirname(os.path.abspath(__file__))),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': settings or {},
+        'results': {name: results[name] for name in sorted(results)}
+    }
+    with open(file_path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def load_results(file_path: str) -> Dict[str, Any]:
+    """Load a JSON result file written by save_results"""
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any], metric: str = 'p50_us') -> Dict[str, Dict[str, Any]]:
+    """
+    Compare two result files benchmark by benchmark
+
+    Parameters:
+    - old: Baseline results (as loaded by load_results)
+    - new: New results
+    - metric: Latency metric to compare
+
+    Returns:
+    Dictionary of benchmark name -> old value, new value and change in percent
+    (benchmarks missing from either file are left out)
+    """
+    comparison = {}
+    for name, result in new.get('results', {}).items():
+        baseline = old.get('results', {}).get(name)
+        if not baseline or metric not in baseline or metric not in result:
+            continue
+        change = (result[metric] - baseline[metric]) / baseline[metric] * 100 if baseline[metric] else 0.0
+        comparison[name] = {'old': baseline[metric], 'new': result[metric], 'change_percent': round(change, 1)}
+    return comparison
@@ -10,18 +10,73 @@ This module provides a Python interface to the ICICI Direct Breeze API for:
 The SDK handles authentication, session management, and provides high-level
 abstractions for common trading operations.
 """
-import breeze_connect
-from breeze_connect import BreezeConnect
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import urllib
 import sys
 import time
 import logging
-from typing import Dict, List, Optional, Any, Union, Generator
+from typing import Dict, List, Optional, Any, Union, Generator, Tuple
 import os
 import yaml
 import traceback
-from kite_utils import setup_logger, load_config
+from kite_utils import setup_logger
+from config_service import ConfigError, get_config_service
+from rate_limiter import TokenBucket, backoff_delay
+from session_cache import SessionExpiredError, get_session_cache
+
+# Calendar days per historical data request; Breeze returns at most 1000 candles per call
+HISTORY_WINDOW_DAYS = {
+    "1minute": 2,
+    "5minute": 10,
+    "30minute": 60,
+    "1day": 1000
+}
+
+# Messages of Breeze errors that mean the session token is expired or invalid
+SESSION_EXPIRED_ERRORS = (
+    'SESSIONKEY_INCORRECT',
+    'Could not authenticate credentials',
+    'Request token is required',
+    'Unable to retrieve customer details at the moment',
+    'Session key is expired'
+)
+
+# Breeze allows 100 API calls per minute; shared by every BreezeApi instance
+_history_rate_limiter = TokenBucket(rate=100 / 60, capacity=5)
+
+
+class HistoryFetchError(Exception):
+    """Raised when windows of a historical data request could not be fetched"""
+
+    def __init__(self, message: str, failed_windows: List[Tuple[datetime, datetime]],
+                 partial_data: Optional[List[Dict[str, Any]]] = None):
+        """Initialize the error.
+        
+        Args:
+            message: Description of the failure
+            failed_windows: (from_date, to_date) windows that returned no data
+            partial_data: Candles of the windows that were fetched
+        """
+        super().__init__(message)
+        self.failed_windows = failed_windows
+        self.partial_data = partial_data or []
+
+
+def _create_breeze_client(app_key: str) -> Any:
+    """Create a BreezeConnect client.
+    
+    The Breeze SDK (and its socket.io client) is imported here rather than at module
+    level, so scripts that import this module without connecting start quickly.
+    
+    Args:
+        app_key: API application key
+        
+    Returns:
+        BreezeConnect instance
+    """
+    from breeze_connect import BreezeConnect
+    return BreezeConnect(api_key=app_key)
 
 
 class BreezeApi:
@@ -72,24 +127,19 @@ class BreezeApi:
         self.logger = setup_logger(__name__, symbol)
         self.breeze = None
         
-        # Load configuration
+        # Load credentials (config.yaml is parsed once per process)
         try:
-            self.config = load_config()
-            breeze_config = self.config.get('breeze_api', {})
-            # Validate required Breeze configuration
-            required_params = ['api_token', 'secret_token', 'session_id']
-            missing_params = [param for param in required_params if param not in breeze_config]
-            
-            if missing_params:
-                error_msg = f"Missing required Breeze API parameters: {', '.join(missing_params)}"
-                self.logger.error(error_msg)
+            try:
+                credentials = get_config_service().get_breeze_credentials()
+            except ConfigError as e:
+                self.logger.error(f"Invalid Breeze API configuration: {e}")
                 self.print_config_instructions()
-                raise ValueError(error_msg)
+                raise
             
             # Store credentials
-            self.app_key = breeze_config[required_params[0]]
-            self.secret_key = breeze_config[required_params[1]]
-            self.session_token = breeze_config[required_params[2]]
+            self.app_key = credentials.api_token
+            self.secret_key = credentials.secret_token
+            self.session_token = credentials.session_id
             
             # Initialize Breeze API
             # self.initiate_api()
@@ -159,7 +209,7 @@ class BreezeApi:
                 raise ValueError("Request token is required")
             
             # Generate new session
-            self.breeze = BreezeConnect(api_key=self.app_key)
+            self.breeze = _create_breeze_client(self.app_key)
             data = self.breeze.generate_session(
                 api_secret=self.secret_key,
                 session_token=request_token
@@ -182,6 +232,7 @@ class BreezeApi:
             # Save updated config while preserving other sections
             with open('config/config.yaml', 'w') as f:
                 yaml.dump(existing_config, f, default_flow_style=False)
+            get_config_service().reload()
             
             print("\nSuccessfully generated new session token and updated config!")
             print("You can now continue with your trading operations.\n")
@@ -202,44 +253,67 @@ class BreezeApi:
         self.initiate_api()  # Reinitialize with new token
 
     def initiate_api(self) -> None:
-        """Initialize API connection and generate session."""
+        """Initialize API connection and generate session.
+        
+        A session token already rejected this trading day (see session_cache) fails at
+        once without another login attempt. generate_session still runs for a token
+        validated earlier today, since the Breeze SDK derives its request signing state
+        from it.
+        
+        Raises:
+            SessionExpiredError: If the session token is expired or invalid
+        """
+        session_cache = get_session_cache()
+        login_url = f"https://api.icicidirect.com/apiuser/login?api_key={urllib.parse.quote_plus(self.app_key)}"
+        if session_cache.is_expired('breeze', self.app_key, self.session_token):
+            self.logger.error("Breeze session token was already found expired this trading day")
+            self.print_token_renewal_instructions(login_url)
+            raise SessionExpiredError('breeze', "Breeze session token expired", login_url)
+        
         try:
-            self.breeze = BreezeConnect(api_key=self.app_key)
+            self.breeze = _create_breeze_client(self.app_key)
             self.breeze.generate_session(
                 api_secret=self.secret_key,
                 session_token=self.session_token
             )
+            session_cache.record_valid('breeze', self.app_key, self.session_token)
             self.logger.info("Successfully initialized Breeze API with credentials")
         except Exception as err:
             error_msg = str(err)
-            print(f"error_msg = {error_msg}")
-            if 'SESSIONKEY_INCORRECT' in error_msg or 'Could not authenticate credentials' in error_msg or 'Request token is required' in error_msg or 'Unable to retrieve customer details at the moment' in error_msg or 'Session key is expired' in error_msg:
-                self.logger.warning("Session expired or invalid, attempting to regenerate token")
-                login_url = f"https://api.icicidirect.com/apiuser/login?api_key={urllib.parse.quote_plus(self.app_key)}"
+            if any(marker in error_msg for marker in SESSION_EXPIRED_ERRORS):
+                self.logger.error(f"Breeze session expired or invalid: {error_msg}")
                 self.logger.info(f"login_url = {login_url}")
-                print("\n" + "="*80)
-                print("TOKEN RENEWAL INSTRUCTIONS")
-                print("="*80)
-                print("Your session has expired. Please follow these steps:")
-                print("1. Visit the login URL that will be shown below")
-                print("2. Login with your ICICI Direct credentials")
-                print("3. After login, you'll be redirected to a URL that looks like:")
-                print(f'   login_url = f"https://api.icicidirect.com/apiuser/login?api_key={urllib.parse.quote_plus(self.app_key)}"')
-                print("4. Copy the request_token value from the URL")
-                print("="*80 + "\n")
-                sys.exit(1)
-                # self.get_session_token()
+                session_cache.record_expired('breeze', self.app_key, self.session_token, error_msg)
+                self.print_token_renewal_instructions(login_url)
+                raise SessionExpiredError('breeze', f"Breeze session token expired: {error_msg}", login_url) from None
             else:
                 self.logger.error(f"Error initializing API: {err}\n{traceback.format_exc()}")
                 raise
 
+    @staticmethod
+    def print_token_renewal_instructions(login_url: str) -> None:
+        """Print the steps to renew an expired session token.
+        
+        Args:
+            login_url: ICICI Direct login URL of the app
+        """
+        print("\n" + "="*80)
+        print("TOKEN RENEWAL INSTRUCTIONS")
+        print("="*80)
+        print("Your session has expired. Please follow these steps:")
+        print(f"1. Visit the login URL: {login_url}")
+        print("2. Login with your ICICI Direct credentials")
+        print("3. After login, you'll be redirected to a URL that contains the session token")
+        print("4. Update session_id under breeze_api in config/config.yaml")
+        print("="*80 + "\n")
+
     def get_customer_details(self) -> Dict[str, Any]:
         """Get customer account details.
         
         Returns:
             Dictionary containing customer details
         """
-        return self.breeze.get_customer_details(api_session=self.config['breeze_api']['session_id'])
+        return self.breeze.get_customer_details(api_session=self.session_token)
     
     def connect_socket(self) -> None:
         """Connect to WebSocket for live data streaming."""
@@ -524,44 +598,125 @@ class BreezeApi:
             yield cur_date
             cur_date += timedelta(days=1)
 
+    def _get_history_windows(self, start_date: datetime, end_date: datetime,
+                             interval: str) -> List[Tuple[datetime, datetime]]:
+        """Split a date range into windows that fit one historical data request.
+        
+        Args:
+            start_date: Start date
+            end_date: End date
+            interval: Candle interval (1minute, 5minute, 30minute or 1day)
+            
+        Returns:
+            List of (from_date, to_date) windows covering the range
+        """
+        window = timedelta(days=HISTORY_WINDOW_DAYS.get(interval, 1))
+        windows = []
+        cur_date = start_date
+        while cur_date < end_date:  # api does not take same date for from date and to date
+            window_end = min(cur_date + window, end_date)
+            windows.append((cur_date, window_end))
+            cur_date = window_end
+        return windows
+
+    def _fetch_history_window(self, from_date: datetime, to_date: datetime, stock_code: str,
+                              exchange_code: str, interval: str, max_retries: int) -> List[Dict[str, Any]]:
+        """Fetch one window of historical data, retrying with exponential backoff.
+        
+        Args:
+            from_date: Window start
+            to_date: Window end
+            stock_code: Stock symbol
+            exchange_code: Exchange code
+            interval: Candle interval
+            max_retries: Number of retries on throttling or errors
+            
+        Returns:
+            List of historical data points of the window
+            
+        Raises:
+            HistoryFetchError: If every attempt failed
+        """
+        for attempt in range(max_retries + 1):
+            _history_rate_limiter.acquire()
+            try:
+                data = self.breeze.get_historical_data_v2(
+                    interval=interval,
+                    from_date=from_date,
+                    to_date=to_date,
+                    stock_code=stock_code,
+                    exchange_code=exchange_code,
+                    product_type="cash"
+                )
+            except Exception as e:
+                self.logger.warning(f"Historical data request {from_date.date()} - {to_date.date()} failed: {e}")
+                data = None
+
+            if data and data.get('Status') == 200:
+                return data.get('Success') or []
+            if data and data.get('Status') == 429:
+                self.logger.warning(f"Rate limited fetching {from_date.date()} - {to_date.date()}, retry {attempt + 1}/{max_retries}")
+            elif data:
+                self.logger.warning(f"Unexpected historical data response for {from_date.date()} - {to_date.date()}: {data.get('Status')} {data.get('Error')}")
+
+            if attempt < max_retries:
+                time.sleep(backoff_delay(attempt))
+
+        message = f"Giving up on historical data {from_date.date()} - {to_date.date()} for {stock_code} after {max_retries} retries"
+        self.logger.error(message)
+        raise HistoryFetchError(message, [(from_date, to_date)])
+
     def get_historical_one_min_data(self, start_date: str, end_date: str, 
                                   stock_code: str, 
-                                  exchange_code: str = "NSE") -> List[Dict[str, Any]]:
-        """Get historical one-minute data.
+                                  exchange_code: str = "NSE",
+                                  interval: str = "1day",
+                                  max_workers: int = 4,
+                                  max_retries: int = 5) -> List[Dict[str, Any]]:
+        """Get historical data for a date range.
+        
+        The range is split into windows that fit one request, fetched concurrently
+        under the shared Breeze rate limit, then merged and deduplicated by timestamp.
         
         Args:
-            date1: Start date in dd/mm/yyyy format
-            date2: End date in dd/mm/yyyy format
+            start_date: Start date in dd/mm/yyyy format
+            end_date: End date in dd/mm/yyyy format
             stock_code: Stock symbol
             exchange_code: Exchange code (default: NSE)
+            interval: Candle interval (default: 1day)
+            max_workers: Maximum number of concurrent requests
+            max_retries: Number of retries per window on throttling or errors
             
         Returns:
-            List of historical data points
-        """
-        hist_data = []
-        print(f"code = {stock_code}")
-        for cur_date in self.iterate_dates(self.get_date_obj(start_date), self.get_date_obj(end_date)):
-            end_date = cur_date + timedelta(days=1)
+            List of historical data points sorted by datetime
             
-            # print(f"cur date = {cur_date.isoformat()}")  # Uncomment for debugging
-            # print(f"end date = {end_date.isoformat()}")  # Uncomment for debugging
-            data = self.breeze.get_historical_data_v2(
-                interval="1day",
-                from_date=cur_date,
-                to_date=end_date,
-                stock_code=stock_code,
-                exchange_code=exchange_code,
-                product_type="cash"
-            )
-            # print(f"data = {data}")  # Uncomment for debugging
-            if data['Status'] == 200:
-                hist_data.extend(data['Success'])
-            elif data['Status'] == 429:
-                time.sleep(1)
-            else:
-                print(f"unexpected response, please check!")
-                time.sleep(1)
-
+        Raises:
+            HistoryFetchError: If any window could not be fetched; its partial_data holds
+                the candles of the other windows and failed_windows the missing ranges
+        """
+        windows = self._get_history_windows(self.get_date_obj(start_date), self.get_date_obj(end_date), interval)
+        self.logger.info(f"Fetching {interval} history for {stock_code}: {start_date} - {end_date} in {len(windows)} requests")
+
+        candles: Dict[str, Dict[str, Any]] = {}
+        failed_windows = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows) or 1))) as executor:
+            futures = [executor.submit(self._fetch_history_window, from_date, to_date, stock_code,
+                                       exchange_code, interval, max_retries)
+                       for from_date, to_date in windows]
+            # Windows are merged in range order, so a later window wins for an overlapping timestamp
+            for future in futures:
+                try:
+                    window_candles = future.result()
+                except HistoryFetchError as e:
+                    failed_windows.extend(e.failed_windows)
+                    continue
+                for candle in window_candles:
+                    candles[candle.get('datetime')] = candle
+
+        hist_data = [candles[key] for key in sorted(candles, key=str)]
+        if failed_windows:
+            missing = ', '.join(f"{from_date.date()} - {to_date.date()}" for from_date, to_date in failed_windows)
+            raise HistoryFetchError(f"Missing {interval} history for {stock_code}: {missing}", failed_windows, hist_data)
+        self.logger.info(f"Fetched {len(hist_data)} unique {interval} candles for {stock_code}")
         return hist_data
 
     def _load_config(self) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,206 @@
+"""
+Zerodha Equity Delivery Charges
+
+Sell-side charges and net P&L of equity delivery trades, with two APIs over the same
+rates:
+- Scalar functions returning dictionaries, for live order decisions
+  (calculate_zerodha_charges, calculate_profit_with_charges, required_sell_value)
+- NumPy functions taking arrays (or scalars, broadcast together) for backtests and
+  reports over millions of fills in one call (zerodha_charges_array,
+  sell_charges_array, profit_with_charges_array, required_sell_value_array)
+
+Every sell-side charge except the flat DP charge is a fixed fraction of the sell value,
+so total charges = sell_value * SELL_CHARGES_RATE + DP_CHARGES.
+NumPy is only imported by the array functions.
+"""
+from typing import Dict, Any
+
+# Zerodha Equity Delivery Sell-Side Charges
+BROKERAGE = 0.00                  # Zero for equity delivery
+STT_RATE = 0.001                  # STT: 0.1% of sell value
+EXCHANGE_CHARGES_RATE = 0.0000345  # NSE exchange transaction charges: 0.00345% of sell value
+SEBI_FEES_RATE = 0.000001         # SEBI turnover fees: 0.0001% of sell value
+GST_RATE = 0.18                   # GST: 18% on exchange charges + SEBI fees
+DP_CHARGES = 15.93                # DP charges: ₹13.5 + 18% GST per scrip per day
+
+# Charges per rupee of sell value, excluding the flat DP charge
+SELL_CHARGES_RATE = STT_RATE + (EXCHANGE_CHARGES_RATE + SEBI_FEES_RATE) * (1 + GST_RATE)
+
+
+def calculate_zerodha_charges(sell_value: float, quantity: int) -> dict:
+    """
+    Calculate all Zerodha charges for equity delivery sell orders
+
+    Parameters:
+    - sell_value: Total sell value (price * quantity)
+    - quantity: Number of shares being sold
+
+    Returns:
+    Dictionary containing all charges and total charges
+    """
+    stt = sell_value * STT_RATE
+    exchange_charges = sell_value * EXCHANGE_CHARGES_RATE
+    sebi_fees = sell_value * SEBI_FEES_RATE
+    gst = (exchange_charges + sebi_fees) * GST_RATE
+    total_charges = BROKERAGE + stt + exchange_charges + sebi_fees + DP_CHARGES + gst
+
+    return {
+        'brokerage': BROKERAGE,
+        'stt': stt,
+        'exchange_charges': exchange_charges,
+        'sebi_fees': sebi_fees,
+        'dp_charges': DP_CHARGES,
+        'gst': gst,
+        'total_charges': total_charges,
+        'charges_per_share': total_charges / quantity if quantity > 0 else 0
+    }
+
+
+def calculate_profit_with_charges(buy_price: float, sell_price: float, quantity: int) -> dict:
+    """
+    Calculate profit after considering all Zerodha charges
+
+    Parameters:
+    - buy_price: Average buy price per share
+    - sell_price: Sell price per share
+    - quantity: Number of shares
+
+    Returns:
+    Dictionary containing profit analysis
+    """
+    buy_value = buy_price * quantity
+    sell_value = sell_price * quantity
+    gross_profit = sell_value - buy_value
+
+    charges = calculate_zerodha_charges(sell_value, quantity)
+    total_charges = charges['total_charges']
+    net_profit = gross_profit - total_charges
+
+    return {
+        'buy_value': buy_value,
+        'sell_value': sell_value,
+        'gross_profit': gross_profit,
+        'gross_profit_percentage': (gross_profit / buy_value) * 100 if buy_value > 0 else 0,
+        'charges': charges,
+        'total_charges': total_charges,
+        'charges_percentage': (total_charges / buy_value) * 100 if buy_value > 0 else 0,
+        'net_profit': net_profit,
+        'net_profit_percentage': (net_profit / buy_value) * 100 if buy_value > 0 else 0,
+        'break_even_price': buy_price + (total_charges / quantity) if quantity > 0 else buy_price
+    }
+
+
+def required_sell_value(buy_value: float, target_net_profit_percentage: float) -> float:
+    """
+    Total sell value that earns the target net profit percentage on a buy value after charges
+
+    Parameters:
+    - buy_value: Total buy value (price * quantity)
+    - target_net_profit_percentage: Target net profit percentage
+
+    Returns:
+    Required total sell value
+    """
+    return (buy_value * (1 + target_net_profit_percentage / 100) + DP_CHARGES) / (1 - SELL_CHARGES_RATE)
+
+
+def sell_charges_array(sell_value: Any) -> Any:
+    """
+    Vectorised total of calculate_zerodha_charges
+
+    Parameters:
+    - sell_value: Array of total sell values (price * quantity)
+
+    Returns:
+    Array of total charges
+    """
+    import numpy as np
+
+    return np.asarray(sell_value, dtype=np.float64) * SELL_CHARGES_RATE + DP_CHARGES
+
+
+def zerodha_charges_array(sell_value: Any) -> Dict[str, Any]:
+    """
+    Vectorised calculate_zerodha_charges with every charge component
+
+    Parameters:
+    - sell_value: Array of total sell values (price * quantity)
+
+    Returns:
+    Dictionary of arrays: 'stt', 'exchange_charges', 'sebi_fees', 'dp_charges', 'gst' and 'total_charges'
+    """
+    import numpy as np
+
+    sell_value = np.asarray(sell_value, dtype=np.float64)
+    stt = sell_value * STT_RATE
+    exchange_charges = sell_value * EXCHANGE_CHARGES_RATE
+    sebi_fees = sell_value * SEBI_FEES_RATE
+    gst = (exchange_charges + sebi_fees) * GST_RATE
+    dp_charges = np.full_like(sell_value, DP_CHARGES)
+    return {
+        'stt': stt,
+        'exchange_charges': exchange_charges,
+        'sebi_fees': sebi_fees,
+        'dp_charges': dp_charges,
+        'gst': gst,
+        'total_charges': stt + exchange_charges + sebi_fees + dp_charges + gst
+    }
+
+
+def profit_with_charges_array(buy_price: Any, sell_price: Any, quantity: Any) -> Dict[str, Any]:
+    """
+    Vectorised calculate_profit_with_charges (arguments are broadcast)
+
+    Parameters:
+    - buy_price: Average buy prices per share
+    - sell_price: Sell prices per share
+    - quantity: Numbers of shares
+
+    Returns:
+    Dictionary of arrays: 'buy_value', 'sell_value', 'gross_profit', 'total_charges', 'net_profit',
+    'gross_profit_percentage', 'charges_percentage', 'net_profit_percentage' and 'break_even_price'
+    (percentages are 0 where the buy value is 0, the break-even price is the buy price where
+    the quantity is 0)
+    """
+    import numpy as np
+
+    buy_price = np.asarray(buy_price, dtype=np.float64)
+    quantity = np.asarray(quantity, dtype=np.float64)
+    buy_value = buy_price * quantity
+    sell_value = np.asarray(sell_price, dtype=np.float64) * quantity
+    gross_profit = sell_value - buy_value
+    total_charges = sell_value * SELL_CHARGES_RATE + DP_CHARGES
+    net_profit = gross_profit - total_charges
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_base = np.where(buy_value > 0, 100 / buy_value, 0.0)
+        break_even_price = np.where(quantity > 0, buy_price + total_charges / quantity, buy_price)
+
+    return {
+        'buy_value': buy_value,
+        'sell_value': sell_value,
+        'gross_profit': gross_profit,
+        'total_charges': total_charges,
+        'net_profit': net_profit,
+        'gross_profit_percentage': gross_profit * percent_base,
+        'charges_percentage': total_charges * percent_base,
+        'net_profit_percentage': net_profit * percent_base,
+        'break_even_price': break_even_price
+    }
+
+
+def required_sell_value_array(buy_value: Any, target_net_profit_percentage: Any) -> Any:
+    """
+    Vectorised required_sell_value (arguments are broadcast)
+
+    Parameters:
+    - buy_value: Array of total buy values (position cost bases)
+    - target_net_profit_percentage: Target net profit percentage(s)
+
+    Returns:
+    Array of required total sell values
+    """
+    import numpy as np
+
+    buy_value = np.asarray(buy_value, dtype=np.float64)
+    return (buy_value * (1 + np.asarray(target_net_profit_percentage) / 100) + DP_CHARGES) / (1 - SELL_CHARGES_RATE)
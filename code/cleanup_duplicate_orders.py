@@ -4,39 +4,28 @@ Script to clean up duplicate GTT orders
 This script will identify duplicate orders and cancel them, keeping only the first set of orders.
 """
 
-import json
-import os
 import sys
 import traceback
 from datetime import datetime
 from typing import List, Dict, Any
 from kite_utils import setup_logger
 from kite_connect_api import KiteConnectAPI
+from gtt_history_journal import get_gtt_history_journal
 
 def load_gtt_history(company_name: str, logger) -> List[Dict[str, Any]]:
-    """Load GTT history from JSON file"""
+    """Load GTT history from the history snapshot plus journal"""
     try:
-        file_path = os.path.join('workdir', 'orders', f'{company_name}_gtt_history.json')
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        return []
+        return get_gtt_history_journal(company_name, logger).load()
     except Exception as e:
         logger.error(f"Error loading GTT history: {e}")
         return []
 
 def save_gtt_history(company_name: str, gtt_orders: List[Dict[str, Any]], logger) -> None:
-    """Save GTT history to JSON file"""
+    """Save GTT history by journaling the changed orders"""
     try:
-        # Create orders directory if it doesn't exist
-        orders_dir = os.path.join('workdir', 'orders')
-        os.makedirs(orders_dir, exist_ok=True)
-        
-        file_path = os.path.join(orders_dir, f'{company_name}_gtt_history.json')
-        with open(file_path, 'w') as f:
-            json.dump(gtt_orders, f, indent=4)
-        
-        logger.info(f"GTT history saved to {file_path}")
+        journal = get_gtt_history_journal(company_name, logger)
+        journal.record(gtt_orders)
+        logger.info(f"GTT history saved to {journal.snapshot_path}")
     except Exception as e:
         logger.error(f"Error saving GTT history: {e}")
 
@@ -0,0 +1,314 @@
+"""
+Config Service
+
+Single-parse, cached access to config/config.yaml. The file is located and parsed
+once per process and validated against CONFIG_SCHEMA; every caller (KiteConnectAPI,
+initialize_kite, BreezeApi, FallBuy, the schedulers) then reads the cached copy
+instead of searching for and parsing the file again.
+
+Callers get typed, immutable views of the sections they need:
+- get_kite_credentials() -> KiteCredentials
+- get_breeze_credentials() -> BreezeCredentials
+- get_strategy_params() -> StrategyParams (the 'stratergy' section)
+
+Long-running processes pick up edits to the file: the file's mtime is checked at
+most every check_interval seconds and the config is re-parsed when it changed. A
+reload that fails validation is logged and the previous config is kept.
+
+Example:
+    config = get_config_service()
+    credentials = config.get_kite_credentials()
+    kite = KiteConnect(api_key=credentials.api_key)
+    params = config.get_strategy_params()
+    order_count = params.get('order_count', 10)
+"""
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, NamedTuple, Optional, Union
+
+import yaml
+
+CONFIG_RELATIVE_PATH = os.path.join('config', 'config.yaml')
+DEFAULT_CHECK_INTERVAL = 1.0
+
+_NUMBER = (int, float)
+
+# Expected value types by section and key; keys not listed here are allowed and kept
+CONFIG_SCHEMA: Dict[str, Dict[str, Any]] = {
+    'kite_connect': {
+        'api_key': str,
+        'api_secret': str,
+        'access_token': str,
+        'request_token': str,
+        'redirect_url': str,
+        'rate_limit_dir': str
+    },
+    'breeze_api': {
+        'api_token': str,
+        'secret_token': str,
+        'session_id': (str, int)
+    },
+    'stratergy': {
+        'buy': _NUMBER,
+        'sell': _NUMBER,
+        'start_buy': _NUMBER,
+        'linear_from': _NUMBER,
+        'order_count': int,
+        'start_quantity': int,
+        'price_difference_percent': _NUMBER,
+        'steps': int,
+        'base_shares': int,
+        'max_fall_pct': _NUMBER,
+        'fall_power': _NUMBER,
+        'size_power': _NUMBER,
+        'size_multiplier': _NUMBER
+    }
+}
+
+
+class ConfigError(ValueError):
+    """Raised when config.yaml is invalid or misses a required value"""
+
+
+class KiteCredentials(NamedTuple):
+    """Kite Connect credentials from the kite_connect section"""
+    api_key: str
+    api_secret: Optional[str] = None
+    access_token: Optional[str] = None
+    request_token: Optional[str] = None
+    redirect_url: Optional[str] = None
+    rate_limit_dir: Optional[str] = None
+
+
+class BreezeCredentials(NamedTuple):
+    """Breeze API credentials from the breeze_api section"""
+    api_token: str
+    secret_token: str
+    session_id: Union[str, int]
+
+
+class StrategyParams(NamedTuple):
+    """Strategy parameters from the stratergy section (None when not configured)"""
+    buy: Optional[float] = None
+    sell: Optional[float] = None
+    start_buy: Optional[float] = None
+    linear_from: Optional[float] = None
+    order_count: Optional[int] = None
+    start_quantity: Optional[int] = None
+    price_difference_percent: Optional[float] = None
+    steps: Optional[int] = None
+    base_shares: Optional[int] = None
+    max_fall_pct: Optional[float] = None
+    fall_power: Optional[float] = None
+    size_power: Optional[float] = None
+    size_multiplier: Optional[float] = None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get a parameter, or default when it is not configured"""
+        value = getattr(self, name) if name in self._fields else None
+        return default if value is None else value
+
+
+def find_config_path() -> str:
+    """
+    Locate config/config.yaml
+
+    Looks relative to the working directory and to this file, then in config/ of
+    every parent of the working directory.
+
+    Returns:
+    - str: Path to the config file
+
+    Raises:
+    - FileNotFoundError: If no config file is found
+    """
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    possible_paths = [
+        CONFIG_RELATIVE_PATH,  # Relative to current directory
+        os.path.join(code_dir, '..', CONFIG_RELATIVE_PATH)  # Relative to this file
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+
+    # Search from the current directory up to the root directory
+    current_dir = os.getcwd()
+    while current_dir != os.path.dirname(current_dir):
+        test_path = os.path.join(current_dir, CONFIG_RELATIVE_PATH)
+        if os.path.exists(test_path):
+            return test_path
+        current_dir = os.path.dirname(current_dir)
+
+    logging.error(f"Config file not found. Tried paths: {possible_paths}")
+    logging.error(f"Current working directory: {os.getcwd()}")
+    raise FileNotFoundError("Config file config/config.yaml not found in any expected location")
+
+
+def validate_config(config: Any) -> List[str]:
+    """
+    Check a parsed config against CONFIG_SCHEMA
+
+    Parameters:
+    - config: Parsed YAML document
+
+    Returns:
+    List of problems (empty when the config is valid)
+    """
+    if not isinstance(config, dict):
+        return ["config.yaml must contain a mapping of sections"]
+
+    errors = []
+    for section, fields in CONFIG_SCHEMA.items():
+        values = config.get(section)
+        if values is None:
+            continue
+        if not isinstance(values, dict):
+            errors.append(f"'{section}' must be a mapping")
+            continue
+        for key, expected in fields.items():
+            value = values.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, expected):
+                names = '/'.join(t.__name__ for t in expected) if isinstance(expected, tuple) else expected.__name__
+                errors.append(f"'{section}.{key}' must be {names}, got {type(value).__name__}")
+    return errors
+
+
+def _section_view(view: type, section: Dict[str, Any]) -> Any:
+    """Build a NamedTuple view from the fields of a config section"""
+    return view(**{field: section[field] for field in view._fields if section.get(field) is not None})
+
+
+class ConfigService:
+    """Class to parse config.yaml once and serve cached, immutable views of it"""
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        """
+        Initialize the config service
+
+        Parameters:
+        - path: Path to config.yaml (default: located with find_config_path on first use)
+        - check_interval: Minimum seconds between mtime checks for reloads (0 checks on every access)
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.loads = 0
+        self._config: Optional[Dict[str, Any]] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._views: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Parse and validate the file (the lock must be held)"""
+        if self.path is None:
+            self.path = os.path.abspath(find_config_path())
+            logging.info(f"Using config file at: {self.path}")
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, 'r') as f:
+            config = yaml.safe_load(f)
+
+        errors = validate_config(config)
+        if errors:
+            raise ConfigError(f"Invalid config file {self.path}: {'; '.join(errors)}")
+
+        self._config = config
+        self._mtime = mtime
+        self._views = {}
+        self.loads += 1
+
+    def _ensure_loaded(self) -> Dict[str, Any]:
+        """Load the config on first use and reload it when the file changed"""
+        with self._lock:
+            if self._config is None:
+                self._load()
+                self._checked_at = time.monotonic()
+            elif time.monotonic() - self._checked_at >= self.check_interval:
+                self._checked_at = time.monotonic()
+                try:
+                    if os.path.getmtime(self.path) != self._mtime:
+                        self._load()
+                        logging.info(f"Reloaded changed config file {self.path}")
+                except (OSError, yaml.YAMLError, ConfigError) as e:
+                    logging.error(f"Error reloading config, keeping the previous version: {e}")
+            return self._config
+
+    def reload(self) -> None:
+        """Re-parse the file now (e.g. right after writing a new token to it)"""
+        with self._lock:
+            self._load()
+            self._checked_at = time.monotonic()
+
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Get the whole config
+
+        Returns:
+        Deep copy of the parsed config.yaml (callers may modify it)
+        """
+        return copy.deepcopy(self._ensure_loaded())
+
+    def _get_view(self, section: str, view: type, required: tuple = ()) -> Any:
+        config = self._ensure_loaded()
+        with self._lock:
+            cached = self._views.get(section)
+            if cached is not None and cached[0] is config:
+                return cached[1]
+
+        values = config.get(section) or {}
+        missing = [key for key in required if values.get(key) in (None, '')]
+        if missing:
+            raise ConfigError(f"Missing required {section} parameters in config.yaml: {', '.join(missing)}")
+        result = _section_view(view, values)
+        with self._lock:
+            self._views[section] = (config, result)
+        return result
+
+    def get_kite_credentials(self) -> KiteCredentials:
+        """
+        Get the Kite Connect credentials
+
+        Raises:
+        - ConfigError: If kite_connect.api_key is missing
+        """
+        return self._get_view('kite_connect', KiteCredentials, required=('api_key',))
+
+    def get_breeze_credentials(self) -> BreezeCredentials:
+        """
+        Get the Breeze API credentials
+
+        Raises:
+        - ConfigError: If api_token, secret_token or session_id is missing
+        """
+        return self._get_view('breeze_api', BreezeCredentials, required=BreezeCredentials._fields)
+
+    def get_strategy_params(self) -> StrategyParams:
+        """Get the strategy parameters (unset parameters are None)"""
+        return self._get_view('stratergy', StrategyParams)
+
+
+_shared_services: Dict[Optional[str], ConfigService] = {}
+_shared_services_lock = threading.Lock()
+
+
+def get_config_service(path: Optional[str] = None) -> ConfigService:
+    """
+    Get the process-wide config service
+
+    Parameters:
+    - path: Path to config.yaml (default: the located config/config.yaml)
+
+    Returns:
+    ConfigService shared by every caller with the same path
+    """
+    key = os.path.abspath(path) if path else None
+    with _shared_services_lock:
+        service = _shared_services.get(key)
+        if service is None:
+            service = ConfigService(key)
+            _shared_services[key] = service
+        return service
@@ -20,7 +20,8 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any
 from kite_connect_api import KiteConnectAPI
-from kite_utils import setup_logger, load_config
+from kite_utils import setup_logger
+from config_service import get_config_service
 
 
 class GTTOrderDeleter:
@@ -41,7 +42,7 @@ class GTTOrderDeleter:
         
         # Test config loading first
         try:
-            load_config()
+            get_config_service().get_kite_credentials()
             self.logger.info("Configuration loaded successfully")
         except Exception as e:
             self.logger.error(f"Failed to load configuration: {e}")
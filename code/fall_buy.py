@@ -7,7 +7,8 @@ import traceback
 import json
 import atexit
 import pytz
-from kite_utils import load_config, setup_logger
+from kite_utils import setup_logger
+from config_service import StrategyParams, get_config_service
 from kite_connect_api import KiteConnectAPI
 
 
@@ -102,7 +103,6 @@ class FallBuy:
         self.exchange = exchange.strip()
         self.stock_name = stock_name.strip()
         self.demo_mode = demo_mode
-        self.config = load_config()
         self.kite_api = None
         self.order_history = []
         self.current_price = None
@@ -217,31 +217,32 @@ class FallBuy:
         self.start_buy = strategy_config['start_buy']
         self.linear_from = strategy_config['linear_from']
 
-    def _load_trading_params(self) -> Dict[str, Any]:
+    def _load_trading_params(self) -> StrategyParams:
         """
         Load trading parameters from config
         
         Returns:
-        Dictionary containing trading parameters
+        StrategyParams view of the stratergy section
         """
         try:
-            # Get trading parameters from config
-            self.logger.info(self.config)
-            trading_params = self.config.get('stratergy', {})
+            # Get trading parameters from config (only this section is logged, never the credentials)
+            trading_params = get_config_service().get_strategy_params()
+            self.logger.info(f"Strategy parameters: {trading_params._asdict()}")
             
             # Validate required parameters
             required_params = ['sell', 'buy', 'start_buy', 'linear_from']
-            missing_params = [param for param in required_params if param not in trading_params]
+            missing_params = [param for param in required_params if getattr(trading_params, param) is None]
             
-            self.buy_perc = trading_params['buy']
-            self.sell_perc = trading_params['sell']
-            self.start_buy = trading_params['start_buy']
-            self.linear_from = trading_params['linear_from']
             if missing_params:
                 error_msg = f"Missing required trading parameters: {', '.join(missing_params)}"
                 self.logger.error(error_msg)
                 raise ValueError(error_msg)
             
+            self.buy_perc = trading_params.buy
+            self.sell_perc = trading_params.sell
+            self.start_buy = trading_params.start_buy
+            self.linear_from = trading_params.linear_from
+            
             return trading_params
             
         except Exception as e:
@@ -2,16 +2,27 @@ import logging
 import sys
 import time
 import traceback
-import json
 import os
+import csv
 import threading
 from datetime import datetime, time as dt_time
 import pytz
 from typing import Dict, Any, Optional, List
-from kite_utils import setup_logger, load_config
+from kite_utils import setup_logger
 from breeze_sdk_api import BreezeApi
 from kite_connect_api import KiteConnectAPI
-import pandas as pd
+from instrument_master import InstrumentMaster, get_shared_instrument_master
+from gtt_history_journal import get_gtt_history_journal
+from tick_dispatcher import TickDispatcher
+from order_updates import OrderUpdateListener, KiteTickerOrderSource
+from tick_math import get_tick_grid, nse_tick_size_for_price, to_paise
+from http_session import get_connection_stats
+
+
+# Seconds between monitoring cycles when fills are detected by polling
+MONITOR_CYCLE_SECONDS = 120
+# Seconds between reconciliation cycles when order updates are connected
+ORDER_RECONCILE_SECONDS = 900
 
 
 def is_market_hours() -> bool:
@@ -33,7 +44,7 @@ def is_market_hours() -> bool:
 
 def save_gtt_history(company_name: str, gtt_orders: List[Dict[str, Any]], logger: logging.Logger) -> None:
     """
-    Save GTT order history to JSON file
+    Save GTT order history by appending the changed orders to the history journal
     
     Parameters:
     - company_name: Name of the company
@@ -41,25 +52,8 @@ def save_gtt_history(company_name: str, gtt_orders: List[Dict[str, Any]], logger
     - logger: Logger instance
     """
     try:
-        # Create orders directory if it doesn't exist
-        orders_dir = os.path.join('workdir', 'orders')
-        os.makedirs(orders_dir, exist_ok=True)
-        
-        # Prepare history data
-        history_data = {
-            'company_name': company_name,
-            'last_updated': datetime.now().isoformat(),
-            'gtt_orders': gtt_orders,
-            'total_orders': len(gtt_orders)
-        }
-        
-        # Save to JSON file
-        file_path = os.path.join(orders_dir, f'{company_name}_gtt_history.json')
-        
-        with open(file_path, 'w') as f:
-            json.dump(history_data, f, indent=4)
-        
-        logger.info(f"GTT history saved: {len(gtt_orders)} orders")
+        events_written = get_gtt_history_journal(company_name, logger).record(gtt_orders)
+        logger.info(f"GTT history saved: {len(gtt_orders)} orders ({events_written} journal events)")
         
     except Exception as e:
         logger.error(f"Error saving GTT history: {e}")
@@ -67,51 +61,22 @@ def save_gtt_history(company_name: str, gtt_orders: List[Dict[str, Any]], logger
 
 def load_gtt_history(company_name: str, logger: logging.Logger) -> List[Dict[str, Any]]:
     """
-    Load GTT order history from JSON file
+    Load GTT order history by replaying the history snapshot plus journal
     
     Parameters:
     - company_name: Name of the company
     - logger: Logger instance
     
     Returns:
-    - List of GTT order details or empty list if file doesn't exist
+    - List of GTT order details or empty list if there is no history
     """
     try:
-        file_path = os.path.join('workdir', 'orders', f'{company_name}_gtt_history.json')
-        if os.path.exists(file_path):
-            # Check if file is empty
-            if os.path.getsize(file_path) == 0:
-                logger.info(f"GTT history file is empty: {file_path}")
-                return []
-            
-            try:
-                with open(file_path, 'r') as f:
-                    history_data = json.load(f)
-                
-                # Validate that history_data is a dictionary
-                if not isinstance(history_data, dict):
-                    logger.warning(f"Invalid GTT history format in {file_path}")
-                    return []
-                
-                gtt_orders = history_data.get('gtt_orders', [])
-                
-                # Validate that gtt_orders is a list
-                if not isinstance(gtt_orders, list):
-                    logger.warning(f"Invalid gtt_orders format in {file_path}")
-                    return []
-                
-                logger.info(f"Loaded GTT history: {len(gtt_orders)} orders")
-                return gtt_orders
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in GTT history file: {e}")
-                return []
-            except Exception as e:
-                logger.error(f"Error reading GTT history file: {e}")
-                return []
+        gtt_orders = get_gtt_history_journal(company_name, logger).load()
+        if gtt_orders:
+            logger.info(f"Loaded GTT history: {len(gtt_orders)} orders")
         else:
-            logger.info(f"No GTT history file found. Starting fresh.")
-            return []
+            logger.info(f"No GTT history found. Starting fresh.")
+        return gtt_orders
             
     except Exception as e:
         logger.error(f"Error loading GTT history: {e}")
@@ -293,6 +258,70 @@ def place_gtt_order(kite_api: KiteConnectAPI, trading_symbol: str, exchange: str
         return None
 
 
+def place_buy_gtt_batch(kite_api: KiteConnectAPI, company_name: str, stock_exchange: str,
+                        planned_orders: List[Dict[str, Any]], current_price: float,
+                        logger: logging.Logger) -> List[Dict[str, Any]]:
+    """
+    Place planned buy GTT orders together with KiteConnectAPI.place_gtt_batch
+    
+    Parameters:
+    - kite_api: Initialized Kite API instance
+    - company_name: Company name
+    - stock_exchange: Stock exchange
+    - planned_orders: Orders to place, dicts with 'order_number', 'quantity', 'price' and 'trigger_price'
+    - current_price: Current price of the stock
+    - logger: Logger instance
+    
+    Returns:
+    - List of history details of the orders that were placed, in plan order (failed and
+      duplicate orders are left out)
+    """
+    if not planned_orders:
+        return []
+    
+    # Keys describe only the order, so a rung planned again by an overlapping cycle or a
+    # retry is placed once; KiteConnectAPI expires them after its gtt_dedupe_ttl
+    specs = [{
+        'trading_symbol': company_name,
+        'exchange': stock_exchange,
+        'transaction_type': 'BUY',
+        'quantity': order['quantity'],
+        'price': order['price'],
+        'trigger_price': order['trigger_price'],
+        'current_price': current_price,
+        'idempotency_key': f"{stock_exchange}:{company_name}:BUY:{order['quantity']}@{order['price']}/{order['trigger_price']}"
+    } for order in planned_orders]
+    results = kite_api.place_gtt_batch(specs)
+    
+    new_gtt_orders = []
+    for order, result in zip(planned_orders, results):
+        if result['status'] == 'FAILED':
+            logger.error(f"Failed to place GTT order {order['order_number']}: {result['error']}")
+            continue
+        if result['status'] == 'DUPLICATE':
+            logger.info(f"GTT order {order['order_number']} duplicates trigger {result['trigger_id']}, not recorded again")
+            continue
+        
+        logger.info(f"Successfully placed GTT order {order['order_number']}: {result['trigger_id']}")
+        new_gtt_orders.append({
+            'trigger_id': result['trigger_id'],
+            'trading_symbol': company_name,
+            'exchange': stock_exchange,
+            'transaction_type': 'BUY',
+            'quantity': order['quantity'],
+            'price': order['price'],
+            'trigger_price': order['trigger_price'],
+            'order_type': 'LIMIT',
+            'validity': 'DAY',
+            'date_placed': datetime.now().isoformat(),
+            'current_price_when_placed': current_price,
+            'status': 'ACTIVE',
+            'percentage_drop_from_entry': order['order_number']
+        })
+    
+    return new_gtt_orders
+
+
 def calculate_total_shares_and_avg_price(gtt_orders: List[Dict[str, Any]]) -> tuple:
     """
     Calculate total shares and average price from executed buy orders
@@ -483,45 +512,57 @@ def update_gtt_order_statuses(kite_api: KiteConnectAPI, company_name: str, stock
         return gtt_orders, False, 0, 0
 
 
-def get_instrument_master(kite_api: KiteConnectAPI, file_path: str = "instruments.csv") -> Optional[pd.DataFrame]:
+def get_instrument_master(kite_api: KiteConnectAPI, file_path: str = "instruments.csv") -> Optional[InstrumentMaster]:
     """
     Downloads the latest instrument master file from Zerodha if it doesn't exist
-    or is too old, then loads it into a Pandas DataFrame.
+    or is too old, then loads it into the shared in-memory InstrumentMaster.
     
     Parameters:
     - kite_api: Initialized Kite API instance
     - file_path: Path to save/load the instrument master file
     
     Returns:
-    - pd.DataFrame: Instrument master data or None if error
+    - InstrumentMaster: Indexed instrument master or None if error
     """
+    instrument_master = get_shared_instrument_master(file_path)
     try:
         # Check if file exists and is recent (e.g., less than a day old)
         if os.path.exists(file_path):
             mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
             if (datetime.now() - mod_time).days < 1:
                 logging.info(f"Using existing instrument master file: {file_path}")
-                return pd.read_csv(file_path)
+                return instrument_master if instrument_master.load() else None
         
         logging.info("Downloading latest instrument master file...")
         instruments_data = kite_api.kite.instruments()
-        df = pd.DataFrame(instruments_data)
-        df.to_csv(file_path, index=False)
+        if not instruments_data:
+            logging.error("Instrument master download returned no instruments")
+            return None
+        
+        with open(file_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(instruments_data[0].keys()))
+            writer.writeheader()
+            writer.writerows(instruments_data)
+        
+        # Re-index from the downloaded rows so every caller sees the fresh data without a re-parse,
+        # and refresh the binary snapshot used by the next process start
+        instrument_master.load_records(instruments_data)
+        instrument_master.write_snapshot()
         logging.info(f"Instrument master file downloaded and saved to {file_path}")
-        return df
+        return instrument_master
     except Exception as e:
         logging.error(f"Error downloading instrument master file: {e}")
         logging.error("Could not download instrument master. Please ensure your access token is valid.")
         return None
 
 
-def get_tick_size_from_instruments(df_instruments: pd.DataFrame, trading_symbol: str, exchange: str) -> float:
+def get_tick_size_from_instruments(instrument_master: InstrumentMaster, trading_symbol: str, exchange: str) -> float:
     """
     Retrieves the tick size for a given trading symbol and exchange
-    from the instrument master DataFrame.
+    from the in-memory instrument master.
     
     Parameters:
-    - df_instruments: Instrument master DataFrame
+    - instrument_master: Loaded InstrumentMaster
     - trading_symbol: Trading symbol of the stock
     - exchange: Exchange name (e.g., "NSE")
     
@@ -532,15 +573,11 @@ def get_tick_size_from_instruments(df_instruments: pd.DataFrame, trading_symbol:
         # Ensure exchange is a string for comparison
         exchange_str = exchange.replace('KITE_EXCHANGE_', '')  # e.g., converts 'KITE_EXCHANGE_NSE' to 'NSE'
         
-        instrument_info = df_instruments[
-            (df_instruments['tradingsymbol'] == trading_symbol) &
-            (df_instruments['exchange'] == exchange_str)
-        ]
+        tick_size = instrument_master.get_tick_size(exchange_str, trading_symbol)
         
-        if not instrument_info.empty:
-            tick_size = instrument_info.iloc[0]['tick_size']
+        if tick_size is not None:
             logging.info(f"Found tick size for {trading_symbol} on {exchange_str}: {tick_size}")
-            return float(tick_size)
+            return tick_size
         else:
             logging.warning(f"Tick size not found for {trading_symbol} on {exchange_str}. Falling back to default 0.01.")
             return 0.01  # Default fallback for most NSE stocks
@@ -553,7 +590,8 @@ def get_tick_size_from_instruments(df_instruments: pd.DataFrame, trading_symbol:
 def round_to_tick(price: float, tick_size: float) -> float:
     """
     Rounds a given price to the nearest multiple of the specified tick size.
-    This is the improved version from Gemini AI with better precision handling.
+    The price is converted to a whole number of ticks (see tick_math.TickGrid), so the
+    result is always exactly on the tick grid.
     
     Parameters:
     - price: Original price to round
@@ -566,18 +604,8 @@ def round_to_tick(price: float, tick_size: float) -> float:
         if tick_size <= 0:
             raise ValueError("Tick size must be greater than zero.")
         
-        # Convert to integer for precision, then back
-        # Example: 289.57 / 0.05 = 5791.4 -> round(5791.4) = 5791 -> 5791 * 0.05 = 289.55
-        # Example: 289.67 / 0.05 = 5793.4 -> round(5793.4) = 5793 -> 5793 * 0.05 = 289.65
-        rounded_price = round(price / tick_size) * tick_size
-        
-        # Handle floating point inaccuracies: ensure it's represented correctly
-        # Determine decimal places needed based on tick_size
-        decimal_places = 0
-        if '.' in str(tick_size):
-            decimal_places = len(str(tick_size).split('.')[-1])
-        
-        return round(rounded_price, decimal_places)
+        # Example: 289.57 / 0.05 = 5791.4 ticks -> 5791 ticks -> 289.55
+        return get_tick_grid(tick_size).round(price)
         
     except Exception as e:
         logging.error(f"Error rounding price {price} with tick size {tick_size}: {e}")
@@ -589,7 +617,7 @@ def calculate_gtt_prices(current_price: float, drop_percentage: float, tick_size
                         order_type: str = "BUY", price_delta_ticks: int = 2) -> tuple:
     """
     Calculate GTT trigger price and limit price based on current price and drop percentage.
-    This incorporates the improved logic from Gemini AI.
+    The trigger is rounded to the tick grid once; the limit is a whole number of ticks away.
     
     Parameters:
     - current_price: Current last traded price
@@ -602,22 +630,21 @@ def calculate_gtt_prices(current_price: float, drop_percentage: float, tick_size
     - tuple: (trigger_price, limit_price)
     """
     try:
-        # Calculate raw target price based on drop percentage
-        target_price_raw = current_price * (1 - (drop_percentage / 100))
+        grid = get_tick_grid(tick_size)
         
-        # Round trigger price to valid tick size
-        trigger_price = round_to_tick(target_price_raw, tick_size)
+        # Calculate raw target price based on drop percentage and round it to whole ticks
+        target_price_raw = current_price * (1 - (drop_percentage / 100))
+        trigger_ticks = grid.to_ticks(target_price_raw)
         
-        # Calculate limit price with delta
         if order_type == "BUY":
             # For BUY orders: limit price slightly above trigger price
-            limit_price_raw = trigger_price + (tick_size * price_delta_ticks)
+            limit_ticks = trigger_ticks + price_delta_ticks
         else:
             # For SELL orders: limit price slightly below trigger price
-            limit_price_raw = trigger_price - (tick_size * price_delta_ticks)
+            limit_ticks = trigger_ticks - price_delta_ticks
         
-        # Round limit price to valid tick size
-        limit_price = round_to_tick(limit_price_raw, tick_size)
+        trigger_price = grid.to_price(trigger_ticks)
+        limit_price = grid.to_price(limit_ticks)
         
         logging.info(f"Price calculation for {order_type} order:")
         logging.info(f"  Current price: {current_price:.2f}")
@@ -649,58 +676,22 @@ def get_tick_size_for_stock(trading_symbol: str, current_price: float = None) ->
     - float: Tick size for the stock
     """
     try:
-        # First, try to get tick size from instruments.csv (most accurate)
+        # First, try to get tick size from the in-memory instrument master (most accurate)
         try:
-            import pandas as pd
-            import os
-            
-            # Check if instruments.csv exists
-            instruments_file = "instruments.csv"
-            if os.path.exists(instruments_file):
-                # Read instruments.csv
-                df = pd.read_csv(instruments_file)
-                
-                # Filter for the specific stock and NSE equity
-                stock_data = df[
-                    (df['tradingsymbol'] == trading_symbol.upper()) & 
-                    (df['exchange'] == 'NSE') & 
-                    (df['instrument_type'] == 'EQ')
-                ]
-                
-                if not stock_data.empty:
-                    tick_size = stock_data.iloc[0]['tick_size']
-                    logging.info(f"Found tick size for {trading_symbol}: {tick_size} from instruments.csv")
-                    return float(tick_size)
-                else:
-                    logging.warning(f"No tick size found for {trading_symbol} in instruments.csv. Using dynamic calculation.")
+            instrument = get_shared_instrument_master("instruments.csv").get_instrument('NSE', trading_symbol)
+            
+            if instrument and instrument['instrument_type'] == 'EQ' and instrument['tick_size'] > 0:
+                logging.debug(f"Found tick size for {trading_symbol}: {instrument['tick_size']} from instrument master")
+                return instrument['tick_size']
             else:
-                logging.warning(f"Instruments file {instruments_file} not found. Using dynamic calculation.")
+                logging.warning(f"No tick size found for {trading_symbol} in instrument master. Using dynamic calculation.")
                 
         except Exception as e:
-            logging.error(f"Error reading instruments.csv: {e}. Using dynamic calculation.")
+            logging.error(f"Error reading instrument master: {e}. Using dynamic calculation.")
         
         # Fallback: If current_price is provided, calculate tick size dynamically based on NSE rules
         if current_price is not None and current_price > 0:
-            # NSE tick size rules based on price range:
-            # Below ₹250: ₹0.01
-            # ₹250 to ₹1,000: ₹0.05
-            # > ₹1,000 to ₹5,000: ₹0.10
-            # > ₹5,000 to ₹10,000: ₹0.50
-            # > ₹10,000 to ₹20,000: ₹1.00
-            # > ₹20,000: ₹5.00
-            
-            if current_price < 250:
-                return 0.01
-            elif current_price <= 1000:
-                return 0.05
-            elif current_price <= 5000:
-                return 0.10
-            elif current_price <= 10000:
-                return 0.50
-            elif current_price <= 20000:
-                return 1.00
-            else:
-                return 5.00
+            return nse_tick_size_for_price(current_price)
         
         # Final fallback: default tick size
         logging.warning(f"Using default tick size for {trading_symbol}: 0.01")
@@ -740,15 +731,15 @@ def is_similar_to_existing_orders(new_price: float, new_trigger_price: float, ex
                 existing_trigger_price = order.get('condition', {}).get('price', 0)
                 
                 if existing_price > 0:
-                    # Check order price similarity
-                    price_diff = abs(new_price - existing_price) / existing_price
+                    # Check order price similarity (in whole paise, so equal prices compare exactly)
+                    price_diff = abs(to_paise(new_price) - to_paise(existing_price)) / to_paise(existing_price)
                     if price_diff <= similarity_threshold:
                         logging.info(f"New order price {new_price:.2f} is similar to existing order price {existing_price:.2f} (diff: {price_diff*100:.2f}%)")
                         return True
                     
                     # Check trigger price similarity
                     if existing_trigger_price > 0:
-                        trigger_diff = abs(new_trigger_price - existing_trigger_price) / existing_trigger_price
+                        trigger_diff = abs(to_paise(new_trigger_price) - to_paise(existing_trigger_price)) / to_paise(existing_trigger_price)
                         if trigger_diff <= similarity_threshold:
                             logging.info(f"New trigger price {new_trigger_price:.2f} is similar to existing trigger price {existing_trigger_price:.2f} (diff: {trigger_diff*100:.2f}%)")
                             return True
@@ -933,10 +924,7 @@ def handle_tick_data(tick_data: Dict[str, Any], kite_api: KiteConnectAPI, breeze
             current_gtt_orders = kite_api.get_gtt_orders()
             
             # Filter for company-specific active buy orders
-            active_buy_orders = [order for order in current_gtt_orders 
-                               if (order.get('condition', {}).get('tradingsymbol', '').upper() == company_name.upper() and 
-                                   order.get('orders', [{}])[0].get('transaction_type') == 'BUY' and 
-                                   order.get('status', '').upper() in ['ACTIVE', 'PENDING', 'OPEN'])]
+            active_buy_orders = get_active_buy_orders(current_gtt_orders, company_name)
             
             logger.info(f"Tick: Active buy orders for {company_name}: {len(active_buy_orders)}")
             
@@ -967,13 +955,275 @@ def handle_tick_data(tick_data: Dict[str, Any], kite_api: KiteConnectAPI, breeze
         logger.error(f"Error in tick data handler: {e}")
 
 
+def start_tick_dispatcher(breeze_api: BreezeApi, kite_api: KiteConnectAPI, company_name: str, stock_exchange: str,
+                          gtt_orders: List[Dict[str, Any]], logger: logging.Logger,
+                          previous_dispatcher: Optional[TickDispatcher] = None) -> TickDispatcher:
+    """
+    Route the Breeze ticks of a company to handle_tick_data
+    
+    Parameters:
+    - breeze_api: Initialized Breeze API instance
+    - kite_api: Initialized Kite API instance
+    - company_name: Company name
+    - stock_exchange: Stock exchange
+    - gtt_orders: List of GTT orders from history file
+    - logger: Logger instance
+    - previous_dispatcher: Dispatcher of an earlier connection, stopped before the new one starts
+    
+    Returns:
+    - TickDispatcher: The dispatcher now receiving the ticks (stop it on shutdown)
+    """
+    if previous_dispatcher is not None:
+        previous_dispatcher.stop()
+    
+    def tick_handler(tick_data):
+        handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, gtt_orders, logger)
+    
+    # Ticks are handed to a per-symbol worker so the socket thread never waits on Kite I/O
+    tick_dispatcher = TickDispatcher(tick_handler, name=company_name)
+    breeze_api.set_on_ticks(tick_dispatcher.submit)
+    logger.info("Tick handler set up successfully")
+    return tick_dispatcher
+
+
+def start_order_updates(kite_api: KiteConnectAPI, company_name: str, stock_exchange: str,
+                        gtt_orders: List[Dict[str, Any]], logger: logging.Logger, source="kite_ticker",
+                        get_price=None) -> Optional[OrderUpdateListener]:
+    """
+    Apply the company's order updates to the history as they happen
+    
+    A completed GTT buy manages the sell order and refills the ladder at once, so the
+    monitoring loop only has to reconcile missed updates.
+    
+    Parameters:
+    - kite_api: Initialized Kite API instance
+    - company_name: Company name
+    - stock_exchange: Stock exchange
+    - gtt_orders: List of GTT orders from history file
+    - logger: Logger instance
+    - source: Order update source (see order_updates), or "kite_ticker" to use the
+      KiteTicker of the Kite session
+    - get_price: Optional function returning the latest price (default: the fill price)
+    
+    Returns:
+    - OrderUpdateListener: The started listener (stop it on shutdown), or None if it could not start
+    """
+    def on_order_update(event):
+        order = apply_order_update(company_name, gtt_orders, event, logger, kite_api)
+        if order is None or event['status'] != 'COMPLETE':
+            return
+        
+        # A triggered GTT left the order book; do not reuse the cached snapshot
+        kite_api.gtt_cache.invalidate()
+        if event.get('transaction_type') != 'BUY':
+            return
+        
+        current_price = (get_price() if get_price else None) or event.get('average_price') or event.get('price')
+        manage_sell_orders_based_on_history(kite_api, company_name, stock_exchange, gtt_orders, current_price, logger)
+        active_buy_orders = get_active_buy_orders(kite_api.get_gtt_orders(), company_name)
+        refill_buy_ladder(kite_api, company_name, stock_exchange, gtt_orders, active_buy_orders, current_price, logger)
+    
+    try:
+        if source == "kite_ticker":
+            source = KiteTickerOrderSource.from_kite(kite_api.kite)
+        order_updates = OrderUpdateListener(source)
+        order_updates.add_handler(lambda event: on_order_update(event) if event.get('tradingsymbol') == company_name else None)
+        order_updates.start()
+        logger.info(f"Listening for order updates of {company_name}")
+        return order_updates
+    except Exception as e:
+        logger.warning(f"Could not start order updates: {e}. Fills are detected by polling only")
+        return None
+
+
+def get_active_buy_orders(current_gtt_orders: List[Dict[str, Any]], company_name: str) -> List[Dict[str, Any]]:
+    """
+    Filter a Kite GTT order book down to the active buy orders of one company
+    
+    Parameters:
+    - current_gtt_orders: GTT orders as returned by kite_api.get_gtt_orders()
+    - company_name: Company name
+    
+    Returns:
+    - List of active buy GTT orders for the company
+    """
+    active_buy_orders = []
+    for order in current_gtt_orders:
+        if (order.get('condition', {}).get('tradingsymbol', '').upper() == company_name.upper() and 
+            order.get('orders', [{}])[0].get('transaction_type') == 'BUY' and 
+            order.get('status', '').upper() in ['ACTIVE', 'PENDING', 'OPEN']):
+            active_buy_orders.append(order)
+    return active_buy_orders
+
+
+def refill_buy_ladder(kite_api: KiteConnectAPI, company_name: str, stock_exchange: str, 
+                      gtt_orders: List[Dict[str, Any]], active_buy_orders: List[Dict[str, Any]], 
+                      current_price: float, logger: logging.Logger, target_active_orders: int = 5) -> int:
+    """
+    Place new buy GTT orders below the lowest active one until the ladder is back
+    to target_active_orders orders. New orders are appended to gtt_orders and saved.
+    
+    Parameters:
+    - kite_api: Initialized Kite API instance
+    - company_name: Company name
+    - stock_exchange: Stock exchange
+    - gtt_orders: List of GTT orders from history file
+    - active_buy_orders: Active buy GTT orders of the company from the Kite order book
+    - current_price: Current price of the stock
+    - logger: Logger instance
+    - target_active_orders: Number of active buy orders to maintain
+    
+    Returns:
+    - int: Number of new buy orders placed
+    """
+    # Maintain exactly target_active_orders active buy orders
+    orders_placed = 0
+    if len(active_buy_orders) < target_active_orders:
+        orders_needed = target_active_orders - len(active_buy_orders)
+        logger.info(f"Need to place {orders_needed} more buy orders to maintain {target_active_orders} active orders")
+        logger.info(f"Current active orders: {len(active_buy_orders)}/{target_active_orders}")
+        
+        # Get the lowest active buy order price to calculate next order price (last order in sequence)
+        lowest_active_price = None
+        if active_buy_orders:
+            # Extract prices from the nested GTT order structure
+            prices = []
+            logger.debug(f"Found {len(active_buy_orders)} active buy orders to extract prices from")
+            
+            for i, order in enumerate(active_buy_orders):
+                try:
+                    
+                    # Try multiple ways to extract price
+                    order_price = None
+                    
+                    # Method 1: Try nested orders structure
+                    if 'orders' in order and order['orders']:
+                        order_price = order['orders'][0].get('price')
+                        logger.debug(f"Method 1 - Price from orders[0].price: {order_price}")
+                    
+                    # Method 2: Try direct price field
+                    if not order_price and 'price' in order:
+                        order_price = order.get('price')
+                        logger.debug(f"Method 2 - Price from direct price field: {order_price}")
+                    
+                    # Method 3: Try condition structure
+                    if not order_price and 'condition' in order:
+                        order_price = order['condition'].get('price')
+                        logger.debug(f"Method 3 - Price from condition.price: {order_price}")
+                    
+                    if order_price and order_price != float('inf') and order_price > 0:
+                        prices.append(order_price)
+                        logger.debug(f"Valid price found: {order_price}")
+                    else:
+                        logger.warning(f"Invalid price found: {order_price}")
+                        
+                except (IndexError, TypeError) as e:
+                    logger.warning(f"Could not extract price from order {i+1}: {e}")
+                    continue
+            
+            if prices:
+                lowest_active_price = min(prices)  # Use lowest price (last order in sequence)
+                logger.info(f"Lowest active order price (last order): {lowest_active_price}")
+            else:
+                logger.warning("No valid prices found in existing orders, using current market price")
+                lowest_active_price = current_price
+        
+        if lowest_active_price:
+            # Use the lowest active price as the base for new orders
+            previous_order_price = lowest_active_price
+            logger.info(f"Starting new order placement from lowest active price: {previous_order_price}")
+            
+            # Get tick size for the stock using improved method
+            tick_size = get_tick_size_for_stock(company_name, current_price)
+            logger.info(f"Tick size for {company_name}: {tick_size}")
+            tick_grid = get_tick_grid(tick_size)
+            previous_order_ticks = tick_grid.to_ticks(previous_order_price)
+            
+            planned_orders = []
+            for i in range(orders_needed):
+                # Calculate the correct order number and quantity based on existing orders
+                # We need to find the lowest existing order number and add 1
+                existing_order_numbers = []
+                for order in active_buy_orders:
+                    try:
+                        # Try to get quantity from the order to determine order number
+                        quantity = order.get('orders', [{}])[0].get('quantity', 0)
+                        if quantity > 0:
+                            existing_order_numbers.append(quantity)
+                            logger.debug(f"Found existing order with quantity: {quantity}")
+                    except (IndexError, TypeError):
+                        continue
+                
+                if existing_order_numbers:
+                    # Find the highest existing order number
+                    highest_existing = max(existing_order_numbers)
+                    order_number = highest_existing + 1
+                    logger.debug(f"Highest existing order number: {highest_existing}, new order number: {order_number}")
+                else:
+                    # If no existing orders found, start with 1
+                    order_number = 1
+                    logger.debug(f"No existing orders found, starting with order number: {order_number}")
+                
+                quantity = order_number  # Quantity equals the order number: 1, 2, 3, 4, 5, 6, 7, etc.
+                
+                logger.debug(f"existing_order_count={len(active_buy_orders)}, i={i}, order_number={order_number}")
+                logger.debug(f"Attempting to place order {i+1}/{orders_needed} with order_number={order_number}")
+                
+                # Trigger 1% below the previous order price (the lowest active price for the
+                # first new order), limit 1% below the trigger; both are whole ticks
+                trigger_ticks = tick_grid.shift_percent(previous_order_ticks, -1.0)
+                order_ticks = tick_grid.shift_percent(trigger_ticks, -1.0)
+                trigger_price = tick_grid.to_price(trigger_ticks)
+                order_price = tick_grid.to_price(order_ticks)
+                logger.debug(f"Order {i+1} - trigger 1% below {tick_grid.to_price(previous_order_ticks):.2f} -> {trigger_price:.2f}, limit 1% below trigger -> {order_price:.2f}")
+                
+                logger.info(f"Placing GTT order {order_number}: {quantity} shares @ {order_price:.2f} (trigger: {trigger_price:.2f}) - {order_number}% drop from entry")
+                logger.debug(f"Price validation - Order: {order_price:.2f}, Trigger: {trigger_price:.2f}, Tick size: {tick_size}")
+                
+                # Check if new price is similar to existing orders
+                logger.debug(f"Checking if price {order_price:.2f} is similar to existing orders...")
+                if is_similar_to_existing_orders(order_price, trigger_price, active_buy_orders):
+                    logger.info(f"New price {order_price:.2f} is similar to existing orders. Skipping this order.")
+                    logger.debug(f"Order {i+1} skipped due to similar price")
+                    continue
+                
+                logger.debug(f"Price check passed, queueing order for batch placement...")
+                planned_orders.append({
+                    'order_number': order_number,
+                    'quantity': quantity,
+                    'price': order_price,
+                    'trigger_price': trigger_price
+                })
+                
+                # Update previous order price for next iteration
+                previous_order_ticks = order_ticks
+            
+            # Place the whole refill as one batch and add the placed orders to local tracking
+            new_gtt_orders = place_buy_gtt_batch(kite_api, company_name, stock_exchange, planned_orders,
+                                                 current_price, logger)
+            gtt_orders.extend(new_gtt_orders)
+            orders_placed = len(new_gtt_orders)
+            
+            # Save updated GTT history
+            save_gtt_history(company_name, gtt_orders, logger)
+            logger.info("Updated GTT history saved")
+        else:
+            logger.warning("No active buy orders found, cannot determine price for new orders")
+    else:
+        logger.info(f"Already have {target_active_orders} active buy orders, no new orders needed")
+        logger.info(f"Active orders count: {len(active_buy_orders)}/{target_active_orders}")
+    
+    return orders_placed
+
+
 def monitor_and_manage_sell_orders(kite_api: KiteConnectAPI, breeze_api: BreezeApi, 
                                  company_name: str, stock_exchange: str, 
                                  gtt_orders: List[Dict[str, Any]], logger: logging.Logger,
-                                 stop_monitoring: threading.Event) -> None:
+                                 stop_monitoring: threading.Event, cycle_seconds: float = MONITOR_CYCLE_SECONDS) -> None:
     """
-    Monitor GTT orders every 5 minutes and manage sell orders for profit booking
+    Monitor GTT orders every cycle and manage sell orders for profit booking
     Also maintain exactly 5 active buy orders by placing new orders when existing ones are triggered
+    With order updates connected (see start_order_updates) the cycle only reconciles missed updates
     
     Parameters:
     - kite_api: Initialized Kite API instance
@@ -983,13 +1233,14 @@ def monitor_and_manage_sell_orders(kite_api: KiteConnectAPI, breeze_api: BreezeA
     - gtt_orders: List of GTT orders
     - logger: Logger instance
     - stop_monitoring: Threading event to stop monitoring
+    - cycle_seconds: Seconds between monitoring cycles
     """
-    logger.info("Starting GTT order monitoring thread")
+    logger.info(f"Starting GTT order monitoring thread ({cycle_seconds:.0f}s cycles)")
     
     # Track if sell order was placed outside market hours
     sell_order_placed_outside_market = False
     consecutive_market_closed_cycles = 0
-    max_market_closed_cycles = 12  # 1 hour (12 * 5 minutes) of market closed before stopping
+    max_market_closed_cycles = max(1, int(3600 / cycle_seconds))  # 1 hour of market closed before stopping
     
     # Track the next order number for maintaining 5 active orders
     next_order_number = 6  # Start with 6 since we already have orders 1-5
@@ -1018,7 +1269,7 @@ def monitor_and_manage_sell_orders(kite_api: KiteConnectAPI, breeze_api: BreezeA
             current_price = get_current_price(breeze_api, company_name)
             if not current_price:
                 logger.warning("Could not get current price. Skipping this cycle.")
-                time.sleep(300)  # Wait 5 minutes
+                stop_monitoring.wait(min(300, cycle_seconds))
                 continue
             
             # First, check for newly executed buy orders and update sell order immediately
@@ -1056,186 +1307,12 @@ def monitor_and_manage_sell_orders(kite_api: KiteConnectAPI, breeze_api: BreezeA
                 logger.info("Continuing with empty GTT orders list")
             
             # Count active buy orders for the company
-            active_buy_orders = []
-            for order in current_gtt_orders:
-                if (order.get('condition', {}).get('tradingsymbol', '').upper() == company_name.upper() and 
-                    order.get('orders', [{}])[0].get('transaction_type') == 'BUY' and 
-                    order.get('status', '').upper() in ['ACTIVE', 'PENDING', 'OPEN']):
-                    active_buy_orders.append(order)
-            
+            active_buy_orders = get_active_buy_orders(current_gtt_orders, company_name)
             logger.info(f"Active buy orders for {company_name}: {len(active_buy_orders)}")
             
             # Maintain exactly 5 active buy orders
-            if len(active_buy_orders) < 5:
-                orders_needed = 5 - len(active_buy_orders)
-                logger.info(f"Need to place {orders_needed} more buy orders to maintain 5 active orders")
-                logger.info(f"Current active orders: {len(active_buy_orders)}/5")
-                
-                # Get the lowest active buy order price to calculate next order price (last order in sequence)
-                lowest_active_price = None
-                if active_buy_orders:
-                    # Extract prices from the nested GTT order structure
-                    prices = []
-                    logger.info(f"DEBUG: Found {len(active_buy_orders)} active buy orders to extract prices from")
-                    
-                    for i, order in enumerate(active_buy_orders):
-                        try:
-                            logger.info(f"DEBUG: Order {i+1} structure: {order}")
-                            
-                            # Try multiple ways to extract price
-                            order_price = None
-                            
-                            # Method 1: Try nested orders structure
-                            if 'orders' in order and order['orders']:
-                                order_price = order['orders'][0].get('price')
-                                logger.info(f"DEBUG: Method 1 - Price from orders[0].price: {order_price}")
-                            
-                            # Method 2: Try direct price field
-                            if not order_price and 'price' in order:
-                                order_price = order.get('price')
-                                logger.info(f"DEBUG: Method 2 - Price from direct price field: {order_price}")
-                            
-                            # Method 3: Try condition structure
-                            if not order_price and 'condition' in order:
-                                order_price = order['condition'].get('price')
-                                logger.info(f"DEBUG: Method 3 - Price from condition.price: {order_price}")
-                            
-                            if order_price and order_price != float('inf') and order_price > 0:
-                                prices.append(order_price)
-                                logger.info(f"DEBUG: Valid price found: {order_price}")
-                            else:
-                                logger.warning(f"DEBUG: Invalid price found: {order_price}")
-                                
-                        except (IndexError, TypeError) as e:
-                            logger.warning(f"Could not extract price from order {i+1}: {e}")
-                            continue
-                    
-                    if prices:
-                        lowest_active_price = min(prices)  # Use lowest price (last order in sequence)
-                        logger.info(f"Lowest active order price (last order): {lowest_active_price}")
-                    else:
-                        logger.warning("No valid prices found in existing orders, using current market price")
-                        lowest_active_price = current_price
-                
-                if lowest_active_price:
-                    # Use the lowest active price as the base for new orders
-                    previous_order_price = lowest_active_price
-                    logger.info(f"Starting new order placement from lowest active price: {previous_order_price}")
-                    
-                    # Get tick size for the stock using improved method
-                    tick_size = get_tick_size_for_stock(company_name, current_price)
-                    logger.info(f"Tick size for {company_name}: {tick_size}")
-                    
-                    for i in range(orders_needed):
-                        # Calculate the correct order number and quantity based on existing orders
-                        # We need to find the lowest existing order number and add 1
-                        existing_order_numbers = []
-                        for order in active_buy_orders:
-                            try:
-                                # Try to get quantity from the order to determine order number
-                                quantity = order.get('orders', [{}])[0].get('quantity', 0)
-                                if quantity > 0:
-                                    existing_order_numbers.append(quantity)
-                                    logger.debug(f"DEBUG: Found existing order with quantity: {quantity}")
-                            except (IndexError, TypeError):
-                                continue
-                        
-                        if existing_order_numbers:
-                            # Find the highest existing order number
-                            highest_existing = max(existing_order_numbers)
-                            order_number = highest_existing + 1
-                            logger.info(f"DEBUG: Highest existing order number: {highest_existing}, new order number: {order_number}")
-                        else:
-                            # If no existing orders found, start with 1
-                            order_number = 1
-                            logger.info(f"DEBUG: No existing orders found, starting with order number: {order_number}")
-                        
-                        quantity = order_number  # Quantity equals the order number: 1, 2, 3, 4, 5, 6, 7, etc.
-                        
-                        logger.info(f"DEBUG: existing_order_count={len(active_buy_orders)}, i={i}, order_number={order_number}")
-                        logger.info(f"DEBUG: Attempting to place order {i+1}/{orders_needed} with order_number={order_number}")
-                        
-                        # Calculate order price using improved method
-                        if i == 0:  # First new order in this cycle
-                            # For 6th order: trigger at 1% below lowest active price, limit at 1% below trigger
-                            raw_trigger_price = previous_order_price * 0.99  # 1% below lowest active price
-                            trigger_price = round_to_tick(raw_trigger_price, tick_size)
-                            
-                            raw_order_price = trigger_price * 0.99  # 1% below trigger price
-                            order_price = round_to_tick(raw_order_price, tick_size)
-                            
-                            logger.info(f"DEBUG: First order - trigger at 1% below lowest active price: {previous_order_price} * 0.99 = {raw_trigger_price:.4f} -> {trigger_price:.2f}")
-                            logger.info(f"DEBUG: First order - limit at 1% below trigger: {trigger_price} * 0.99 = {raw_order_price:.4f} -> {order_price:.2f}")
-                        else:
-                            # For subsequent orders: trigger at 1% below previous order price, limit at 1% below trigger
-                            raw_trigger_price = previous_order_price * 0.99  # 1% below previous order price
-                            trigger_price = round_to_tick(raw_trigger_price, tick_size)
-                            
-                            raw_order_price = trigger_price * 0.99  # 1% below trigger price
-                            order_price = round_to_tick(raw_order_price, tick_size)
-                            
-                            logger.info(f"DEBUG: Subsequent order - trigger at 1% below previous price: {previous_order_price} * 0.99 = {raw_trigger_price:.4f} -> {trigger_price:.2f}")
-                            logger.info(f"DEBUG: Subsequent order - limit at 1% below trigger: {trigger_price} * 0.99 = {raw_order_price:.4f} -> {order_price:.2f}")
-                        
-                        logger.info(f"Placing GTT order {order_number}: {quantity} shares @ {order_price:.2f} (trigger: {trigger_price:.2f}) - {order_number}% drop from entry")
-                        logger.info(f"DEBUG: Price validation - Order: {order_price:.2f}, Trigger: {trigger_price:.2f}, Tick size: {tick_size}")
-                        
-                        # Check if new price is similar to existing orders
-                        logger.info(f"DEBUG: Checking if price {order_price:.2f} is similar to existing orders...")
-                        if is_similar_to_existing_orders(order_price, trigger_price, active_buy_orders):
-                            logger.info(f"New price {order_price:.2f} is similar to existing orders. Skipping this order.")
-                            logger.info(f"DEBUG: Order {i+1} skipped due to similar price")
-                            continue
-                        
-                        logger.info(f"DEBUG: Price check passed, proceeding with order placement...")
-                        
-                        # Place a GTT buy order
-                        gtt_order_id = place_gtt_order(
-                            kite_api=kite_api,
-                            trading_symbol=company_name,
-                            exchange=stock_exchange,
-                            transaction_type="BUY",
-                            quantity=quantity,
-                            price=order_price,
-                            trigger_price=trigger_price,
-                            current_price=current_price
-                        )
-                        
-                        if gtt_order_id:
-                            logger.info(f"Successfully placed new GTT order {order_number}: {gtt_order_id}")
-                            
-                            # Add to local tracking
-                            new_order_details = {
-                                'trigger_id': gtt_order_id,
-                                'trading_symbol': company_name,
-                                'exchange': stock_exchange,
-                                'transaction_type': 'BUY',
-                                'quantity': quantity,
-                                'price': order_price,
-                                'trigger_price': trigger_price,
-                                'order_type': 'LIMIT',
-                                'validity': 'DAY',
-                                'date_placed': datetime.now().isoformat(),
-                                'current_price_when_placed': current_price,
-                                'status': 'ACTIVE',
-                                'percentage_drop_from_entry': order_number
-                            }
-                            gtt_orders.append(new_order_details)
-                            
-                            # Update previous order price for next iteration
-                            previous_order_price = order_price
-                        else:
-                            logger.error(f"Failed to place new GTT order {order_number}")
-                            break
-                    
-                    # Save updated GTT history
-                    save_gtt_history(company_name, gtt_orders, logger)
-                    logger.info("Updated GTT history saved")
-                else:
-                    logger.warning("No active buy orders found, cannot determine price for new orders")
-            else:
-                logger.info("Already have 5 active buy orders, no new orders needed")
-                logger.info(f"Active orders count: {len(active_buy_orders)}/5")
+            refill_buy_ladder(kite_api, company_name, stock_exchange, gtt_orders, active_buy_orders, 
+                              current_price, logger)
             
             # Calculate total shares and average price from executed buy orders
             # Update order statuses before calculating shares
@@ -1410,26 +1487,124 @@ def monitor_and_manage_sell_orders(kite_api: KiteConnectAPI, breeze_api: BreezeA
             else:
                 logger.info("No shares available for selling")
             
+            logger.info(f"GTT book cache stats: {kite_api.get_gtt_cache_stats()}")
+            logger.info(f"Kite request stats: {kite_api.get_request_stats()}")
+            logger.info(f"HTTP connection stats: {get_connection_stats('kite')}")
             logger.info("=== End Monitoring Cycle ===")
             
             # Reset sell order flag when market opens
             if is_market_open:
                 sell_order_placed_outside_market = False
             
-            # Wait 2 minutes before next cycle (reduced from 5 minutes since we have tick data)
-            # This cycle now focuses on order maintenance rather than price monitoring
-            time.sleep(120)
+            # This cycle focuses on order maintenance; ticks and order updates react in between
+            stop_monitoring.wait(cycle_seconds)
             
         except Exception as e:
             logger.error(f"Error in monitoring cycle: {e}\n{traceback.format_exc()}")
-            time.sleep(300)  # Wait 5 minutes before retrying
+            stop_monitoring.wait(min(300, cycle_seconds))
     
     logger.info("GTT order monitoring stopped")
     # Signal main thread to stop
     stop_monitoring.set()
 
 
-def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, cancel_orders: bool = False):
+def place_buy_ladder(kite_api: KiteConnectAPI, company_name: str, stock_exchange: str, num_orders: int, 
+                     previous_order_price: float, current_price: float, existing_order_count: int, 
+                     active_buy_orders: List[Dict[str, Any]], existing_gtt_orders: List[Dict[str, Any]], 
+                     logger: logging.Logger) -> List[Dict[str, Any]]:
+    """
+    Place the initial fall-buy ladder of GTT buy orders below a starting price
+    
+    Parameters:
+    - kite_api: Initialized Kite API instance
+    - company_name: Company name
+    - stock_exchange: Stock exchange
+    - num_orders: Number of GTT orders to place
+    - previous_order_price: Price the first order is placed below
+    - current_price: Current price of the stock
+    - existing_order_count: Number of active buy orders that already exist
+    - active_buy_orders: Active buy orders used for the similar-price check
+    - existing_gtt_orders: Orders already in the history file
+    - logger: Logger instance
+    
+    Returns:
+    - List of details of the newly placed orders
+    """
+    # Place multiple GTT orders with different quantities and prices
+    # First order will be 0.27% below current price (to meet Kite's 0.25% minimum requirement), then 1% below previous order price for gradual fall buy strategy
+    # Quantities will be based on percentage drop from first share price: 1% drop = 1 share, 2% drop = 2 shares, etc.
+    # Prices are planned first, then the whole ladder is placed as one batch
+    planned_orders = []
+    
+    # Get tick size for the stock
+    tick_size = get_tick_size_for_stock(company_name, current_price)
+    
+    for i in range(1, num_orders + 1):  # 1 to num_orders
+        # Calculate the correct order number and quantity based on existing orders
+        order_number = existing_order_count + i  # If 0 existing orders, new orders are 1, 2, 3, 4, 5
+        quantity = order_number  # Quantity equals the order number: 1, 2, 3, 4, 5 shares
+        
+        logger.debug(f"existing_order_count={existing_order_count}, i={i}, order_number={order_number}")
+        logger.debug(f"Attempting to place order {i}/{num_orders}")
+        
+        # Calculate order price using improved method
+        if i == 1:  # First new order in this cycle
+            drop_percentage = 0.27
+            trigger_price, order_price = calculate_gtt_prices(
+                current_price=previous_order_price,
+                drop_percentage=drop_percentage,
+                tick_size=tick_size,
+                order_type="BUY",
+                price_delta_ticks=2
+            )
+            logger.debug(f"First order - calculated prices using {drop_percentage}% drop from lowest active price")
+        else:
+            drop_percentage = 1.0
+            trigger_price, order_price = calculate_gtt_prices(
+                current_price=previous_order_price,
+                drop_percentage=drop_percentage,
+                tick_size=tick_size,
+                order_type="BUY",
+                price_delta_ticks=2
+            )
+            logger.debug(f"Subsequent order - calculated prices using {drop_percentage}% drop from previous price")
+        
+        logger.info(f"Placing GTT order {order_number}: {quantity} shares @ {order_price:.2f} (trigger: {trigger_price:.2f}) - {order_number}% drop from entry")
+        logger.debug(f"Price validation - Order: {order_price:.2f}, Trigger: {trigger_price:.2f}, Tick size: {tick_size}")
+        
+        # Check if new price is similar to existing orders
+        logger.debug(f"Checking if price {order_price:.2f} is similar to existing orders...")
+        if is_similar_to_existing_orders(order_price, trigger_price, active_buy_orders):
+            logger.info(f"New price {order_price:.2f} is similar to existing orders. Skipping this order.")
+            logger.debug(f"Order {i} skipped due to similar price")
+            continue
+        
+        logger.debug(f"Price check passed, queueing order for batch placement...")
+        planned_orders.append({
+            'order_number': order_number,
+            'quantity': quantity,
+            'price': order_price,
+            'trigger_price': trigger_price
+        })
+        
+        # Update previous order price for next iteration
+        previous_order_price = order_price
+    
+    new_gtt_orders = place_buy_gtt_batch(kite_api, company_name, stock_exchange, planned_orders, current_price, logger)
+    logger.info(f"Placed {len(new_gtt_orders)}/{len(planned_orders)} planned GTT orders")
+    
+    # Save to history file immediately to prevent loss of orders
+    if new_gtt_orders:
+        try:
+            save_gtt_history(company_name, existing_gtt_orders + new_gtt_orders, logger)
+        except Exception as e:
+            logger.error(f"Error saving placed orders to history: {e}")
+    
+    return new_gtt_orders
+
+
+def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, cancel_orders: bool = False,
+         order_update_source="kite_ticker"):
     """
     Main function to handle GTT fall buy strategy
     
@@ -1438,6 +1613,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
     - stock_exchange: Stock exchange (default: "NSE")
     - num_orders: Number of GTT orders to place (default: 5)
     - cancel_orders: If True, cancel all existing GTT orders (default: False)
+    - order_update_source: Order update source or "kite_ticker" (None polls for fills)
     """
     # Set up logger
     logger = setup_logger(__name__, company_name)
@@ -1445,15 +1621,25 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
     # Global variables for cleanup
     breeze_api = None
     stop_monitoring = None
+    tick_dispatcher = None
+    order_updates = None
     
     def cleanup_on_exit():
         """Cleanup function to be called on exit"""
-        nonlocal breeze_api, stop_monitoring
+        nonlocal breeze_api, stop_monitoring, tick_dispatcher, order_updates
         try:
             if stop_monitoring:
                 stop_monitoring.set()
                 logger.info("Stop monitoring signal set")
             
+            if order_updates:
+                logger.info(f"Order update stats: {order_updates.get_stats()}")
+                order_updates.stop()
+            
+            if tick_dispatcher:
+                logger.info(f"Tick dispatcher metrics: {tick_dispatcher.get_metrics()}")
+                tick_dispatcher.stop()
+            
             if breeze_api:
                 try:
                     if hasattr(breeze_api, 'breeze') and hasattr(breeze_api.breeze, 'sio'):
@@ -1468,6 +1654,28 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
         except Exception as e:
             logger.warning(f"Error during cleanup on exit: {e}")
     
+    def start_monitoring(all_gtt_orders):
+        """Connect order updates and start the monitoring thread; returns (stop event, thread)"""
+        nonlocal order_updates
+        # Fills arrive as order update events; polling then only reconciles missed updates
+        cycle_seconds = MONITOR_CYCLE_SECONDS
+        if order_update_source is not None:
+            if order_updates:
+                order_updates.stop()
+            order_updates = start_order_updates(kite_api, company_name, stock_exchange, all_gtt_orders, logger,
+                                                order_update_source)
+            if order_updates:
+                cycle_seconds = ORDER_RECONCILE_SECONDS
+        
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=monitor_and_manage_sell_orders,
+            args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_event, cycle_seconds)
+        )
+        thread.daemon = True
+        thread.start()
+        return stop_event, thread
+    
     try:
         logger.info(f"Starting GTT Fall Buy strategy for {company_name} on {stock_exchange}")
         
@@ -1495,12 +1703,9 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
             cancelled_count = cancel_all_gtt_orders(kite_api, company_name, logger)
             logger.info(f"Cancelled {cancelled_count} GTT orders")
             
-            # Clear the history file after cancelling orders
+            # Clear the history snapshot and journal after cancelling orders
             try:
-                file_path = os.path.join('workdir', 'orders', f'{company_name}_gtt_history.json')
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    logger.info(f"Cleared GTT history file: {file_path}")
+                get_gtt_history_journal(company_name, logger).clear()
             except Exception as e:
                 logger.error(f"Error clearing history file: {e}")
             
@@ -1564,13 +1769,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                     logger.info(f"Using {len(all_gtt_orders)} existing orders for monitoring")
                     
                     # Start monitoring thread with existing orders
-                    stop_monitoring = threading.Event()
-                    monitoring_thread = threading.Thread(
-                        target=monitor_and_manage_sell_orders,
-                        args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_monitoring)
-                    )
-                    monitoring_thread.daemon = True
-                    monitoring_thread.start()
+                    stop_monitoring, monitoring_thread = start_monitoring(all_gtt_orders)
                     
                     # Set up tick data handling for real-time monitoring
                     try:
@@ -1582,10 +1781,8 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                             logger.info("Connected to Breeze WebSocket for real-time data")
                         stock_token = breeze_api.get_icici_token_name(company_name)
                         logger.info(f"Stock token for tick data: {stock_token}")
-                        def tick_handler(tick_data):
-                            handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger)
-                        breeze_api.set_on_ticks(tick_handler)
-                        logger.info("Tick handler set up successfully")
+                        tick_dispatcher = start_tick_dispatcher(breeze_api, kite_api, company_name, stock_exchange,
+                                                                all_gtt_orders, logger, tick_dispatcher)
                         breeze_api.subscribe_feed_token(stock_token)
                         logger.info(f"Subscribed to real-time feed for {company_name}")
                         logger.info("Real-time tick data monitoring is now active!")
@@ -1610,13 +1807,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                 all_gtt_orders = existing_gtt_orders
                 logger.info(f"Using {len(all_gtt_orders)} existing orders for monitoring")
                 # Start monitoring thread with existing orders
-                stop_monitoring = threading.Event()
-                monitoring_thread = threading.Thread(
-                    target=monitor_and_manage_sell_orders,
-                    args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_monitoring)
-                )
-                monitoring_thread.daemon = True
-                monitoring_thread.start()
+                stop_monitoring, monitoring_thread = start_monitoring(all_gtt_orders)
                 # Set up tick data handling for real-time monitoring
                 try:
                     logger.info("Setting up real-time tick data monitoring...")
@@ -1627,10 +1818,8 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                         logger.info("Connected to Breeze WebSocket for real-time data")
                     stock_token = breeze_api.get_icici_token_name(company_name)
                     logger.info(f"Stock token for tick data: {stock_token}")
-                    def tick_handler(tick_data):
-                        handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger)
-                    breeze_api.set_on_ticks(tick_handler)
-                    logger.info("Tick handler set up successfully")
+                    tick_dispatcher = start_tick_dispatcher(breeze_api, kite_api, company_name, stock_exchange,
+                                                            all_gtt_orders, logger, tick_dispatcher)
                     breeze_api.subscribe_feed_token(stock_token)
                     logger.info(f"Subscribed to real-time feed for {company_name}")
                     logger.info("Real-time tick data monitoring is now active!")
@@ -1656,13 +1845,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                 all_gtt_orders = actual_gtt_orders
                 logger.info(f"Using {len(all_gtt_orders)} existing orders for monitoring")
                 # Start monitoring thread with existing orders
-                stop_monitoring = threading.Event()
-                monitoring_thread = threading.Thread(
-                    target=monitor_and_manage_sell_orders,
-                    args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_monitoring)
-                )
-                monitoring_thread.daemon = True
-                monitoring_thread.start()
+                stop_monitoring, monitoring_thread = start_monitoring(all_gtt_orders)
                 # Set up tick data handling for real-time monitoring
                 try:
                     logger.info("Setting up real-time tick data monitoring...")
@@ -1673,10 +1856,8 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                         logger.info("Connected to Breeze WebSocket for real-time data")
                     stock_token = breeze_api.get_icici_token_name(company_name)
                     logger.info(f"Stock token for tick data: {stock_token}")
-                    def tick_handler(tick_data):
-                        handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger)
-                    breeze_api.set_on_ticks(tick_handler)
-                    logger.info("Tick handler set up successfully")
+                    tick_dispatcher = start_tick_dispatcher(breeze_api, kite_api, company_name, stock_exchange,
+                                                            all_gtt_orders, logger, tick_dispatcher)
                     breeze_api.subscribe_feed_token(stock_token)
                     logger.info(f"Subscribed to real-time feed for {company_name}")
                     logger.info("Real-time tick data monitoring is now active!")
@@ -1725,13 +1906,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                 logger.info(f"Using {len(all_gtt_orders)} existing orders for monitoring")
                 
                 # Start monitoring thread with existing orders
-                stop_monitoring = threading.Event()
-                monitoring_thread = threading.Thread(
-                    target=monitor_and_manage_sell_orders,
-                    args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_monitoring)
-                )
-                monitoring_thread.daemon = True
-                monitoring_thread.start()
+                stop_monitoring, monitoring_thread = start_monitoring(all_gtt_orders)
                 
                 # Set up tick data handling for real-time monitoring
                 try:
@@ -1750,11 +1925,8 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                     logger.info(f"Stock token for tick data: {stock_token}")
                     
                     # Set up tick handler
-                    def tick_handler(tick_data):
-                        handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger)
-                    
-                    breeze_api.set_on_ticks(tick_handler)
-                    logger.info("Tick handler set up successfully")
+                    tick_dispatcher = start_tick_dispatcher(breeze_api, kite_api, company_name, stock_exchange,
+                                                            all_gtt_orders, logger, tick_dispatcher)
                     
                     # Subscribe to stock feed
                     breeze_api.subscribe_feed_token(stock_token)
@@ -1803,13 +1975,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                     logger.info(f"Using {len(all_gtt_orders)} existing orders for monitoring")
                     
                     # Start monitoring thread with existing orders
-                    stop_monitoring = threading.Event()
-                    monitoring_thread = threading.Thread(
-                        target=monitor_and_manage_sell_orders,
-                        args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_monitoring)
-                    )
-                    monitoring_thread.daemon = True
-                    monitoring_thread.start()
+                    stop_monitoring, monitoring_thread = start_monitoring(all_gtt_orders)
                     
                     # Set up tick data handling for real-time monitoring
                     try:
@@ -1828,11 +1994,8 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
                         logger.info(f"Stock token for tick data: {stock_token}")
                         
                         # Set up tick handler
-                        def tick_handler(tick_data):
-                            handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger)
-                        
-                        breeze_api.set_on_ticks(tick_handler)
-                        logger.info("Tick handler set up successfully")
+                        tick_dispatcher = start_tick_dispatcher(breeze_api, kite_api, company_name, stock_exchange,
+                                                                all_gtt_orders, logger, tick_dispatcher)
                         
                         # Subscribe to stock feed
                         breeze_api.subscribe_feed_token(stock_token)
@@ -1882,105 +2045,11 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
             previous_order_price = current_price
             logger.info(f"Starting fresh fall buy strategy from current price: {previous_order_price}")
         
-        # Place multiple GTT orders with different quantities and prices
-        # First order will be 0.27% below current price (to meet Kite's 0.25% minimum requirement), then 1% below previous order price for gradual fall buy strategy
-        # Quantities will be based on percentage drop from first share price: 1% drop = 1 share, 2% drop = 2 shares, etc.
-        orders_placed = 0
-        new_gtt_orders = []
-        
-        # Get tick size for the stock
-        tick_size = get_tick_size_for_stock(company_name, current_price)
-        
-        for i in range(1, num_orders + 1):  # 1 to num_orders
-            # Calculate the correct order number and quantity based on existing orders
-            order_number = existing_order_count + i  # If 0 existing orders, new orders are 1, 2, 3, 4, 5
-            quantity = order_number  # Quantity equals the order number: 1, 2, 3, 4, 5 shares
-            
-            logger.info(f"DEBUG: existing_order_count={existing_order_count}, i={i}, order_number={order_number}")
-            logger.info(f"DEBUG: Attempting to place order {i}/{num_orders}")
-            
-            # Calculate order price using improved method
-            if i == 1:  # First new order in this cycle
-                drop_percentage = 0.27
-                trigger_price, order_price = calculate_gtt_prices(
-                    current_price=previous_order_price,
-                    drop_percentage=drop_percentage,
-                    tick_size=tick_size,
-                    order_type="BUY",
-                    price_delta_ticks=2
-                )
-                logger.info(f"DEBUG: First order - calculated prices using {drop_percentage}% drop from lowest active price")
-            else:
-                drop_percentage = 1.0
-                trigger_price, order_price = calculate_gtt_prices(
-                    current_price=previous_order_price,
-                    drop_percentage=drop_percentage,
-                    tick_size=tick_size,
-                    order_type="BUY",
-                    price_delta_ticks=2
-                )
-                logger.info(f"DEBUG: Subsequent order - calculated prices using {drop_percentage}% drop from previous price")
-            
-            logger.info(f"Placing GTT order {order_number}: {quantity} shares @ {order_price:.2f} (trigger: {trigger_price:.2f}) - {order_number}% drop from entry")
-            logger.info(f"DEBUG: Price validation - Order: {order_price:.2f}, Trigger: {trigger_price:.2f}, Tick size: {tick_size}")
-            
-            # Check if new price is similar to existing orders
-            logger.info(f"DEBUG: Checking if price {order_price:.2f} is similar to existing orders...")
-            if is_similar_to_existing_orders(order_price, trigger_price, active_buy_orders):
-                logger.info(f"New price {order_price:.2f} is similar to existing orders. Skipping this order.")
-                logger.info(f"DEBUG: Order {i} skipped due to similar price")
-                continue
-            
-            logger.info(f"DEBUG: Price check passed, proceeding with order placement...")
-            
-            # Place a GTT buy order
-            gtt_order_id = place_gtt_order(
-                kite_api=kite_api,
-                trading_symbol=company_name,
-                exchange=stock_exchange,
-                transaction_type="BUY",
-                quantity=quantity,
-                price=order_price,
-                trigger_price=trigger_price,
-                current_price=current_price
-            )
-            
-            if gtt_order_id:
-                orders_placed += 1
-                logger.info(f"Successfully placed GTT order {order_number}: {gtt_order_id}")
-                logger.info(f"DEBUG: Order {i} placed successfully. Total placed: {orders_placed}")
-                
-                # Store order details
-                order_details = {
-                    'trigger_id': gtt_order_id,
-                    'trading_symbol': company_name,
-                    'exchange': stock_exchange,
-                    'transaction_type': 'BUY',
-                    'quantity': quantity,
-                    'price': order_price,
-                    'trigger_price': trigger_price,
-                    'order_type': 'LIMIT',
-                    'validity': 'DAY',
-                    'date_placed': datetime.now().isoformat(),
-                    'current_price_when_placed': current_price,
-                    'status': 'ACTIVE',
-                    'percentage_drop_from_entry': order_number
-                }
-                new_gtt_orders.append(order_details)
-                
-                # Immediately save to history file to prevent loss of orders
-                try:
-                    current_all_orders = existing_gtt_orders + new_gtt_orders
-                    save_gtt_history(company_name, current_all_orders, logger)
-                    logger.info(f"DEBUG: Immediately saved order {gtt_order_id} to history file")
-                except Exception as e:
-                    logger.error(f"Error immediately saving order to history: {e}")
-                
-                # Update previous order price for next iteration
-                previous_order_price = order_price
-            else:
-                logger.error(f"Failed to place GTT order {order_number}")
-                logger.info(f"DEBUG: Order {i} failed to place. Total placed: {orders_placed}")
+        new_gtt_orders = place_buy_ladder(
+            kite_api, company_name, stock_exchange, num_orders, previous_order_price, current_price,
+            existing_order_count, active_buy_orders, existing_gtt_orders, logger
+        )
+        orders_placed = len(new_gtt_orders)
         
         logger.info(f"DEBUG: Order placement loop completed. orders_placed={orders_placed}, num_orders={num_orders}")
         logger.info(f"Total GTT orders placed: {orders_placed}/{num_orders}")
@@ -2033,13 +2102,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
             logger.error("No GTT orders were placed successfully")
         
         # Start monitoring thread
-        stop_monitoring = threading.Event()
-        monitoring_thread = threading.Thread(
-            target=monitor_and_manage_sell_orders,
-            args=(kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger, stop_monitoring)
-        )
-        monitoring_thread.daemon = True
-        monitoring_thread.start()
+        stop_monitoring, monitoring_thread = start_monitoring(all_gtt_orders)
         
         # Set up tick data handling for real-time monitoring
         try:
@@ -2058,11 +2121,8 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
             logger.info(f"Stock token for tick data: {stock_token}")
             
             # Set up tick handler
-            def tick_handler(tick_data):
-                handle_tick_data(tick_data, kite_api, breeze_api, company_name, stock_exchange, all_gtt_orders, logger)
-            
-            breeze_api.set_on_ticks(tick_handler)
-            logger.info("Tick handler set up successfully")
+            tick_dispatcher = start_tick_dispatcher(breeze_api, kite_api, company_name, stock_exchange,
+                                                    all_gtt_orders, logger, tick_dispatcher)
             
             # Subscribe to stock feed
             breeze_api.subscribe_feed_token(stock_token)
@@ -2073,7 +2133,7 @@ def main(company_name: str, stock_exchange: str = "NSE", num_orders: int = 5, ca
             
         except Exception as e:
             logger.warning(f"Could not set up tick data monitoring: {e}")
-            logger.info("Continuing with 5-minute quote-based monitoring only")
+            logger.info("Continuing with quote-based monitoring only")
         
         logger.info("GTT order monitoring started.")
         logger.info("Monitoring will automatically stop when market closes for 1 hour.")
@@ -2319,6 +2379,113 @@ def detect_and_update_triggered_orders_from_history(kite_api: KiteConnectAPI, co
         return gtt_orders, False, 0, 0
 
 
+def get_gtt_origin(event: Dict[str, Any], gtt_book: Optional[List[Dict[str, Any]]] = None) -> tuple:
+    """
+    Find out whether the regular order of an order update was placed by a GTT
+    
+    The order's tag ("gtt" or "gtt:<trigger id>", also in the payload's tags list) marks
+    GTT-placed orders; otherwise the GTT book is searched for a trigger whose result
+    holds the order ID.
+    
+    Parameters:
+    - event: Normalized order update event
+    - gtt_book: GTT orders from Kite (optional, searched when the tag does not name the trigger)
+    
+    Returns:
+    - tuple: (placed by a GTT, trigger ID as a string or None if unknown)
+    """
+    raw_tags = (event.get('raw') or {}).get('tags') or []
+    tags = [str(tag) for tag in [event.get('tag')] + list(raw_tags) if tag]
+    for tag in tags:
+        if tag.lower().startswith('gtt:') and tag[4:]:
+            return True, tag[4:]
+    
+    for gtt in gtt_book or []:
+        for gtt_order in gtt.get('orders') or []:
+            order_result = (gtt_order.get('result') or {}).get('order_result') or {}
+            if order_result.get('order_id') and str(order_result['order_id']) == event.get('order_id'):
+                return True, str(gtt.get('id'))
+    
+    return any(tag.lower() == 'gtt' for tag in tags), None
+
+
+def apply_order_update(company_name: str, gtt_orders: List[Dict[str, Any]], event: Dict[str, Any], 
+                       logger: logging.Logger, kite_api: Optional[KiteConnectAPI] = None) -> Optional[Dict[str, Any]]:
+    """
+    Apply an order update event (see order_updates.normalize_order_update) to the GTT history.
+    Only regular orders placed by a triggered GTT are applied (see get_gtt_origin); manual
+    orders and orders of other strategies are ignored. The order is matched to the ACTIVE
+    history order of its trigger ID or, when the trigger ID is unknown, to the one with the
+    same side, quantity and limit price. COMPLETE marks it executed, CANCELLED/REJECTED failed.
+    
+    Parameters:
+    - company_name: Name of the company
+    - gtt_orders: List of GTT orders from history file (updated in place and saved)
+    - event: Normalized order update event
+    - logger: Logger instance
+    - kite_api: Kite API instance, to look the order up in the GTT book when its tag does
+      not name the trigger (optional)
+    
+    Returns:
+    - The history order that was updated, or None if the event did not change the history
+    """
+    try:
+        status = event.get('status', '')
+        if event.get('tradingsymbol', '').upper() != company_name.upper() or status not in ['COMPLETE', 'CANCELLED', 'REJECTED']:
+            return None
+        
+        # Ignore events that were already applied
+        if any(order.get('order_id') == event['order_id'] for order in gtt_orders):
+            return None
+        
+        is_gtt_order, trigger_id = get_gtt_origin(event)
+        if trigger_id is None and kite_api is not None:
+            # The trigger changed in Kite without a write of ours, so the cached book may predate it
+            from_book, trigger_id = get_gtt_origin(event, kite_api.get_gtt_orders(max_age_seconds=0))
+            is_gtt_order = is_gtt_order or from_book
+        if not is_gtt_order:
+            logger.debug(f"Order update {event['order_id']} was not placed by a GTT, ignoring it")
+            return None
+        
+        matched_order = None
+        for order in gtt_orders:
+            if (order.get('trading_symbol', '').upper() != company_name.upper() or 
+                order.get('transaction_type') != event.get('transaction_type') or 
+                order.get('status') not in ['ACTIVE', 'PENDING', 'OPEN']):
+                continue
+            if trigger_id is not None:
+                if str(order.get('trigger_id')) == trigger_id:
+                    matched_order = order
+                    break
+            elif (order.get('quantity') == event.get('quantity') and 
+                  abs(float(order.get('price', 0)) - event.get('price', 0)) <= 0.01):
+                matched_order = order
+                break
+        
+        if matched_order is None:
+            logger.info(f"Order update {event['order_id']} ({status}) does not match an active history order")
+            return None
+        
+        matched_order['order_id'] = event['order_id']
+        if status == 'COMPLETE':
+            logger.info(f"ORDER EXECUTED: {matched_order.get('trigger_id')} - {event.get('filled_quantity')} shares @ {event.get('average_price')}")
+            matched_order['status'] = 'COMPLETE'
+            matched_order['triggered_at'] = datetime.now().isoformat()
+            matched_order['average_price'] = event.get('average_price')
+        else:
+            logger.warning(f"Order {matched_order.get('trigger_id')} was triggered but failed to execute (status: {status})")
+            matched_order['status'] = 'FAILED'
+            matched_order['failed_at'] = datetime.now().isoformat()
+            matched_order['failure_reason'] = f"Order status: {status}"
+        
+        save_gtt_history(company_name, gtt_orders, logger)
+        return matched_order
+        
+    except Exception as e:
+        logger.error(f"Error applying order update: {e}")
+        return None
+
+
 def manage_sell_orders_based_on_history(kite_api: KiteConnectAPI, company_name: str, stock_exchange: str, 
                                        gtt_orders: List[Dict[str, Any]], current_price: float, logger: logging.Logger) -> bool:
     """
@@ -2526,6 +2693,7 @@ if __name__ == "__main__":
     STOCK_EXCHANGE = "NSE"     # Change this to your desired exchange
     N = 5  # Change this to specify number of GTT orders to place (should be 5 for proper fall buy strategy)
     CANCEL_ORDERS = False  # Set to True to cancel all existing GTT orders
+    ORDER_UPDATE_SOURCE = "kite_ticker"  # Set to None to detect fills by polling only
     
     print(f"Starting GTT Fall Buy strategy:")
     print(f"  Company: {COMPANY_NAME}")
@@ -2534,4 +2702,4 @@ if __name__ == "__main__":
     print(f"  Cancel existing orders: {CANCEL_ORDERS}")
     print("-" * 50)
     
-    main(COMPANY_NAME, STOCK_EXCHANGE, N, CANCEL_ORDERS) 
\ No newline at end of file
+    main(COMPANY_NAME, STOCK_EXCHANGE, N, CANCEL_ORDERS, ORDER_UPDATE_SOURCE)
\ No newline at end of file
@@ -0,0 +1,386 @@
+"""
+GTT History Journal
+
+Persists a company's GTT order history as a JSON snapshot plus an append-only
+JSON-lines journal. Every save only appends the orders that changed (fsynced), so
+writes cost O(changes) instead of rewriting the whole history, and a crash can at
+worst leave a torn last journal line, which is skipped on replay. The journal is
+periodically compacted into the snapshot with an atomic file replace.
+
+The files may also be changed by another process (e.g. cleanup_duplicate_orders.py
+while gtt_fall_buy.py is running): the (inode, mtime, size) of both files is recorded
+after every replay and write, and load()/record() replay again when either changed.
+record() diffs the caller's list against the history the caller last loaded or
+recorded, not against the files, and applies only those changes on top of the
+replayed state, so a stale in-memory list never undoes another process's edits. Reads,
+appends and compactions hold a lock file (created with O_EXCL, like
+rate_limiter.SharedTokenBucket), so an append can not fall between a compaction's
+snapshot replace and journal truncate.
+
+Files in workdir/orders:
+- {company}_gtt_history.json          snapshot (same format as before)
+- {company}_gtt_history.journal.jsonl journal of upsert/remove events since the snapshot
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+class GTTHistoryJournal:
+    """Class to persist GTT order history as a snapshot plus an append-only journal"""
+
+    def __init__(self, company_name: str, orders_dir: str = os.path.join('workdir', 'orders'),
+                 compact_every: int = 200, logger: Optional[logging.Logger] = None,
+                 stale_lock_seconds: float = 30.0):
+        """
+        Initialize the journal for a company
+
+        Parameters:
+        - company_name: Name of the company
+        - orders_dir: Directory holding the history files
+        - compact_every: Number of journal events after which the journal is compacted
+        - logger: Logger instance
+        - stale_lock_seconds: Age after which a lock file left by a killed process is broken
+        """
+        self.company_name = company_name
+        self.orders_dir = orders_dir
+        self.compact_every = compact_every
+        self.logger = logger or logging.getLogger(__name__)
+        self.snapshot_path = os.path.join(orders_dir, f'{company_name}_gtt_history.json')
+        self.journal_path = os.path.join(orders_dir, f'{company_name}_gtt_history.journal.jsonl')
+        self.lock_path = self.snapshot_path + '.lock'
+        self.stale_lock_seconds = stale_lock_seconds
+
+        # trigger_id -> serialized order, in history order, as replayed from the files
+        self._orders: Dict[Any, str] = {}
+        # The history as the caller last loaded or recorded it (None until then)
+        self._base: Optional[Dict[Any, str]] = None
+        self._file_lock_depth = 0
+        self._journal_events = 0
+        self._loaded = False
+        # (inode, mtime, size) of snapshot and journal as of our last replay or write
+        self._file_state = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _serialize(order: Dict[str, Any]) -> str:
+        return json.dumps(order, sort_keys=True, default=str)
+
+    @classmethod
+    def _index_orders(cls, gtt_orders: List[Dict[str, Any]]) -> Dict[Any, str]:
+        """
+        Key orders by trigger_id; orders without a unique trigger_id get a tuple key
+        of their content so they are kept (such lists are always persisted by compaction)
+        """
+        orders = {}
+        for order in gtt_orders:
+            key = order.get('trigger_id')
+            serialized = cls._serialize(order)
+            if key is None or key in orders:
+                occurrence = 0
+                while ('#', serialized, occurrence) in orders:
+                    occurrence += 1
+                key = ('#', serialized, occurrence)
+            orders[key] = serialized
+        return orders
+
+    @contextmanager
+    def _file_locked(self):
+        """Hold the lock file shared with other processes (re-entrant within this journal)"""
+        with self._lock:
+            if self._file_lock_depth == 0:
+                os.makedirs(self.orders_dir, exist_ok=True)
+                while True:
+                    try:
+                        os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                        break
+                    except FileExistsError:
+                        try:
+                            if time.time() - os.path.getmtime(self.lock_path) > self.stale_lock_seconds:
+                                self.logger.warning(f"Breaking stale GTT history lock {self.lock_path}")
+                                os.remove(self.lock_path)
+                                continue
+                        except OSError:
+                            continue
+                        time.sleep(0.001)
+            self._file_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._file_lock_depth -= 1
+                if self._file_lock_depth == 0:
+                    try:
+                        os.remove(self.lock_path)
+                    except OSError:
+                        pass
+
+    def _read_snapshot(self) -> List[Dict[str, Any]]:
+        """Read the snapshot file, tolerating missing, empty or invalid files"""
+        if not os.path.exists(self.snapshot_path):
+            return []
+        if os.path.getsize(self.snapshot_path) == 0:
+            self.logger.info(f"GTT history file is empty: {self.snapshot_path}")
+            return []
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                history_data = json.load(f)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON in GTT history file: {e}")
+            return []
+
+        if not isinstance(history_data, dict):
+            self.logger.warning(f"Invalid GTT history format in {self.snapshot_path}")
+            return []
+        gtt_orders = history_data.get('gtt_orders', [])
+        if not isinstance(gtt_orders, list):
+            self.logger.warning(f"Invalid gtt_orders format in {self.snapshot_path}")
+            return []
+        return gtt_orders
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _current_file_state(self) -> tuple:
+        return (self._stat(self.snapshot_path), self._stat(self.journal_path))
+
+    def _ensure_current(self) -> None:
+        """Replay the files if not loaded yet or if another writer changed them since"""
+        if not self._loaded or self._current_file_state() != self._file_state:
+            if self._loaded:
+                self.logger.info(f"GTT history files of {self.company_name} changed on disk, replaying")
+            self._replay()
+
+    def _replay(self) -> None:
+        """Rebuild the in-memory state from snapshot plus journal"""
+        orders = self._index_orders(self._read_snapshot())
+
+        events = 0
+        torn = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-append can only tear the last line; skip it
+                        self.logger.warning(f"Skipping unreadable journal line {line_number} in {self.journal_path}")
+                        torn = True
+                        continue
+                    if event.get('op') == 'upsert':
+                        order = event['order']
+                        orders[order.get('trigger_id')] = self._serialize(order)
+                    elif event.get('op') == 'remove':
+                        orders.pop(event.get('trigger_id'), None)
+                    events += 1
+
+        self._orders = orders
+        self._journal_events = events
+        self._loaded = True
+        self._file_state = self._current_file_state()
+
+        # Rewrite the files so new appends never land on the torn line
+        if torn:
+            self.compact()
+
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Load the GTT history by replaying snapshot plus journal
+
+        Returns:
+        - List of GTT order details (empty list if there is no history)
+        """
+        with self._file_locked():
+            self._ensure_current()
+            self._base = dict(self._orders)
+            return [json.loads(order) for order in self._orders.values()]
+
+    def _append(self, events: List[Dict[str, Any]]) -> None:
+        """Append events to the journal and fsync them (the file lock must be held)"""
+        with open(self.journal_path, 'a') as f:
+            for event in events:
+                f.write(json.dumps(event, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_events += len(events)
+        self._file_state = self._current_file_state()
+
+    def record(self, gtt_orders: List[Dict[str, Any]]) -> int:
+        """
+        Persist the given full order list by journaling only what changed
+
+        The list is compared with the history this journal last loaded or recorded.
+        If another process changed the files since, only the caller's own upserts and
+        removals are applied on top of that process's state (an order changed by both
+        takes the caller's version). Falls back to a compaction when the changes cannot
+        be expressed as journal events (orders without a unique trigger_id, or
+        reordered orders).
+
+        Parameters:
+        - gtt_orders: Complete list of GTT order details
+
+        Returns:
+        - Number of journal events written
+        """
+        with self._file_locked():
+            self._ensure_current()
+
+            new_orders = self._index_orders(gtt_orders)
+            base = self._orders if self._base is None else self._base
+            if list(base.items()) != list(self._orders.items()):
+                return self._merge(base, new_orders)
+
+            old_keys = list(self._orders.keys())
+            new_keys = list(new_orders.keys())
+            expected_keys = [key for key in old_keys if key in new_orders] + \
+                            [key for key in new_keys if key not in self._orders]
+            if any(isinstance(key, tuple) for key in new_keys + old_keys) or expected_keys != new_keys:
+                self.compact(gtt_orders)
+                self._base = dict(new_orders)
+                return 0
+
+            timestamp = datetime.now().isoformat()
+            events = []
+            for key in old_keys:
+                if key not in new_orders:
+                    events.append({'op': 'remove', 'trigger_id': key, 'ts': timestamp})
+            for order in gtt_orders:
+                key = order['trigger_id']
+                if self._orders.get(key) != new_orders[key]:
+                    events.append({'op': 'upsert', 'order': order, 'ts': timestamp})
+
+            if events:
+                self._append(events)
+                self._orders = new_orders
+            self._base = dict(new_orders)
+
+            if self._journal_events >= self.compact_every:
+                self.compact()
+            return len(events)
+
+    def _merge(self, base: Dict[Any, str], new_orders: Dict[Any, str]) -> int:
+        """
+        Apply the caller's changes since base on top of files another process changed
+
+        Parameters:
+        - base: The history the caller's list was derived from
+        - new_orders: The caller's list, indexed
+
+        Returns:
+        - Number of journal events written
+        """
+        removed = [key for key in base if key not in new_orders]
+        upserted = [key for key, order in new_orders.items() if base.get(key) != order]
+        self.logger.info(f"GTT history of {self.company_name} was changed by another process; merging "
+                         f"{len(upserted)} updated and {len(removed)} removed orders")
+
+        merged = dict(self._orders)
+        for key in removed:
+            merged.pop(key, None)
+        for key in upserted:
+            merged[key] = new_orders[key]
+        self._base = dict(new_orders)
+
+        if any(isinstance(key, tuple) for key in removed + upserted):
+            self.compact([json.loads(order) for order in merged.values()])
+            return 0
+
+        timestamp = datetime.now().isoformat()
+        events = [{'op': 'remove', 'trigger_id': key, 'ts': timestamp} for key in removed if key in self._orders]
+        events += [{'op': 'upsert', 'order': json.loads(new_orders[key]), 'ts': timestamp} for key in upserted]
+        if events:
+            self._append(events)
+            self._orders = merged
+        if self._journal_events >= self.compact_every:
+            self.compact()
+        return len(events)
+
+    def compact(self, gtt_orders: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Write the full history to the snapshot atomically and truncate the journal
+
+        Parameters:
+        - gtt_orders: Order list to write (defaults to the current journaled state)
+        """
+        with self._file_locked():
+            if gtt_orders is None:
+                self._ensure_current()
+                gtt_orders = [json.loads(order) for order in self._orders.values()]
+
+            history_data = {
+                'company_name': self.company_name,
+                'last_updated': datetime.now().isoformat(),
+                'gtt_orders': gtt_orders,
+                'total_orders': len(gtt_orders)
+            }
+
+            # Unique per process, in case a stale lock was broken while another process compacts
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(history_data, f, indent=4, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # The snapshot now covers every journaled event
+            with open(self.journal_path, 'w') as f:
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._orders = self._index_orders(gtt_orders)
+            if self._base is None:
+                self._base = dict(self._orders)
+            self._journal_events = 0
+            self._loaded = True
+            self._file_state = self._current_file_state()
+            self.logger.info(f"Compacted GTT history for {self.company_name}: {len(gtt_orders)} orders")
+
+    def clear(self) -> None:
+        """Remove the snapshot and journal files and reset the in-memory state"""
+        with self._file_locked():
+            for path in (self.snapshot_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+                    self.logger.info(f"Cleared GTT history file: {path}")
+            self._orders = {}
+            self._base = {}
+            self._journal_events = 0
+            self._loaded = True
+            self._file_state = self._current_file_state()
+
+
+_journals: Dict[str, GTTHistoryJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_gtt_history_journal(company_name: str, logger: Optional[logging.Logger] = None) -> GTTHistoryJournal:
+    """
+    Get the process-wide journal for a company
+
+    Parameters:
+    - company_name: Name of the company
+    - logger: Logger instance (used when the journal is first created)
+
+    Returns:
+    Shared GTTHistoryJournal instance
+    """
+    orders_dir = os.path.join('workdir', 'orders')
+    key = os.path.abspath(os.path.join(orders_dir, company_name))
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = GTTHistoryJournal(company_name, orders_dir, logger=logger)
+            _journals[key] = journal
+        return journal
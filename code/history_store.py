@@ -0,0 +1,332 @@
+"""
+History Store
+
+Per-symbol local store of OHLCV candles in a columnar NumPy file
+(workdir/history/{SYMBOL}_{source}_{interval}.npz). The header records the range the
+store covers, so a refresh only fetches the bars after the last stored timestamp (the
+last bar is fetched again since it may have been stored mid-session).
+
+Files are replaced atomically (written to a temporary file, then os.replace), so any
+number of readers can load a store while a refresh writes it; they see either the old
+or the new complete file.
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+STORE_VERSION = 1
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def candles_to_arrays(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Convert candle dictionaries (Breeze/yfinance style) to column arrays
+
+    Parameters:
+    - candles: Dictionaries with 'datetime' and open/high/low/close/volume
+
+    Returns:
+    Dictionary of 'datetime' (datetime64[s]) and float64 price column arrays;
+    candles without a usable datetime or price are skipped
+    """
+    timestamps = []
+    rows = []
+    for candle in candles:
+        try:
+            timestamp = np.datetime64(str(candle['datetime']).replace(' ', 'T')[:19], 's')
+            rows.append(tuple(float(candle.get(column) or 0) for column in PRICE_COLUMNS))
+            timestamps.append(timestamp)
+        except (KeyError, TypeError, ValueError):
+            logging.warning(f"Skipping invalid candle: {candle}")
+
+    values = np.array(rows, dtype=np.float64).reshape(-1, len(PRICE_COLUMNS))
+    arrays = {'datetime': np.array(timestamps, dtype='datetime64[s]')}
+    for i, column in enumerate(PRICE_COLUMNS):
+        arrays[column] = values[:, i]
+    return arrays
+
+
+def merge_arrays(old: Optional[Dict[str, np.ndarray]], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Merge two sets of column arrays by timestamp (new candles replace old ones)
+
+    Returns:
+    Merged column arrays sorted by datetime without duplicate timestamps
+    """
+    if old is None or len(old['datetime']) == 0:
+        combined = new
+    else:
+        combined = {column: np.concatenate([old[column], new[column]]) for column in ('datetime',) + PRICE_COLUMNS}
+
+    # Keep the last occurrence of each timestamp: unique on the reversed arrays
+    reversed_times = combined['datetime'][::-1]
+    _, first_in_reversed = np.unique(reversed_times, return_index=True)
+    keep = len(reversed_times) - 1 - first_in_reversed
+    return {column: values[keep] for column, values in combined.items()}
+
+
+class HistoryStore:
+    """Class to keep incrementally updated per-symbol candle history on disk"""
+
+    def __init__(self, store_dir: str = os.path.join('workdir', 'history'), source: str = 'breeze',
+                 interval: str = '1day'):
+        """
+        Initialize the store
+
+        Parameters:
+        - store_dir: Directory holding the .npz files
+        - source: Data source name used in the file names (e.g., "breeze", "yfinance")
+        - interval: Candle interval used in the file names (e.g., "1day")
+        """
+        self.store_dir = store_dir
+        self.source = source
+        self.interval = interval
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def get_path(self, symbol: str) -> str:
+        """Get the store file path of a symbol"""
+        return os.path.join(self.store_dir, f"{symbol.upper().replace('.', '_')}_{self.source}_{self.interval}.npz")
+
+    def _get_lock(self, symbol: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(symbol.upper(), threading.Lock())
+
+    def read_header(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Read only the header of a symbol's store (no candle data is decompressed)
+
+        Returns:
+        Header dictionary or None if there is no usable store
+        """
+        path = self.get_path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(str(data['header']))
+            if header.get('version') != STORE_VERSION:
+                logging.warning(f"Ignoring history store {path} with version {header.get('version')}")
+                return None
+            return header
+        except Exception as e:
+            logging.error(f"Error reading history store header {path}: {e}")
+            return None
+
+    def read(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Read a symbol's candles
+
+        Returns:
+        Dictionary of 'datetime' and open/high/low/close/volume arrays, or None if there is no store
+        """
+        path = self.get_path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(str(data['header']))
+                if header.get('version') != STORE_VERSION:
+                    return None
+                return {column: data[column] for column in ('datetime',) + PRICE_COLUMNS}
+        except Exception as e:
+            logging.error(f"Error reading history store {path}: {e}")
+            return None
+
+    def read_records(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Read a symbol's candles as dictionaries in the Breeze history format
+
+        Returns:
+        List of candle dictionaries sorted by datetime (empty if there is no store)
+        """
+        arrays = self.read(symbol)
+        if arrays is None:
+            return []
+        dates = np.datetime_as_string(arrays['datetime'], unit='s')
+        records = []
+        for i, timestamp in enumerate(dates):
+            record = {'datetime': timestamp.replace('T', ' ')}
+            for column in PRICE_COLUMNS:
+                record[column] = arrays[column][i].item()
+            records.append(record)
+        return records
+
+    def get_last_timestamp(self, symbol: str) -> Optional[datetime]:
+        """
+        Get the timestamp of the last stored candle
+
+        Returns:
+        datetime of the last candle or None if the store is empty
+        """
+        header = self.read_header(symbol)
+        if not header or not header.get('last_timestamp'):
+            return None
+        return datetime.fromisoformat(header['last_timestamp'])
+
+    def _write(self, symbol: str, arrays: Dict[str, np.ndarray], covered_from: Optional[str]) -> None:
+        """Write a symbol's store atomically"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self.get_path(symbol)
+        count = len(arrays['datetime'])
+        header = {
+            'version': STORE_VERSION,
+            'symbol': symbol.upper(),
+            'source': self.source,
+            'interval': self.interval,
+            'count': count,
+            'covered_from': covered_from,
+            'first_timestamp': str(arrays['datetime'][0]) if count else None,
+            'last_timestamp': str(arrays['datetime'][-1]) if count else None,
+            'last_updated': datetime.now().isoformat()
+        }
+
+        # A unique temporary name per writer keeps concurrent refreshes from clobbering each other
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, header=np.array(json.dumps(header)), **arrays)
+        os.replace(tmp_path, path)
+
+    def append(self, symbol: str, candles: List[Dict[str, Any]], covered_from: Optional[datetime] = None) -> int:
+        """
+        Merge candles into a symbol's store
+
+        Parameters:
+        - symbol: Stock symbol
+        - candles: Candle dictionaries with 'datetime' and open/high/low/close/volume
+        - covered_from: Start of the requested range the store now covers
+
+        Returns:
+        - Number of candles with new timestamps
+        """
+        with self._get_lock(symbol):
+            header = self.read_header(symbol)
+            old = self.read(symbol) if header else None
+            new = candles_to_arrays(candles)
+            if not len(new['datetime']) and covered_from is None:
+                return 0
+
+            merged = merge_arrays(old, new)
+            old_count = len(old['datetime']) if old else 0
+
+            stored_from = header.get('covered_from') if header else None
+            if covered_from is not None:
+                requested_from = covered_from.date().isoformat()
+                stored_from = min(stored_from, requested_from) if stored_from else requested_from
+
+            self._write(symbol, merged, stored_from)
+            return len(merged['datetime']) - old_count
+
+    def update(self, symbol: str, fetch_func: Callable[[datetime, datetime], List[Dict[str, Any]]],
+               start_date: datetime, end_date: Optional[datetime] = None) -> int:
+        """
+        Fetch and store only the candles missing from a symbol's store
+
+        Parameters:
+        - symbol: Stock symbol
+        - fetch_func: Function fetching candle dictionaries for a (start, end) datetime range
+        - start_date: Start of the history the store should cover
+        - end_date: End of the range to cover (default: now)
+
+        Returns:
+        - Number of candles with new timestamps
+
+        Raises:
+        - Exception: The error of a failed fetch, after the candles of the ranges that were
+          fetched are stored. A failed range is neither stored nor counted as covered, so the
+          next update fetches it again.
+        """
+        end_date = end_date or datetime.now()
+        header = self.read_header(symbol)
+        last_timestamp = self.get_last_timestamp(symbol)
+
+        # (start, end, whether the range extends the store back to start_date)
+        ranges = []
+        if header is None or last_timestamp is None:
+            ranges.append((start_date, end_date, True))
+        else:
+            covered_from = header.get('covered_from')
+            if covered_from and start_date.date() < datetime.fromisoformat(covered_from).date():
+                ranges.append((start_date, datetime.fromisoformat(header['first_timestamp']), True))
+            if last_timestamp < end_date:
+                # Fetch the last stored bar again, it may have been stored before the session closed
+                ranges.append((last_timestamp, end_date, False))
+
+        if not ranges:
+            logging.info(f"History for {symbol} is up to date ({last_timestamp})")
+            return 0
+
+        candles = []
+        covered_from = start_date
+        fetch_error = None
+        for range_start, range_end, extends_start in ranges:
+            logging.info(f"Fetching {self.source} {self.interval} history for {symbol}: {range_start} - {range_end}")
+            try:
+                candles.extend(fetch_func(range_start, range_end) or [])
+            except Exception as e:
+                # Partial data of the range is dropped too: storing it would move the
+                # last timestamp past the hole and the next update would not refetch it
+                logging.error(f"Error fetching {self.source} history for {symbol}: {range_start} - {range_end}: {e}")
+                fetch_error = fetch_error or e
+                if extends_start:
+                    covered_from = None
+
+        added = self.append(symbol, candles, covered_from=covered_from)
+        logging.info(f"Stored {added} new candles for {symbol} in {self.get_path(symbol)}")
+        if fetch_error is not None:
+            raise fetch_error
+        return added
+
+    def import_json(self, symbol: str, file_path: str) -> int:
+        """
+        Import a history JSON file written by tests/breeze_history.py
+
+        Parameters:
+        - symbol: Stock symbol
+        - file_path: Path of the JSON file
+
+        Returns:
+        - Number of candles with new timestamps
+        """
+        with open(file_path, 'r') as f:
+            history_data = json.load(f)
+        candles = history_data.get('data', [])
+        if not candles:
+            return 0
+        first = min(str(candle.get('datetime')) for candle in candles)
+        return self.append(symbol, candles, covered_from=datetime.fromisoformat(first[:10]))
+
+
+def refresh_symbols(store: HistoryStore, symbols: List[str],
+                    fetch_func: Callable[[str, datetime, datetime], List[Dict[str, Any]]],
+                    start_date: datetime, end_date: Optional[datetime] = None,
+                    max_workers: int = 4) -> Dict[str, Any]:
+    """
+    Refresh many symbols concurrently
+
+    Parameters:
+    - store: History store
+    - symbols: Symbols to refresh
+    - fetch_func: Function fetching candles for (symbol, start, end)
+    - start_date: Start of the history the store should cover
+    - end_date: End of the range to cover (default: now)
+    - max_workers: Number of symbols refreshed at the same time
+
+    Returns:
+    Dictionary of symbol -> number of new candles, or the error message if the refresh failed
+    """
+    def refresh(symbol: str):
+        try:
+            return store.update(symbol, lambda start, end: fetch_func(symbol, start, end), start_date, end_date)
+        except Exception as e:
+            logging.error(f"Error refreshing history for {symbol}: {e}")
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return dict(zip(symbols, executor.map(refresh, symbols)))
@@ -0,0 +1,127 @@
+"""
+HTTP Sessions
+
+Process-wide requests sessions with keep-alive connection pools. Every client built
+on a shared session (see kite_utils.initialize_kite) reuses its open TCP/TLS
+connections instead of paying a handshake per call: KiteConnect only keeps
+connections alive when it is given a session, and otherwise calls requests.request()
+with a new connection every time.
+
+The pool of each host holds DEFAULT_POOL_MAXSIZE connections, enough for the GTT
+batch workers (10) and the async API workers (8) to run without opening throwaway
+connections. get_connection_stats() reports requests and new connections per host,
+so connection reuse can be checked in the logs.
+
+Only Kite uses these sessions. BreezeConnect sends its REST calls through the
+module-level requests.get/post/put/delete and takes no session, so Breeze calls
+(e.g. get_historical_data_v2 windows) still open a connection each; its ticks stream
+over a single socket.io connection and are not affected.
+
+Example:
+    kite = KiteConnect(api_key=api_key)
+    kite.reqsession = get_shared_session("kite")
+    ...
+    get_connection_stats("kite")   # {'https://api.kite.trade': {'requests': 12, 'new_connections': 1, ...}}
+"""
+import threading
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+# Connections kept alive per host; at least the number of concurrent API workers
+DEFAULT_POOL_MAXSIZE = 16
+# Hosts whose pools are kept per session
+DEFAULT_POOL_CONNECTIONS = 4
+
+_sessions: Dict[str, 'requests.Session'] = {}
+_sessions_lock = threading.Lock()
+
+
+def create_session(pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                   pool_connections: int = DEFAULT_POOL_CONNECTIONS) -> 'requests.Session':
+    """
+    Create a requests session with a keep-alive connection pool per host
+
+    Parameters:
+    - pool_maxsize: Connections kept alive per host
+    - pool_connections: Number of hosts whose pools are kept
+
+    Returns:
+    requests.Session with pooled adapters mounted for http and https
+    """
+    # Imported on first use, so importing this module (e.g. for get_connection_stats)
+    # does not load requests
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_shared_session(name: str = "kite", pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> 'requests.Session':
+    """
+    Get the process-wide session of a client
+
+    Parameters:
+    - name: Client name; callers with the same name share one session and connection pool
+    - pool_maxsize: Connections kept alive per host (used when the session is created)
+
+    Returns:
+    Shared requests.Session
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = create_session(pool_maxsize=pool_maxsize)
+            _sessions[name] = session
+        return session
+
+
+def close_shared_sessions() -> None:
+    """Close every shared session and drop its connections (the next lookup creates a fresh one)"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def get_connection_stats(name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Get connection reuse statistics of the shared sessions by host
+
+    Only hosts whose pool is still open are reported.
+
+    Parameters:
+    - name: Client name of one shared session (None: every shared session)
+
+    Returns:
+    Dictionary of "scheme://host[:port]" -> requests, new connections, reused requests
+    and reuse ratio
+    """
+    with _sessions_lock:
+        sessions = [_sessions[name]] if name in _sessions else ([] if name else list(_sessions.values()))
+
+    stats: Dict[str, Dict[str, Any]] = {}
+    for session in sessions:
+        adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                default_port = {'http': 80, 'https': 443}.get(pool.scheme)
+                host = f"{pool.scheme}://{pool.host}" + (f":{pool.port}" if pool.port and pool.port != default_port else "")
+                host_stats = stats.setdefault(host, {'requests': 0, 'new_connections': 0})
+                host_stats['requests'] += pool.num_requests
+                host_stats['new_connections'] += pool.num_connections
+
+    for host_stats in stats.values():
+        host_stats['reused'] = max(0, host_stats['requests'] - host_stats['new_connections'])
+        host_stats['reuse_ratio'] = host_stats['reused'] / host_stats['requests'] if host_stats['requests'] else 0.0
+    return stats
@@ -0,0 +1,438 @@
+"""
+Instrument Master Service
+
+This module keeps Zerodha's instrument master (instruments.csv) in memory so that
+tick size, lot size and instrument token lookups are O(1) dictionary reads instead of
+a full CSV parse per call. The file is loaded lazily on first lookup and shared by
+every caller in the process through get_shared_instrument_master().
+
+The traded segments (NSE/BSE EQ) are also written to a compressed columnar NumPy
+snapshot (instruments.npz, byte string columns) with a versioned header, so later
+process starts load in milliseconds instead of parsing the full CSV. A master loaded
+from the snapshot falls back to the CSV once for lookups outside those segments.
+"""
+import csv
+import logging
+import os
+import json
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+SNAPSHOT_VERSION = 2
+# (exchange, instrument_type) pairs kept in the binary snapshot
+SNAPSHOT_SEGMENTS = (('NSE', 'EQ'), ('BSE', 'EQ'))
+SNAPSHOT_COLUMNS = ('instrument_token', 'exchange', 'tradingsymbol', 'name', 'segment',
+                    'instrument_type', 'tick_size', 'lot_size')
+# Stored as UTF-8 byte strings ('S' dtype), a quarter of the size of numpy unicode columns
+SNAPSHOT_TEXT_COLUMNS = ('exchange', 'tradingsymbol', 'name', 'segment', 'instrument_type')
+# Seconds a missing instruments file is remembered before lookups look for it again
+MISSING_FILE_RETRY_SECONDS = 60.0
+
+
+def get_snapshot_path(file_path: str) -> str:
+    """Get the snapshot path that belongs to an instrument master CSV path"""
+    return os.path.splitext(file_path)[0] + ".npz"
+
+
+def write_snapshot(records: Iterable[Dict[str, Any]], snapshot_path: str, download_date: Optional[date] = None) -> bool:
+    """
+    Write traded-segment instruments to a columnar NumPy snapshot
+
+    Parameters:
+    - records: Instrument records as built by InstrumentMaster
+    - snapshot_path: Destination .npz path
+    - download_date: Date the instrument master was downloaded (defaults to today)
+
+    Returns:
+    True if the snapshot was written, False otherwise
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        logging.warning("numpy not available, skipping instrument snapshot")
+        return False
+
+    try:
+        rows = [r for r in records if (r['exchange'], r['instrument_type']) in SNAPSHOT_SEGMENTS]
+        header = {
+            'version': SNAPSHOT_VERSION,
+            'download_date': (download_date or datetime.now().date()).isoformat(),
+            'segments': [list(segment) for segment in SNAPSHOT_SEGMENTS],
+            'count': len(rows)
+        }
+        columns = {
+            'instrument_token': np.array([r['instrument_token'] for r in rows], dtype=np.int64),
+            'tick_size': np.array([r['tick_size'] for r in rows], dtype=np.float64),
+            'lot_size': np.array([r['lot_size'] for r in rows], dtype=np.int32)
+        }
+        for column in SNAPSHOT_TEXT_COLUMNS:
+            columns[column] = np.array([r[column].encode('utf-8') for r in rows], dtype=bytes)
+
+        # Write to a temporary file first so readers never see a partial snapshot
+        tmp_path = snapshot_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, header=np.array(json.dumps(header)), **columns)
+        os.replace(tmp_path, snapshot_path)
+        logging.info(f"Wrote instrument snapshot with {len(rows)} instruments to {snapshot_path}")
+        return True
+    except Exception as e:
+        logging.error(f"Error writing instrument snapshot {snapshot_path}: {e}")
+        return False
+
+
+def read_snapshot(snapshot_path: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    Read a columnar NumPy instrument snapshot
+
+    Parameters:
+    - snapshot_path: Path of the .npz snapshot
+
+    Returns:
+    Tuple of (header, instrument records) or None if the snapshot is missing or unusable
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    try:
+        with np.load(snapshot_path, allow_pickle=False) as data:
+            header = json.loads(str(data['header']))
+            if header.get('version') != SNAPSHOT_VERSION:
+                logging.warning(f"Ignoring instrument snapshot {snapshot_path} with version {header.get('version')}")
+                return None
+            columns = {column: data[column].tolist() for column in SNAPSHOT_COLUMNS}
+        for column in SNAPSHOT_TEXT_COLUMNS:
+            columns[column] = [value.decode('utf-8') for value in columns[column]]
+
+        records = [dict(zip(SNAPSHOT_COLUMNS, values)) for values in zip(*(columns[c] for c in SNAPSHOT_COLUMNS))]
+        return header, records
+    except Exception as e:
+        logging.error(f"Error reading instrument snapshot {snapshot_path}: {e}")
+        return None
+
+
+class InstrumentMaster:
+    """Class to serve instrument lookups from an in-memory index of the instrument master"""
+
+    def __init__(self, file_path: str = "instruments.csv", snapshot_path: Optional[str] = None):
+        """
+        Initialize the instrument master
+
+        Parameters:
+        - file_path: Path of the instrument master CSV file
+        - snapshot_path: Path of the binary snapshot (defaults to the CSV path with .npz)
+        """
+        self.file_path = file_path
+        self.snapshot_path = snapshot_path or get_snapshot_path(file_path)
+        self.loaded_at = None
+        self.download_date = None
+        self.source = None
+        # (exchange, instrument_type) pairs held in memory; None when every segment is loaded
+        self.segments: Optional[set] = None
+        self._full_load_attempted = False
+        self._missing_since: Optional[float] = None
+        self._by_symbol: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._by_token: Dict[int, Dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Held while reading the snapshot or parsing the CSV, so concurrent first lookups parse once
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def _build_record(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Convert a raw instrument row (CSV or API) into a compact record
+
+        Parameters:
+        - row: Instrument row with Kite instrument master columns
+
+        Returns:
+        Dictionary with the indexed fields or None if the row is unusable
+        """
+        try:
+            return {
+                'instrument_token': int(row['instrument_token']),
+                'exchange_token': row.get('exchange_token'),
+                'tradingsymbol': str(row['tradingsymbol']).upper(),
+                'name': row.get('name') or '',
+                'exchange': str(row['exchange']).upper(),
+                'segment': row.get('segment') or '',
+                'instrument_type': row.get('instrument_type') or '',
+                'tick_size': float(row.get('tick_size') or 0),
+                'lot_size': int(float(row.get('lot_size') or 0))
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def load_records(self, rows: Iterable[Dict[str, Any]], download_date: Optional[date] = None,
+                     source: str = "api") -> int:
+        """
+        Replace the in-memory indexes with the given instrument rows
+
+        Parameters:
+        - rows: Instrument rows (e.g. from csv.DictReader or kite.instruments())
+        - download_date: Date the rows were downloaded (defaults to today)
+        - source: Where the rows came from ("api", "csv" or "snapshot")
+
+        Returns:
+        Number of instruments indexed
+        """
+        records = (self._build_record(row) for row in rows)
+        return self._set_index((record for record in records if record is not None), download_date, source)
+
+    def _set_index(self, records: Iterable[Dict[str, Any]], download_date: Optional[date], source: str,
+                   segments: Optional[Iterable[Tuple[str, str]]] = None) -> int:
+        """
+        Swap in new indexes built from already-normalised instrument records
+
+        Parameters:
+        - records: Instrument records
+        - download_date: Date the records were downloaded (defaults to today)
+        - source: Where the records came from
+        - segments: (exchange, instrument_type) pairs the records are limited to (None: all)
+
+        Returns:
+        Number of instruments indexed
+        """
+        by_symbol = {}
+        by_token = {}
+        for record in records:
+            key = (record['exchange'], record['tradingsymbol'])
+            existing = by_symbol.get(key)
+            # Prefer the equity listing when a symbol appears more than once on an exchange
+            if existing is None or (existing['instrument_type'] != 'EQ' and record['instrument_type'] == 'EQ'):
+                by_symbol[key] = record
+            by_token[record['instrument_token']] = record
+
+        with self._lock:
+            self._by_symbol = by_symbol
+            self._by_token = by_token
+            self._loaded = True
+            self.loaded_at = datetime.now()
+            self.download_date = download_date or self.loaded_at.date()
+            self.source = source
+            self.segments = {tuple(segment) for segment in segments} if segments is not None else None
+
+        logging.info(f"Instrument master indexed: {len(by_token)} instruments from {source}")
+        return len(by_token)
+
+    def load(self, force: bool = False) -> bool:
+        """
+        Load the instrument master into memory (only once unless forced)
+
+        The binary snapshot is used when it is at least as new as the CSV; otherwise
+        the CSV is parsed and a fresh snapshot is written for the next start. Concurrent
+        callers wait for the first one's load instead of parsing the file again. A missing
+        file is reported once and not looked for again for MISSING_FILE_RETRY_SECONDS.
+
+        Parameters:
+        - force: Reload even if the instruments were already loaded
+
+        Returns:
+        True if instruments are available in memory, False otherwise
+        """
+        if self._loaded and not force:
+            return True
+
+        with self._load_lock:
+            if self._loaded and not force:
+                return True
+            if (not force and self._missing_since is not None and
+                    time.monotonic() - self._missing_since < MISSING_FILE_RETRY_SECONDS):
+                return False
+            return self._load_files()
+
+    def _load_files(self) -> bool:
+        """Load the snapshot or the CSV (the load lock must be held)"""
+        csv_date = None
+        if os.path.exists(self.file_path):
+            csv_date = datetime.fromtimestamp(os.path.getmtime(self.file_path)).date()
+
+        snapshot = read_snapshot(self.snapshot_path)
+        if snapshot is not None:
+            header, records = snapshot
+            snapshot_date = date.fromisoformat(header['download_date'])
+            if csv_date is None or snapshot_date >= csv_date:
+                # Snapshot columns are already typed, so they are indexed without re-normalising
+                self._set_index(records, snapshot_date, "snapshot", segments=header.get('segments', SNAPSHOT_SEGMENTS))
+                logging.info(f"Loaded instrument master from snapshot {self.snapshot_path} ({header['download_date']})")
+                self._missing_since = None
+                return True
+
+        if csv_date is None:
+            if self._missing_since is None:
+                logging.warning(f"Instruments file {self.file_path} not found")
+            self._missing_since = time.monotonic()
+            return False
+        self._missing_since = None
+
+        try:
+            with open(self.file_path, 'r', newline='') as f:
+                self.load_records(csv.DictReader(f), download_date=csv_date, source="csv")
+            logging.info(f"Loaded instrument master from {self.file_path}")
+            self.write_snapshot()
+            return True
+        except Exception as e:
+            logging.error(f"Error loading instrument master from {self.file_path}: {e}")
+            return False
+
+    def _load_all_segments(self) -> bool:
+        """
+        Replace a snapshot-limited index with the full CSV, once per process
+
+        Returns:
+        True if the index now holds every segment of the instrument master
+        """
+        if self.segments is None:
+            return True
+        with self._load_lock:
+            if self.segments is None:
+                return True
+            if self._full_load_attempted:
+                return False
+            self._full_load_attempted = True
+            if not os.path.exists(self.file_path):
+                logging.warning(f"Instruments file {self.file_path} not found, only {sorted(self.segments)} instruments are available")
+                return False
+            try:
+                csv_date = datetime.fromtimestamp(os.path.getmtime(self.file_path)).date()
+                with open(self.file_path, 'r', newline='') as f:
+                    self.load_records(csv.DictReader(f), download_date=csv_date, source="csv")
+                logging.info(f"Loaded all instrument segments from {self.file_path}")
+                return True
+            except Exception as e:
+                logging.error(f"Error loading instrument master from {self.file_path}: {e}")
+                return False
+
+    def write_snapshot(self) -> bool:
+        """
+        Write the traded segments of the loaded instruments to the binary snapshot
+
+        Returns:
+        True if the snapshot was written, False otherwise
+        """
+        if not self._loaded:
+            return False
+        return write_snapshot(list(self._by_token.values()), self.snapshot_path, self.download_date)
+
+    def is_loaded(self) -> bool:
+        """Check whether the indexes have been built"""
+        return self._loaded
+
+    def get_instrument(self, exchange: str, trading_symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the instrument record for a trading symbol
+
+        Parameters:
+        - exchange: Exchange name (e.g., "NSE")
+        - trading_symbol: Trading symbol (e.g., "ITC")
+
+        Returns:
+        Instrument record or None if not found
+        """
+        if not self.load():
+            return None
+        key = (exchange.upper(), trading_symbol.upper())
+        instrument = self._by_symbol.get(key)
+        if instrument is None and self.segments is not None and self._load_all_segments():
+            instrument = self._by_symbol.get(key)
+        return instrument
+
+    def get_instrument_by_token(self, instrument_token: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the instrument record for an instrument token
+
+        Parameters:
+        - instrument_token: Kite instrument token
+
+        Returns:
+        Instrument record or None if not found
+        """
+        if not self.load():
+            return None
+        try:
+            instrument_token = int(instrument_token)
+        except (TypeError, ValueError):
+            return None
+        instrument = self._by_token.get(instrument_token)
+        if instrument is None and self.segments is not None and self._load_all_segments():
+            instrument = self._by_token.get(instrument_token)
+        return instrument
+
+    def get_tick_size(self, exchange: str, trading_symbol: str) -> Optional[float]:
+        """
+        Get the tick size for a trading symbol
+
+        Returns:
+        Tick size or None if the instrument is unknown
+        """
+        instrument = self.get_instrument(exchange, trading_symbol)
+        return instrument['tick_size'] if instrument and instrument['tick_size'] > 0 else None
+
+    def get_lot_size(self, exchange: str, trading_symbol: str) -> Optional[int]:
+        """
+        Get the lot size for a trading symbol
+
+        Returns:
+        Lot size or None if the instrument is unknown
+        """
+        instrument = self.get_instrument(exchange, trading_symbol)
+        return instrument['lot_size'] if instrument else None
+
+    def get_instrument_token(self, exchange: str, trading_symbol: str) -> Optional[int]:
+        """
+        Get the instrument token for a trading symbol
+
+        Returns:
+        Instrument token or None if the instrument is unknown
+        """
+        instrument = self.get_instrument(exchange, trading_symbol)
+        return instrument['instrument_token'] if instrument else None
+
+    def get_exchange_instruments(self, exchange: str) -> List[Dict[str, Any]]:
+        """
+        Get all instrument records of an exchange
+
+        Parameters:
+        - exchange: Exchange name (e.g., "NSE")
+
+        Returns:
+        List of instrument records
+        """
+        if not self.load():
+            return []
+        # The snapshot holds only the EQ segments, not every instrument of the exchange
+        self._load_all_segments()
+        exchange = exchange.upper()
+        return [record for (record_exchange, _), record in self._by_symbol.items() if record_exchange == exchange]
+
+    def __len__(self) -> int:
+        return len(self._by_token)
+
+
+_shared_masters: Dict[str, InstrumentMaster] = {}
+_shared_masters_lock = threading.Lock()
+
+
+def get_shared_instrument_master(file_path: str = "instruments.csv") -> InstrumentMaster:
+    """
+    Get the process-wide instrument master for a file path
+
+    Parameters:
+    - file_path: Path of the instrument master CSV file
+
+    Returns:
+    Shared InstrumentMaster instance (loaded lazily on first lookup)
+    """
+    key = os.path.abspath(file_path)
+    with _shared_masters_lock:
+        master = _shared_masters.get(key)
+        if master is None:
+            master = InstrumentMaster(file_path)
+            _shared_masters[key] = master
+        return master
@@ -1,7 +1,11 @@
+import copy
 import logging
 import json
 from datetime import datetime
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from kite_utils import (
     initialize_kite,
@@ -10,9 +14,11 @@ from kite_utils import (
     get_live_data,
     get_multiple_live_data,
     signal_handler,
-    load_config,
     get_login_url
 )
+from config_service import get_config_service
+from rate_limiter import backoff_delay
+from kite_request_scheduler import KiteRequestScheduler, ScheduledKiteClient, get_shared_request_scheduler
 
 # Set up logging with more detailed format
 logging.basicConfig(
@@ -20,15 +26,171 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+class GTTBookCache:
+    """Class to hold a short-lived snapshot of the account's GTT order book
+    
+    Every caller on the tick path asks for the full GTT list, so one tick used to
+    cost several identical REST round-trips. The cache serves a snapshot while it is
+    younger than max_age_seconds and is invalidated explicitly whenever we place,
+    modify or delete a GTT, so callers never see a book older than our own writes.
+    Each invalidation starts a new generation; a fetch that began in an earlier
+    generation may have read the book before the write and is not stored. Callers
+    that miss while a fetch of the current generation is in flight wait for it
+    instead of sending their own (single flight), so a tick burst across symbols
+    still costs one fetch.
+    """
+    
+    def __init__(self, max_age_seconds: float = 2.0):
+        """
+        Initialize the GTT book cache
+        
+        Parameters:
+        - max_age_seconds: Staleness window for a cached snapshot (0 disables caching)
+        """
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.dropped_stores = 0
+        self.shared_fetches = 0
+        self.generation = 0
+        self._orders = None
+        self._fetched_at = 0.0
+        # Fetch in flight: {'generation', 'started_at', 'done': Event, 'orders'}
+        self._flight = None
+        self._lock = threading.Lock()
+    
+    def get(self, max_age_seconds: Optional[float] = None) -> Optional[list]:
+        """
+        Get the cached GTT orders if the snapshot is fresh enough
+        
+        Parameters:
+        - max_age_seconds: Optional override of the staleness window for this lookup
+        
+        Returns:
+        Deep copy of the cached GTT order list (callers may modify it), or None on a miss
+        """
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        with self._lock:
+            if self._orders is not None and (time.monotonic() - self._fetched_at) <= max_age:
+                self.hits += 1
+                return copy.deepcopy(self._orders)
+            self.misses += 1
+            return None
+    
+    def store(self, gtt_orders: list, generation: Optional[int] = None) -> bool:
+        """
+        Store a freshly fetched GTT order list
+        
+        Parameters:
+        - gtt_orders: GTT orders as returned by Kite
+        - generation: Cache generation read before the fetch started (None stores unconditionally)
+        
+        Returns:
+        True if stored, False if the cache was invalidated while the orders were fetched
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.dropped_stores += 1
+                return False
+            self._orders = copy.deepcopy(gtt_orders)
+            self._fetched_at = time.monotonic()
+            return True
+    
+    def start_fetch(self, max_age_seconds: Optional[float] = None) -> tuple:
+        """
+        Start a fetch of the GTT book, or join the one in flight
+        
+        A fetch in flight is joined only if it belongs to the current generation and
+        started within the staleness window (so max_age_seconds=0 always fetches).
+        
+        Parameters:
+        - max_age_seconds: Optional override of the staleness window for this lookup
+        
+        Returns:
+        Tuple of (flight, is_leader); the leader fetches and calls finish_fetch, other
+        callers wait with wait_fetch
+        """
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        with self._lock:
+            flight = self._flight
+            if (flight is not None and flight['generation'] == self.generation and
+                    max_age > 0 and time.monotonic() - flight['started_at'] <= max_age):
+                self.shared_fetches += 1
+                return flight, False
+            flight = {'generation': self.generation, 'started_at': time.monotonic(),
+                      'done': threading.Event(), 'orders': None}
+            self._flight = flight
+            return flight, True
+    
+    def finish_fetch(self, flight: Dict[str, Any], gtt_orders: Optional[list]) -> None:
+        """
+        Publish the result of a fetch to its waiters and store it if still current
+        
+        Parameters:
+        - flight: Flight returned by start_fetch
+        - gtt_orders: Fetched GTT orders, or None if the fetch failed
+        """
+        if gtt_orders is not None:
+            self.store(gtt_orders, flight['generation'])
+            flight['orders'] = copy.deepcopy(gtt_orders)
+        with self._lock:
+            if self._flight is flight:
+                self._flight = None
+        flight['done'].set()
+    
+    @staticmethod
+    def wait_fetch(flight: Dict[str, Any]) -> Optional[list]:
+        """Wait for a joined fetch; returns a copy of its orders, or None if it failed"""
+        flight['done'].wait()
+        return copy.deepcopy(flight['orders']) if flight['orders'] is not None else None
+    
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next lookup fetches from Kite"""
+        with self._lock:
+            self._orders = None
+            self.generation += 1
+            self.invalidations += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache hit/miss counters
+        
+        Returns:
+        Dictionary with hits, misses, invalidations, dropped stores and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'dropped_stores': self.dropped_stores,
+                'shared_fetches': self.shared_fetches,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'max_age_seconds': self.max_age_seconds
+            }
+
+
 class KiteConnectAPI:
     """Class to handle all Kite Connect API operations for NSE trading"""
     
-    def __init__(self, trading_symbol: str = ""):
+    def __init__(self, trading_symbol: str = "", gtt_cache_max_age: float = 2.0,
+                 request_scheduler: Optional[KiteRequestScheduler] = None,
+                 gtt_dedupe_ttl: float = 300.0):
         """
         Initialize the Kite Connect API
         
+        Every REST call made through self.kite goes through a KiteRequestScheduler that
+        keeps it under Kite's per-endpoint rate limits. By default the scheduler is shared
+        by the whole process; set kite_connect.rate_limit_dir in config.yaml to share it
+        with other processes on this machine too.
+        
         Parameters:
         - trading_symbol: Trading symbol of the stock (required)
+        - gtt_cache_max_age: Seconds a fetched GTT order book may be reused (default: 2.0)
+        - request_scheduler: Scheduler for the REST calls (default: the shared scheduler)
+        - gtt_dedupe_ttl: Seconds a placed GTT's idempotency key blocks placing it again (default: 300)
         
         Raises:
         - ValueError: If trading_symbol is not provided or is empty
@@ -38,14 +200,45 @@ class KiteConnectAPI:
             logging.error(error_msg)
             raise ValueError(error_msg)
             
-        self.kite = None
+        self._kite = None
         self.order_history = []
-        self.config = load_config()
+        if request_scheduler is None:
+            rate_limit_dir = get_config_service().get_kite_credentials().rate_limit_dir
+            request_scheduler = get_shared_request_scheduler(rate_limit_dir)
+        self.request_scheduler = request_scheduler
         self.trading_symbol = trading_symbol.strip()
         self.exchange = "NSE"  # Fixed to NSE
+        self.gtt_cache = GTTBookCache(max_age_seconds=gtt_cache_max_age)
+        self.gtt_dedupe_ttl = gtt_dedupe_ttl
+        # Idempotency key -> (trigger ID, monotonic time placed)
+        self._placed_gtt_keys: Dict[str, tuple] = {}
+        # Idempotency key -> pending placement of a batch still sending it
+        # ({'done': Event, 'trigger_id': ..., 'error': ...})
+        self._inflight_gtt_keys: Dict[str, Dict[str, Any]] = {}
+        self._placed_gtt_keys_lock = threading.Lock()
         self._setup_logging()
         logging.info(f"Initialized KiteConnectAPI for {self.trading_symbol} on {self.exchange}")
     
+    @property
+    def kite(self) -> Optional[ScheduledKiteClient]:
+        """Kite client whose REST calls go through the request scheduler (None until connected)"""
+        return self._kite
+    
+    @kite.setter
+    def kite(self, client: Any) -> None:
+        if client is not None and not isinstance(client, ScheduledKiteClient):
+            client = ScheduledKiteClient(client, self.request_scheduler)
+        self._kite = client
+    
+    def get_request_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the request scheduler metrics
+        
+        Returns:
+        Dictionary of endpoint group -> calls, queue depth, wait times and 429 counts
+        """
+        return self.request_scheduler.get_stats()
+    
     def _setup_logging(self):
         """Set up logging configuration"""
         logging.basicConfig(
@@ -213,7 +406,8 @@ class KiteConnectAPI:
 
     def place_gtt_order(self, trading_symbol: str, exchange: str, transaction_type: str, 
                        quantity: int, price: float, trigger_price: float, 
-                       order_type: str = "LIMIT", validity: str = "DAY", current_price: float = None) -> str:
+                       order_type: str = "LIMIT", validity: str = "DAY", current_price: float = None,
+                       verbose: bool = True) -> str:
         """
         Place a Good Till Triggered (GTT) order using Kite Connect API
         
@@ -227,6 +421,7 @@ class KiteConnectAPI:
         - order_type: Type of order (default: "LIMIT")
         - validity: Order validity (default: "DAY")
         - current_price: Current price of the stock (optional, will fetch if not provided)
+        - verbose: Log every request parameter and the full response (default: True)
         
         Returns:
         GTT trigger ID
@@ -279,24 +474,25 @@ class KiteConnectAPI:
                 }
             ]
             
-            # Log all GTT parameters being sent
-            logging.info("=== GTT ORDER PARAMETERS ===")
-            logging.info(f"trigger_type: {self.kite.GTT_TYPE_SINGLE}")
-            logging.info(f"tradingsymbol: {trading_symbol}")
-            logging.info(f"exchange: {exchange}")
-            logging.info(f"trigger_values: {[trigger_price]}")
-            logging.info(f"last_price: {last_price}")
-            logging.info("orders_to_place:")
-            for i, order in enumerate(orders_to_place):
-                logging.info(f"  Order {i+1}:")
-                logging.info(f"    exchange: {order['exchange']}")
-                logging.info(f"    tradingsymbol: {order['tradingsymbol']}")
-                logging.info(f"    transaction_type: {order['transaction_type']}")
-                logging.info(f"    quantity: {order['quantity']}")
-                logging.info(f"    order_type: {order['order_type']}")
-                logging.info(f"    product: {order['product']}")
-                logging.info(f"    price: {order['price']}")
-            logging.info("=== END GTT PARAMETERS ===")
+            if verbose:
+                # Log all GTT parameters being sent
+                logging.info("=== GTT ORDER PARAMETERS ===")
+                logging.info(f"trigger_type: {self.kite.GTT_TYPE_SINGLE}")
+                logging.info(f"tradingsymbol: {trading_symbol}")
+                logging.info(f"exchange: {exchange}")
+                logging.info(f"trigger_values: {[trigger_price]}")
+                logging.info(f"last_price: {last_price}")
+                logging.info("orders_to_place:")
+                for i, order in enumerate(orders_to_place):
+                    logging.info(f"  Order {i+1}:")
+                    logging.info(f"    exchange: {order['exchange']}")
+                    logging.info(f"    tradingsymbol: {order['tradingsymbol']}")
+                    logging.info(f"    transaction_type: {order['transaction_type']}")
+                    logging.info(f"    quantity: {order['quantity']}")
+                    logging.info(f"    order_type: {order['order_type']}")
+                    logging.info(f"    product: {order['product']}")
+                    logging.info(f"    price: {order['price']}")
+                logging.info("=== END GTT PARAMETERS ===")
             
             # Place GTT order using Kite API
             gtt_response = self.kite.place_gtt(
@@ -307,27 +503,235 @@ class KiteConnectAPI:
                 last_price=last_price,
                 orders=orders_to_place
             )
+            self.gtt_cache.invalidate()
             
             trigger_id = gtt_response.get('trigger_id')
-            logging.info(f"GTT order placed successfully. Trigger ID: {trigger_id}")
-            logging.info(f"Full GTT response: {gtt_response}")
-            logging.info(f"Details: {trading_symbol} {transaction_type} {quantity} shares @ {price} (trigger: {trigger_price})")
+            if verbose:
+                logging.info(f"GTT order placed successfully. Trigger ID: {trigger_id}")
+                logging.info(f"Full GTT response: {gtt_response}")
+                logging.info(f"Details: {trading_symbol} {transaction_type} {quantity} shares @ {price} (trigger: {trigger_price})")
+            else:
+                logging.info(f"GTT order placed: {trading_symbol} {transaction_type} {quantity} @ {price} (trigger: {trigger_price}), trigger ID {trigger_id}")
             
             return trigger_id
             
         except Exception as e:
             logging.error(f"Error placing GTT order: {e}")
-            logging.error(f"Exception type: {type(e).__name__}")
-            logging.error(f"Exception details: {str(e)}")
+            if verbose:
+                logging.error(f"Exception type: {type(e).__name__}")
+                logging.error(f"Exception details: {str(e)}")
             raise
 
-    def get_gtt_orders(self) -> list:
+    def place_gtt_batch(self, orders: List[Dict[str, Any]], max_workers: int = 10,
+                        max_retries: int = 3) -> List[Dict[str, Any]]:
+        """
+        Place several GTT orders concurrently
+        
+        Orders are sent by a bounded worker pool; the request scheduler keeps them under
+        Kite's rate limit and ahead of GTT book polls, so a ladder of GTTs takes about one
+        round-trip of wall time instead of one per order. The scheduler only paces this
+        process (or the processes sharing its state directory): a 429 caused by other
+        clients of the account is retried here with backoff, and any other error fails
+        only its own order. The scheduler's 'throttled' stat counts every rejected attempt.
+        Last prices missing from the specs are fetched with one LTP call for the whole batch.
+        
+        An order whose idempotency key was placed by this instance in the last
+        gtt_dedupe_ttl seconds (or earlier in the same batch) is not sent again; its
+        result is DUPLICATE with the trigger ID of the original order. A key another
+        batch is still sending is reserved: this batch waits for that placement and
+        reports it as DUPLICATE, or FAILED if it failed. Keys should describe the order's
+        content, so a retried or concurrently planned order maps to the same key.
+        Modifying or deleting the GTT releases its key.
+        
+        Parameters:
+        - orders: GTT specs, dictionaries of place_gtt_order arguments: 'transaction_type',
+          'quantity', 'price', 'trigger_price' and optionally 'trading_symbol' and 'exchange'
+          (default: this instance's), 'current_price' and 'idempotency_key'
+        - max_workers: Maximum number of concurrent requests
+        - max_retries: Retries per order on rate limit errors
+        
+        Returns:
+        List of results in the order of the specs, each with 'index', 'idempotency_key',
+        'status' ('PLACED', 'DUPLICATE' or 'FAILED'), 'trigger_id' and 'error'
+        """
+        started = time.monotonic()
+        results = [{'index': i, 'idempotency_key': spec.get('idempotency_key'), 'status': None,
+                    'trigger_id': None, 'error': None} for i, spec in enumerate(orders)]
+        
+        # Send each idempotency key once; repeats are resolved after the batch. Keys are
+        # reserved before sending so an overlapping batch can not send them too.
+        to_send = []
+        first_index_by_key = {}
+        pending_elsewhere = {}
+        with self._placed_gtt_keys_lock:
+            expired_before = time.monotonic() - self.gtt_dedupe_ttl
+            for key in [key for key, (_, placed_at) in self._placed_gtt_keys.items() if placed_at < expired_before]:
+                del self._placed_gtt_keys[key]
+            for i, spec in enumerate(orders):
+                key = spec.get('idempotency_key')
+                if key is not None and key in self._placed_gtt_keys:
+                    results[i].update(status='DUPLICATE', trigger_id=self._placed_gtt_keys[key][0])
+                elif key is not None and key in self._inflight_gtt_keys:
+                    pending_elsewhere[i] = self._inflight_gtt_keys[key]
+                elif key is not None and key in first_index_by_key:
+                    continue
+                else:
+                    if key is not None:
+                        first_index_by_key[key] = i
+                        self._inflight_gtt_keys[key] = {'done': threading.Event(), 'trigger_id': None, 'error': None}
+                    to_send.append(i)
+        
+        retries = []
+        
+        def send(i: int) -> str:
+            spec = orders[i]
+            trading_symbol = spec.get('trading_symbol') or self.trading_symbol
+            exchange = spec.get('exchange') or self.exchange
+            current_price = spec.get('current_price')
+            if current_price is None:
+                current_price = last_prices.get(f"{exchange}:{trading_symbol}")
+            for attempt in range(max_retries + 1):
+                try:
+                    return self.place_gtt_order(
+                        trading_symbol=trading_symbol,
+                        exchange=exchange,
+                        transaction_type=spec['transaction_type'],
+                        quantity=spec['quantity'],
+                        price=spec['price'],
+                        trigger_price=spec['trigger_price'],
+                        order_type=spec.get('order_type', "LIMIT"),
+                        validity=spec.get('validity', "DAY"),
+                        current_price=current_price,
+                        verbose=False
+                    )
+                except Exception as e:
+                    if getattr(e, 'code', None) != 429 or attempt >= max_retries:
+                        raise
+                    retries.append(i)
+                    logging.warning(f"GTT order {i + 1} of batch rate limited, retry {attempt + 1}/{max_retries}")
+                    time.sleep(backoff_delay(attempt, base_delay=0.2, max_delay=2.0))
+        
+        try:
+            if to_send:
+                last_prices = self._get_batch_last_prices([orders[i] for i in to_send])
+                with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_send)))) as executor:
+                    futures = {i: executor.submit(send, i) for i in to_send}
+                    for i, future in futures.items():
+                        try:
+                            results[i].update(status='PLACED', trigger_id=future.result())
+                        except Exception as e:
+                            results[i].update(status='FAILED', error=str(e))
+        finally:
+            # Publish the placed keys and release the reservations of failed ones
+            with self._placed_gtt_keys_lock:
+                placed_at = time.monotonic()
+                for key, i in first_index_by_key.items():
+                    pending = self._inflight_gtt_keys.pop(key)
+                    if results[i]['status'] == 'PLACED':
+                        self._placed_gtt_keys[key] = (results[i]['trigger_id'], placed_at)
+                        pending['trigger_id'] = results[i]['trigger_id']
+                    else:
+                        pending['error'] = results[i]['error'] or "batch aborted"
+                    pending['done'].set()
+        
+        for i, pending in pending_elsewhere.items():
+            pending['done'].wait()
+            if pending['trigger_id'] is not None:
+                results[i].update(status='DUPLICATE', trigger_id=pending['trigger_id'])
+            else:
+                results[i].update(status='FAILED', error=f"Concurrent placement failed: {pending['error']}")
+        for result in results:
+            if result['status'] is None:
+                first = results[first_index_by_key[result['idempotency_key']]]
+                if first['status'] == 'PLACED':
+                    result.update(status='DUPLICATE', trigger_id=first['trigger_id'])
+                else:
+                    result.update(status='FAILED', error=first['error'])
+        
+        counts = {status: sum(1 for result in results if result['status'] == status)
+                  for status in ('PLACED', 'DUPLICATE', 'FAILED')}
+        logging.info(f"GTT batch of {len(orders)}: {counts['PLACED']} placed, {counts['DUPLICATE']} duplicate, "
+                     f"{counts['FAILED']} failed, {len(retries)} rate limit retries in {time.monotonic() - started:.2f}s")
+        return results
+    
+    def _release_gtt_keys(self, trigger_id: Any) -> None:
+        """Forget the idempotency keys of a GTT that was modified or deleted"""
+        with self._placed_gtt_keys_lock:
+            for key in [key for key, (placed_id, _) in self._placed_gtt_keys.items() if str(placed_id) == str(trigger_id)]:
+                del self._placed_gtt_keys[key]
+    
+    def _get_batch_last_prices(self, orders: List[Dict[str, Any]]) -> Dict[str, float]:
+        """
+        Fetch the last prices of the instruments of GTT specs that do not carry a current price
+        
+        Parameters:
+        - orders: GTT specs (see place_gtt_batch)
+        
+        Returns:
+        Dictionary of "EXCHANGE:SYMBOL" -> last price (empty if the LTP call fails)
+        """
+        instruments = sorted({f"{spec.get('exchange') or self.exchange}:{spec.get('trading_symbol') or self.trading_symbol}"
+                              for spec in orders if spec.get('current_price') is None})
+        if not instruments:
+            return {}
+        try:
+            ltp_data = self.kite.ltp(instruments)
+            return {instrument: data['last_price'] for instrument, data in ltp_data.items()}
+        except Exception as e:
+            logging.warning(f"Could not fetch LTP for GTT batch {instruments}: {e}")
+            return {}
+
+    def get_gtt_orders(self, max_age_seconds: Optional[float] = None) -> list:
         """
         Get all GTT orders
         
+        Served from the GTT book cache while the last snapshot is fresh, so the
+        several lookups made while handling one tick cost at most one REST call.
+        Concurrent misses share one fetch (see GTTBookCache.start_fetch).
+        
+        Parameters:
+        - max_age_seconds: Optional staleness override (0 forces a fresh fetch)
+        
         Returns:
         List of GTT orders
         """
+        cached_orders = self.gtt_cache.get(max_age_seconds)
+        if cached_orders is not None:
+            logging.debug(f"Using cached GTT order book ({len(cached_orders)} orders)")
+            return cached_orders
+        
+        # The flight records the generation before fetching, so a write that lands
+        # during the fetch keeps it out of the cache
+        flight, is_leader = self.gtt_cache.start_fetch(max_age_seconds)
+        if not is_leader:
+            gtt_orders = self.gtt_cache.wait_fetch(flight)
+            return gtt_orders if gtt_orders is not None else []
+        
+        gtt_orders = None
+        try:
+            gtt_orders = self._fetch_gtt_orders()
+        finally:
+            self.gtt_cache.finish_fetch(flight, gtt_orders)
+        if gtt_orders is None:
+            return []
+        return list(gtt_orders)
+
+    def get_gtt_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters of the GTT book cache
+        
+        Returns:
+        Dictionary with cache statistics
+        """
+        return self.gtt_cache.get_stats()
+
+    def _fetch_gtt_orders(self) -> Optional[list]:
+        """
+        Fetch all GTT orders from Kite, bypassing the cache
+        
+        Returns:
+        List of GTT orders or None if they could not be fetched
+        """
         try:
             # Try different methods based on Kite Connect version
             gtt_orders = None
@@ -356,13 +760,13 @@ class KiteConnectAPI:
             except AttributeError:
                 logging.error("No GTT orders method found - gtts(), gtt_orders(), or get_gtts()")
             
-            # If none of the methods work, return empty list
+            # If none of the methods work, return None
             logging.error("GTT orders method not available in this Kite Connect version")
-            return []
+            return None
             
         except Exception as e:
             logging.error(f"Error getting GTT orders: {e}")
-            return []
+            return None
 
     def modify_gtt_order(self, gtt_order_id: str, trading_symbol: str, exchange: str,
                         transaction_type: str, quantity: int, price: float, 
@@ -433,6 +837,8 @@ class KiteConnectAPI:
                 last_price=last_price,
                 orders=orders_to_place
             )
+            self.gtt_cache.invalidate()
+            self._release_gtt_keys(gtt_order_id)
             
             modified_trigger_id = gtt_response.get('trigger_id')
             logging.info(f"GTT order modified successfully. Trigger ID: {modified_trigger_id}")
@@ -458,6 +864,8 @@ class KiteConnectAPI:
             
             # Delete GTT order
             self.kite.delete_gtt(gtt_order_id)
+            self.gtt_cache.invalidate()
+            self._release_gtt_keys(gtt_order_id)
             
             logging.info(f"GTT order {gtt_order_id} deleted successfully")
             return True
@@ -514,6 +922,7 @@ class KiteConnectAPI:
                 order_type=order_type,
                 validity=validity
             )
+            self.gtt_cache.invalidate()
             
             logging.info(f"GTT order with stop loss placed successfully. Order ID: {gtt_order_id}")
             logging.info(f"Details: {trading_symbol} SELL {quantity} shares @ {stop_loss_price} (trigger: {trigger_price})")
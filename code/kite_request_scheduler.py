@@ -0,0 +1,288 @@
+"""
+Kite Request Scheduler
+
+Central client-side scheduler for Kite Connect REST calls. Every call made through
+KiteConnectAPI.kite takes a token from the bucket of its endpoint group, sized to
+Kite's published limits, before it is sent:
+
+- quote (ltp, quote, ohlc): 1 request/second
+- historical (historical_data): 3 requests/second
+- order (place/modify/cancel order): 10 requests/second
+- default (GTTs, order book, portfolio, ...): 10 requests/second
+
+Callers waiting on the same bucket are served by priority. Priority only orders callers
+within one endpoint group: GTT writes share 'default' with get_gtts and the order book,
+so they go ahead of those polls, but they do not compete with ltp/quote, which draw from
+the separate 'quote' bucket. Queue depth, wait time and 429 counts are available from
+get_stats().
+
+One scheduler is shared by every KiteConnectAPI in the process. With shared_state_dir
+the buckets live in files (rate_limiter.SharedTokenBucket), so several symbol
+processes on one machine share one account limit.
+
+Example:
+    scheduler = get_shared_request_scheduler()
+    kite = ScheduledKiteClient(initialize_kite(), scheduler)
+    kite.ltp("NSE:ITC")                  # waits for a 'quote' token
+    scheduler.get_stats()['quote']       # calls, queue depth, wait times
+"""
+import functools
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from rate_limiter import TokenBucket, SharedTokenBucket
+
+# Kite Connect rate limits (requests per second) by endpoint group
+KITE_RATE_LIMITS = {
+    'quote': 1,
+    'historical': 3,
+    'order': 10,
+    'default': 10
+}
+
+# Lower values are served first
+PRIORITY_ORDER = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_POLL = 2
+
+# KiteConnect client method -> (endpoint group, priority); other methods are not rate limited
+KITE_ENDPOINTS: Dict[str, Tuple[str, int]] = {
+    'ltp': ('quote', PRIORITY_POLL),
+    'quote': ('quote', PRIORITY_POLL),
+    'ohlc': ('quote', PRIORITY_POLL),
+    'historical_data': ('historical', PRIORITY_POLL),
+    'place_order': ('order', PRIORITY_ORDER),
+    'modify_order': ('order', PRIORITY_ORDER),
+    'cancel_order': ('order', PRIORITY_ORDER),
+    'exit_order': ('order', PRIORITY_ORDER),
+    'place_gtt': ('default', PRIORITY_ORDER),
+    'modify_gtt': ('default', PRIORITY_ORDER),
+    'delete_gtt': ('default', PRIORITY_ORDER),
+    'get_gtts': ('default', PRIORITY_POLL),
+    'get_gtt': ('default', PRIORITY_POLL),
+    'orders': ('default', PRIORITY_POLL),
+    'order_history': ('default', PRIORITY_POLL),
+    'trades': ('default', PRIORITY_POLL),
+    'order_trades': ('default', PRIORITY_POLL),
+    'profile': ('default', PRIORITY_DEFAULT),
+    'margins': ('default', PRIORITY_DEFAULT),
+    'holdings': ('default', PRIORITY_DEFAULT),
+    'positions': ('default', PRIORITY_DEFAULT),
+    'instruments': ('default', PRIORITY_DEFAULT),
+    'generate_session': ('default', PRIORITY_DEFAULT),
+    'invalidate_access_token': ('default', PRIORITY_DEFAULT)
+}
+
+
+class _EndpointQueue:
+    """Token bucket of one endpoint group plus the priority queue of callers waiting on it"""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.waiters = []
+        self.condition = threading.Condition()
+        self.calls = 0
+        self.throttled = 0
+        self.errors = 0
+        self.waited_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_depth = 0
+
+
+class KiteRequestScheduler:
+    """Class to rate limit and prioritise Kite Connect REST calls by endpoint group"""
+
+    def __init__(self, rate_limits: Optional[Dict[str, float]] = None, shared_state_dir: Optional[str] = None):
+        """
+        Initialize the scheduler
+
+        Parameters:
+        - rate_limits: Requests per second by endpoint group (default: KITE_RATE_LIMITS)
+        - shared_state_dir: Directory for bucket state files shared between processes
+          (None keeps the buckets in this process)
+        """
+        self.rate_limits = dict(rate_limits or KITE_RATE_LIMITS)
+        self.shared_state_dir = shared_state_dir
+        self._sequence = itertools.count()
+        self._queues: Dict[str, _EndpointQueue] = {}
+        for endpoint, rate in self.rate_limits.items():
+            if shared_state_dir:
+                bucket = SharedTokenBucket(os.path.join(shared_state_dir, f"kite_{endpoint}.json"), rate, capacity=rate)
+            else:
+                bucket = TokenBucket(rate, capacity=rate)
+            self._queues[endpoint] = _EndpointQueue(bucket)
+
+    def _get_queue(self, endpoint: str) -> _EndpointQueue:
+        return self._queues.get(endpoint) or self._queues['default']
+
+    def acquire(self, endpoint: str = 'default', priority: int = PRIORITY_DEFAULT,
+                timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a request slot of an endpoint group
+
+        Callers are served in priority order, then in arrival order.
+
+        Parameters:
+        - endpoint: Endpoint group (see KITE_RATE_LIMITS; unknown groups use 'default')
+        - priority: PRIORITY_ORDER, PRIORITY_DEFAULT or PRIORITY_POLL
+        - timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+        - bool: True if a slot was taken, False if the timeout expired
+        """
+        queue = self._get_queue(endpoint)
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        entry = (priority, next(self._sequence))
+
+        with queue.condition:
+            heapq.heappush(queue.waiters, entry)
+            queue.max_depth = max(queue.max_depth, len(queue.waiters))
+            try:
+                while True:
+                    if queue.waiters[0] == entry:
+                        if queue.bucket.try_acquire():
+                            break
+                        wait = queue.bucket.wait_time()
+                    else:
+                        # Not at the head: sleep until the head takes its token
+                        wait = None
+
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    queue.condition.wait(wait)
+            finally:
+                queue.waiters.remove(entry)
+                heapq.heapify(queue.waiters)
+                queue.condition.notify_all()
+
+            waited = time.monotonic() - started
+            queue.calls += 1
+            queue.total_wait += waited
+            queue.max_wait = max(queue.max_wait, waited)
+            if waited > 0.001:
+                queue.waited_calls += 1
+        return True
+
+    def call(self, endpoint: str, func: Callable[..., Any], *args, priority: int = PRIORITY_DEFAULT, **kwargs) -> Any:
+        """
+        Call a Kite client function once a request slot of its endpoint group is free
+
+        Parameters:
+        - endpoint: Endpoint group
+        - func: Function making the REST call
+        - priority: PRIORITY_ORDER, PRIORITY_DEFAULT or PRIORITY_POLL
+        - *args, **kwargs: Arguments of func
+
+        Returns:
+        Result of func (exceptions are re-raised; 429 responses are counted as throttled)
+        """
+        self.acquire(endpoint, priority)
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            queue = self._get_queue(endpoint)
+            with queue.condition:
+                if getattr(e, 'code', None) == 429:
+                    queue.throttled += 1
+                else:
+                    queue.errors += 1
+            if getattr(e, 'code', None) == 429:
+                logging.warning(f"Kite rate limited a '{endpoint}' request despite client-side scheduling")
+            raise
+
+    def queue_depth(self, endpoint: Optional[str] = None) -> int:
+        """Get the number of callers waiting on an endpoint group (all groups if None)"""
+        queues = [self._get_queue(endpoint)] if endpoint else self._queues.values()
+        return sum(len(queue.waiters) for queue in queues)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per endpoint group metrics
+
+        Returns:
+        Dictionary of endpoint group -> rate limit, calls, current and max queue depth,
+        calls that had to wait, mean/max wait in milliseconds, 429s and other errors
+        """
+        stats = {}
+        for endpoint, queue in self._queues.items():
+            with queue.condition:
+                stats[endpoint] = {
+                    'rate_limit': self.rate_limits[endpoint],
+                    'calls': queue.calls,
+                    'queue_depth': len(queue.waiters),
+                    'max_queue_depth': queue.max_depth,
+                    'waited_calls': queue.waited_calls,
+                    'mean_wait_ms': round(queue.total_wait / queue.calls * 1000, 3) if queue.calls else 0.0,
+                    'max_wait_ms': round(queue.max_wait * 1000, 3),
+                    'throttled': queue.throttled,
+                    'errors': queue.errors
+                }
+        return stats
+
+
+class ScheduledKiteClient:
+    """Class to route the REST methods of a KiteConnect client through a KiteRequestScheduler
+
+    Methods listed in KITE_ENDPOINTS are rate limited; every other attribute (constants,
+    set_access_token, login_url, fake-only helpers) is passed through unchanged.
+    """
+
+    def __init__(self, kite: Any, scheduler: KiteRequestScheduler):
+        """
+        Initialize the wrapper
+
+        Parameters:
+        - kite: KiteConnect client (or a fake with the same methods)
+        - scheduler: Scheduler the REST calls go through
+        """
+        self.client = kite
+        self.scheduler = scheduler
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.client, name)
+        if name not in KITE_ENDPOINTS or not callable(attribute):
+            return attribute
+
+        endpoint, priority = KITE_ENDPOINTS[name]
+
+        @functools.wraps(attribute)
+        def scheduled(*args, **kwargs):
+            return self.scheduler.call(endpoint, attribute, *args, priority=priority, **kwargs)
+
+        return scheduled
+
+    def __repr__(self) -> str:
+        return f"ScheduledKiteClient({self.client!r})"
+
+
+_shared_schedulers: Dict[Optional[str], KiteRequestScheduler] = {}
+_shared_schedulers_lock = threading.Lock()
+
+
+def get_shared_request_scheduler(shared_state_dir: Optional[str] = None) -> KiteRequestScheduler:
+    """
+    Get the process-wide request scheduler
+
+    Parameters:
+    - shared_state_dir: Directory for bucket state shared between processes (None: this process only)
+
+    Returns:
+    KiteRequestScheduler shared by every caller with the same shared_state_dir
+    """
+    key = os.path.abspath(shared_state_dir) if shared_state_dir else None
+    with _shared_schedulers_lock:
+        scheduler = _shared_schedulers.get(key)
+        if scheduler is None:
+            scheduler = KiteRequestScheduler(shared_state_dir=key)
+            _shared_schedulers[key] = scheduler
+        return scheduler
@@ -1,13 +1,33 @@
 import yaml
-from kiteconnect import KiteConnect
 import logging
 import json
 from datetime import datetime
 import os
 import signal
 import sys
+import threading
+import time
 from contextlib import contextmanager
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+from config_service import KiteCredentials, find_config_path, get_config_service
+from session_cache import SessionExpiredError, get_session_cache
+
+if TYPE_CHECKING:
+    from kiteconnect import KiteConnect
+
+class _LazyFileHandler(logging.FileHandler):
+    """File handler that creates its log directory and file on the first record
+    
+    Importing a module only sets up its logger; scripts that never log to it do not
+    touch the disk.
+    """
+    
+    def __init__(self, filename: str):
+        super().__init__(filename, delay=True)
+    
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
 
 def setup_logger(name: str, stock_id: Optional[str] = None) -> logging.Logger:
     """
@@ -29,9 +49,7 @@ def setup_logger(name: str, stock_id: Optional[str] = None) -> logging.Logger:
         
     logger.setLevel(logging.DEBUG)
     
-    # Create logs directory if it doesn't exist
     log_dir = os.path.join('workdir', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
     
     # Create filename with date and optional stock ID
     date_str = datetime.now().strftime('%Y-%m-%d')
@@ -42,8 +60,8 @@ def setup_logger(name: str, stock_id: Optional[str] = None) -> logging.Logger:
     
     log_file = os.path.join(log_dir, filename)
     
-    # Create file handler
-    file_handler = logging.FileHandler(log_file)
+    # Create file handler (the logs directory and file are created on the first record)
+    file_handler = _LazyFileHandler(log_file)
     file_handler.setLevel(logging.INFO)
     
     # Create formatter
@@ -62,46 +80,14 @@ def load_config() -> Dict[str, Any]:
     """
     Load configuration from config/config.yaml
     
+    The file is parsed once per process by the shared ConfigService (and re-parsed
+    when it changes on disk); each call returns a copy of the cached config.
+    
     Returns:
     Dictionary containing configuration
     """
     try:
-        # Try multiple possible paths for the config file
-        possible_paths = [
-            os.path.join('config', 'config.yaml'),  # Relative to current directory
-            os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'),  # Relative to this file
-            os.path.join(os.getcwd(), 'config', 'config.yaml'),  # Relative to working directory
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'config.yaml')  # Absolute path from this file
-        ]
-        
-        config_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                config_path = path
-                break
-        
-        if not config_path:
-            # If no path found, try to find it by searching from current directory
-            current_dir = os.getcwd()
-            while current_dir != os.path.dirname(current_dir):  # Stop at root directory
-                test_path = os.path.join(current_dir, 'config', 'config.yaml')
-                if os.path.exists(test_path):
-                    config_path = test_path
-                    break
-                current_dir = os.path.dirname(current_dir)
-        
-        if not config_path:
-            logger.error(f"Config file not found. Tried paths: {possible_paths}")
-            logger.error(f"Current working directory: {os.getcwd()}")
-            logger.error(f"Script location: {os.path.abspath(__file__)}")
-            raise FileNotFoundError("Config file config/config.yaml not found in any expected location")
-            
-        logger.info(f"Using config file at: {config_path}")
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            
-        return config
-        
+        return get_config_service().get_config()
     except Exception as e:
         logger.error(f"Error loading config: {e}")
         raise
@@ -131,53 +117,93 @@ def signal_handler(order_history: Optional[List[Dict[str, Any]]] = None):
         if order_history:
             write_order_history(order_history)
 
-def initialize_kite() -> KiteConnect:
-    """Initialize Kite Connect with API credentials"""
+def _print_login_instructions(login_url: str) -> None:
+    """Print the steps to get a new request token"""
+    print("\nPlease follow these steps to get a new request token:")
+    print("1. Click on this URL to login:", login_url)
+    print("2. After successful login, you'll be redirected to your redirect URL")
+    print("3. From the redirect URL, copy the request_token parameter")
+    print("4. Update the request_token in your config.yaml file")
+
+def initialize_kite(credentials: Optional[KiteCredentials] = None) -> 'KiteConnect':
+    """
+    Initialize Kite Connect with API credentials
+    
+    The client uses the process-wide keep-alive session (see http_session). A
+    configured access token is checked against the daily session cache first: a token
+    validated this trading day is used without the margins() probe, and a token found
+    expired this trading day fails at once with SessionExpiredError.
+    
+    Parameters:
+    - credentials: Kite credentials (default: from the shared ConfigService)
+    
+    Returns:
+    Connected KiteConnect instance
+    
+    Raises:
+    - SessionExpiredError: If the access token is expired and no request token is set
+    """
+    # Imported here: the kiteconnect package loads its websocket stack (twisted,
+    # autobahn) on import, which scripts that never connect should not pay for
+    from kiteconnect import KiteConnect
+    from http_session import get_shared_session
+    
     try:
-        # Load configuration
-        config = load_config()
-        config = config['kite_connect']
-        # print(config)
+        # Load credentials (config.yaml is parsed once per process)
+        if credentials is None:
+            credentials = get_config_service().get_kite_credentials()
+        api_key = credentials.api_key
+        session_cache = get_session_cache()
 
-        # Initialize Kite Connect
-        kite = KiteConnect(api_key=config['api_key'])
+        # Initialize Kite Connect on the shared keep-alive session
+        kite = KiteConnect(api_key=api_key)
+        kite.reqsession = get_shared_session("kite")
         
         # Set access token if available
-        if config.get('access_token'):
-            kite.set_access_token(config['access_token'])
-            try:
-                # Test the connection
-                kite.margins()
-                print("Successfully connected to Kite!")
+        access_token = credentials.access_token
+        if access_token:
+            kite.set_access_token(access_token)
+            kite.set_session_expiry_hook(
+                lambda: session_cache.record_expired("kite", api_key, access_token, "Kite session expired"))
+            
+            if session_cache.is_valid("kite", api_key, access_token):
+                logger.info("Access token already validated this trading day, skipping check")
                 return kite
-            except Exception as e:
-                if "Invalid access token" in str(e) or 'Incorrect `api_key` or `access_token`' in str(e):
-                    logger.error("Access token expired. Getting new token...")
-                    login_url = kite.login_url()
-                    print("\nPlease follow these steps to get a new request token:")
-                    print("1. Click on this URL to login:", login_url)
-                    print("2. After successful login, you'll be redirected to your redirect URL")
-                    print("3. From the redirect URL, copy the request_token parameter")
-                    print("4. Update the request_token in your config.yaml file")
-                    # raise Exception("Please update your request_token in config.yaml")
-                    sys.exit(1)
-                else:
-                    raise
+            
+            expired_error = None
+            if session_cache.is_expired("kite", api_key, access_token):
+                expired_error = "Access token was already found expired this trading day"
+            else:
+                try:
+                    # Test the connection
+                    kite.margins()
+                    session_cache.record_valid("kite", api_key, access_token)
+                    print("Successfully connected to Kite!")
+                    return kite
+                except Exception as e:
+                    if "Invalid access token" in str(e) or 'Incorrect `api_key` or `access_token`' in str(e):
+                        session_cache.record_expired("kite", api_key, access_token, str(e))
+                        expired_error = f"Access token expired: {e}"
+                    else:
+                        raise
+            
+            # A request token can still renew the session below
+            if not credentials.request_token:
+                login_url = kite.login_url()
+                _print_login_instructions(login_url)
+                raise SessionExpiredError("kite", expired_error, login_url)
+            logger.warning(f"{expired_error}. Generating a new session from the request token...")
         
         # If no access token or token expired, get new token
-        if not config.get('request_token'):
+        if not credentials.request_token:
             login_url = kite.login_url()
-            print("\nPlease follow these steps to get a new request token:")
-            print("1. Click on this URL to login:", login_url)
-            print("2. After successful login, you'll be redirected to your redirect URL")
-            print("3. From the redirect URL, copy the request_token parameter")
-            print("4. Update the request_token in your config.yaml file")
+            _print_login_instructions(login_url)
             print("\nExample redirect URL format:")
             print("https://your-redirect-url/?request_token=YOUR_REQUEST_TOKEN&action=login&status=success")
             raise Exception("Please update your request_token in config.yaml")
         
         # Generate session
-        data = kite.generate_session(config['request_token'], api_secret=config['api_secret'])
+        data = kite.generate_session(credentials.request_token, api_secret=credentials.api_secret)
         print("Generated session data:", data)
         access_token = data["access_token"]
         
@@ -186,6 +212,9 @@ def initialize_kite() -> KiteConnect:
         
         # Set access token
         kite.set_access_token(access_token)
+        kite.set_session_expiry_hook(
+            lambda: session_cache.record_expired("kite", api_key, access_token, "Kite session expired"))
+        session_cache.record_valid("kite", api_key, access_token)
         print("Successfully connected to Kite!")
         return kite
         
@@ -193,7 +222,7 @@ def initialize_kite() -> KiteConnect:
         logger.error(f"Error initializing Kite Connect: {e}")
         raise
 
-def get_login_url(kite: KiteConnect) -> str:
+def get_login_url(kite: 'KiteConnect') -> str:
     """
     Get the login URL for Kite Connect
     
@@ -205,32 +234,144 @@ def get_login_url(kite: KiteConnect) -> str:
     """
     try:
         login_url = kite.login_url()
-        print("\nPlease follow these steps to get a new request token:")
-        print("1. Click on this URL to login:", login_url)
-        print("2. After successful login, you'll be redirected to your redirect URL")
-        print("3. From the redirect URL, copy the request_token parameter")
-        print("4. Update the request_token in your config.yaml file")
+        _print_login_instructions(login_url)
         return login_url
     except Exception as e:
         logger.error(f"Error getting login URL: {e}")
         raise
 
-def get_instrument_token(kite: KiteConnect, trading_symbol: str, exchange: str = "NSE") -> int:
-    """Get instrument token for a given trading symbol"""
+# Process-wide instrument token cache: {exchange: {tradingsymbol: instrument_token}}
+INSTRUMENTS_FILE = "instruments.csv"
+# Minimum seconds between reloads of an exchange's list for a symbol that was not found
+INSTRUMENT_TOKEN_RELOAD_SECONDS = 300.0
+_instrument_token_cache: Dict[str, Dict[str, int]] = {}
+_instrument_token_cache_date = None
+_instrument_token_cache_lock = threading.Lock()
+# Exchange -> event set when the load in flight finishes (one download per exchange at a time)
+_instrument_token_loads: Dict[str, threading.Event] = {}
+_instrument_token_reloaded_at: Dict[str, float] = {}
+
+def _load_exchange_tokens(kite: 'KiteConnect', exchange: str, download: bool = False) -> Dict[str, int]:
+    """
+    Build the tradingsymbol -> instrument token map for an exchange
+    
+    Uses today's instruments.csv when available, otherwise downloads the
+    exchange instrument dump once.
+    
+    Parameters:
+    - kite: KiteConnect instance
+    - exchange: Exchange name (e.g., "NSE")
+    - download: Skip instruments.csv and download the current list
+    
+    Returns:
+    Dictionary of trading symbol to instrument token
+    """
+    if not download and os.path.exists(INSTRUMENTS_FILE):
+        mod_date = datetime.fromtimestamp(os.path.getmtime(INSTRUMENTS_FILE)).date()
+        if mod_date == datetime.now().date():
+            try:
+                from instrument_master import get_shared_instrument_master
+                records = get_shared_instrument_master(INSTRUMENTS_FILE).get_exchange_instruments(exchange)
+                if records:
+                    logger.info(f"Loaded {len(records)} {exchange} instrument tokens from {INSTRUMENTS_FILE}")
+                    return {record['tradingsymbol']: record['instrument_token'] for record in records}
+            except Exception as e:
+                logger.warning(f"Could not load instrument tokens from {INSTRUMENTS_FILE}: {e}")
+    
+    logger.info(f"Downloading {exchange} instrument list for token cache")
+    tokens = {}
+    for instrument in kite.instruments(exchange):
+        tokens.setdefault(instrument['tradingsymbol'], instrument['instrument_token'])
+    return tokens
+
+def _get_exchange_tokens(kite: 'KiteConnect', exchange: str, reload: bool = False) -> Dict[str, int]:
+    """
+    Get the cached token map of an exchange, loading it if needed
+    
+    The load runs outside the cache lock, so lookups on other exchanges are not held up
+    by a download. Only one thread loads an exchange at a time; the others wait for its
+    result (and retry the load if it failed).
+    
+    Parameters:
+    - kite: KiteConnect instance
+    - exchange: Exchange name (e.g., "NSE")
+    - reload: Download the list again even if it is cached
+    
+    Returns:
+    Dictionary of trading symbol to instrument token
+    """
+    global _instrument_token_cache_date
+    while True:
+        with _instrument_token_cache_lock:
+            today = datetime.now().date()
+            if _instrument_token_cache_date != today:
+                _instrument_token_cache.clear()
+                _instrument_token_cache_date = today
+            
+            tokens = _instrument_token_cache.get(exchange)
+            if tokens is not None and not reload:
+                return tokens
+            loading = _instrument_token_loads.get(exchange)
+            if loading is None:
+                loading = threading.Event()
+                _instrument_token_loads[exchange] = loading
+                break
+        # Another thread is loading this exchange; its result serves this lookup too
+        loading.wait()
+        reload = False
+    
+    tokens = None
+    try:
+        tokens = _load_exchange_tokens(kite, exchange, download=reload)
+    finally:
+        with _instrument_token_cache_lock:
+            if tokens is not None:
+                _instrument_token_cache[exchange] = tokens
+            del _instrument_token_loads[exchange]
+        loading.set()
+    return tokens
+
+def _claim_instrument_token_reload(exchange: str) -> bool:
+    """Allow one reload of an exchange's list per INSTRUMENT_TOKEN_RELOAD_SECONDS"""
+    with _instrument_token_cache_lock:
+        now = time.monotonic()
+        reloaded_at = _instrument_token_reloaded_at.get(exchange)
+        if reloaded_at is not None and now - reloaded_at < INSTRUMENT_TOKEN_RELOAD_SECONDS:
+            return False
+        _instrument_token_reloaded_at[exchange] = now
+        return True
+
+def get_instrument_token(kite: 'KiteConnect', trading_symbol: str, exchange: str = "NSE") -> int:
+    """
+    Get instrument token for a given trading symbol (cached per exchange for the trading day)
+    
+    A symbol missing from the cached list (e.g. listed after the list was loaded)
+    triggers a download of the current list, at most once per
+    INSTRUMENT_TOKEN_RELOAD_SECONDS for each exchange.
+    """
     try:
-        # Get all instruments
-        instruments = kite.instruments(exchange)
-        
-        # Find the instrument
-        for instrument in instruments:
-            if instrument['tradingsymbol'] == trading_symbol:
-                return instrument['instrument_token']
-        
-        raise Exception(f"Trading symbol {trading_symbol} not found in {exchange}")
+        tokens = _get_exchange_tokens(kite, exchange)
+        instrument_token = tokens.get(trading_symbol)
+        if instrument_token is None and _claim_instrument_token_reload(exchange):
+            logger.info(f"{trading_symbol} not in cached {exchange} tokens, reloading the instrument list")
+            tokens = _get_exchange_tokens(kite, exchange, reload=True)
+            instrument_token = tokens.get(trading_symbol)
+        
+        if instrument_token is None:
+            raise Exception(f"Trading symbol {trading_symbol} not found in {exchange}")
+        return instrument_token
     except Exception as e:
         logger.error(f"Error getting instrument token: {e}")
         raise
 
+def clear_instrument_token_cache() -> None:
+    """Drop cached instrument tokens so the next lookup reloads them"""
+    global _instrument_token_cache_date
+    with _instrument_token_cache_lock:
+        _instrument_token_cache.clear()
+        _instrument_token_reloaded_at.clear()
+        _instrument_token_cache_date = None
+
 def find_latest_order_file() -> Optional[str]:
     """Find the most recent order history file in the workdir"""
     try:
@@ -288,7 +429,7 @@ def write_order_history(order_history: List[Dict[str, Any]]) -> None:
         logger.error(f"Error writing order history: {e}")
         raise
 
-def get_live_data(kite: KiteConnect, trading_symbol: str, exchange: str = "NSE") -> Dict[str, Any]:
+def get_live_data(kite: 'KiteConnect', trading_symbol: str, exchange: str = "NSE") -> Dict[str, Any]:
     """
     Get live market data for a given stock
     
@@ -353,7 +494,7 @@ def get_live_data(kite: KiteConnect, trading_symbol: str, exchange: str = "NSE")
         logger.error(f"Error getting live data for {trading_symbol}: {e}")
         raise
 
-def get_multiple_live_data(kite: KiteConnect, trading_symbols: List[str], exchange: str = "NSE") -> Dict[str, Dict[str, Any]]:
+def get_multiple_live_data(kite: 'KiteConnect', trading_symbols: List[str], exchange: str = "NSE") -> Dict[str, Dict[str, Any]]:
     """
     Get live market data for multiple stocks
     
@@ -422,32 +563,7 @@ def update_access_token(access_token: str) -> None:
         access_token: New access token to save
     """
     try:
-        # Use the same path resolution logic as load_config
-        possible_paths = [
-            os.path.join('config', 'config.yaml'),  # Relative to current directory
-            os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'),  # Relative to this file
-            os.path.join(os.getcwd(), 'config', 'config.yaml'),  # Relative to working directory
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'config.yaml')  # Absolute path from this file
-        ]
-        
-        config_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                config_path = path
-                break
-        
-        if not config_path:
-            # If no path found, try to find it by searching from current directory
-            current_dir = os.getcwd()
-            while current_dir != os.path.dirname(current_dir):  # Stop at root directory
-                test_path = os.path.join(current_dir, 'config', 'config.yaml')
-                if os.path.exists(test_path):
-                    config_path = test_path
-                    break
-                current_dir = os.path.dirname(current_dir)
-        
-        if not config_path:
-            raise FileNotFoundError("Config file config/config.yaml not found in any expected location")
+        config_path = find_config_path()
         
         # Read existing config file
         with open(config_path, 'r') as f:
@@ -461,6 +577,7 @@ def update_access_token(access_token: str) -> None:
         # Save updated config while preserving other sections
         with open(config_path, 'w') as f:
             yaml.dump(existing_config, f, default_flow_style=False)
+        get_config_service().reload()
             
         print(f"Access token updated in {config_path}")
         
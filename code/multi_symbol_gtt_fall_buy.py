@@ -0,0 +1,425 @@
+"""
+Multi-Symbol GTT Fall Buy
+
+Runs the GTT fall buy strategy for several stocks in a single process instead of one
+copy of gtt_fall_buy.py per stock. All symbols share:
+- one Breeze session and websocket, with one feed subscription per stock token;
+- one Kite session, whose GTT order book is polled once per monitoring cycle and
+  fanned out to the symbols by tradingsymbol (a symbol whose own GTT writes in the
+  cycle invalidated the book reads it again before refilling its ladder);
+- one instrument master (loaded once by gtt_fall_buy.get_tick_size_for_stock).
+
+Each symbol keeps its own SymbolState (history, latest price, logger).
+
+With an order update source (KiteTicker order updates or Kite postbacks, see
+order_updates), fills are applied to the history as they happen and the GTT poll
+only runs as a low-frequency reconciliation.
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from kite_utils import setup_logger
+from breeze_sdk_api import BreezeApi
+from kite_connect_api import KiteConnectAPI
+from tick_dispatcher import TickDispatcher
+from order_updates import OrderUpdateListener, KiteTickerOrderSource
+from gtt_fall_buy import (
+    is_market_hours,
+    load_gtt_history,
+    get_current_price,
+    get_active_buy_orders,
+    place_buy_ladder,
+    refill_buy_ladder,
+    handle_tick_data,
+    apply_order_update,
+    detect_and_update_triggered_orders_from_history,
+    manage_sell_orders_based_on_history
+)
+
+
+class SymbolState:
+    """Class to hold the per-symbol state of the fall buy strategy"""
+
+    def __init__(self, company_name: str, stock_exchange: str = "NSE", num_orders: int = 5):
+        """
+        Initialize the state of one symbol
+
+        Parameters:
+        - company_name: Name of the company (e.g., "ONGC")
+        - stock_exchange: Stock exchange (default: "NSE")
+        - num_orders: Number of active buy GTT orders to maintain
+        """
+        self.company_name = company_name.upper()
+        self.stock_exchange = stock_exchange
+        self.num_orders = num_orders
+        self.logger = setup_logger(f"{__name__}.{self.company_name}", self.company_name)
+        self.gtt_orders: List[Dict[str, Any]] = []
+        self.stock_token: Optional[str] = None
+        self.last_price: Optional[float] = None
+        self.last_tick_time: Optional[float] = None
+        # Serializes tick handling and monitoring cycles for this symbol
+        self.lock = threading.Lock()
+
+    def update_price(self, price: float) -> None:
+        """Record the latest traded price from the tick feed"""
+        self.last_price = price
+        self.last_tick_time = time.monotonic()
+
+    def get_fresh_price(self, max_age_seconds: float) -> Optional[float]:
+        """
+        Get the latest tick price if it is recent enough
+
+        Parameters:
+        - max_age_seconds: Maximum age of the tick price
+
+        Returns:
+        - float: Latest price or None if there is no recent tick
+        """
+        if self.last_tick_time is None or time.monotonic() - self.last_tick_time > max_age_seconds:
+            return None
+        return self.last_price
+
+
+class MultiSymbolGTTFallBuy:
+    """Class to run the GTT fall buy strategy for several symbols in one process"""
+
+    def __init__(self, company_names: List[str], stock_exchange: str = "NSE", num_orders: int = 5,
+                 cycle_seconds: float = 120, gtt_cache_max_age: float = 30.0,
+                 order_update_source=None, reconcile_seconds: float = 900):
+        """
+        Initialize the multi-symbol runner
+
+        Parameters:
+        - company_names: Names of the companies to trade
+        - stock_exchange: Stock exchange (default: "NSE")
+        - num_orders: Number of active buy GTT orders to maintain per symbol
+        - cycle_seconds: Seconds between monitoring cycles when polling for fills
+        - gtt_cache_max_age: Seconds the shared GTT order book poll is reused for
+        - order_update_source: Order update source (see order_updates), or "kite_ticker" to
+          use the KiteTicker of the shared Kite session; None keeps polling for fills
+        - reconcile_seconds: Seconds between reconciliation polls when an order update source is used
+        """
+        self.stock_exchange = stock_exchange
+        self.order_update_source = order_update_source
+        self.order_updates: Optional[OrderUpdateListener] = None
+        if order_update_source is not None:
+            # Fills arrive as events, so the poll only reconciles missed updates
+            cycle_seconds = max(cycle_seconds, reconcile_seconds)
+        self.cycle_seconds = cycle_seconds
+        self.gtt_cache_max_age = gtt_cache_max_age
+        self.logger = setup_logger(__name__)
+        self.states: Dict[str, SymbolState] = {}
+        for company_name in company_names:
+            state = SymbolState(company_name, stock_exchange, num_orders)
+            self.states[state.company_name] = state
+        self.states_by_token: Dict[str, SymbolState] = {}
+        self.breeze_api: Optional[BreezeApi] = None
+        self.kite_api: Optional[KiteConnectAPI] = None
+        # Socket ticks are coalesced per token and handled on one worker thread per symbol
+        self.tick_dispatcher = TickDispatcher(self.on_tick, name="multi-symbol")
+        self.stop_event = threading.Event()
+        self.max_market_closed_cycles = max(1, int(3600 / cycle_seconds))  # 1 hour of market closed
+
+    def connect(self) -> None:
+        """Create the shared Breeze and Kite sessions"""
+        # The sessions are created for the first symbol; every GTT call passes its own symbol
+        first_symbol = next(iter(self.states))
+        self.breeze_api = BreezeApi(symbol=first_symbol)
+        self.breeze_api.start_api()
+        self.logger.info("Successfully initialized shared Breeze API")
+
+        # Every symbol's triggered-order check reads the GTT book through this cache,
+        # so a single poll per cycle serves all symbols until one of them writes a GTT
+        self.kite_api = KiteConnectAPI(trading_symbol=first_symbol, gtt_cache_max_age=self.gtt_cache_max_age)
+        self.kite_api.connect()
+        self.logger.info("Successfully initialized shared Kite API")
+
+        if self.order_update_source is not None:
+            source = self.order_update_source
+            if source == "kite_ticker":
+                source = KiteTickerOrderSource.from_kite(self.kite_api.kite)
+            self.order_updates = OrderUpdateListener(source)
+            self.order_updates.add_handler(self.on_order_update)
+
+    def poll_gtt_book(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the GTT order book once and group it by tradingsymbol
+
+        Returns:
+        - Dictionary of tradingsymbol to that symbol's GTT orders
+        """
+        book = {company_name: [] for company_name in self.states}
+        try:
+            gtt_orders = self.kite_api.get_gtt_orders(max_age_seconds=0)
+        except Exception as e:
+            self.logger.error(f"Error polling GTT order book: {e}")
+            return book
+
+        for order in gtt_orders:
+            trading_symbol = order.get('condition', {}).get('tradingsymbol', '').upper()
+            if trading_symbol in book:
+                book[trading_symbol].append(order)
+        self.logger.info(f"Polled {len(gtt_orders)} GTT orders for {len(self.states)} symbols")
+        return book
+
+    def get_price(self, state: SymbolState) -> Optional[float]:
+        """Get the symbol's price from the tick feed, falling back to a quote"""
+        price = state.get_fresh_price(self.cycle_seconds)
+        if price is None:
+            price = get_current_price(self.breeze_api, state.company_name)
+        return price
+
+    def initialize_symbol(self, state: SymbolState, symbol_book: List[Dict[str, Any]]) -> None:
+        """
+        Load the symbol's history and place its initial buy ladder if needed
+
+        Parameters:
+        - state: Symbol state
+        - symbol_book: The symbol's orders from the shared GTT poll
+        """
+        logger = state.logger
+        state.gtt_orders = load_gtt_history(state.company_name, logger)
+        active_buy_orders = get_active_buy_orders(symbol_book, state.company_name)
+        logger.info(f"{state.company_name}: {len(state.gtt_orders)} orders in history, "
+                    f"{len(active_buy_orders)} active buy orders in Kite")
+
+        if len(active_buy_orders) >= state.num_orders:
+            logger.info(f"Already have {len(active_buy_orders)} active buy orders. No need to place new orders.")
+            return
+
+        current_price = self.get_price(state)
+        if not current_price:
+            logger.error(f"Could not get current price for {state.company_name}. Skipping initial ladder.")
+            return
+
+        if active_buy_orders:
+            previous_order_price = min(order.get('orders', [{}])[0].get('price', current_price)
+                                       for order in active_buy_orders)
+            logger.info(f"Continuing fall buy strategy from existing order price: {previous_order_price}")
+        else:
+            previous_order_price = current_price
+            logger.info(f"Starting fresh fall buy strategy from current price: {previous_order_price}")
+
+        new_gtt_orders = place_buy_ladder(
+            self.kite_api, state.company_name, state.stock_exchange,
+            state.num_orders - len(active_buy_orders), previous_order_price, current_price,
+            len(active_buy_orders), active_buy_orders, state.gtt_orders, logger
+        )
+        # place_buy_ladder already saved the history with the new orders
+        state.gtt_orders.extend(new_gtt_orders)
+        logger.info(f"Placed {len(new_gtt_orders)} initial GTT orders for {state.company_name}")
+
+    def subscribe_ticks(self) -> None:
+        """Connect the shared websocket once and subscribe every symbol's token"""
+        self.breeze_api.connect_socket()
+        self.breeze_api.set_on_ticks(self.tick_dispatcher.submit)
+
+        for state in self.states.values():
+            try:
+                state.stock_token = self.breeze_api.get_icici_token_name(state.company_name)
+                self.states_by_token[state.stock_token] = state
+                self.breeze_api.subscribe_feed_token(state.stock_token)
+                self.logger.info(f"Subscribed to real-time feed for {state.company_name} ({state.stock_token})")
+            except Exception as e:
+                self.logger.error(f"Could not subscribe to feed for {state.company_name}: {e}")
+
+    def on_tick(self, tick_data: Dict[str, Any]) -> None:
+        """
+        Handle the latest tick of a symbol (called on the symbol's dispatcher worker)
+
+        Parameters:
+        - tick_data: Real-time tick data from Breeze API
+        """
+        state = self.states_by_token.get(tick_data.get('symbol'))
+        if state is None:
+            return
+
+        price = tick_data.get('last')
+        if price:
+            state.update_price(float(price))
+
+        # Ticks arriving while a monitoring cycle holds the lock coalesce in the dispatcher
+        with state.lock:
+            handle_tick_data(tick_data, self.kite_api, self.breeze_api, state.company_name,
+                             state.stock_exchange, state.gtt_orders, state.logger)
+
+    def on_order_update(self, event: Dict[str, Any]) -> None:
+        """
+        Apply an order update to its symbol and react to executed orders immediately
+
+        Parameters:
+        - event: Normalized order update event
+        """
+        state = self.states.get(event.get('tradingsymbol'))
+        if state is None:
+            return
+
+        with state.lock:
+            order = apply_order_update(state.company_name, state.gtt_orders, event, state.logger, self.kite_api)
+            if order is None or event['status'] != 'COMPLETE':
+                return
+
+            # A triggered GTT left the order book; do not reuse the cached snapshot
+            self.kite_api.gtt_cache.invalidate()
+            if event.get('transaction_type') != 'BUY':
+                return
+
+            current_price = state.last_price or event.get('average_price') or event.get('price')
+            manage_sell_orders_based_on_history(
+                self.kite_api, state.company_name, state.stock_exchange, state.gtt_orders, current_price, state.logger
+            )
+            active_buy_orders = get_active_buy_orders(self.kite_api.get_gtt_orders(), state.company_name)
+            refill_buy_ladder(self.kite_api, state.company_name, state.stock_exchange, state.gtt_orders,
+                              active_buy_orders, current_price, state.logger, target_active_orders=state.num_orders)
+
+    def process_symbol(self, state: SymbolState, symbol_book: List[Dict[str, Any]], is_market_open: bool) -> None:
+        """
+        Run one monitoring cycle for a symbol
+
+        Parameters:
+        - state: Symbol state
+        - symbol_book: The symbol's orders from the shared GTT poll, re-read if this cycle writes a GTT
+        - is_market_open: Whether the market is currently open
+        """
+        logger = state.logger
+        current_price = self.get_price(state)
+        if not current_price:
+            logger.warning(f"Could not get current price for {state.company_name}. Skipping this cycle.")
+            return
+        book_generation = self.kite_api.gtt_cache.generation
+
+        updated_orders, triggered_detected, total_shares, avg_price = detect_and_update_triggered_orders_from_history(
+            self.kite_api, state.company_name, state.stock_exchange, state.gtt_orders, logger
+        )
+        state.gtt_orders[:] = updated_orders
+
+        if triggered_detected or (total_shares > 0 and is_market_open):
+            manage_sell_orders_based_on_history(
+                self.kite_api, state.company_name, state.stock_exchange, state.gtt_orders, current_price, logger
+            )
+
+        if self.kite_api.gtt_cache.generation != book_generation:
+            # Placing or modifying the sell GTT invalidated the polled book; read it again
+            symbol_book = self.kite_api.get_gtt_orders()
+        active_buy_orders = get_active_buy_orders(symbol_book, state.company_name)
+        logger.info(f"Active buy orders for {state.company_name}: {len(active_buy_orders)}")
+        refill_buy_ladder(self.kite_api, state.company_name, state.stock_exchange, state.gtt_orders,
+                          active_buy_orders, current_price, logger, target_active_orders=state.num_orders)
+
+    def run_cycle(self) -> None:
+        """Poll the GTT order book once and run the monitoring cycle of every symbol"""
+        is_market_open = is_market_hours()
+        book = self.poll_gtt_book()
+        for company_name, state in self.states.items():
+            with state.lock:
+                try:
+                    self.process_symbol(state, book[company_name], is_market_open)
+                except Exception as e:
+                    state.logger.error(f"Error in monitoring cycle for {company_name}: {e}\n{traceback.format_exc()}")
+        self.logger.info(f"GTT book cache stats: {self.kite_api.get_gtt_cache_stats()}")
+        self.logger.info(f"Tick dispatcher metrics: {self.tick_dispatcher.get_metrics()}")
+        if self.order_updates:
+            self.logger.info(f"Order update stats: {self.order_updates.get_stats()}")
+
+    def run(self) -> None:
+        """Start the shared sessions, initialize every symbol and monitor until stopped"""
+        self.connect()
+
+        book = self.poll_gtt_book()
+        for company_name, state in self.states.items():
+            with state.lock:
+                try:
+                    self.initialize_symbol(state, book[company_name])
+                except Exception as e:
+                    state.logger.error(f"Error initializing {company_name}: {e}\n{traceback.format_exc()}")
+
+        try:
+            self.subscribe_ticks()
+        except Exception as e:
+            self.logger.warning(f"Could not set up tick data monitoring: {e}")
+            self.logger.info(f"Continuing with {self.cycle_seconds}s quote-based monitoring only")
+
+        if self.order_updates:
+            try:
+                self.order_updates.start()
+                self.logger.info(f"Order updates are event-driven; reconciling every {self.cycle_seconds}s")
+            except Exception as e:
+                self.logger.error(f"Could not start order update source: {e}")
+
+        consecutive_market_closed_cycles = 0
+        while not self.stop_event.is_set():
+            self.logger.info(f"=== Multi-symbol monitoring cycle ({datetime.now().isoformat()}) ===")
+            if is_market_hours():
+                consecutive_market_closed_cycles = 0
+            else:
+                consecutive_market_closed_cycles += 1
+                if consecutive_market_closed_cycles >= self.max_market_closed_cycles:
+                    self.logger.info("Market has been closed for 1 hour. Stopping monitoring.")
+                    break
+
+            try:
+                self.run_cycle()
+            except Exception as e:
+                self.logger.error(f"Error in monitoring cycle: {e}\n{traceback.format_exc()}")
+            self.stop_event.wait(self.cycle_seconds)
+
+        self.stop()
+
+    def stop(self) -> None:
+        """Stop monitoring, the tick workers and the shared websocket"""
+        self.stop_event.set()
+        self.tick_dispatcher.stop()
+        if self.order_updates:
+            self.order_updates.stop()
+        try:
+            if self.breeze_api and hasattr(self.breeze_api, 'breeze') and hasattr(self.breeze_api.breeze, 'sio'):
+                if self.breeze_api.breeze.sio.connected:
+                    self.breeze_api.disconnect_socket()
+                    self.logger.info("WebSocket connection closed")
+        except Exception as e:
+            self.logger.warning(f"Error during WebSocket cleanup: {e}")
+
+
+def main(company_names: List[str], stock_exchange: str = "NSE", num_orders: int = 5,
+         order_update_source=None):
+    """
+    Main function to run the GTT fall buy strategy for several companies
+
+    Parameters:
+    - company_names: Names of the companies (e.g., ["ONGC", "ITC"])
+    - stock_exchange: Stock exchange (default: "NSE")
+    - num_orders: Number of active buy GTT orders to maintain per company
+    - order_update_source: Order update source or "kite_ticker" (None polls for fills)
+    """
+    runner = MultiSymbolGTTFallBuy(company_names, stock_exchange, num_orders,
+                                   order_update_source=order_update_source)
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        logging.info("Program terminated by user")
+        runner.stop()
+        sys.exit(0)
+    except Exception as e:
+        logging.error(f"Unexpected error: {e}\n{traceback.format_exc()}")
+        runner.stop()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # Hardcoded values for direct execution
+    COMPANY_NAMES = ["ITC", "JIOFIN", "NTPC", "ONGC", "POWERGRID", "TATASTEEL", "WIPRO"]
+    STOCK_EXCHANGE = "NSE"
+    N = 5  # Number of active GTT buy orders to maintain per company
+    ORDER_UPDATE_SOURCE = "kite_ticker"  # Set to None to detect fills by polling only
+
+    print(f"Starting multi-symbol GTT Fall Buy strategy:")
+    print(f"  Companies: {', '.join(COMPANY_NAMES)}")
+    print(f"  Exchange: {STOCK_EXCHANGE}")
+    print(f"  Number of orders per company: {N}")
+    print("-" * 50)
+
+    main(COMPANY_NAMES, STOCK_EXCHANGE, N, ORDER_UPDATE_SOURCE)
@@ -48,7 +48,9 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from kite_connect_api import KiteConnectAPI
-from kite_utils import setup_logger, load_config
+from kite_utils import setup_logger
+from config_service import get_config_service
+from tick_math import get_symbol_tick_grid
 
 
 def convex_accumulation_plan(
@@ -146,8 +148,7 @@ class HybridOrderScheduler:
 
         # Load configuration and set parameters
         try:
-            config = load_config()
-            strategy_config = config.get('stratergy', {})  # Note: keeping typo for compatibility
+            strategy_config = get_config_service().get_strategy_params()
             
             # If steps is 0 or None, load from config
             if not steps:
@@ -216,7 +217,7 @@ class HybridOrderScheduler:
         
         # Test config loading first
         try:
-            load_config()
+            get_config_service().get_kite_credentials()
             self.logger.info("Configuration loaded successfully")
         except Exception as e:
             self.logger.error(f"Failed to load configuration: {e}")
@@ -225,6 +226,9 @@ class HybridOrderScheduler:
         
         # Initialize Kite Connect API
         self.kite_api = KiteConnectAPI(self.company_symbol)
+        
+        # Order and trigger prices are rounded to the instrument's tick grid
+        self.tick_grid = get_symbol_tick_grid(self.company_symbol, current_price)
         self.gtt_orders = []
         
     def connect_to_kite(self) -> None:
@@ -315,16 +319,16 @@ class HybridOrderScheduler:
                     # Subsequent orders: GTT orders with convex spacing
                     order_type = 'GTT'
                     order_type_display = 'GTT ORDER'
-                    order_price = plan_item['trigger_price']
-                    trigger_price = round(order_price * 0.999, 1)  # 0.1% below order price
+                    order_price = self.tick_grid.round(plan_item['trigger_price'])
+                    trigger_price = self.tick_grid.round(order_price * 0.999)  # 0.1% below order price
                 
                 quantity = plan_item['shares_to_buy']
                 total_value = round(order_price * quantity, 1)
                 
                 order_details = {
                     'order_number': i + 1,
-                    'order_price': round(order_price, 1),
-                    'trigger_price': round(trigger_price, 1) if trigger_price else None,
+                    'order_price': order_price,
+                    'trigger_price': trigger_price,
                     'quantity': quantity,
                     'total_value': total_value,
                     'order_type': order_type,
@@ -355,7 +359,7 @@ class HybridOrderScheduler:
                     # First order: SKIPPED when market is closed
                     order_details = {
                         'order_number': i + 1,
-                        'order_price': round(base_price, 1),
+                        'order_price': self.tick_grid.round(base_price),
                         'trigger_price': None,
                         'quantity': plan_item['shares_to_buy'],
                         'total_value': round(base_price * plan_item['shares_to_buy'], 1),
@@ -368,15 +372,15 @@ class HybridOrderScheduler:
                     self.logger.info(f"Order {i+1}: SKIPPED (Market closed - AMO not supported)")
                 else:
                     # Subsequent orders: GTT orders with convex spacing
-                    order_price = plan_item['trigger_price']
-                    trigger_price = round(order_price * 0.999, 1)  # 0.1% below order price
+                    order_price = self.tick_grid.round(plan_item['trigger_price'])
+                    trigger_price = self.tick_grid.round(order_price * 0.999)  # 0.1% below order price
                     quantity = plan_item['shares_to_buy']
                     total_value = round(order_price * quantity, 1)
                     
                     order_details = {
                         'order_number': i + 1,
-                        'order_price': round(order_price, 1),
-                        'trigger_price': round(trigger_price, 1),
+                        'order_price': order_price,
+                        'trigger_price': trigger_price,
                         'quantity': quantity,
                         'total_value': total_value,
                         'order_type': 'GTT',
@@ -399,6 +403,9 @@ class HybridOrderScheduler:
         """
         Place all orders (first as market order, subsequent as GTT orders)
         
+        The GTT orders are sent together with KiteConnectAPI.place_gtt_batch, so the
+        ladder goes out in about one round-trip instead of one per order.
+        
         Parameters:
         - orders: List of order details
         
@@ -406,6 +413,8 @@ class HybridOrderScheduler:
         List of placed orders with order IDs or trigger IDs
         """
         placed_orders = []
+        gtt_specs = []
+        gtt_positions = []
         
         for order in orders:
             try:
@@ -450,32 +459,18 @@ class HybridOrderScheduler:
                     self.logger.info(f"MARKET order {order['order_number']} placed successfully with order ID: {order_id}")
                     
                 else:
-                    # Subsequent orders: Place as GTT orders
-                    self.logger.info(f"Placing GTT order {order['order_number']} for {self.company_symbol}")
-                    
-                    # Place GTT order
-                    trigger_id = self.kite_api.place_gtt_order(
-                        trading_symbol=self.company_symbol,
-                        exchange="NSE",
-                        transaction_type="BUY",
-                        quantity=order['quantity'],
-                        price=order['order_price'],
-                        trigger_price=order['trigger_price'],
-                        order_type="LIMIT",
-                        validity="DAY"
-                    )
-                    
-                    # Store order details with trigger ID
-                    placed_order = {
-                        **order,
-                        'order_id': None,
-                        'trigger_id': trigger_id,
-                        'status': 'PLACED',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    placed_orders.append(placed_order)
-                    self.logger.info(f"GTT order {order['order_number']} placed successfully with trigger ID: {trigger_id}")
+                    # Subsequent orders: GTT orders, placed together as one batch below
+                    gtt_specs.append({
+                        'trading_symbol': self.company_symbol,
+                        'exchange': "NSE",
+                        'transaction_type': "BUY",
+                        'quantity': order['quantity'],
+                        'price': order['order_price'],
+                        'trigger_price': order['trigger_price'],
+                        'idempotency_key': f"{self.company_symbol}:BUY:{order['order_number']}"
+                    })
+                    gtt_positions.append(len(placed_orders))
+                    placed_orders.append(order)
                 
             except Exception as e:
                 error_msg = str(e)
@@ -494,6 +489,35 @@ class HybridOrderScheduler:
                 }
                 placed_orders.append(failed_order)
         
+        if gtt_specs:
+            self.logger.info(f"Placing {len(gtt_specs)} GTT orders for {self.company_symbol} as one batch")
+            results = self.kite_api.place_gtt_batch(gtt_specs)
+            
+            for position, result in zip(gtt_positions, results):
+                order = placed_orders[position]
+                if result['status'] == 'FAILED':
+                    self.logger.error(f"Failed to place order {order['order_number']} (GTT): {result['error']}")
+                    self.logger.error(f"Order details: Price: Rs.{order['order_price']:.1f}, Quantity: {order['quantity']}")
+                    placed_orders[position] = {
+                        **order,
+                        'order_id': None,
+                        'trigger_id': None,
+                        'status': 'FAILED',
+                        'error': result['error'],
+                        'error_details': f"Failed to place GTT order with price Rs.{order['order_price']:.1f} and quantity {order['quantity']}",
+                        'timestamp': datetime.now().isoformat()
+                    }
+                else:
+                    # Store order details with trigger ID
+                    placed_orders[position] = {
+                        **order,
+                        'order_id': None,
+                        'trigger_id': result['trigger_id'],
+                        'status': 'PLACED',
+                        'timestamp': datetime.now().isoformat()
+                    }
+                    self.logger.info(f"GTT order {order['order_number']} placed successfully with trigger ID: {result['trigger_id']}")
+        
         return placed_orders
     
     def save_order_summary(self, orders: List[Dict[str, Any]]) -> None:
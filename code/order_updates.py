@@ -0,0 +1,289 @@
+"""
+Order Update Listener
+
+Pushes Kite order updates into the strategy as they happen instead of inferring
+fills by diffing get_gtt_orders() against the history file. When a GTT triggers,
+Kite places a regular order; its updates (OPEN -> COMPLETE / CANCELLED / REJECTED)
+arrive through one of these sources:
+- KiteTickerOrderSource: the KiteTicker websocket's on_order_update callback
+- PostbackHTTPSource: a local HTTP endpoint registered as the Kite postback URL
+- FakeOrderUpdateSource: an in-process source for tests and dry runs
+
+OrderUpdateListener normalizes the payloads, drops duplicates and calls the
+registered handlers. Polling stays in place only as a low-frequency reconciliation.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, List, Optional
+
+# Order statuses after which an order no longer changes
+TERMINAL_ORDER_STATUSES = ('COMPLETE', 'CANCELLED', 'REJECTED')
+
+
+def normalize_order_update(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a Kite order update / postback payload into an order event
+
+    Parameters:
+    - data: Order payload from KiteTicker or the postback endpoint
+
+    Returns:
+    Dictionary with order_id, status, tradingsymbol, exchange, transaction_type,
+    quantity, filled_quantity, price, average_price, order_timestamp and tag,
+    or None if the payload is not an order update
+    """
+    if not isinstance(data, dict) or not data.get('order_id') or not data.get('status'):
+        return None
+    try:
+        return {
+            'order_id': str(data['order_id']),
+            'status': str(data['status']).upper(),
+            'tradingsymbol': str(data.get('tradingsymbol', '')).upper(),
+            'exchange': data.get('exchange', ''),
+            'transaction_type': str(data.get('transaction_type', '')).upper(),
+            'quantity': int(data.get('quantity') or 0),
+            'filled_quantity': int(data.get('filled_quantity') or 0),
+            'price': float(data.get('price') or 0),
+            'average_price': float(data.get('average_price') or 0),
+            'order_timestamp': data.get('order_timestamp'),
+            'tag': data.get('tag'),
+            'raw': data
+        }
+    except (TypeError, ValueError):
+        return None
+
+
+def compute_postback_checksum(order_id: str, order_timestamp: str, api_secret: str) -> str:
+    """
+    Compute the checksum Kite sends with every postback
+
+    Returns:
+    SHA-256 hex digest of order_id + order_timestamp + api_secret
+    """
+    return hashlib.sha256(f"{order_id}{order_timestamp}{api_secret}".encode('utf-8')).hexdigest()
+
+
+class OrderUpdateListener:
+    """Class to fan out normalized order updates from an event source to handlers"""
+
+    def __init__(self, source=None, dedupe_size: int = 1000):
+        """
+        Initialize the listener
+
+        Parameters:
+        - source: Event source with start(callback) and stop() methods
+        - dedupe_size: Number of recent (order_id, status, filled_quantity) keys remembered
+        """
+        self.source = source
+        self.dedupe_size = dedupe_size
+        self._handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._seen: "OrderedDict[tuple, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'received': 0, 'published': 0, 'duplicates': 0, 'invalid': 0, 'handler_errors': 0}
+
+    def add_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a function called with every new order event
+
+        Parameters:
+        - handler: Callback receiving the normalized order event
+        """
+        self._handlers.append(handler)
+
+    def publish(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Normalize an order payload and deliver it to the handlers
+
+        Parameters:
+        - data: Raw order payload
+
+        Returns:
+        The delivered event, or None if it was invalid or a duplicate
+        """
+        event = normalize_order_update(data)
+        with self._lock:
+            self._stats['received'] += 1
+            if event is None:
+                self._stats['invalid'] += 1
+                return None
+            key = (event['order_id'], event['status'], event['filled_quantity'])
+            if key in self._seen:
+                self._stats['duplicates'] += 1
+                return None
+            self._seen[key] = None
+            if len(self._seen) > self.dedupe_size:
+                self._seen.popitem(last=False)
+            self._stats['published'] += 1
+
+        logging.info(f"Order update: {event['order_id']} {event['tradingsymbol']} {event['transaction_type']} "
+                     f"{event['status']} ({event['filled_quantity']}/{event['quantity']} @ {event['average_price']})")
+        for handler in list(self._handlers):
+            try:
+                handler(event)
+            except Exception as e:
+                with self._lock:
+                    self._stats['handler_errors'] += 1
+                logging.error(f"Error in order update handler: {e}")
+        return event
+
+    def start(self) -> None:
+        """Start the event source"""
+        if self.source is not None:
+            self.source.start(self.publish)
+
+    def stop(self) -> None:
+        """Stop the event source"""
+        if self.source is not None:
+            self.source.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get received/published/duplicate/invalid/handler error counts"""
+        with self._lock:
+            return dict(self._stats)
+
+
+class KiteTickerOrderSource:
+    """Class to receive order updates from the KiteTicker websocket"""
+
+    def __init__(self, api_key: str, access_token: str):
+        """
+        Initialize the source
+
+        Parameters:
+        - api_key: Kite Connect API key
+        - access_token: Access token of the current session
+        """
+        self.api_key = api_key
+        self.access_token = access_token
+        self.ticker = None
+
+    @classmethod
+    def from_kite(cls, kite) -> "KiteTickerOrderSource":
+        """Create the source from an authenticated KiteConnect instance"""
+        return cls(kite.api_key, kite.access_token)
+
+    def start(self, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Connect the ticker in a background thread and forward order updates
+
+        Parameters:
+        - callback: Function called with each raw order payload
+        """
+        from kiteconnect import KiteTicker
+
+        self.ticker = KiteTicker(self.api_key, self.access_token)
+        self.ticker.on_order_update = lambda ws, data: callback(data)
+        self.ticker.on_connect = lambda ws, response: logging.info("KiteTicker connected for order updates")
+        self.ticker.on_error = lambda ws, code, reason: logging.error(f"KiteTicker error {code}: {reason}")
+        self.ticker.connect(threaded=True)
+
+    def stop(self) -> None:
+        """Close the ticker connection"""
+        if self.ticker is not None:
+            try:
+                self.ticker.close()
+            except Exception as e:
+                logging.warning(f"Error closing KiteTicker: {e}")
+            self.ticker = None
+
+
+class PostbackHTTPSource:
+    """Class to receive Kite order postbacks on a local HTTP endpoint"""
+
+    def __init__(self, api_secret: str, host: str = "127.0.0.1", port: int = 8765,
+                 path: str = "/kite/postback"):
+        """
+        Initialize the source
+
+        Parameters:
+        - api_secret: Kite Connect API secret used to verify postback checksums
+        - host: Interface to bind (put a reverse proxy in front for the public postback URL)
+        - port: Port to listen on (0 picks a free port)
+        - path: URL path of the postback endpoint
+        """
+        self.api_secret = api_secret
+        self.host = host
+        self.port = port
+        self.path = path
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Start serving postbacks in a background thread
+
+        Parameters:
+        - callback: Function called with each verified raw order payload
+        """
+        source = self
+
+        class PostbackHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != source.path:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    data = json.loads(self.rfile.read(length).decode('utf-8'))
+                except (ValueError, UnicodeDecodeError):
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                expected = compute_postback_checksum(str(data.get('order_id', '')),
+                                                     str(data.get('order_timestamp', '')), source.api_secret)
+                if data.get('checksum') != expected:
+                    logging.warning(f"Rejected postback with invalid checksum for order {data.get('order_id')}")
+                    self.send_response(403)
+                    self.end_headers()
+                    return
+
+                # Acknowledge first so Kite never waits on strategy code
+                self.send_response(200)
+                self.end_headers()
+                callback(data)
+
+            def log_message(self, format, *args):
+                logging.debug(f"Postback server: {format % args}")
+
+        self.server = ThreadingHTTPServer((self.host, self.port), PostbackHandler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="kite-postback", daemon=True)
+        self._thread.start()
+        logging.info(f"Listening for Kite postbacks on http://{self.host}:{self.port}{self.path}")
+
+    def stop(self) -> None:
+        """Stop the HTTP server"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class FakeOrderUpdateSource:
+    """Class to emit order updates in-process (for tests and dry runs)"""
+
+    def __init__(self):
+        self._callback: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+    def start(self, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        self._callback = callback
+
+    def stop(self) -> None:
+        self._callback = None
+
+    def emit(self, **order) -> Any:
+        """
+        Emit an order update (keyword arguments use Kite order payload field names)
+
+        Returns:
+        Whatever the listener callback returned (the event or None)
+        """
+        if self._callback is None:
+            raise RuntimeError("FakeOrderUpdateSource is not started")
+        return self._callback(order)
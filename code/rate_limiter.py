@@ -0,0 +1,196 @@
+"""
+Rate Limiting Helpers
+
+Thread-safe token bucket used to keep concurrent API calls under a broker's rate
+limit, plus the exponential backoff used when a request is throttled anyway.
+SharedTokenBucket keeps its state in a file so several processes (e.g. one script per
+symbol) can share one broker limit.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Class to limit the rate of operations shared by many threads"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket (it starts full)
+
+        Parameters:
+        - rate: Tokens added per second (sustained requests per second)
+        - capacity: Maximum number of stored tokens (burst size, default: max(1, rate))
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be greater than zero.")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _take(self, tokens: float, consume: bool = True) -> float:
+        """Take tokens if available; returns 0.0 if they were (or could be) taken, else the seconds until they can"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                if consume:
+                    self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Take tokens if they are available right now
+
+        Parameters:
+        - tokens: Number of tokens to take
+
+        Returns:
+        - bool: True if the tokens were taken, False otherwise
+        """
+        return self._take(tokens) == 0.0
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Get the seconds until tokens will be available (0.0 if they are now), without taking them"""
+        return self._take(tokens, consume=False)
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting until they are available
+
+        Parameters:
+        - tokens: Number of tokens to take (at most the capacity)
+        - timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+        - bool: True if the tokens were taken, False if the timeout expired
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait == 0.0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def available(self) -> float:
+        """Get the number of tokens currently available"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class SharedTokenBucket(TokenBucket):
+    """Class to limit the rate of operations shared by many processes through a state file
+
+    The token count and refill time live in a small JSON file guarded by a lock file
+    (created with O_EXCL, so it works on every platform). A lock left behind by a killed
+    process is broken after stale_lock_seconds. The state is written to a temporary file
+    and renamed over the old one, so a process killed mid-write (or one that reads after
+    a stale lock was broken) never finds a truncated file that would reset the bucket to full.
+    """
+
+    def __init__(self, state_file: str, rate: float, capacity: Optional[float] = None,
+                 stale_lock_seconds: float = 5.0):
+        """
+        Initialize the bucket (a missing or unreadable state file starts full)
+
+        Parameters:
+        - state_file: Path of the shared state file (its directory is created if needed)
+        - rate: Tokens added per second (sustained requests per second)
+        - capacity: Maximum number of stored tokens (burst size, default: max(1, rate))
+        - stale_lock_seconds: Age after which a lock file is considered abandoned
+        """
+        super().__init__(rate, capacity)
+        self.state_file = state_file
+        self.lock_file = f"{state_file}.lock"
+        self.stale_lock_seconds = stale_lock_seconds
+        directory = os.path.dirname(state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _lock_file(self) -> None:
+        while True:
+            try:
+                os.close(os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_file) > self.stale_lock_seconds:
+                        logging.warning(f"Breaking stale rate limit lock {self.lock_file}")
+                        os.remove(self.lock_file)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.001)
+
+    def _unlock_file(self) -> None:
+        try:
+            os.remove(self.lock_file)
+        except OSError:
+            pass
+
+    def _take(self, tokens: float, consume: bool = True) -> float:
+        with self._lock:
+            self._lock_file()
+            try:
+                now = time.time()
+                try:
+                    with open(self.state_file, 'r') as f:
+                        state = json.load(f)
+                    available = min(self.capacity, state['tokens'] + max(0.0, now - state['updated_at']) * self.rate)
+                except (OSError, ValueError, KeyError, TypeError):
+                    available = self.capacity
+
+                if available < tokens:
+                    return (tokens - available) / self.rate
+                if consume:
+                    # Replace the file whole, so a reader never sees a half-written state
+                    tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+                    with open(tmp_file, 'w') as f:
+                        json.dump({'tokens': available - tokens, 'updated_at': now}, f)
+                    os.replace(tmp_file, self.state_file)
+                return 0.0
+            finally:
+                self._unlock_file()
+
+    def available(self) -> float:
+        """Get the number of tokens currently available"""
+        wait = self._take(self.capacity, consume=False)
+        return self.capacity - wait * self.rate
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0, jitter: bool = True) -> float:
+    """
+    Exponential backoff delay for a retry
+
+    Parameters:
+    - attempt: Retry number starting at 0
+    - base_delay: Delay of the first retry in seconds
+    - max_delay: Upper bound of the delay in seconds
+    - jitter: Randomize the upper half of the delay so concurrent workers do not retry together
+
+    Returns:
+    - float: Seconds to wait before the retry
+    """
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2) if jitter else delay
@@ -54,7 +54,9 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from kite_connect_api import KiteConnectAPI
-from kite_utils import setup_logger, load_config
+from kite_utils import setup_logger
+from config_service import get_config_service
+from tick_math import get_symbol_tick_grid
 
 
 class HybridOrderScheduler:
@@ -79,17 +81,17 @@ class HybridOrderScheduler:
 
         # Load configuration and set parameters
         try:
-            config = load_config()
-            self.price_difference_percent = config.get('stratergy', {}).get('price_difference_percent', 0.4)
+            strategy_params = get_config_service().get_strategy_params()
+            self.price_difference_percent = strategy_params.get('price_difference_percent', 0.4)
             
             # If order_count is 0 or None, load from config
             if not order_count:
-                order_count = config.get('stratergy', {}).get('order_count', 10)
+                order_count = strategy_params.get('order_count', 10)
                 self.logger.info(f"Using order_count from config: {order_count}")
             
             # If start_quantity is None, load from config
             if start_quantity is None:
-                start_quantity = config.get('stratergy', {}).get('start_quantity', 1)
+                start_quantity = strategy_params.get('start_quantity', 1)
                 self.logger.info(f"Using start_quantity from config: {start_quantity}")
             
             self.order_count = order_count
@@ -118,7 +120,7 @@ class HybridOrderScheduler:
         
         # Test config loading first
         try:
-            load_config()
+            get_config_service().get_kite_credentials()
             self.logger.info("Configuration loaded successfully")
         except Exception as e:
             self.logger.error(f"Failed to load configuration: {e}")
@@ -127,6 +129,9 @@ class HybridOrderScheduler:
         
         # Initialize Kite Connect API
         self.kite_api = KiteConnectAPI(self.company_symbol)
+        
+        # Order and trigger prices are rounded to the instrument's tick grid
+        self.tick_grid = get_symbol_tick_grid(self.company_symbol, current_price)
         self.gtt_orders = []
         
     def connect_to_kite(self) -> None:
@@ -212,17 +217,17 @@ class HybridOrderScheduler:
                      order_type = 'GTT'
                      order_type_display = 'GTT ORDER'
                      price_decrease = i * (self.price_difference_percent / 100)  # 0.4%, 0.8%, 1.2%, etc.
-                     trigger_price = round(base_price * (1 - price_decrease) * 0.999, 1)  # 0.1% below order price
+                     trigger_price = self.tick_grid.round(base_price * (1 - price_decrease) * 0.999)  # 0.1% below order price
                 
-                order_price = base_price * (1 - price_decrease)
+                order_price = self.tick_grid.round(base_price * (1 - price_decrease))
                 progressive_quantity = min(self.start_quantity + i, self.max_quantity)
                 
                 order_details = {
                     'order_number': i + 1,
-                    'order_price': round(order_price, 1),
-                    'trigger_price': round(trigger_price, 1),
+                    'order_price': order_price,
+                    'trigger_price': trigger_price,
                     'quantity': progressive_quantity,
-                    'total_value': round(order_price * progressive_quantity, 1),
+                    'total_value': round(order_price * progressive_quantity, 2),
                     'order_type': order_type
                 }
                 
@@ -248,10 +253,10 @@ class HybridOrderScheduler:
                     # First order: SKIPPED when market is closed
                     order_details = {
                         'order_number': i + 1,
-                        'order_price': round(base_price, 1),
+                        'order_price': self.tick_grid.round(base_price),
                         'trigger_price': None,
                         'quantity': 1,
-                        'total_value': round(base_price, 1),
+                        'total_value': self.tick_grid.round(base_price),
                         'order_type': 'SKIPPED',
                         'skip_reason': 'Market closed - AMO not supported'
                     }
@@ -260,16 +265,16 @@ class HybridOrderScheduler:
                 else:
                                                               # Subsequent orders: GTT orders starting from 0.25% lower
                     price_decrease = (i - 0.75) * (self.price_difference_percent / 100)  # 0.25%, 0.65%, 1.05%, etc.
-                    order_price = base_price * (1 - price_decrease)
+                    order_price = self.tick_grid.round(base_price * (1 - price_decrease))
                     progressive_quantity = min(self.start_quantity + i - 1, self.max_quantity)  # Start from start_quantity for first GTT order
-                    trigger_price = round(order_price * 0.999, 1)  # 0.1% below order price
+                    trigger_price = self.tick_grid.round(order_price * 0.999)  # 0.1% below order price
                     
                     order_details = {
                         'order_number': i + 1,
-                        'order_price': round(order_price, 1),
-                        'trigger_price': round(trigger_price, 1),
+                        'order_price': order_price,
+                        'trigger_price': trigger_price,
                         'quantity': progressive_quantity,
-                        'total_value': round(order_price * progressive_quantity, 1),
+                        'total_value': round(order_price * progressive_quantity, 2),
                         'order_type': 'GTT'
                     }
                     
@@ -287,6 +292,9 @@ class HybridOrderScheduler:
         """
         Place all orders (first as market order, subsequent as GTT orders)
         
+        The GTT orders are sent together with KiteConnectAPI.place_gtt_batch, so the
+        ladder goes out in about one round-trip instead of one per order.
+        
         Parameters:
         - orders: List of order details
         
@@ -294,6 +302,8 @@ class HybridOrderScheduler:
         List of placed orders with order IDs or trigger IDs
         """
         placed_orders = []
+        gtt_specs = []
+        gtt_positions = []
         
         for order in orders:
             try:
@@ -338,32 +348,18 @@ class HybridOrderScheduler:
                     self.logger.info(f"MARKET order {order['order_number']} placed successfully with order ID: {order_id}")
                     
                 else:
-                    # Subsequent orders: Place as GTT orders
-                    self.logger.info(f"Placing GTT order {order['order_number']} for {self.company_symbol}")
-                    
-                    # Place GTT order
-                    trigger_id = self.kite_api.place_gtt_order(
-                        trading_symbol=self.company_symbol,
-                        exchange="NSE",
-                        transaction_type="BUY",
-                        quantity=order['quantity'],
-                        price=order['order_price'],
-                        trigger_price=order['trigger_price'],
-                        order_type="LIMIT",
-                        validity="DAY"
-                    )
-                    
-                    # Store order details with trigger ID
-                    placed_order = {
-                        **order,
-                        'order_id': None,
-                        'trigger_id': trigger_id,
-                        'status': 'PLACED',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    placed_orders.append(placed_order)
-                    self.logger.info(f"GTT order {order['order_number']} placed successfully with trigger ID: {trigger_id}")
+                    # Subsequent orders: GTT orders, placed together as one batch below
+                    gtt_specs.append({
+                        'trading_symbol': self.company_symbol,
+                        'exchange': "NSE",
+                        'transaction_type': "BUY",
+                        'quantity': order['quantity'],
+                        'price': order['order_price'],
+                        'trigger_price': order['trigger_price'],
+                        'idempotency_key': f"{self.company_symbol}:BUY:{order['order_number']}"
+                    })
+                    gtt_positions.append(len(placed_orders))
+                    placed_orders.append(order)
                 
             except Exception as e:
                 error_msg = str(e)
@@ -382,6 +378,35 @@ class HybridOrderScheduler:
                 }
                 placed_orders.append(failed_order)
         
+        if gtt_specs:
+            self.logger.info(f"Placing {len(gtt_specs)} GTT orders for {self.company_symbol} as one batch")
+            results = self.kite_api.place_gtt_batch(gtt_specs)
+            
+            for position, result in zip(gtt_positions, results):
+                order = placed_orders[position]
+                if result['status'] == 'FAILED':
+                    self.logger.error(f"Failed to place order {order['order_number']} (GTT): {result['error']}")
+                    self.logger.error(f"Order details: Price: Rs.{order['order_price']:.2f}, Quantity: {order['quantity']}")
+                    placed_orders[position] = {
+                        **order,
+                        'order_id': None,
+                        'trigger_id': None,
+                        'status': 'FAILED',
+                        'error': result['error'],
+                        'error_details': f"Failed to place GTT order with price Rs.{order['order_price']:.2f} and quantity {order['quantity']}",
+                        'timestamp': datetime.now().isoformat()
+                    }
+                else:
+                    # Store order details with trigger ID
+                    placed_orders[position] = {
+                        **order,
+                        'order_id': None,
+                        'trigger_id': result['trigger_id'],
+                        'status': 'PLACED',
+                        'timestamp': datetime.now().isoformat()
+                    }
+                    self.logger.info(f"GTT order {order['order_number']} placed successfully with trigger ID: {result['trigger_id']}")
+        
         return placed_orders
     
     def save_order_summary(self, orders: List[Dict[str, Any]]) -> None:
@@ -30,133 +30,70 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 from kite_connect_api import KiteConnectAPI
-from kite_utils import setup_logger, load_config
+from kite_utils import setup_logger
+from charges import (calculate_zerodha_charges, calculate_profit_with_charges, required_sell_value,
+                     required_sell_value_array)
+from tick_math import ROUND_UP, get_tick_grid, get_symbol_tick_grid
 
+# Slack for float noise when a price lands exactly on a tick
+_TICK_EPSILON = 1e-9
 
-def calculate_zerodha_charges(sell_value: float, quantity: int) -> dict:
-    """
-    Calculate all Zerodha charges for equity delivery sell orders
-    
-    Parameters:
-    - sell_value: Total sell value (price * quantity)
-    - quantity: Number of shares being sold
-    
-    Returns:
-    Dictionary containing all charges and total charges
+
+def calculate_optimal_sell_price(buy_price: float, quantity: int, target_net_profit_percentage: float,
+                                 tick_size: float = 0.05) -> float:
     """
-    # Zerodha Equity Delivery Sell-Side Charges
-    brokerage = 0.00  # Zero for equity delivery
-    
-    # STT (Securities Transaction Tax): 0.1% of Sell Value
-    stt = sell_value * 0.001
-    
-    # Exchange Transaction Charges (NSE Equity): 0.00345% of Sell Value
-    exchange_charges = sell_value * 0.0000345
+    Calculate the lowest tick-aligned sell price achieving the target net profit percentage after charges
     
-    # SEBI Turnover Fees: 0.0001% of Sell Value
-    sebi_fees = sell_value * 0.000001
-    
-    # DP (Depository Participant) Charges: ₹13.5 + 18% GST = ₹15.93
-    dp_charges = 15.93
-    
-    # GST: 18% on (Exchange Transaction Charges + SEBI Turnover Fees)
-    gst_base = exchange_charges + sebi_fees
-    gst = gst_base * 0.18
-    
-    # Calculate total charges
-    total_charges = brokerage + stt + exchange_charges + sebi_fees + dp_charges + gst
-    
-    return {
-        'brokerage': brokerage,
-        'stt': stt,
-        'exchange_charges': exchange_charges,
-        'sebi_fees': sebi_fees,
-        'dp_charges': dp_charges,
-        'gst': gst,
-        'total_charges': total_charges,
-        'charges_per_share': total_charges / quantity if quantity > 0 else 0
-    }
-
-
-def calculate_profit_with_charges(buy_price: float, sell_price: float, quantity: int) -> dict:
-    """
-    Calculate profit after considering all Zerodha charges
+    The charges are a fixed fraction of the sell value plus the DP charge, so the net profit
+        sell_price * quantity * (1 - SELL_CHARGES_RATE) - buy_price * quantity - DP_CHARGES
+    reaches the target at a price that is solved directly and rounded up to the next tick.
     
     Parameters:
     - buy_price: Average buy price per share
-    - sell_price: Sell price per share
     - quantity: Number of shares
+    - target_net_profit_percentage: Target net profit percentage
+    - tick_size: Price tick size of the instrument
     
     Returns:
-    Dictionary containing profit analysis
-    """
-    # Calculate basic profit
-    buy_value = buy_price * quantity
-    sell_value = sell_price * quantity
-    gross_profit = sell_value - buy_value
-    
-    # Calculate charges
-    charges = calculate_zerodha_charges(sell_value, quantity)
-    total_charges = charges['total_charges']
-    
-    # Calculate net profit
-    net_profit = gross_profit - total_charges
+    Optimal sell price per share
     
-    # Calculate profit percentages
-    gross_profit_percentage = (gross_profit / buy_value) * 100 if buy_value > 0 else 0
-    net_profit_percentage = (net_profit / buy_value) * 100 if buy_value > 0 else 0
-    charges_percentage = (total_charges / buy_value) * 100 if buy_value > 0 else 0
+    Raises:
+    - ValueError: If buy_price, quantity or tick_size is not positive
+    """
+    if buy_price <= 0 or quantity <= 0 or tick_size <= 0:
+        raise ValueError(f"Invalid sell price inputs: buy_price={buy_price}, quantity={quantity}, tick_size={tick_size}")
     
-    return {
-        'buy_value': buy_value,
-        'sell_value': sell_value,
-        'gross_profit': gross_profit,
-        'gross_profit_percentage': gross_profit_percentage,
-        'charges': charges,
-        'total_charges': total_charges,
-        'charges_percentage': charges_percentage,
-        'net_profit': net_profit,
-        'net_profit_percentage': net_profit_percentage,
-        'break_even_price': buy_price + (total_charges / quantity) if quantity > 0 else buy_price
-    }
-
-
-def calculate_optimal_sell_price(buy_price: float, quantity: int, target_net_profit_percentage: float) -> float:
+    sell_value = required_sell_value(buy_price * quantity, target_net_profit_percentage)
+    return get_tick_grid(tick_size).round(sell_value / quantity, ROUND_UP)
+
+
+def calculate_optimal_sell_prices(buy_prices: Any, quantities: Any, target_net_profit_percentages: Any,
+                                  tick_size: Any = 0.05) -> Any:
     """
-    Calculate the optimal sell price to achieve target net profit percentage after charges
+    Vectorised calculate_optimal_sell_price for arrays of orders (arguments are broadcast)
     
     Parameters:
-    - buy_price: Average buy price per share
-    - quantity: Number of shares
-    - target_net_profit_percentage: Target net profit percentage
+    - buy_prices: Average buy prices per share
+    - quantities: Numbers of shares
+    - target_net_profit_percentages: Target net profit percentages
+    - tick_size: Price tick size (scalar or array)
     
     Returns:
-    Optimal sell price per share
+    NumPy array of optimal sell prices (NaN where an input is not positive)
     """
-    # Start with a reasonable guess
-    sell_price = buy_price * (1 + target_net_profit_percentage / 100)
-    
-    # Iteratively find the optimal price
-    max_iterations = 50
-    tolerance = 0.01  # 0.01% tolerance
+    import numpy as np
     
-    for iteration in range(max_iterations):
-        profit_analysis = calculate_profit_with_charges(buy_price, sell_price, quantity)
-        current_net_profit_percentage = profit_analysis['net_profit_percentage']
-        
-        # Check if we're close enough to target
-        if abs(current_net_profit_percentage - target_net_profit_percentage) <= tolerance:
-            break
-        
-        # Adjust sell price based on difference
-        if current_net_profit_percentage < target_net_profit_percentage:
-            # Need higher profit, increase sell price
-            sell_price *= 1.001  # Increase by 0.1%
-        else:
-            # Too much profit, decrease sell price
-            sell_price *= 0.999  # Decrease by 0.1%
+    buy_prices = np.asarray(buy_prices, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    targets = np.asarray(target_net_profit_percentages, dtype=np.float64)
+    tick_size = np.asarray(tick_size, dtype=np.float64)
     
-    return round(sell_price, 2)
+    valid = (buy_prices > 0) & (quantities > 0) & (tick_size > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sell_values = required_sell_value_array(buy_prices * quantities, targets)
+        ticks = np.ceil(sell_values / quantities / tick_size - _TICK_EPSILON)
+        prices = np.round(ticks * tick_size, 2)
+    return np.where(valid, prices, np.nan)
 
 
 def get_holdings_info(kite_api: KiteConnectAPI, company_symbol: str) -> Tuple[int, float]:
@@ -419,12 +356,18 @@ class GTTSellOrderScheduler:
         if sell_quantity <= 0:
             raise ValueError(f"Invalid quantity: {sell_quantity}")
         
-        # Calculate optimal sell price
-        sell_price = calculate_optimal_sell_price(avg_price, sell_quantity, self.net_profit_percentage)
-        sell_price = round(sell_price, 1)
+        # Calculate optimal sell price on the symbol's tick grid (the price band fallback
+        # uses the unrounded target price, which may sit in a higher band than avg_price)
+        target_price = required_sell_value(avg_price * sell_quantity, self.net_profit_percentage) / sell_quantity
+        tick_grid = get_symbol_tick_grid(self.company_symbol, target_price)
+        sell_price = calculate_optimal_sell_price(avg_price, sell_quantity, self.net_profit_percentage,
+                                                  tick_size=tick_grid.tick_size)
         
-        # Calculate trigger price (0.1% above sell price for GTT)
-        trigger_price = round(sell_price * 1.001, 1)
+        # Calculate trigger price (0.1% above sell price for GTT), rounded up and at least
+        # one tick above the sell price
+        sell_ticks = tick_grid.to_ticks(sell_price)
+        trigger_ticks = max(tick_grid.shift_percent(sell_ticks, 0.1, ROUND_UP), sell_ticks + 1)
+        trigger_price = tick_grid.to_price(trigger_ticks)
         
         # Calculate profit analysis
         profit_analysis = calculate_profit_with_charges(avg_price, sell_price, sell_quantity)
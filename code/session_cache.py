@@ -0,0 +1,204 @@
+"""
+Session Cache
+
+Daily record of broker sessions already validated (or found expired), so helper
+scripts do not repeat login validation on every start. Entries are keyed by provider
+and API key and belong to one trading day: Kite access tokens and Breeze session
+tokens both expire overnight, so a record is only trusted from 06:00 IST until
+06:00 IST the next day.
+
+- A token validated today is trusted without another validation call
+  (kite_utils.initialize_kite skips its margins() probe).
+- A token found expired today fails at once with SessionExpiredError, instead of
+  each start retrying the login against the broker.
+
+Only SHA-256 fingerprints of the API keys and tokens are written, to
+workdir/session/session_cache.json with owner-only permissions (0600).
+
+Example:
+    cache = get_session_cache()
+    if cache.is_expired("kite", api_key, access_token):
+        raise SessionExpiredError("kite", "Access token expired", login_url)
+    if not cache.is_valid("kite", api_key, access_token):
+        kite.margins()
+        cache.record_valid("kite", api_key, access_token)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+SESSION_CACHE_FILE = os.path.join('workdir', 'session', 'session_cache.json')
+
+# Kite and Breeze tokens expire overnight; a trading day's sessions start at 06:00 IST
+IST = timezone(timedelta(hours=5, minutes=30))
+TRADING_DAY_START_HOUR = 6
+
+STATUS_VALID = 'valid'
+STATUS_EXPIRED = 'expired'
+
+
+class SessionExpiredError(Exception):
+    """Raised when a broker session is expired and a new login is needed"""
+
+    def __init__(self, provider: str, message: str, login_url: Optional[str] = None):
+        """
+        Initialize the error
+
+        Parameters:
+        - provider: Broker whose session expired ("kite" or "breeze")
+        - message: Description of the failure
+        - login_url: URL to log in and get a new token
+        """
+        self.provider = provider
+        self.login_url = login_url
+        if login_url:
+            message = f"{message.rstrip('.')}. Log in at {login_url} and update config/config.yaml"
+        super().__init__(message)
+
+
+def get_trading_day(now: Optional[datetime] = None) -> str:
+    """
+    Get the trading day a session belongs to
+
+    Parameters:
+    - now: Time to look up (default: now)
+
+    Returns:
+    - str: ISO date of the trading day (before 06:00 IST this is the previous day)
+    """
+    now = (now or datetime.now(IST)).astimezone(IST)
+    if now.hour < TRADING_DAY_START_HOUR:
+        now -= timedelta(days=1)
+    return now.date().isoformat()
+
+
+def _fingerprint(value: str) -> str:
+    """SHA-256 of a key or token, so the secret itself is never written"""
+    return hashlib.sha256(str(value).encode('utf-8')).hexdigest()
+
+
+class SessionCache:
+    """Class to remember validated and expired broker sessions for the trading day"""
+
+    def __init__(self, path: str = SESSION_CACHE_FILE):
+        """
+        Initialize the session cache
+
+        Parameters:
+        - path: Path to the cache file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _key(self, provider: str, api_key: str) -> str:
+        return f"{provider}:{_fingerprint(api_key)[:16]}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read today's entries (entries of earlier trading days are dropped)"""
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        today = get_trading_day()
+        return {key: entry for key, entry in entries.items()
+                if isinstance(entry, dict) and entry.get('trading_day') == today}
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Write the entries atomically to an owner-only file"""
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f, indent=2)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write session cache {self.path}: {e}")
+
+    def get_status(self, provider: str, api_key: str, token: str) -> Optional[str]:
+        """
+        Get today's recorded status of a session token
+
+        Parameters:
+        - provider: Broker name ("kite" or "breeze")
+        - api_key: API key of the app
+        - token: Access or session token
+
+        Returns:
+        STATUS_VALID, STATUS_EXPIRED, or None if the token was not checked today
+        """
+        if not token:
+            return None
+        with self._lock:
+            entry = self._load().get(self._key(provider, api_key))
+        if entry and entry.get('token_sha256') == _fingerprint(token):
+            return entry.get('status')
+        return None
+
+    def is_valid(self, provider: str, api_key: str, token: str) -> bool:
+        """Check whether a token was validated this trading day"""
+        return self.get_status(provider, api_key, token) == STATUS_VALID
+
+    def is_expired(self, provider: str, api_key: str, token: str) -> bool:
+        """Check whether a token was found expired this trading day"""
+        return self.get_status(provider, api_key, token) == STATUS_EXPIRED
+
+    def _record(self, provider: str, api_key: str, token: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[self._key(provider, api_key)] = {
+                'provider': provider,
+                'trading_day': get_trading_day(),
+                'token_sha256': _fingerprint(token),
+                'status': status,
+                'checked_at': time.time(),
+                'error': error
+            }
+            self._save(entries)
+
+    def record_valid(self, provider: str, api_key: str, token: str) -> None:
+        """Record that a token was validated just now"""
+        self._record(provider, api_key, token, STATUS_VALID)
+
+    def record_expired(self, provider: str, api_key: str, token: str, error: Optional[str] = None) -> None:
+        """Record that a token was rejected as expired"""
+        self._record(provider, api_key, token, STATUS_EXPIRED, error)
+
+    def invalidate(self, provider: str, api_key: str) -> None:
+        """Forget the recorded session of an API key"""
+        with self._lock:
+            entries = self._load()
+            if entries.pop(self._key(provider, api_key), None) is not None:
+                self._save(entries)
+
+
+_shared_caches: Dict[str, SessionCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_session_cache(path: str = SESSION_CACHE_FILE) -> SessionCache:
+    """
+    Get the process-wide session cache of a cache file
+
+    Parameters:
+    - path: Path to the cache file
+
+    Returns:
+    SessionCache shared by every caller with the same path
+    """
+    with _shared_caches_lock:
+        cache = _shared_caches.get(path)
+        if cache is None:
+            cache = SessionCache(path)
+            _shared_caches[path] = cache
+        return cache
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Convex Accumulation Parameter Sweep
+
+Evaluates many convex_accumulation_plan configurations (fall_power, size_power,
+size_multiplier, max_fall_pct, steps) against stored daily history and ranks them by
+net return, capital required and max drawdown.
+
+Configurations are split into chunks and run in a ProcessPoolExecutor across all
+cores; inside a worker, every configuration of a chunk is simulated together as NumPy
+arrays (one loop step per bar), like backtest_gtt_fall_buy.
+
+Strategy model (per configuration), following HybridOrderScheduler with the market open:
+- Level 0 of the plan is bought at the anchor price (market order), every further
+  level is a GTT buy at the plan's trigger_price (GTT trigger 0.1% below it)
+- A GTT buy fills when the bar's low reaches its trigger, at the order price (or at
+  the open if the bar gaps below the trigger)
+- The position is sold at the price that yields net_profit_pct net of the sell-side
+  Zerodha charges (as schedule_gtt_sell_order does), once a later bar's high reaches it
+- After a sale the remaining GTT buys are cancelled and a new plan starts at that bar's close
+
+Usage:
+    python sweep_convex_accumulation.py <symbol> [--random N] [--workers N] [--output results.csv|results.parquet]
+
+Examples:
+    python sweep_convex_accumulation.py ITC
+    # Grid search over the default parameter ranges
+
+    python sweep_convex_accumulation.py ITC --random 10000 --seed 7
+    # 10000 random configurations
+
+    python sweep_convex_accumulation.py ITC --steps 5:12 --max-fall-pcts 6:16:2 --output itc_sweep.parquet
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from backtest_gtt_fall_buy import load_history_bars, parse_values, save_results_to_csv
+from charges import required_sell_value_array, sell_charges_array
+from new_schedule_gtt_orders import convex_accumulation_plan
+
+# Default grid (first value of each list is the default of convex_accumulation_plan)
+DEFAULT_FALL_POWERS = [1.7, 1.0, 1.3, 2.0, 2.5]
+DEFAULT_SIZE_POWERS = [1.6, 1.0, 1.3, 2.0, 2.5]
+DEFAULT_SIZE_MULTIPLIERS = [3.8, 1.0, 2.0, 3.0, 5.0]
+DEFAULT_MAX_FALL_PCTS = [10.0, 6.0, 8.0, 12.0, 15.0]
+DEFAULT_STEPS = [10, 5, 7, 12]
+
+# Ranges used by the random search: (low, high)
+RANDOM_RANGES = {
+    'fall_power': (0.8, 3.0),
+    'size_power': (0.8, 3.0),
+    'size_multiplier': (0.5, 6.0),
+    'max_fall_pct': (4.0, 20.0),
+    'steps': (3, 15)
+}
+
+PARAM_COLUMNS = ['fall_power', 'size_power', 'size_multiplier', 'max_fall_pct', 'steps']
+
+RESULT_COLUMNS = PARAM_COLUMNS + [
+    'cycles', 'buy_fills', 'shares_bought', 'net_pnl', 'charges', 'open_shares',
+    'unrealised_pnl', 'plan_capital', 'max_capital_at_risk', 'max_drawdown',
+    'net_return_pct', 'rank_net_return', 'rank_capital', 'rank_drawdown', 'score'
+]
+
+# Bars of the worker process, set by _init_worker
+_worker_bars: Optional[Dict[str, np.ndarray]] = None
+
+
+def build_grid(fall_powers: Sequence[float] = DEFAULT_FALL_POWERS,
+               size_powers: Sequence[float] = DEFAULT_SIZE_POWERS,
+               size_multipliers: Sequence[float] = DEFAULT_SIZE_MULTIPLIERS,
+               max_fall_pcts: Sequence[float] = DEFAULT_MAX_FALL_PCTS,
+               steps: Sequence[int] = DEFAULT_STEPS) -> List[Dict[str, Any]]:
+    """
+    Build the cartesian product of parameter values
+
+    Returns:
+    List of configuration dictionaries
+    """
+    return [dict(zip(PARAM_COLUMNS, combo))
+            for combo in itertools.product(fall_powers, size_powers, size_multipliers, max_fall_pcts, steps)]
+
+
+def build_random_configs(count: int, seed: Optional[int] = None,
+                         ranges: Dict[str, tuple] = RANDOM_RANGES) -> List[Dict[str, Any]]:
+    """
+    Draw random configurations uniformly from the given ranges
+
+    Parameters:
+    - count: Number of configurations
+    - seed: Random seed (for reproducible sweeps)
+    - ranges: (low, high) per parameter; steps is drawn as an integer
+
+    Returns:
+    List of configuration dictionaries
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name in PARAM_COLUMNS:
+        low, high = ranges[name]
+        if name == 'steps':
+            columns[name] = rng.integers(low, high + 1, size=count)
+        else:
+            columns[name] = np.round(rng.uniform(low, high, size=count), 3)
+    return [{name: columns[name][i].item() for name in PARAM_COLUMNS} for i in range(count)]
+
+
+def simulate_configs(bars: Dict[str, np.ndarray], configs: List[Dict[str, Any]], base_shares: int = 15,
+                     net_profit_pct: float = 2.5, tick_size: float = 0.05) -> Dict[str, np.ndarray]:
+    """
+    Simulate the convex accumulation strategy for a list of configurations
+
+    Parameters:
+    - bars: OHLC arrays from load_history_bars
+    - configs: Configuration dictionaries (keys of PARAM_COLUMNS)
+    - base_shares: Shares bought at the first level
+    - net_profit_pct: Target net profit percentage of the sell order
+    - tick_size: Tick size used to round the sell price up
+
+    Returns:
+    Dictionary of result arrays, one value per configuration
+    """
+    open_, high, low, close = bars['open'], bars['high'], bars['low'], bars['close']
+    n_configs = len(configs)
+    max_steps = max(int(config['steps']) for config in configs)
+
+    # Plan shape per configuration; fall percentages and sizes do not depend on the price
+    fall_pcts = np.zeros((n_configs, max_steps))
+    level_shares = np.zeros((n_configs, max_steps))
+    for i, config in enumerate(configs):
+        plan = convex_accumulation_plan(start_price=100.0, base_shares=base_shares,
+                                        max_fall_pct=config['max_fall_pct'], steps=int(config['steps']),
+                                        fall_power=config['fall_power'], size_power=config['size_power'],
+                                        size_multiplier=config['size_multiplier'])
+        for item in plan:
+            fall_pcts[i, item['level']] = item['fall_pct']
+            level_shares[i, item['level']] = item['shares_to_buy']
+    gtt_levels = (level_shares > 0) & (np.arange(max_steps)[None, :] > 0)
+
+    shares = np.zeros(n_configs)
+    cost = np.zeros(n_configs)
+    order_prices = np.zeros((n_configs, max_steps))
+    gtt_triggers = np.zeros((n_configs, max_steps))
+    pending = np.zeros((n_configs, max_steps), dtype=bool)
+    sell_price = np.full(n_configs, np.inf)
+
+    cycles = np.zeros(n_configs, dtype=np.int64)
+    buy_fills = np.zeros(n_configs, dtype=np.int64)
+    shares_bought = np.zeros(n_configs)
+    realised = np.zeros(n_configs)
+    charges = np.zeros(n_configs)
+    max_capital = np.zeros(n_configs)
+    peak_equity = np.zeros(n_configs)
+    max_drawdown = np.zeros(n_configs)
+
+    def start_plans(mask: np.ndarray, anchor: float) -> None:
+        """Buy level 0 at the anchor and place the GTT levels of the masked configurations"""
+        order_prices[mask] = np.round(anchor * (1 - fall_pcts[mask] / 100), 1)
+        gtt_triggers[mask] = np.round(order_prices[mask] * 0.999, 1)
+        pending[mask] = gtt_levels[mask]
+        shares[mask] = level_shares[mask, 0]
+        cost[mask] = level_shares[mask, 0] * anchor
+        shares_bought[mask] += level_shares[mask, 0]
+        buy_fills[mask] += 1
+        update_sell_price(mask)
+
+    def update_sell_price(mask: np.ndarray) -> None:
+        sell_value = required_sell_value_array(cost[mask], net_profit_pct)
+        sell_price[mask] = np.ceil(sell_value / shares[mask] / tick_size - 1e-9) * tick_size
+
+    start_plans(np.ones(n_configs, dtype=bool), close[0])
+    plan_capital = (level_shares * order_prices).sum(axis=1)
+
+    for t in range(1, len(close)):
+        # Sell first, with the position held at the start of the bar
+        sold = (shares > 0) & (high[t] >= sell_price)
+        if sold.any():
+            proceeds = shares[sold] * np.maximum(sell_price[sold], open_[t])
+            trade_charges = sell_charges_array(proceeds)
+            realised[sold] += proceeds - trade_charges - cost[sold]
+            charges[sold] += trade_charges
+            cycles[sold] += 1
+            shares[sold] = 0
+            cost[sold] = 0
+            sell_price[sold] = np.inf
+            pending[sold] = False
+
+        filled = pending & (low[t] <= gtt_triggers)
+        bought = filled.any(axis=1)
+        if bought.any():
+            fill_prices = np.where(open_[t] <= gtt_triggers, open_[t], order_prices)
+            filled_shares = filled * level_shares
+            shares += filled_shares.sum(axis=1)
+            cost += (filled_shares * fill_prices).sum(axis=1)
+            shares_bought += filled_shares.sum(axis=1)
+            buy_fills += filled.sum(axis=1)
+            pending &= ~filled
+            update_sell_price(bought)
+
+        # A new plan starts at the close after every sale
+        if sold.any():
+            start_plans(sold, close[t])
+
+        max_capital = np.maximum(max_capital, cost)
+        equity = realised + shares * close[t] - cost
+        peak_equity = np.maximum(peak_equity, equity)
+        max_drawdown = np.maximum(max_drawdown, peak_equity - equity)
+
+    results = {name: np.array([config[name] for config in configs]) for name in PARAM_COLUMNS}
+    results.update({
+        'cycles': cycles,
+        'buy_fills': buy_fills,
+        'shares_bought': shares_bought.astype(np.int64),
+        'net_pnl': realised,
+        'charges': charges,
+        'open_shares': shares.astype(np.int64),
+        'unrealised_pnl': shares * close[-1] - cost,
+        'plan_capital': plan_capital,
+        'max_capital_at_risk': max_capital,
+        'max_drawdown': max_drawdown,
+        'net_return_pct': np.where(max_capital > 0, realised / np.where(max_capital > 0, max_capital, 1) * 100, 0.0)
+    })
+    return results
+
+
+def _init_worker(symbol: str, history_file: Optional[str]) -> None:
+    """Load the history once per worker process"""
+    global _worker_bars
+    _worker_bars = load_history_bars(symbol, file_path=history_file)
+
+
+def _run_chunk(configs: List[Dict[str, Any]], base_shares: int, net_profit_pct: float,
+               tick_size: float) -> Dict[str, np.ndarray]:
+    return simulate_configs(_worker_bars, configs, base_shares, net_profit_pct, tick_size)
+
+
+def run_sweep(symbol: str, configs: List[Dict[str, Any]], history_file: Optional[str] = None,
+              base_shares: int = 15, net_profit_pct: float = 2.5, tick_size: float = 0.05,
+              workers: Optional[int] = None, chunk_size: int = 250) -> Dict[str, np.ndarray]:
+    """
+    Evaluate configurations in parallel
+
+    Parameters:
+    - symbol: Stock symbol whose stored history is used
+    - configs: Configuration dictionaries
+    - history_file: Explicit history file (default: workdir/history/{symbol}_breeze_history_3years.json)
+    - base_shares: Shares bought at the first level
+    - net_profit_pct: Target net profit percentage of the sell order
+    - tick_size: Tick size used to round the sell price up
+    - workers: Number of worker processes (default: all cores)
+    - chunk_size: Configurations per task
+
+    Returns:
+    Dictionary of result arrays in configuration order
+    """
+    chunks = [configs[i:i + chunk_size] for i in range(0, len(configs), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(symbol, history_file)) as executor:
+        futures = [executor.submit(_run_chunk, chunk, base_shares, net_profit_pct, tick_size) for chunk in chunks]
+        chunk_results = [future.result() for future in futures]
+
+    return {name: np.concatenate([result[name] for result in chunk_results]) for name in chunk_results[0]}
+
+
+def rank_sweep_results(results: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Rank configurations by net return (higher is better), capital required and max
+    drawdown (lower is better); the score is the mean of the three ranks
+
+    Parameters:
+    - results: Result arrays from run_sweep
+
+    Returns:
+    List of result rows sorted best first
+    """
+    def ranks(values: np.ndarray) -> np.ndarray:
+        order = np.argsort(values, kind='stable')
+        rank = np.empty(len(values), dtype=np.int64)
+        rank[order] = np.arange(1, len(values) + 1)
+        return rank
+
+    results = dict(results)
+    results['rank_net_return'] = ranks(-results['net_return_pct'])
+    results['rank_capital'] = ranks(results['max_capital_at_risk'])
+    results['rank_drawdown'] = ranks(results['max_drawdown'])
+    results['score'] = (results['rank_net_return'] + results['rank_capital'] + results['rank_drawdown']) / 3
+
+    rows = []
+    for i in np.lexsort((results['rank_net_return'], results['score'])):
+        row = {}
+        for column in RESULT_COLUMNS:
+            value = results[column][i].item()
+            row[column] = round(value, 3) if isinstance(value, float) else value
+        rows.append(row)
+    return rows
+
+
+def save_sweep_results(rows: List[Dict[str, Any]], file_path: str) -> str:
+    """
+    Save ranked results as Parquet (for .parquet paths, when pandas with a Parquet engine
+    is installed) or CSV
+
+    Parameters:
+    - rows: Rows from rank_sweep_results
+    - file_path: Output path
+
+    Returns:
+    Path of the written file
+    """
+    if file_path.endswith('.parquet'):
+        try:
+            import pandas as pd
+
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            pd.DataFrame(rows, columns=RESULT_COLUMNS).to_parquet(file_path, index=False)
+            return file_path
+        except ImportError:
+            file_path = file_path[:-len('.parquet')] + '.csv'
+            logging.warning(f"Parquet output needs pandas with pyarrow or fastparquet, writing {file_path} instead")
+
+    save_results_to_csv(rows, file_path, RESULT_COLUMNS)
+    return file_path
+
+
+def main():
+    """Main function to parse arguments and run the sweep"""
+    parser = argparse.ArgumentParser(
+        description="Sweep convex_accumulation_plan parameters over stored daily history",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('symbol', help='Trading symbol of the company (e.g., ITC)')
+    parser.add_argument('--history-file', help='History JSON file (default: the history store, else workdir/history/{symbol}_breeze_history_3years.json)')
+    parser.add_argument('--fall-powers', default=','.join(map(str, DEFAULT_FALL_POWERS)))
+    parser.add_argument('--size-powers', default=','.join(map(str, DEFAULT_SIZE_POWERS)))
+    parser.add_argument('--size-multipliers', default=','.join(map(str, DEFAULT_SIZE_MULTIPLIERS)))
+    parser.add_argument('--max-fall-pcts', default=','.join(map(str, DEFAULT_MAX_FALL_PCTS)))
+    parser.add_argument('--steps', default=','.join(map(str, DEFAULT_STEPS)))
+    parser.add_argument('--random', type=int, help='Evaluate N random configurations instead of the grid')
+    parser.add_argument('--seed', type=int, help='Random seed for --random')
+    parser.add_argument('--base-shares', type=int, default=15, help='Shares bought at the first level (default: 15)')
+    parser.add_argument('--net-profit-pct', type=float, default=2.5, help='Net profit target of the sell (default: 2.5)')
+    parser.add_argument('--tick-size', type=float, default=0.05, help='Tick size for sell prices (default: 0.05)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--output', help='Output .csv or .parquet (default: workdir/backtests/{symbol}_convex_sweep.csv)')
+    parser.add_argument('--top', type=int, default=10, help='Number of best configurations to print')
+
+    args = parser.parse_args()
+    symbol = args.symbol.upper()
+
+    try:
+        if args.random:
+            configs = build_random_configs(args.random, args.seed)
+        else:
+            configs = build_grid(parse_values(args.fall_powers), parse_values(args.size_powers),
+                                 parse_values(args.size_multipliers), parse_values(args.max_fall_pcts),
+                                 parse_values(args.steps, int))
+
+        start_time = time.perf_counter()
+        results = run_sweep(symbol, configs, args.history_file, args.base_shares, args.net_profit_pct,
+                            args.tick_size, args.workers)
+        elapsed = time.perf_counter() - start_time
+
+        rows = rank_sweep_results(results)
+        output = args.output or os.path.join('workdir', 'backtests', f'{symbol}_convex_sweep.csv')
+        output = save_sweep_results(rows, output)
+
+        print(f"Evaluated {len(rows)} configurations in {elapsed:.2f}s -> {output}")
+        for row in rows[:args.top]:
+            print(f"  fall_power {row['fall_power']} size_power {row['size_power']} "
+                  f"size_multiplier {row['size_multiplier']} max_fall {row['max_fall_pct']}% steps {row['steps']}: "
+                  f"net return {row['net_return_pct']:.2f}% ({row['net_pnl']:.2f}), "
+                  f"max capital {row['max_capital_at_risk']:.2f}, max drawdown {row['max_drawdown']:.2f}")
+
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import logging
 import traceback
 from kite_utils import setup_logger, load_config
 from breeze_sdk_api import BreezeApi
+from history_store import HistoryStore
 
 def fetch_stock_history(symbol: str, years: int = 5) -> dict:
     """
@@ -91,22 +92,60 @@ def save_history_to_json(data: dict, symbol: str, years: int) -> None:
         logger.error(f"Error saving historical data: {str(e)}\n{traceback.format_exc()}")
         raise
 
+def fetch_history_range(breeze: BreezeApi, symbol: str, start_date: datetime, end_date: datetime) -> list:
+    """
+    Fetch daily bars of a date range using Breeze API
+    
+    Parameters:
+    - breeze: BreezeApi instance
+    - symbol: Stock symbol
+    - start_date: Start of the range
+    - end_date: End of the range
+    
+    Returns:
+    List of daily bars
+    """
+    return breeze.get_historical_one_min_data(
+        stock_code=symbol,
+        exchange_code="NSE",
+        start_date=start_date.strftime("%d/%m/%Y"),
+        end_date=end_date.strftime("%d/%m/%Y"),
+    )
+
+def update_history_store(symbol: str, years: int = 3) -> int:
+    """
+    Bring the local history store of a symbol up to date, fetching only missing bars
+    
+    Parameters:
+    - symbol: Stock symbol
+    - years: Number of years of history the store should cover
+    
+    Returns:
+    Number of new bars stored
+    """
+    store = HistoryStore(source='breeze')
+    
+    # Seed the store from an existing JSON download so it is not fetched again
+    json_path = os.path.join('workdir', 'history', f'{symbol}_breeze_history_{years}years.json')
+    if store.read_header(symbol) is None and os.path.exists(json_path):
+        logger.info(f"Importing {json_path} into the history store")
+        store.import_json(symbol, json_path)
+    
+    breeze = BreezeApi(symbol=symbol)
+    start_date = datetime.now() - timedelta(days=years*365)
+    added = store.update(symbol, lambda start, end: fetch_history_range(breeze, symbol, start, end), start_date)
+    logger.info(f"History store {store.get_path(symbol)} updated with {added} new bars")
+    return added
+
 def main():
-    """Main function to fetch and save stock history"""
+    """Main function to bring the stock history store up to date"""
     try:
         # Set up logger
         global logger
         logger = setup_logger(__name__, "ITC")
         
-        logger.info("Starting historical data fetch process...")
-        
-        # Fetch stock history
-        logger.info("Fetching stock history...")
-        history_data = fetch_stock_history("ITC", years=3)
-        
-        # Save to JSON file
-        logger.info("Saving historical data...")
-        save_history_to_json(history_data, "ITC", 3)
+        logger.info("Starting historical data update process...")
+        update_history_store("ITC", years=3)
         
         logger.info("Process completed successfully")
         
@@ -115,4 +154,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
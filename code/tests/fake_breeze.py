@@ -0,0 +1,424 @@
+"""
+Fake Breeze Connect
+
+Offline replacement of the BreezeConnect client used by BreezeApi, streaming ticks to
+the registered on_ticks callback without an ICICI session, for throughput tests of
+the tick path (handle_tick_data, FallBuy.get_tick, TickDispatcher).
+
+Ticks of the subscribed tokens are generated round-robin at a configurable rate
+(e.g. 1k-50k ticks/s across many symbols) from either:
+- a replay of stored daily history (HistoryStore or history JSON), each bar expanded
+  to an open -> low/high -> close intraday path, or
+- a seeded random walk from a start price.
+
+Each tick has the Breeze quote feed fields ('symbol' is the isec_token_level1 token,
+'last' the traded price) plus 'sent_at' (time.perf_counter() at emission) for
+tick-to-order latency measurements.
+
+Example:
+    breeze_api.breeze = FakeBreezeConnect(prices={"ITC": 430.0}, tick_rate=5000, seed=1)
+    breeze_api.connect_socket()
+    breeze_api.set_on_ticks(dispatcher.submit)
+    breeze_api.subscribe_feed_token(breeze_api.get_icici_token_name("ITC"))
+    breeze_api.breeze.start_stream(duration=10)
+    print(breeze_api.breeze.get_stats())
+"""
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Random walk prices are generated in blocks of this many ticks per symbol
+WALK_BLOCK_SIZE = 4096
+
+
+class _FakeSocket:
+    """Stand-in for BreezeConnect.sio (callers check sio.connected)"""
+
+    def __init__(self):
+        self.connected = False
+
+
+class _PricePath:
+    """Endless price sequence of one symbol"""
+
+    def __init__(self, prices: Optional[np.ndarray] = None, start_price: float = 100.0,
+                 volatility: float = 0.0005, tick_size: float = 0.05, rng: Optional[np.random.Generator] = None):
+        self.replay = prices
+        self.price = start_price if prices is None else float(prices[0])
+        self.volatility = volatility
+        self.tick_size = tick_size
+        self.rng = rng or np.random.default_rng()
+        self.buffer: List[float] = []
+        self.position = 0
+        self.open: Optional[float] = None
+        self.high = self.low = self.price
+
+    def _next_block(self) -> List[float]:
+        if self.replay is not None:
+            # Loop the replayed history
+            return self.replay.tolist()
+        steps = self.rng.normal(0.0, self.volatility, WALK_BLOCK_SIZE)
+        walk = self.price * np.exp(np.cumsum(steps))
+        walk = np.maximum(np.round(walk / self.tick_size) * self.tick_size, self.tick_size)
+        return np.round(walk, 2).tolist()
+
+    def next(self) -> float:
+        if self.position >= len(self.buffer):
+            self.buffer = self._next_block()
+            self.position = 0
+        self.price = self.buffer[self.position]
+        self.position += 1
+        if self.open is None:
+            self.open = self.high = self.low = self.price
+        self.high = max(self.high, self.price)
+        self.low = min(self.low, self.price)
+        return self.price
+
+
+def history_tick_path(bars: Dict[str, np.ndarray], ticks_per_bar: int = 20, tick_size: float = 0.05) -> np.ndarray:
+    """
+    Expand daily bars into an intraday tick price path
+
+    Each bar moves open -> low -> high -> close on up days and open -> high -> low -> close
+    on down days, linearly interpolated and rounded to the tick size.
+
+    Parameters:
+    - bars: Dictionary with 'open', 'high', 'low' and 'close' arrays
+    - ticks_per_bar: Number of ticks generated per bar (at least 4)
+    - tick_size: Price tick size
+
+    Returns:
+    Array of tick prices
+    """
+    ticks_per_bar = max(4, int(ticks_per_bar))
+    opens, highs, lows, closes = (np.asarray(bars[column], dtype=np.float64)
+                                  for column in ('open', 'high', 'low', 'close'))
+    up = closes >= opens
+    anchors = np.column_stack([opens, np.where(up, lows, highs), np.where(up, highs, lows), closes]).ravel()
+
+    # Anchors of a bar sit at positions 0..3 of that bar; sample ticks_per_bar points per bar
+    bar_positions = np.linspace(0.0, 3.0, ticks_per_bar)
+    positions = (np.arange(len(opens))[:, None] * 4 + bar_positions[None, :]).ravel()
+    path = np.interp(positions, np.arange(len(anchors)), anchors)
+    return np.round(np.round(path / tick_size) * tick_size, 2)
+
+
+class FakeBreezeConnect:
+    """Class to simulate the BreezeConnect client and its websocket tick feed"""
+
+    def __init__(self, prices: Optional[Dict[str, float]] = None, tick_rate: Optional[float] = 1000.0,
+                 volatility: float = 0.0005, tick_size: float = 0.05, tokens: Optional[Dict[str, str]] = None,
+                 batch_ticks: bool = False, seed: Optional[int] = None):
+        """
+        Initialize the fake client
+
+        Parameters:
+        - prices: Random walk start prices by stock code (unknown codes start at 100)
+        - tick_rate: Total ticks per second across all subscribed tokens (None streams as fast as possible)
+        - volatility: Standard deviation of the random walk log return per tick
+        - tick_size: Price tick size of the generated prices
+        - tokens: isec_token_level1 tokens by stock code (default: generated "4.1!<n>" tokens)
+        - batch_ticks: If True, on_ticks receives a list of all ticks due at once instead of one tick per call
+        - seed: Random seed of the random walks
+        """
+        self.prices = dict(prices or {})
+        self.tick_rate = tick_rate
+        self.volatility = volatility
+        self.tick_size = tick_size
+        self.batch_ticks = batch_ticks
+        self.on_ticks: Optional[Callable[[Any], None]] = None
+        self.sio = _FakeSocket()
+        self.rng = np.random.default_rng(seed)
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, str] = {}
+        self._codes_by_token: Dict[str, str] = {}
+        self._paths: Dict[str, _PricePath] = {}
+        self._subscribed: List[str] = []
+        self._token_numbers = itertools.count(1001)
+        for stock_code, token in (tokens or {}).items():
+            self._register(stock_code.upper(), token)
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._emitted = 0
+        self._callback_errors = 0
+        self._callback_time = 0.0
+        self._max_backlog = 0
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+
+    def _register(self, stock_code: str, token: Optional[str] = None) -> str:
+        """Get (or assign) the token of a stock code"""
+        with self._lock:
+            if stock_code not in self._tokens:
+                token = token or f"4.1!{next(self._token_numbers)}"
+                self._tokens[stock_code] = token
+                self._codes_by_token[token] = stock_code
+            return self._tokens[stock_code]
+
+    def _get_path(self, stock_code: str) -> _PricePath:
+        path = self._paths.get(stock_code)
+        if path is None:
+            path = _PricePath(start_price=float(self.prices.get(stock_code, 100.0)), volatility=self.volatility,
+                              tick_size=self.tick_size, rng=self.rng)
+            self._paths[stock_code] = path
+        return path
+
+    # ------------------------------------------------------------------
+    # Simulation control
+    # ------------------------------------------------------------------
+
+    def load_history(self, stock_code: str, history_dir: str = os.path.join('workdir', 'history'),
+                     file_path: Optional[str] = None, ticks_per_bar: int = 20) -> int:
+        """
+        Replay stored daily history as the tick source of a stock
+
+        Parameters:
+        - stock_code: Stock symbol (e.g., "ITC")
+        - history_dir: Directory holding the history store or history JSON
+        - file_path: Explicit history JSON file (overrides history_dir)
+        - ticks_per_bar: Number of ticks generated per daily bar
+
+        Returns:
+        - Number of ticks in the replayed path (the replay loops when it ends)
+        """
+        from backtest_gtt_fall_buy import load_history_bars
+
+        stock_code = stock_code.upper()
+        prices = history_tick_path(load_history_bars(stock_code, history_dir, file_path), ticks_per_bar,
+                                   self.tick_size)
+        self._register(stock_code)
+        self._paths[stock_code] = _PricePath(prices=prices, tick_size=self.tick_size)
+        logging.info(f"Replaying {len(prices)} history ticks for {stock_code}")
+        return len(prices)
+
+    def _build_tick(self, token: str) -> Dict[str, Any]:
+        stock_code = self._codes_by_token.get(token, token)
+        path = self._get_path(stock_code)
+        last = path.next()
+        open_price = path.open
+        return {
+            'symbol': token,
+            'open': open_price,
+            'last': last,
+            'high': path.high,
+            'low': path.low,
+            'change': round((last - open_price) / open_price * 100, 2) if open_price else 0.0,
+            'bPrice': round(last - self.tick_size, 2),
+            'bQty': 100,
+            'sPrice': round(last + self.tick_size, 2),
+            'sQty': 100,
+            'ltq': 1,
+            'avgPrice': last,
+            'quotes': 'Quotes Data',
+            'ttq': self._emitted,
+            'close': open_price,
+            'exchange': 'NSE Equity',
+            'stock_name': stock_code,
+            'sent_at': time.perf_counter()
+        }
+
+    def _deliver(self, ticks: List[Dict[str, Any]]) -> None:
+        callback = self.on_ticks
+        if callback is None:
+            return
+        started = time.perf_counter()
+        if self.batch_ticks:
+            try:
+                callback(ticks)
+            except Exception as e:
+                self._callback_errors += 1
+                logging.error(f"on_ticks callback failed: {e}")
+        else:
+            for tick in ticks:
+                try:
+                    callback(tick)
+                except Exception as e:
+                    self._callback_errors += 1
+                    logging.error(f"on_ticks callback failed: {e}")
+        self._callback_time += time.perf_counter() - started
+
+    def emit(self, count: int = 1) -> int:
+        """
+        Generate and deliver ticks immediately (round-robin over the subscribed tokens)
+
+        Parameters:
+        - count: Number of ticks to deliver
+
+        Returns:
+        - Number of ticks delivered (0 if nothing is subscribed)
+        """
+        tokens = list(self._subscribed)
+        if not tokens or count <= 0:
+            return 0
+        ticks = []
+        for _ in range(count):
+            ticks.append(self._build_tick(tokens[self._emitted % len(tokens)]))
+            self._emitted += 1
+        self._deliver(ticks)
+        return count
+
+    def _stream(self, duration: Optional[float], max_ticks: Optional[int], max_batch: int) -> None:
+        start = time.perf_counter()
+        self._started_at = start
+        emitted = 0
+        while not self._stop_event.is_set():
+            elapsed = time.perf_counter() - start
+            if duration is not None and elapsed >= duration:
+                break
+            if max_ticks is not None and emitted >= max_ticks:
+                break
+
+            due = int(elapsed * self.tick_rate) if self.tick_rate else emitted + max_batch
+            if max_ticks is not None:
+                due = min(due, max_ticks)
+            if due <= emitted:
+                time.sleep(min(0.001, (emitted + 1) / self.tick_rate - elapsed))
+                continue
+
+            backlog = due - emitted
+            self._max_backlog = max(self._max_backlog, backlog)
+            sent = self.emit(min(backlog, max_batch))
+            if not sent:
+                # Nothing subscribed yet: wait without building up a backlog
+                time.sleep(0.001)
+                if self.tick_rate:
+                    start = time.perf_counter() - emitted / self.tick_rate
+            emitted += sent
+        self._stopped_at = time.perf_counter()
+
+    def start_stream(self, duration: Optional[float] = None, max_ticks: Optional[int] = None,
+                     max_batch: int = 500, block: bool = True) -> Dict[str, Any]:
+        """
+        Stream ticks to on_ticks at tick_rate
+
+        Parameters:
+        - duration: Seconds to stream (None streams until stop_stream() or max_ticks)
+        - max_ticks: Number of ticks after which the stream ends
+        - max_batch: Maximum ticks generated per scheduling step when the consumer falls behind
+        - block: If True, stream on the calling thread and return the stats at the end;
+          otherwise stream on a background thread
+
+        Returns:
+        Stream statistics (see get_stats)
+        """
+        self.stop_stream()
+        self._stop_event.clear()
+        self._reset_stats()
+        if block:
+            self._stream(duration, max_ticks, max_batch)
+        else:
+            self._thread = threading.Thread(target=self._stream, args=(duration, max_ticks, max_batch),
+                                            name="fake-breeze-ticks", daemon=True)
+            self._thread.start()
+        return self.get_stats()
+
+    def stop_stream(self) -> None:
+        """Stop a background tick stream"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get tick stream statistics
+
+        Returns:
+        Dictionary with ticks emitted, target and achieved ticks/s, seconds spent in the
+        on_ticks callback, callback errors and the largest backlog of ticks behind schedule
+        """
+        started = self._started_at
+        ended = self._stopped_at or time.perf_counter()
+        elapsed = ended - started if started else 0.0
+        return {
+            'ticks': self._emitted,
+            'subscribed': len(self._subscribed),
+            'target_rate': self.tick_rate,
+            'elapsed': elapsed,
+            'ticks_per_second': self._emitted / elapsed if elapsed else 0.0,
+            'callback_seconds': self._callback_time,
+            'callback_ticks_per_second': self._emitted / self._callback_time if self._callback_time else 0.0,
+            'callback_errors': self._callback_errors,
+            'max_backlog': self._max_backlog
+        }
+
+    # ------------------------------------------------------------------
+    # BreezeConnect client methods
+    # ------------------------------------------------------------------
+
+    def generate_session(self, api_secret: str = '', session_token: str = '') -> None:
+        return None
+
+    def ws_connect(self) -> None:
+        self.sio.connected = True
+
+    def ws_disconnect(self) -> None:
+        self.stop_stream()
+        self.sio.connected = False
+
+    def subscribe_feeds(self, stock_token: str = '', exchange_code: str = '', stock_code: str = '',
+                        product_type: str = '', **kwargs) -> Dict[str, str]:
+        if not self.sio.connected:
+            raise ConnectionError("Websocket is not connected")
+        token = stock_token or self._register(stock_code.upper())
+        if token not in self._codes_by_token:
+            # Unknown token: stream it as its own synthetic stock
+            with self._lock:
+                self._codes_by_token[token] = token
+        with self._lock:
+            if token not in self._subscribed:
+                self._subscribed = self._subscribed + [token]
+        return {'message': f"Stock {token} subscribed successfully"}
+
+    def unsubscribe_feeds(self, stock_token: str = '', exchange_code: str = '', stock_code: str = '',
+                          product_type: str = '', **kwargs) -> Dict[str, str]:
+        token = stock_token or self._tokens.get(stock_code.upper(), '')
+        with self._lock:
+            self._subscribed = [t for t in self._subscribed if t != token]
+        return {'message': f"Stock {token} unsubscribed successfully"}
+
+    def get_names(self, exchange_code: str = 'NSE', stock_code: str = '') -> Dict[str, str]:
+        stock_code = stock_code.upper()
+        token = self._register(stock_code)
+        return {
+            'exchange_code': exchange_code,
+            'exchange_stock_code': stock_code,
+            'isec_stock_code': stock_code,
+            'isec_token': token.split('!')[-1],
+            'company name': stock_code,
+            'isec_token_level1': token,
+            'isec_token_level2': token.replace('4.1!', '4.2!')
+        }
+
+    def get_quotes(self, stock_code: str = '', exchange_code: str = 'NSE', product_type: str = 'cash',
+                   **kwargs) -> Dict[str, Any]:
+        stock_code = stock_code.upper()
+        path = self._get_path(stock_code)
+        return {
+            'Success': [{
+                'exchange_code': exchange_code,
+                'product_type': product_type,
+                'stock_code': stock_code,
+                'ltp': path.price,
+                'ltt': datetime.now().strftime('%d-%b-%Y %H:%M:%S'),
+                'best_bid_price': round(path.price - self.tick_size, 2),
+                'best_offer_price': round(path.price + self.tick_size, 2)
+            }],
+            'Status': 200,
+            'Error': None
+        }
@@ -0,0 +1,772 @@
+"""
+Fake Kite Connect
+
+In-process and localhost fakes of the Kite Connect REST endpoints used by
+KiteConnectAPI, for latency and throughput benchmarks of the order paths without
+network access or a live session.
+
+- FakeKiteConnect: drop-in replacement for the KiteConnect client holding the
+  simulated account (GTTs, orders, holdings, positions, margins, prices). Assign it
+  to KiteConnectAPI.kite. GTTs trigger and orders fill as prices are fed in with
+  set_price() / run_price_path().
+- FakeKiteServer: localhost HTTP server serving a FakeKiteConnect on the Kite REST
+  routes, for a real KiteConnect(api_key, root=server.url) client.
+
+Both inject the configured latency and 429 (rate limit) errors on every call.
+
+Example:
+    kite_api = KiteConnectAPI("ITC")
+    kite_api.kite = FakeKiteConnect(prices={"ITC": 430.0}, latency=0.05)
+    kite_api.place_gtt_order("ITC", "NSE", "BUY", 1, 428.95, 428.85, current_price=430.0)
+    kite_api.kite.run_price_path("ITC", [429.5, 428.8, 431.0])
+"""
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, List, Optional, Sequence, Union
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kiteconnect import exceptions as kite_exceptions
+from rate_limiter import TokenBucket
+
+# Kite Connect rate limits (requests per second) by route; 'default' covers other routes
+KITE_RATE_LIMITS = {
+    'market.quote': 1,
+    'market.quote.ltp': 10,
+    'order.place': 10,
+    'order.cancel': 10,
+    'default': 10
+}
+
+INSTRUMENT_COLUMNS = ['instrument_token', 'exchange_token', 'tradingsymbol', 'name', 'last_price', 'expiry',
+                      'strike', 'tick_size', 'lot_size', 'instrument_type', 'segment', 'exchange']
+
+
+def _now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class FakeKiteConnect:
+    """Class to simulate a Kite Connect account and client in-process"""
+
+    # Same constants as kiteconnect.KiteConnect
+    EXCHANGE_NSE = 'NSE'
+    EXCHANGE_BSE = 'BSE'
+    GTT_TYPE_SINGLE = 'single'
+    GTT_TYPE_OCO = 'two-leg'
+    GTT_STATUS_ACTIVE = 'active'
+    GTT_STATUS_TRIGGERED = 'triggered'
+    GTT_STATUS_DELETED = 'deleted'
+    ORDER_TYPE_LIMIT = 'LIMIT'
+    ORDER_TYPE_MARKET = 'MARKET'
+    PRODUCT_CNC = 'CNC'
+    PRODUCT_MIS = 'MIS'
+    TRANSACTION_TYPE_BUY = 'BUY'
+    TRANSACTION_TYPE_SELL = 'SELL'
+    VALIDITY_DAY = 'DAY'
+    VARIETY_REGULAR = 'regular'
+    STATUS_COMPLETE = 'COMPLETE'
+    STATUS_CANCELLED = 'CANCELLED'
+    STATUS_REJECTED = 'REJECTED'
+
+    def __init__(self, prices: Optional[Dict[str, float]] = None, cash: float = 1_000_000.0,
+                 latency: Union[float, Callable[[], float]] = 0.0,
+                 rate_limits: Optional[Dict[str, float]] = None, error_rate: float = 0.0,
+                 instruments: Optional[List[Dict[str, Any]]] = None, tick_size: float = 0.05,
+                 seed: Optional[int] = None):
+        """
+        Initialize the fake account
+
+        Parameters:
+        - prices: Initial last prices by symbol ("ITC") or exchange key ("NSE:ITC")
+        - cash: Available cash for buys
+        - latency: Seconds added to every call, or a function returning them (e.g. random jitter)
+        - rate_limits: Requests per second by route name (see KITE_RATE_LIMITS); excess calls get a 429
+        - error_rate: Probability of a random 429 on any call
+        - instruments: Instrument records (default: one NSE EQ instrument per priced symbol)
+        - tick_size: Tick size of the generated instruments
+        - seed: Random seed for latency and error injection
+        """
+        self.api_key = 'fake_api_key'
+        self.access_token = 'fake_access_token'
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limits = rate_limits
+        self.tick_size = tick_size
+        self.random = random.Random(seed)
+
+        self._lock = threading.RLock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._prices: Dict[str, float] = {}
+        self._gtts: Dict[int, Dict[str, Any]] = {}
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._holdings: Dict[str, Dict[str, Any]] = {}
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        self._cash = cash
+        self._gtt_ids = itertools.count(100000001)
+        self._order_ids = itertools.count(250000000000001)
+        self._order_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._stats = {'calls': {}, 'throttled': {}, 'gtts_triggered': 0, 'orders_filled': 0}
+
+        for symbol, price in (prices or {}).items():
+            self._prices[self._key(symbol)] = float(price)
+        self._instruments = instruments if instruments is not None else self._generate_instruments()
+
+    # ------------------------------------------------------------------
+    # Simulation controls
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(symbol: str, exchange: str = 'NSE') -> str:
+        return symbol.upper() if ':' in symbol else f"{exchange.upper()}:{symbol.upper()}"
+
+    def _generate_instruments(self) -> List[Dict[str, Any]]:
+        instruments = []
+        for token, key in enumerate(sorted(self._prices), start=1):
+            exchange, symbol = key.split(':')
+            instruments.append({
+                'instrument_token': token, 'exchange_token': str(token), 'tradingsymbol': symbol,
+                'name': symbol, 'last_price': 0.0, 'expiry': '', 'strike': 0.0, 'tick_size': self.tick_size,
+                'lot_size': 1, 'instrument_type': 'EQ', 'segment': exchange, 'exchange': exchange
+            })
+        return instruments
+
+    def add_order_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a function called with every order update (Kite order payload format),
+        e.g. FakeOrderUpdateSource.emit or OrderUpdateListener.publish
+
+        Parameters:
+        - callback: Function receiving the order payload
+        """
+        self._order_listeners.append(callback)
+
+    def set_price(self, symbol: str, price: float, exchange: str = 'NSE') -> List[Dict[str, Any]]:
+        """
+        Move the last price of a symbol, triggering GTTs and filling open orders
+
+        Parameters:
+        - symbol: Trading symbol or exchange key
+        - price: New last price
+        - exchange: Exchange of the symbol
+
+        Returns:
+        List of order updates caused by the price move
+        """
+        key = self._key(symbol, exchange)
+        with self._lock:
+            self._prices[key] = float(price)
+            events = []
+            for gtt in list(self._gtts.values()):
+                if gtt['status'] == self.GTT_STATUS_ACTIVE and self._key(
+                        gtt['condition']['tradingsymbol'], gtt['condition']['exchange']) == key:
+                    events.extend(self._evaluate_gtt(gtt, price))
+            for order in list(self._orders.values()):
+                if order['status'] == 'OPEN' and self._key(order['tradingsymbol'], order['exchange']) == key:
+                    events.extend(self._match_order(order, price))
+        self._emit(events)
+        return events
+
+    def run_price_path(self, symbol: str, prices: Sequence[float], exchange: str = 'NSE',
+                       interval: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Feed a sequence of prices for a symbol
+
+        Parameters:
+        - symbol: Trading symbol
+        - prices: Prices in time order
+        - exchange: Exchange of the symbol
+        - interval: Seconds to wait between prices
+
+        Returns:
+        List of all order updates caused by the path
+        """
+        events = []
+        for price in prices:
+            events.extend(self.set_price(symbol, price, exchange))
+            if interval:
+                time.sleep(interval)
+        return events
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call counts and throttled counts by route plus triggered GTTs and filled orders"""
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    def _enter(self, route: str) -> None:
+        """Apply latency and rate limit / error injection to a call"""
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        with self._lock:
+            self._stats['calls'][route] = self._stats['calls'].get(route, 0) + 1
+            throttled = False
+            if self.rate_limits:
+                rate = self.rate_limits.get(route, self.rate_limits.get('default'))
+                if rate:
+                    bucket = self._buckets.get(route)
+                    if bucket is None:
+                        bucket = self._buckets[route] = TokenBucket(rate, capacity=rate)
+                    throttled = not bucket.try_acquire()
+            if not throttled and self.error_rate:
+                throttled = self.random.random() < self.error_rate
+            if throttled:
+                self._stats['throttled'][route] = self._stats['throttled'].get(route, 0) + 1
+
+        if throttled:
+            raise kite_exceptions.NetworkException("Too many requests", code=429)
+
+    def _emit(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            for callback in list(self._order_listeners):
+                try:
+                    callback(dict(event))
+                except Exception as e:
+                    logging.error(f"Error in fake order listener: {e}")
+
+    def _instrument_token(self, key: str) -> int:
+        exchange, symbol = key.split(':')
+        for instrument in self._instruments:
+            if instrument['exchange'] == exchange and instrument['tradingsymbol'] == symbol:
+                return int(instrument['instrument_token'])
+        return 0
+
+    def _last_price(self, key: str) -> float:
+        if key not in self._prices:
+            raise kite_exceptions.InputException(f"No price for {key}")
+        return self._prices[key]
+
+    # ------------------------------------------------------------------
+    # GTT simulation
+    # ------------------------------------------------------------------
+
+    def _build_gtt(self, trigger_id: int, trigger_type: str, tradingsymbol: str, exchange: str,
+                   trigger_values: List[float], last_price: float, orders: List[Dict[str, Any]],
+                   created_at: str) -> Dict[str, Any]:
+        if trigger_type not in (self.GTT_TYPE_SINGLE, self.GTT_TYPE_OCO):
+            raise kite_exceptions.InputException(f"Invalid trigger type {trigger_type}")
+        if len(trigger_values) != (1 if trigger_type == self.GTT_TYPE_SINGLE else 2):
+            raise kite_exceptions.InputException("Invalid trigger values for the trigger type")
+        if trigger_type == self.GTT_TYPE_SINGLE and abs(float(trigger_values[0]) - float(last_price)) < 0.01:
+            raise kite_exceptions.InputException("Trigger price should not be equal to the last price")
+
+        return {
+            'id': trigger_id,
+            'user_id': 'FAKE01',
+            'parent_trigger': None,
+            'type': trigger_type,
+            'created_at': created_at,
+            'updated_at': _now(),
+            'expires_at': None,
+            'status': self.GTT_STATUS_ACTIVE,
+            'condition': {
+                'exchange': exchange,
+                'tradingsymbol': tradingsymbol,
+                'instrument_token': self._instrument_token(self._key(tradingsymbol, exchange)),
+                'trigger_values': [float(value) for value in trigger_values],
+                'last_price': float(last_price)
+            },
+            'orders': [{
+                'exchange': exchange,
+                'tradingsymbol': tradingsymbol,
+                'transaction_type': order['transaction_type'],
+                'quantity': int(order['quantity']),
+                'order_type': order.get('order_type', self.ORDER_TYPE_LIMIT),
+                'product': order.get('product', self.PRODUCT_CNC),
+                'price': float(order['price']),
+                'result': None
+            } for order in orders],
+            'meta': {}
+        }
+
+    def _evaluate_gtt(self, gtt: Dict[str, Any], price: float) -> List[Dict[str, Any]]:
+        """Trigger a GTT if the price crossed its trigger value"""
+        condition = gtt['condition']
+        values = condition['trigger_values']
+        leg = None
+        if gtt['type'] == self.GTT_TYPE_SINGLE:
+            trigger = values[0]
+            # A single-leg GTT fires when the price reaches the trigger from the side it was placed on
+            if (trigger < condition['last_price'] and price <= trigger) or \
+                    (trigger > condition['last_price'] and price >= trigger):
+                leg = 0
+        elif price <= values[0]:
+            leg = 0
+        elif price >= values[1]:
+            leg = 1
+        if leg is None:
+            return []
+
+        gtt_order = gtt['orders'][leg]
+        gtt['status'] = self.GTT_STATUS_TRIGGERED
+        gtt['updated_at'] = _now()
+        self._stats['gtts_triggered'] += 1
+        order_id, events = self._create_order(gtt_order['exchange'], gtt_order['tradingsymbol'],
+                                              gtt_order['transaction_type'], gtt_order['quantity'],
+                                              gtt_order['product'], gtt_order['order_type'], gtt_order['price'],
+                                              tag=f"gtt:{gtt['id']}")
+        gtt_order['result'] = {
+            'order_result': {'order_id': order_id, 'status': 'success', 'rejection_reason': ''},
+            'timestamp': _now(),
+            'triggered_at': float(price),
+            'quantity': gtt_order['quantity'],
+            'price': gtt_order['price']
+        }
+        return events
+
+    # ------------------------------------------------------------------
+    # Order simulation
+    # ------------------------------------------------------------------
+
+    def _order_payload(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Order update payload as sent by KiteTicker on_order_update"""
+        return dict(order)
+
+    def _create_order(self, exchange: str, tradingsymbol: str, transaction_type: str, quantity: int,
+                      product: str, order_type: str, price: Optional[float], tag: Optional[str] = None) -> tuple:
+        """Create a regular order and match it against the current price"""
+        order_id = str(next(self._order_ids))
+        order = {
+            'order_id': order_id,
+            'exchange_order_id': order_id,
+            'status': 'OPEN',
+            'status_message': None,
+            'variety': self.VARIETY_REGULAR,
+            'exchange': exchange,
+            'tradingsymbol': tradingsymbol,
+            'instrument_token': self._instrument_token(self._key(tradingsymbol, exchange)),
+            'transaction_type': transaction_type,
+            'order_type': order_type,
+            'product': product,
+            'validity': self.VALIDITY_DAY,
+            'quantity': int(quantity),
+            'pending_quantity': int(quantity),
+            'filled_quantity': 0,
+            'cancelled_quantity': 0,
+            'price': float(price or 0),
+            'trigger_price': 0.0,
+            'average_price': 0.0,
+            'order_timestamp': _now(),
+            'exchange_timestamp': None,
+            'tag': tag
+        }
+        self._orders[order_id] = order
+        events = [self._order_payload(order)]
+
+        key = self._key(tradingsymbol, exchange)
+        if key in self._prices:
+            events.extend(self._match_order(order, self._prices[key]))
+        return order_id, events
+
+    def _match_order(self, order: Dict[str, Any], price: float) -> List[Dict[str, Any]]:
+        """Fill an open order if the price allows it"""
+        is_buy = order['transaction_type'] == self.TRANSACTION_TYPE_BUY
+        if order['order_type'] == self.ORDER_TYPE_MARKET:
+            fill_price = price
+        elif (is_buy and price <= order['price']) or (not is_buy and price >= order['price']):
+            fill_price = price
+        else:
+            return []
+
+        quantity = order['quantity']
+        key = self._key(order['tradingsymbol'], order['exchange'])
+        holding = self._holdings.get(key)
+        if is_buy and quantity * fill_price > self._cash:
+            return [self._reject(order, "Insufficient funds")]
+        if not is_buy and order['product'] == self.PRODUCT_CNC and (not holding or holding['quantity'] < quantity):
+            return [self._reject(order, "Insufficient holdings")]
+
+        order.update({'status': self.STATUS_COMPLETE, 'filled_quantity': quantity, 'pending_quantity': 0,
+                      'average_price': fill_price, 'exchange_timestamp': _now()})
+        self._stats['orders_filled'] += 1
+        self._apply_fill(key, order, fill_price)
+        return [self._order_payload(order)]
+
+    def _reject(self, order: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        order.update({'status': self.STATUS_REJECTED, 'status_message': reason, 'pending_quantity': 0})
+        return self._order_payload(order)
+
+    def _apply_fill(self, key: str, order: Dict[str, Any], fill_price: float) -> None:
+        """Update cash, holdings and positions for a filled order"""
+        exchange, symbol = key.split(':')
+        quantity = order['quantity']
+        signed_quantity = quantity if order['transaction_type'] == self.TRANSACTION_TYPE_BUY else -quantity
+        self._cash -= signed_quantity * fill_price
+
+        holding = self._holdings.setdefault(key, {
+            'tradingsymbol': symbol, 'exchange': exchange, 'instrument_token': order['instrument_token'],
+            'product': self.PRODUCT_CNC, 'quantity': 0, 't1_quantity': 0, 'average_price': 0.0,
+            'last_price': fill_price, 'pnl': 0.0
+        })
+        if signed_quantity > 0:
+            total_cost = holding['average_price'] * holding['quantity'] + fill_price * quantity
+            holding['quantity'] += quantity
+            holding['average_price'] = total_cost / holding['quantity']
+        else:
+            holding['quantity'] -= quantity
+            if holding['quantity'] == 0:
+                holding['average_price'] = 0.0
+
+        position = self._positions.setdefault(key, {
+            'tradingsymbol': symbol, 'exchange': exchange, 'instrument_token': order['instrument_token'],
+            'product': order['product'], 'quantity': 0, 'buy_quantity': 0, 'sell_quantity': 0,
+            'buy_value': 0.0, 'sell_value': 0.0, 'average_price': 0.0, 'last_price': fill_price, 'pnl': 0.0
+        })
+        position['quantity'] += signed_quantity
+        if signed_quantity > 0:
+            position['buy_quantity'] += quantity
+            position['buy_value'] += quantity * fill_price
+            position['average_price'] = position['buy_value'] / position['buy_quantity']
+        else:
+            position['sell_quantity'] += quantity
+            position['sell_value'] += quantity * fill_price
+
+    def _mark(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        record = dict(record)
+        last_price = self._prices.get(self._key(record['tradingsymbol'], record['exchange']), record['last_price'])
+        record['last_price'] = last_price
+        if 'buy_value' in record:
+            record['pnl'] = record['sell_value'] - record['buy_value'] + record['quantity'] * last_price
+        else:
+            record['pnl'] = (last_price - record['average_price']) * record['quantity']
+        return record
+
+    # ------------------------------------------------------------------
+    # KiteConnect client methods
+    # ------------------------------------------------------------------
+
+    def place_gtt(self, trigger_type: str, tradingsymbol: str, exchange: str, trigger_values: List[float],
+                  last_price: float, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Place a GTT (same signature as KiteConnect.place_gtt)"""
+        self._enter('gtt.place')
+        with self._lock:
+            trigger_id = next(self._gtt_ids)
+            self._gtts[trigger_id] = self._build_gtt(trigger_id, trigger_type, tradingsymbol, exchange,
+                                                     trigger_values, last_price, orders, _now())
+        return {'trigger_id': trigger_id}
+
+    def modify_gtt(self, trigger_id: int, trigger_type: str, tradingsymbol: str, exchange: str,
+                   trigger_values: List[float], last_price: float, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Modify an active GTT (same signature as KiteConnect.modify_gtt)"""
+        self._enter('gtt.modify')
+        with self._lock:
+            gtt = self._gtts.get(int(trigger_id))
+            if gtt is None or gtt['status'] != self.GTT_STATUS_ACTIVE:
+                raise kite_exceptions.InputException(f"Trigger {trigger_id} is not active")
+            self._gtts[int(trigger_id)] = self._build_gtt(int(trigger_id), trigger_type, tradingsymbol, exchange,
+                                                          trigger_values, last_price, orders, gtt['created_at'])
+        return {'trigger_id': int(trigger_id)}
+
+    def delete_gtt(self, trigger_id: int) -> Dict[str, Any]:
+        """Delete a GTT"""
+        self._enter('gtt.delete')
+        with self._lock:
+            if self._gtts.pop(int(trigger_id), None) is None:
+                raise kite_exceptions.InputException(f"Trigger {trigger_id} not found")
+        return {'trigger_id': int(trigger_id)}
+
+    def get_gtts(self) -> List[Dict[str, Any]]:
+        """Get all GTTs"""
+        self._enter('gtt')
+        with self._lock:
+            return json.loads(json.dumps(list(self._gtts.values())))
+
+    def get_gtt(self, trigger_id: int) -> Dict[str, Any]:
+        """Get one GTT"""
+        self._enter('gtt.info')
+        with self._lock:
+            gtt = self._gtts.get(int(trigger_id))
+            if gtt is None:
+                raise kite_exceptions.InputException(f"Trigger {trigger_id} not found")
+            return json.loads(json.dumps(gtt))
+
+    def ltp(self, *instruments) -> Dict[str, Dict[str, Any]]:
+        """Get last prices of 'EXCHANGE:SYMBOL' instruments"""
+        self._enter('market.quote.ltp')
+        keys = instruments[0] if len(instruments) == 1 and isinstance(instruments[0], (list, tuple)) else instruments
+        with self._lock:
+            return {key: {'instrument_token': self._instrument_token(self._key(key)),
+                          'last_price': self._prices[self._key(key)]}
+                    for key in keys if self._key(key) in self._prices}
+
+    def quote(self, *instruments) -> Dict[str, Dict[str, Any]]:
+        """Get quotes of 'EXCHANGE:SYMBOL' instruments"""
+        self._enter('market.quote')
+        keys = instruments[0] if len(instruments) == 1 and isinstance(instruments[0], (list, tuple)) else instruments
+        quotes = {}
+        with self._lock:
+            for key in keys:
+                if self._key(key) not in self._prices:
+                    continue
+                price = self._prices[self._key(key)]
+                quotes[key] = {
+                    'instrument_token': self._instrument_token(self._key(key)),
+                    'timestamp': _now(),
+                    'last_price': price,
+                    'last_quantity': 1,
+                    'volume': 0,
+                    'net_change': 0.0,
+                    'ohlc': {'open': price, 'high': price, 'low': price, 'close': price},
+                    'depth': {
+                        'buy': [{'price': round(price - self.tick_size, 2), 'quantity': 100, 'orders': 1}],
+                        'sell': [{'price': round(price + self.tick_size, 2), 'quantity': 100, 'orders': 1}]
+                    }
+                }
+        return quotes
+
+    def instruments(self, exchange: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the instrument master, optionally for one exchange"""
+        self._enter('market.instruments' if exchange else 'market.instruments.all')
+        return [dict(instrument) for instrument in self._instruments
+                if exchange is None or instrument['exchange'] == exchange.upper()]
+
+    def place_order(self, variety: str, exchange: str, tradingsymbol: str, transaction_type: str, quantity: int,
+                    product: str, order_type: str, price: Optional[float] = None, tag: Optional[str] = None,
+                    **kwargs) -> str:
+        """Place a regular order (same signature as KiteConnect.place_order)"""
+        self._enter('order.place')
+        if order_type == self.ORDER_TYPE_LIMIT and not price:
+            raise kite_exceptions.InputException("Price is required for LIMIT orders")
+        with self._lock:
+            order_id, events = self._create_order(exchange, tradingsymbol, transaction_type, quantity,
+                                                  product, order_type, price, tag)
+        self._emit(events)
+        return order_id
+
+    def cancel_order(self, variety: str = VARIETY_REGULAR, order_id: Optional[str] = None,
+                     parent_order_id: Optional[str] = None) -> str:
+        """Cancel an open order"""
+        self._enter('order.cancel')
+        with self._lock:
+            order = self._orders.get(str(order_id))
+            if order is None or order['status'] != 'OPEN':
+                raise kite_exceptions.OrderException(f"Order {order_id} cannot be cancelled")
+            order.update({'status': self.STATUS_CANCELLED, 'cancelled_quantity': order['pending_quantity'],
+                          'pending_quantity': 0})
+            event = self._order_payload(order)
+        self._emit([event])
+        return str(order_id)
+
+    def orders(self) -> List[Dict[str, Any]]:
+        """Get the orders of the day"""
+        self._enter('orders')
+        with self._lock:
+            return [dict(order) for order in self._orders.values()]
+
+    def holdings(self) -> List[Dict[str, Any]]:
+        """Get holdings"""
+        self._enter('portfolio.holdings')
+        with self._lock:
+            return [self._mark(holding) for holding in self._holdings.values() if holding['quantity'] > 0]
+
+    def positions(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get net and day positions"""
+        self._enter('portfolio.positions')
+        with self._lock:
+            positions = [self._mark(position) for position in self._positions.values()]
+            return {'net': positions, 'day': [dict(position) for position in positions]}
+
+    def margins(self, segment: Optional[str] = None) -> Dict[str, Any]:
+        """Get available margins"""
+        self._enter('user.margins')
+        with self._lock:
+            equity = {
+                'enabled': True,
+                'net': self._cash,
+                'available': {'cash': self._cash, 'live_balance': self._cash, 'opening_balance': self._cash,
+                              'collateral': 0.0, 'intraday_payin': 0.0, 'adhoc_margin': 0.0},
+                'utilised': {'debits': 0.0}
+            }
+        if segment:
+            return equity
+        return {'equity': equity, 'commodity': {'enabled': False, 'net': 0.0}}
+
+    def profile(self) -> Dict[str, Any]:
+        """Get the user profile"""
+        self._enter('user.profile')
+        return {'user_id': 'FAKE01', 'user_name': 'Fake User', 'email': 'fake@example.com',
+                'broker': 'ZERODHA', 'exchanges': ['NSE', 'BSE'], 'products': ['CNC', 'MIS']}
+
+
+class FakeKiteServer:
+    """Class to serve a FakeKiteConnect on the Kite Connect REST routes over localhost HTTP
+
+    Connections are kept alive (HTTP/1.1) like the real API; connect_latency is paid once
+    per new connection, standing in for the TCP + TLS handshake.
+    """
+
+    def __init__(self, kite: FakeKiteConnect, host: str = "127.0.0.1", port: int = 0,
+                 connect_latency: float = 0.0):
+        """
+        Initialize the server
+
+        Parameters:
+        - kite: Fake account to serve
+        - host: Interface to bind
+        - port: Port to listen on (0 picks a free port)
+        - connect_latency: Seconds added to the first request of every new connection
+        """
+        self.kite = kite
+        self.host = host
+        self.port = port
+        self.connect_latency = connect_latency
+        self.connections = 0
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Root URL to pass as KiteConnect(root=...)"""
+        return f"http://{self.host}:{self.port}"
+
+    def _route(self, method: str, path: str, params: Dict[str, Any]) -> Any:
+        """Dispatch a request to the fake account; returns response data or CSV text"""
+        kite = self.kite
+        parts = [part for part in path.split('/') if part]
+
+        if parts[:2] == ['gtt', 'triggers']:
+            if len(parts) == 2:
+                if method == 'GET':
+                    return kite.get_gtts()
+                if method == 'POST':
+                    condition = json.loads(params['condition'])
+                    return kite.place_gtt(params['type'], condition['tradingsymbol'], condition['exchange'],
+                                          condition['trigger_values'], condition['last_price'],
+                                          json.loads(params['orders']))
+            elif method == 'GET':
+                return kite.get_gtt(parts[2])
+            elif method == 'PUT':
+                condition = json.loads(params['condition'])
+                return kite.modify_gtt(parts[2], params['type'], condition['tradingsymbol'], condition['exchange'],
+                                       condition['trigger_values'], condition['last_price'],
+                                       json.loads(params['orders']))
+            elif method == 'DELETE':
+                return kite.delete_gtt(parts[2])
+        elif parts == ['quote', 'ltp']:
+            return kite.ltp(params.get('i', []))
+        elif parts == ['quote']:
+            return kite.quote(params.get('i', []))
+        elif parts[0] == 'orders':
+            if method == 'GET' and len(parts) == 1:
+                return kite.orders()
+            if method == 'POST' and len(parts) == 2:
+                order_params = {key: value for key, value in params.items()
+                                if key in ('exchange', 'tradingsymbol', 'transaction_type', 'product', 'order_type', 'tag')}
+                return {'order_id': kite.place_order(parts[1], quantity=int(params['quantity']),
+                                                     price=float(params['price']) if params.get('price') else None,
+                                                     **order_params)}
+            if method == 'DELETE' and len(parts) == 3:
+                return {'order_id': kite.cancel_order(parts[1], parts[2])}
+        elif parts == ['portfolio', 'holdings']:
+            return kite.holdings()
+        elif parts == ['portfolio', 'positions']:
+            return kite.positions()
+        elif parts[:2] == ['user', 'margins']:
+            return kite.margins(parts[2] if len(parts) > 2 else None)
+        elif parts == ['user', 'profile']:
+            return kite.profile()
+        elif parts[0] == 'instruments':
+            output = io.StringIO()
+            writer = csv.DictWriter(output, fieldnames=INSTRUMENT_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(kite.instruments(parts[1] if len(parts) > 1 else None))
+            return output.getvalue()
+
+        raise kite_exceptions.GeneralException(f"Route not found: {method} {path}", code=404)
+
+    def start(self) -> str:
+        """
+        Start serving in a background thread
+
+        Returns:
+        Root URL of the server
+        """
+        fake_server = self
+
+        class KiteRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; without this, delayed ACKs stall kept-alive connections
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                fake_server.connections += 1
+                if fake_server.connect_latency:
+                    time.sleep(fake_server.connect_latency)
+
+            def _handle(self, method: str):
+                parsed = urlparse(self.path)
+                params = {key: values if key == 'i' else values[0]
+                          for key, values in parse_qs(parsed.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode('utf-8')
+                    params.update({key: values[0] for key, values in parse_qs(body).items()})
+
+                try:
+                    data = fake_server._route(method, parsed.path, params)
+                    if isinstance(data, str):
+                        status, content_type, body = 200, 'text/csv', data.encode('utf-8')
+                    else:
+                        status, content_type = 200, 'application/json'
+                        body = json.dumps({'status': 'success', 'data': data}).encode('utf-8')
+                except kite_exceptions.KiteException as e:
+                    status, content_type = e.code, 'application/json'
+                    body = json.dumps({'status': 'error', 'error_type': type(e).__name__,
+                                       'message': str(e)}).encode('utf-8')
+                except (KeyError, ValueError) as e:
+                    status, content_type = 400, 'application/json'
+                    body = json.dumps({'status': 'error', 'error_type': 'InputException',
+                                       'message': f"Invalid request: {e}"}).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+            def log_message(self, format, *args):
+                logging.debug(f"Fake Kite server: {format % args}")
+
+        self.server = ThreadingHTTPServer((self.host, self.port), KiteRequestHandler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-kite", daemon=True)
+        self._thread.start()
+        logging.info(f"Fake Kite server listening on {self.url}")
+        return self.url
+
+    def stop(self) -> None:
+        """Stop the HTTP server"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,111 @@
+"""
+Async Kite Connect API Tests
+
+Runs AsyncKiteConnectAPI against a FakeKiteConnect account and checks that its
+gathered calls overlap and return what the sync KiteConnectAPI returns.
+
+Usage:
+    python -m pytest code/tests/test_async_kite_connect_api.py -q
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_kite_connect_api import AsyncKiteConnectAPI
+from fake_kite import FakeKiteConnect
+from kite_connect_api import KiteConnectAPI
+from kite_request_scheduler import KiteRequestScheduler
+
+PRICES = {'ITC': 430.0, 'ONGC': 250.0}
+LATENCY = 0.05
+
+
+class OverlapLatency:
+    """Fake call latency that records how many calls were in flight at once"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        self.peak = 0
+
+    def __call__(self) -> float:
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.in_flight -= 1
+        return 0.0
+
+
+def create_async_api(monkeypatch, tmp_path) -> AsyncKiteConnectAPI:
+    """Create an AsyncKiteConnectAPI over a sync KiteConnectAPI backed by a fresh FakeKiteConnect account"""
+    monkeypatch.chdir(tmp_path)
+    api = KiteConnectAPI(trading_symbol='ITC', request_scheduler=KiteRequestScheduler({'default': 1000}))
+    api.kite = FakeKiteConnect(prices=dict(PRICES), seed=0)
+    api.place_order(2)
+    for price in (425.0, 420.0, 415.0):
+        api.place_gtt_order('ITC', 'NSE', 'BUY', 1, price, price + 0.5, current_price=PRICES['ITC'])
+    api.kite.client.latency = OverlapLatency(LATENCY)
+    return AsyncKiteConnectAPI(api=api)
+
+
+def test_account_details_and_snapshot_match_the_sync_api(monkeypatch, tmp_path):
+    async_api = create_async_api(monkeypatch, tmp_path)
+    api = async_api.api
+    latency = api.kite.client.latency
+    peaks = []
+
+    async def run():
+        async with async_api:
+            latency.reset()
+            details = await async_api.get_account_details()
+            peaks.append(latency.peak)
+            latency.reset()
+            snapshot = await async_api.get_market_snapshot(list(PRICES), 0)
+            peaks.append(latency.peak)
+            return details, snapshot
+
+    details, snapshot = asyncio.run(run())
+    # profile/margins/holdings/positions, then the quote and the GTT book, were in flight together
+    assert peaks[0] >= 2 and peaks[1] == 2
+
+    assert details == api.get_account_details()
+    assert details['holdings'][0]['quantity'] == 2
+
+    def without_timestamps(live_data):
+        return {symbol: {key: value for key, value in data.items() if key != 'timestamp'}
+                for symbol, data in live_data.items()}
+
+    assert without_timestamps(snapshot['live_data']) == without_timestamps(api.get_multiple_live_data(list(PRICES)))
+    assert snapshot['gtt_orders'] == api.get_gtt_orders(max_age_seconds=0)
+
+
+def test_delete_gtt_orders_runs_concurrently_and_reports_each_result(monkeypatch, tmp_path):
+    async_api = create_async_api(monkeypatch, tmp_path)
+    api = async_api.api
+    latency = api.kite.client.latency
+    trigger_ids = [gtt['id'] for gtt in api.get_gtt_orders(max_age_seconds=0)]
+
+    async def run():
+        async with async_api:
+            return await async_api.delete_gtt_orders(trigger_ids[:2] + [999999])
+
+    latency.reset()
+    results = asyncio.run(run())
+
+    assert latency.peak >= 2
+    # Same results as the sync delete_gtt_order: True per deleted order, the error for the unknown one
+    assert results[:2] == [True, True]
+    assert isinstance(results[2], Exception)
+    assert [gtt['id'] for gtt in api.get_gtt_orders(max_age_seconds=0) if gtt['status'] == 'active'] == trigger_ids[2:]
@@ -0,0 +1,60 @@
+"""
+GTT Fall-Buy Backtest Tests
+
+Usage:
+    python -m pytest code/tests/test_backtest_gtt_fall_buy.py -q
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest_gtt_fall_buy import build_parameter_grid, run_backtest
+
+
+def make_bars(closes: list, lows: list) -> dict:
+    closes = np.array(closes, dtype=np.float64)
+    return {
+        'datetime': np.arange(len(closes)),
+        'open': closes.copy(),
+        'high': closes.copy(),
+        'low': np.array(lows, dtype=np.float64),
+        'close': closes
+    }
+
+
+def test_refill_tops_the_ladder_up_below_the_lowest_order():
+    # Ladder from 100: triggers 99.0, 98.1, 97.2 with limits two ticks above
+    params = build_parameter_grid(first_drops=[1.0], step_drops=[1.0], levels=[3], small_targets=[50.0],
+                                  large_targets=[50.0])
+    bars = make_bars([100.0, 99.5, 98.5, 96.5], [100.0, 99.0, 98.1, 95.0])
+
+    fixed = run_backtest(bars, params, 0.05, refill=False)
+    assert fixed['buy_fills'][0] == 3 and fixed['refill_orders'][0] == 0
+
+    # Bar 1 fills order 1 and refills below order 3 (limit 97.3): trigger 96.35, limit 95.4, 4 shares.
+    # Bar 2 fills order 2 and refills below that: trigger 94.45, limit 93.5, 5 shares.
+    # Bar 3 opens below order 3 (filled at the open), fills the first refill order, then
+    # refills two orders below 93.5.
+    refilled = run_backtest(bars, params, 0.05)
+    assert refilled['refill_orders'][0] == 4
+    assert refilled['buy_fills'][0] == 4
+    assert refilled['open_shares'][0] == 1 + 2 + 3 + 4
+    assert refilled['open_cost'][0] == pytest.approx(99.1 + 2 * 98.2 + 3 * 96.5 + 4 * 95.4)
+
+
+def test_refill_order_expires_when_only_its_trigger_is_reached():
+    params = build_parameter_grid(first_drops=[1.0], step_drops=[1.0], levels=[2], small_targets=[50.0],
+                                  large_targets=[50.0])
+    # The refill order after bar 1 triggers at 97.2 with its limit at 96.25, below bar 2's low
+    bars = make_bars([100.0, 99.5, 97.5, 97.5], [100.0, 99.0, 97.0, 97.0])
+
+    results = run_backtest(bars, params, 0.05)
+    assert results['buy_fills'][0] == 2
+    assert results['expired_orders'][0] == 1
+    # No buy order is left, so like the live strategy nothing is refilled
+    assert results['refill_orders'][0] == 1
@@ -0,0 +1,74 @@
+"""
+Array Charges Tests
+
+Checks the NumPy charge functions against the scalar functions they vectorise.
+
+Usage:
+    python -m pytest code/tests/test_charges_array.py -q
+"""
+import os
+import sys
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from charges import (calculate_zerodha_charges, calculate_profit_with_charges, required_sell_value,
+                     zerodha_charges_array, profit_with_charges_array, required_sell_value_array)
+
+# (buy_price, sell_price, quantity), including a zero buy price and a zero quantity
+TRADES = [(425.7, 430.05, 1), (100.0, 99.5, 250), (2500.0, 2650.0, 3), (15000.0, 15100.0, 1),
+          (0.0, 430.0, 10), (430.0, 435.0, 0), (0.0, 0.0, 0)]
+
+
+def test_charge_components_match_the_scalar_charges():
+    sell_values = np.array([sell_price * quantity for _, sell_price, quantity in TRADES])
+
+    charges = zerodha_charges_array(sell_values)
+
+    for i, (_, sell_price, quantity) in enumerate(TRADES):
+        expected = calculate_zerodha_charges(sell_price * quantity, quantity)
+        for key in ('stt', 'exchange_charges', 'sebi_fees', 'dp_charges', 'gst', 'total_charges'):
+            assert charges[key][i] == pytest.approx(expected[key], abs=1e-9), (key, TRADES[i])
+
+
+def test_profit_matches_the_scalar_profit():
+    buy_prices, sell_prices, quantities = (np.array(column, dtype=float) for column in zip(*TRADES))
+
+    profit = profit_with_charges_array(buy_prices, sell_prices, quantities)
+
+    for i, trade in enumerate(TRADES):
+        expected = calculate_profit_with_charges(*trade)
+        for key in ('buy_value', 'sell_value', 'gross_profit', 'total_charges', 'net_profit',
+                    'gross_profit_percentage', 'charges_percentage', 'net_profit_percentage',
+                    'break_even_price'):
+            assert profit[key][i] == pytest.approx(expected[key], abs=1e-9), (key, trade)
+            assert np.isfinite(profit[key][i]), (key, trade)
+
+
+def test_zero_buy_value_and_quantity_branches():
+    profit = profit_with_charges_array([0.0, 430.0], [430.0, 435.0], [10, 0])
+
+    # A zero buy value has no percentages; a zero quantity breaks even at the buy price
+    assert profit['net_profit_percentage'].tolist() == [0.0, 0.0]
+    assert profit['charges_percentage'].tolist() == [0.0, 0.0]
+    assert profit['break_even_price'][1] == 430.0
+
+
+def test_required_sell_value_matches_the_scalar_value():
+    buy_values = [425.7, 25000.0, 0.0, 7500.0]
+    targets = [1.0, 0.0, 5.0, -2.0]
+
+    values = required_sell_value_array(buy_values, targets)
+
+    assert values.tolist() == pytest.approx([required_sell_value(*args) for args in zip(buy_values, targets)])
+    # A scalar target is broadcast over the buy values
+    assert required_sell_value_array(buy_values, 1.0).tolist() == pytest.approx(
+        [required_sell_value(buy_value, 1.0) for buy_value in buy_values])
+    # Selling at the required value earns exactly the target
+    for buy_value, target, value in zip(buy_values, targets, values):
+        if buy_value > 0:
+            profit = calculate_profit_with_charges(buy_value, value, 1)
+            assert profit['net_profit_percentage'] == pytest.approx(target)
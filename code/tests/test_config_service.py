@@ -0,0 +1,97 @@
+"""
+Config Service Tests
+
+Usage:
+    python -m pytest code/tests/test_config_service.py -q
+"""
+import os
+import sys
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import yaml
+
+import config_service
+from config_service import ConfigError, ConfigService, get_config_service
+from kite_utils import update_access_token
+
+CONFIG = {
+    'kite_connect': {'api_key': 'test_api_key', 'api_secret': 'test_secret', 'access_token': 'old_token'},
+    'breeze_api': {'api_token': 'a', 'secret_token': 'b', 'session_id': 123},
+    'stratergy': {'order_count': 5, 'price_difference_percent': 1.5}
+}
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """config/config.yaml in a temporary working directory, with no shared service yet"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_service, '_shared_services', {})
+    path = tmp_path / 'config' / 'config.yaml'
+    path.parent.mkdir()
+    write_config(path, CONFIG)
+    return path
+
+
+def write_config(path, config: dict, mtime_offset: float = 0.0) -> None:
+    with open(path, 'w') as f:
+        yaml.dump(config, f)
+    if mtime_offset:
+        mtime = os.path.getmtime(path) + mtime_offset
+        os.utime(path, (mtime, mtime))
+
+
+def test_config_is_parsed_once_and_shared(config_path):
+    service = get_config_service()
+
+    credentials = service.get_kite_credentials()
+    assert credentials.api_key == 'test_api_key' and credentials.access_token == 'old_token'
+    assert service.get_breeze_credentials().session_id == 123
+    assert service.get_strategy_params().get('order_count') == 5
+    assert service.get_strategy_params().get('steps', 10) == 10
+    assert service.get_kite_credentials() is credentials
+    assert get_config_service() is service and service.loads == 1
+
+    # Callers get a copy of the whole config
+    service.get_config()['kite_connect']['api_key'] = 'changed'
+    assert service.get_kite_credentials().api_key == 'test_api_key'
+
+
+def test_reload_after_update_access_token_serves_the_new_token(config_path):
+    service = get_config_service()
+    assert service.get_kite_credentials().access_token == 'old_token'
+
+    # Within the mtime check interval, so only the explicit reload picks up the new token
+    update_access_token('new_token')
+
+    assert service.get_kite_credentials().access_token == 'new_token'
+    assert service.loads == 2
+    with open(config_path) as f:
+        saved = yaml.safe_load(f)
+    assert saved['kite_connect']['access_token'] == 'new_token'
+    assert saved['breeze_api'] == CONFIG['breeze_api']
+
+
+def test_changed_file_is_reloaded_and_an_invalid_edit_is_ignored(config_path):
+    service = ConfigService(str(config_path), check_interval=0)
+    assert service.get_strategy_params().order_count == 5
+
+    write_config(config_path, dict(CONFIG, stratergy={'order_count': 7}), mtime_offset=1)
+    assert service.get_strategy_params().order_count == 7
+
+    write_config(config_path, dict(CONFIG, stratergy={'order_count': 'many'}), mtime_offset=2)
+    assert service.get_strategy_params().order_count == 7
+    with pytest.raises(ConfigError):
+        service.reload()
+
+
+def test_missing_required_values_raise_config_error(config_path):
+    write_config(config_path, {'kite_connect': {'api_secret': 'test_secret'}})
+    service = get_config_service()
+
+    with pytest.raises(ConfigError, match='api_key'):
+        service.get_kite_credentials()
+    with pytest.raises(ConfigError, match='api_token'):
+        service.get_breeze_credentials()
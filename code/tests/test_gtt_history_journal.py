@@ -0,0 +1,98 @@
+"""
+GTT History Journal Tests
+
+Usage:
+    python -m pytest code/tests/test_gtt_history_journal.py -q
+"""
+import os
+import sys
+import threading
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gtt_history_journal import GTTHistoryJournal
+
+
+def make_order(trigger_id: int, price: float = 100.0, status: str = 'active') -> dict:
+    return {'trigger_id': trigger_id, 'price': price, 'quantity': 1, 'status': status}
+
+
+def test_two_journals_see_each_others_changes(tmp_path):
+    # gtt_fall_buy and cleanup_duplicate_orders.py each hold their own journal on the same files
+    strategy = GTTHistoryJournal('ITC', str(tmp_path))
+    cleanup = GTTHistoryJournal('ITC', str(tmp_path))
+
+    # The strategy keeps its own in-memory list, like all_gtt_orders and SymbolState.gtt_orders
+    gtt_orders = [make_order(1), make_order(2), make_order(3)]
+    strategy.record(gtt_orders)
+    assert [order['trigger_id'] for order in cleanup.load()] == [1, 2, 3]
+
+    # The cleanup removes a duplicate from another process
+    cleanup.record([order for order in cleanup.load() if order['trigger_id'] != 2])
+
+    # The strategy saves its stale list without reloading; only its own change is applied
+    gtt_orders[0]['status'] = 'triggered'
+    strategy.record(gtt_orders)
+    assert [order['trigger_id'] for order in GTTHistoryJournal('ITC', str(tmp_path)).load()] == [1, 3]
+    assert cleanup.load()[0]['status'] == 'triggered'
+
+    # Later saves and compactions of the same stale list keep the removal
+    gtt_orders.append(make_order(4))
+    strategy.record(gtt_orders)
+    strategy.compact()
+    assert [order['trigger_id'] for order in GTTHistoryJournal('ITC', str(tmp_path)).load()] == [1, 3, 4]
+
+
+def test_order_changed_by_the_other_process_is_kept(tmp_path):
+    strategy = GTTHistoryJournal('ITC', str(tmp_path))
+    cleanup = GTTHistoryJournal('ITC', str(tmp_path))
+    gtt_orders = [make_order(1), make_order(2)]
+    strategy.record(gtt_orders)
+
+    edited = cleanup.load()
+    edited[1]['price'] = 99.0
+    cleanup.record(edited)
+
+    gtt_orders.append(make_order(3))
+    strategy.record(gtt_orders)
+    assert GTTHistoryJournal('ITC', str(tmp_path)).load() == [make_order(1), make_order(2, price=99.0), make_order(3)]
+
+
+def test_appends_are_not_lost_to_a_concurrent_compaction(tmp_path):
+    writer = GTTHistoryJournal('ITC', str(tmp_path))
+    compactor = GTTHistoryJournal('ITC', str(tmp_path))
+    writer.record([make_order(0)])
+    done = threading.Event()
+
+    def compact_until_done():
+        while not done.is_set():
+            compactor.compact()
+
+    thread = threading.Thread(target=compact_until_done)
+    thread.start()
+    try:
+        gtt_orders = [make_order(0)]
+        for trigger_id in range(1, 40):
+            gtt_orders.append(make_order(trigger_id))
+            writer.record(gtt_orders)
+    finally:
+        done.set()
+        thread.join()
+
+    assert [order['trigger_id'] for order in GTTHistoryJournal('ITC', str(tmp_path)).load()] == list(range(40))
+    assert not os.path.exists(writer.lock_path)
+
+
+def test_replay_after_other_journal_compacts(tmp_path):
+    first = GTTHistoryJournal('ITC', str(tmp_path))
+    second = GTTHistoryJournal('ITC', str(tmp_path))
+
+    first.record([make_order(1), make_order(2)])
+    assert len(second.load()) == 2
+
+    second.compact([make_order(2, price=99.5)])
+    assert first.load() == [make_order(2, price=99.5)]
+
+    first.record(first.load() + [make_order(4)])
+    assert [order['trigger_id'] for order in second.load()] == [2, 4]
@@ -0,0 +1,63 @@
+"""
+History Store Tests
+
+Usage:
+    python -m pytest code/tests/test_history_store.py -q
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from breeze_sdk_api import HistoryFetchError
+from history_store import HistoryStore
+
+
+def daily_candles(start: datetime, end: datetime) -> list:
+    candles = []
+    day = start
+    while day < end:
+        candles.append({'datetime': day.strftime('%Y-%m-%d 00:00:00'), 'open': 100.0, 'high': 101.0,
+                        'low': 99.0, 'close': 100.5, 'volume': 1000})
+        day += timedelta(days=1)
+    return candles
+
+
+def test_failed_backfill_is_fetched_again(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    end_date = datetime(2024, 3, 1)
+    store.update('ITC', daily_candles, datetime(2024, 2, 1), end_date)
+
+    def failing_backfill(start, end):
+        if start < datetime(2024, 2, 1):
+            raise HistoryFetchError("Missing history", [(start, end)], daily_candles(start, start + timedelta(days=3)))
+        return daily_candles(start, end)
+
+    with pytest.raises(HistoryFetchError):
+        store.update('ITC', failing_backfill, datetime(2024, 1, 1), end_date)
+    assert store.read_header('ITC')['covered_from'] == '2024-02-01'
+    assert store.read_header('ITC')['first_timestamp'] == '2024-02-01T00:00:00'
+
+    fetched = []
+    store.update('ITC', lambda start, end: fetched.append((start, end)) or daily_candles(start, end),
+                 datetime(2024, 1, 1), end_date)
+    assert fetched[0][0] == datetime(2024, 1, 1)
+    assert store.read_header('ITC')['covered_from'] == '2024-01-01'
+    assert store.read_header('ITC')['count'] == 60
+
+
+def test_failed_forward_range_is_not_stored(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.update('ITC', daily_candles, datetime(2024, 2, 1), datetime(2024, 3, 1))
+
+    def failing_forward(start, end):
+        raise HistoryFetchError("Missing history", [(start, end)], daily_candles(end - timedelta(days=2), end))
+
+    with pytest.raises(HistoryFetchError):
+        store.update('ITC', failing_forward, datetime(2024, 2, 1), datetime(2024, 4, 1))
+    # The partial candles at the end of the range would have hidden the hole before them
+    assert store.read_header('ITC')['last_timestamp'] == '2024-02-29T00:00:00'
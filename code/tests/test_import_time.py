@@ -0,0 +1,127 @@
+"""
+Import Time Budget Test
+
+Imports each one-shot CLI script in a fresh interpreter with `python -X importtime`
+and checks that:
+- none of the heavy dependencies (Kite websocket stack, Breeze SDK, requests, numpy,
+  pandas) are loaded before the script actually uses them
+- importing it writes nothing to the working directory (loggers open their files lazily)
+- its cumulative import time stays under a budget, only when IMPORT_TIME_BUDGET_MS is
+  set (wall-clock timings depend on the machine and its load, so the default run does
+  not assert them)
+
+Usage:
+    python -m pytest code/tests/test_import_time.py -q
+    IMPORT_TIME_BUDGET_MS=300 python -m pytest code/tests/test_import_time.py -q
+    python code/tests/test_import_time.py          # prints the import time table
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Optional, Tuple
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per script when the budget is checked (measured ~60-115 ms)
+IMPORT_BUDGET_MS = 300
+# Environment variable that turns the budget check on, with its value as the budget in ms
+IMPORT_BUDGET_ENV = 'IMPORT_TIME_BUDGET_MS'
+
+CLI_MODULES = (
+    'delete_gtt_orders',
+    'cleanup_duplicate_orders',
+    'schedule_gtt_sell_order',
+    'gtt_fall_buy',
+    'multi_symbol_gtt_fall_buy'
+)
+
+# Imported only inside the functions that need them
+HEAVY_MODULES = ('kiteconnect', 'twisted', 'autobahn', 'breeze_connect', 'socketio', 'requests', 'numpy', 'pandas')
+
+
+def measure_import(module: str) -> Tuple[float, Dict[str, int], list]:
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Parameters:
+    - module: Module name (importable from code/)
+
+    Returns:
+    Tuple of (cumulative import time of the module in ms, cumulative microseconds
+    by imported module, files left in the working directory)
+    """
+    env = dict(os.environ, PYTHONPATH=CODE_DIR)
+    with tempfile.TemporaryDirectory(prefix='import_time_') as work_dir:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=work_dir, env=env, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, f"import {module} failed:\n{result.stderr[-2000:]}"
+        leftovers = os.listdir(work_dir)
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, total, name = line.split('|', 2)
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    return cumulative[module] / 1000, cumulative, leftovers
+
+
+def get_import_budget() -> Optional[float]:
+    """Get the import time budget in ms from IMPORT_TIME_BUDGET_MS (None when unset)"""
+    value = os.environ.get(IMPORT_BUDGET_ENV)
+    return float(value) if value else None
+
+
+def check_module(module: str, budget_ms: Optional[float] = None) -> float:
+    """
+    Assert the import hygiene of one module and return its import time in ms
+
+    Parameters:
+    - module: Module name (importable from code/)
+    - budget_ms: Import time budget in ms (None skips the timing check)
+
+    Returns:
+    - float: Cumulative import time in ms
+    """
+    import_ms, cumulative, leftovers = measure_import(module)
+    heavy = sorted(name for name in cumulative if name.split('.')[0] in HEAVY_MODULES)
+    assert not heavy, f"{module} imports heavy dependencies at module level: {heavy[:10]}"
+    assert not leftovers, f"Importing {module} wrote to the working directory: {leftovers}"
+    if budget_ms is not None:
+        assert import_ms < budget_ms, f"{module} took {import_ms:.1f} ms to import (budget {budget_ms:g} ms)"
+    return import_ms
+
+
+def test_delete_gtt_orders_import_time():
+    check_module('delete_gtt_orders', get_import_budget())
+
+
+def test_cleanup_duplicate_orders_import_time():
+    check_module('cleanup_duplicate_orders', get_import_budget())
+
+
+def test_schedule_gtt_sell_order_import_time():
+    check_module('schedule_gtt_sell_order', get_import_budget())
+
+
+def test_gtt_fall_buy_import_time():
+    check_module('gtt_fall_buy', get_import_budget())
+
+
+def test_multi_symbol_gtt_fall_buy_import_time():
+    check_module('multi_symbol_gtt_fall_buy', get_import_budget())
+
+
+if __name__ == "__main__":
+    failed = False
+    budget = get_import_budget() or IMPORT_BUDGET_MS
+    print(f"{'module':<28} {'import ms':>10}   (budget {budget:g} ms)")
+    for name in CLI_MODULES:
+        try:
+            print(f"{name:<28} {check_module(name, budget):>10.1f}")
+        except AssertionError as e:
+            failed = True
+            print(f"{name:<28} {'FAIL':>10}   {e}")
+    sys.exit(1 if failed else 0)
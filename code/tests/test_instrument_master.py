@@ -0,0 +1,110 @@
+"""
+Instrument Master Tests
+
+Usage:
+    python -m pytest code/tests/test_instrument_master.py -q
+"""
+import csv
+import logging
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrument_master
+from instrument_master import InstrumentMaster
+
+INSTRUMENT_ROWS = [
+    {'instrument_token': 424961, 'exchange_token': '1660', 'tradingsymbol': 'ITC', 'name': 'ITC',
+     'tick_size': 0.05, 'lot_size': 1, 'instrument_type': 'EQ', 'segment': 'NSE', 'exchange': 'NSE'},
+    {'instrument_token': 128224004, 'exchange_token': '500875', 'tradingsymbol': 'ITC', 'name': 'ITC',
+     'tick_size': 0.05, 'lot_size': 1, 'instrument_type': 'EQ', 'segment': 'BSE', 'exchange': 'BSE'},
+    {'instrument_token': 256265, 'exchange_token': '1001', 'tradingsymbol': 'NIFTY 50', 'name': 'NIFTY 50',
+     'tick_size': 0.0, 'lot_size': 0, 'instrument_type': 'EQ', 'segment': 'INDICES', 'exchange': 'NSE'},
+    {'instrument_token': 14536962, 'exchange_token': '56785', 'tradingsymbol': 'NIFTY25JUNFUT', 'name': 'NIFTY',
+     'tick_size': 0.1, 'lot_size': 75, 'instrument_type': 'FUT', 'segment': 'NFO-FUT', 'exchange': 'NFO'},
+    {'instrument_token': 5633, 'exchange_token': '22', 'tradingsymbol': 'ACC26JANFUT', 'name': 'ACC',
+     'tick_size': 0.1, 'lot_size': 300, 'instrument_type': 'FUT', 'segment': 'NFO-FUT', 'exchange': 'NFO'}
+]
+
+
+def write_instruments(path: str) -> None:
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(INSTRUMENT_ROWS[0].keys()))
+        writer.writeheader()
+        writer.writerows(INSTRUMENT_ROWS)
+
+
+def test_snapshot_master_falls_back_to_csv_for_other_segments(tmp_path):
+    file_path = str(tmp_path / 'instruments.csv')
+    write_instruments(file_path)
+    InstrumentMaster(file_path).load()
+
+    master = InstrumentMaster(file_path)
+    assert master.load()
+    assert master.source == 'snapshot'
+    assert master.get_tick_size('NSE', 'ITC') == 0.05
+    assert master.source == 'snapshot'
+
+    assert master.get_tick_size('NFO', 'NIFTY25JUNFUT') == 0.1
+    assert master.source == 'csv'
+    assert master.get_lot_size('NFO', 'ACC26JANFUT') == 300
+
+
+def test_snapshot_master_lists_every_instrument_of_an_exchange(tmp_path):
+    file_path = str(tmp_path / 'instruments.csv')
+    write_instruments(file_path)
+    InstrumentMaster(file_path).load()
+
+    master = InstrumentMaster(file_path)
+    symbols = sorted(record['tradingsymbol'] for record in master.get_exchange_instruments('NFO'))
+    assert symbols == ['ACC26JANFUT', 'NIFTY25JUNFUT']
+
+
+def test_concurrent_first_lookups_parse_the_csv_once(tmp_path, monkeypatch):
+    file_path = str(tmp_path / 'instruments.csv')
+    write_instruments(file_path)
+    master = InstrumentMaster(file_path)
+    parses = []
+    load_records = master.load_records
+
+    def slow_load_records(*args, **kwargs):
+        # A parse slow enough for every thread to arrive while it runs
+        parses.append(1)
+        time.sleep(0.05)
+        return load_records(*args, **kwargs)
+
+    monkeypatch.setattr(master, 'load_records', slow_load_records)
+
+    threads = [threading.Thread(target=master.get_tick_size, args=('NSE', 'ITC')) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(parses) == 1
+    assert master.get_tick_size('NSE', 'ITC') == 0.05
+
+
+def test_missing_file_is_reported_once(tmp_path, monkeypatch, caplog):
+    file_path = str(tmp_path / 'instruments.csv')
+    master = InstrumentMaster(file_path)
+    exists_calls = []
+    exists = os.path.exists
+    monkeypatch.setattr(instrument_master.os.path, 'exists', lambda path: exists_calls.append(path) or exists(path))
+
+    with caplog.at_level(logging.WARNING):
+        assert master.get_tick_size('NSE', 'ITC') is None
+        first_checks = len(exists_calls)
+        assert [master.get_tick_size('NSE', 'ITC') for _ in range(4)] == [None] * 4
+    assert len([record for record in caplog.records if 'not found' in record.getMessage()]) == 1
+    # Later lookups do not look for the file again
+    assert len(exists_calls) == first_checks
+
+    # A forced load picks up a file that was written in the meantime
+    write_instruments(file_path)
+    assert master.load(force=True)
+    assert master.get_tick_size('NSE', 'ITC') == 0.05
@@ -0,0 +1,169 @@
+"""
+KiteConnectAPI Tests
+
+Runs the GTT order paths of KiteConnectAPI against a FakeKiteConnect account.
+
+Usage:
+    python -m pytest code/tests/test_kite_connect_api.py -q
+"""
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_kite import FakeKiteConnect
+from kite_connect_api import KiteConnectAPI
+from kite_request_scheduler import KiteRequestScheduler
+
+SYMBOL = "ITC"
+START_PRICE = 430.0
+
+
+def create_kite_api(**kwargs) -> KiteConnectAPI:
+    """Create a KiteConnectAPI backed by a fresh FakeKiteConnect account"""
+    fake_kwargs = {'prices': {SYMBOL: START_PRICE}, 'seed': 0}
+    fake_kwargs.update(kwargs.pop('fake', {}))
+    kite_api = KiteConnectAPI(trading_symbol=SYMBOL, request_scheduler=KiteRequestScheduler({'default': 1000}),
+                              **kwargs)
+    kite_api.kite = FakeKiteConnect(**fake_kwargs)
+    return kite_api
+
+
+def buy_spec(price: float, trigger_price: float, quantity: int = 1) -> dict:
+    return {
+        'trading_symbol': SYMBOL,
+        'exchange': 'NSE',
+        'transaction_type': 'BUY',
+        'quantity': quantity,
+        'price': price,
+        'trigger_price': trigger_price,
+        'current_price': START_PRICE,
+        'idempotency_key': f"NSE:{SYMBOL}:BUY:{quantity}@{price}/{trigger_price}"
+    }
+
+
+def test_place_gtt_batch_dedupes_repeated_orders_across_batches():
+    kite_api = create_kite_api()
+
+    first = kite_api.place_gtt_batch([buy_spec(425.0, 425.5), buy_spec(420.0, 420.5), buy_spec(425.0, 425.5)])
+    assert [result['status'] for result in first] == ['PLACED', 'PLACED', 'DUPLICATE']
+    assert first[2]['trigger_id'] == first[0]['trigger_id']
+
+    # An overlapping cycle planning the same rung again does not place a second GTT
+    second = kite_api.place_gtt_batch([buy_spec(425.0, 425.5), buy_spec(415.0, 415.5)])
+    assert [result['status'] for result in second] == ['DUPLICATE', 'PLACED']
+    assert second[0]['trigger_id'] == first[0]['trigger_id']
+    assert len(kite_api.kite.get_gtts()) == 3
+
+
+def test_place_gtt_batch_keys_expire_and_are_released_on_delete():
+    kite_api = create_kite_api(gtt_dedupe_ttl=0.0)
+    first = kite_api.place_gtt_batch([buy_spec(425.0, 425.5)])
+    assert kite_api.place_gtt_batch([buy_spec(425.0, 425.5)])[0]['status'] == 'PLACED'
+
+    kite_api.gtt_dedupe_ttl = 300.0
+    kite_api.delete_gtt_order(first[0]['trigger_id'])
+    kept = kite_api.place_gtt_batch([buy_spec(420.0, 420.5)])
+    assert kite_api.place_gtt_batch([buy_spec(420.0, 420.5)])[0]['status'] == 'DUPLICATE'
+
+    # A deleted GTT can be placed again at once
+    kite_api.delete_gtt_order(kept[0]['trigger_id'])
+    assert kite_api.place_gtt_batch([buy_spec(420.0, 420.5)])[0]['status'] == 'PLACED'
+
+
+def test_place_gtt_batch_retries_rate_limited_orders():
+    kite_api = create_kite_api(fake={'error_rate': 0.3})
+    specs = [buy_spec(round(420.0 - i, 2), round(420.5 - i, 2)) for i in range(10)]
+
+    results = kite_api.place_gtt_batch(specs, max_retries=10)
+
+    assert [result['status'] for result in results] == ['PLACED'] * 10
+    assert kite_api.kite.get_stats()['throttled'].get('gtt.place', 0) > 0
+    kite_api.kite.client.error_rate = 0.0
+    assert len(kite_api.kite.get_gtts()) == 10
+
+
+def test_gtt_cache_drops_fetch_that_raced_a_write():
+    kite_api = create_kite_api()
+    fetch_gtt_orders = kite_api._fetch_gtt_orders
+
+    def fetch_then_write():
+        # The book is read, then our own write lands before the fetch returns
+        gtt_orders = fetch_gtt_orders()
+        kite_api.place_gtt_order(SYMBOL, "NSE", "BUY", 1, 425.0, 425.5, current_price=START_PRICE)
+        return gtt_orders
+
+    kite_api._fetch_gtt_orders = fetch_then_write
+    assert kite_api.get_gtt_orders() == []
+    kite_api._fetch_gtt_orders = fetch_gtt_orders
+
+    assert len(kite_api.get_gtt_orders()) == 1
+    assert kite_api.get_gtt_cache_stats()['dropped_stores'] == 1
+
+
+def test_gtt_cache_returns_copies_of_the_orders():
+    kite_api = create_kite_api()
+    kite_api.place_gtt_order(SYMBOL, "NSE", "BUY", 1, 425.0, 425.5, current_price=START_PRICE)
+
+    fetched = kite_api.get_gtt_orders()
+    fetched[0]['status'] = 'triggered'
+    fetched[0]['orders'][0]['price'] = 1.0
+    cached = kite_api.get_gtt_orders()
+    cached[0]['status'] = 'cancelled'
+
+    assert kite_api.get_gtt_cache_stats()['hits'] == 1
+    assert kite_api.get_gtt_orders()[0]['status'] == 'active'
+    assert kite_api.get_gtt_orders()[0]['orders'][0]['price'] == 425.0
+
+
+def test_overlapping_batches_send_a_shared_order_once():
+    kite_api = create_kite_api(fake={'latency': 0.1})
+    results = {}
+    first = threading.Thread(target=lambda: results.update(first=kite_api.place_gtt_batch([buy_spec(425.0, 425.5)])))
+    first.start()
+    time.sleep(0.05)
+
+    # A second cycle plans the same rung while the first batch is still sending it
+    second = kite_api.place_gtt_batch([buy_spec(425.0, 425.5), buy_spec(420.0, 420.5)])
+    first.join()
+
+    assert results['first'][0]['status'] == 'PLACED'
+    assert [result['status'] for result in second] == ['DUPLICATE', 'PLACED']
+    assert second[0]['trigger_id'] == results['first'][0]['trigger_id']
+    assert len(kite_api.kite.get_gtts()) == 2
+
+
+def test_failed_order_releases_its_key():
+    kite_api = create_kite_api(fake={'error_rate': 1.0})
+    assert kite_api.place_gtt_batch([buy_spec(425.0, 425.5)], max_retries=0)[0]['status'] == 'FAILED'
+
+    kite_api.kite.client.error_rate = 0.0
+    assert kite_api.place_gtt_batch([buy_spec(425.0, 425.5)])[0]['status'] == 'PLACED'
+
+
+def test_concurrent_cache_misses_share_one_fetch():
+    kite_api = create_kite_api(fake={'latency': 0.1})
+    kite_api.place_gtt_order(SYMBOL, "NSE", "BUY", 1, 425.0, 425.5, current_price=START_PRICE)
+    kite_api.gtt_cache.invalidate()
+    calls_before = kite_api.kite.get_stats()['calls'].get('gtt', 0)
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(kite_api.get_gtt_orders())) for _ in range(8)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert kite_api.kite.get_stats()['calls'].get('gtt', 0) - calls_before == 1
+    assert [len(orders) for orders in results] == [1] * 8
+    assert kite_api.get_gtt_cache_stats()['shared_fetches'] == 7
+    # Each caller gets its own copy of the shared result
+    results[0][0]['status'] = 'cancelled'
+    assert all(orders[0]['status'] == 'active' for orders in results[1:])
+
+    # Forcing a fresh read never joins an earlier fetch
+    assert len(kite_api.get_gtt_orders(max_age_seconds=0)) == 1
+    assert kite_api.kite.get_stats()['calls'].get('gtt', 0) - calls_before == 2
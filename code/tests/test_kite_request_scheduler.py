@@ -0,0 +1,119 @@
+"""
+Kite Request Scheduler Tests
+
+Sends bursts of Kite calls through KiteRequestScheduler to a rate limited FakeKiteConnect.
+
+Usage:
+    python -m pytest code/tests/test_kite_request_scheduler.py -q
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_kite import FakeKiteConnect
+from kite_request_scheduler import KiteRequestScheduler, ScheduledKiteClient, PRIORITY_ORDER, PRIORITY_POLL
+from rate_limiter import SharedTokenBucket
+
+# Kite's limits scaled up so a burst drains the buckets within a fraction of a second. The
+# account counts calls when they arrive, so the scheduler runs a little below it to absorb
+# the delay between a thread taking its slot and its call reaching the account.
+SCHEDULER_LIMITS = {'quote': 18, 'default': 45}
+ACCOUNT_LIMITS = {'market.quote': 20, 'default': 50}
+
+
+def run_burst(kite, threads: int = 4, calls: int = 6) -> None:
+    """Call quote and get_gtts from several threads at once, ignoring 429s"""
+    def worker():
+        for _ in range(calls):
+            for method, args in (('quote', (["NSE:ITC"],)), ('get_gtts', ())):
+                try:
+                    getattr(kite, method)(*args)
+                except Exception:
+                    pass
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+def test_scheduled_burst_is_not_rate_limited():
+    fake = FakeKiteConnect(prices={'ITC': 430.0}, rate_limits=ACCOUNT_LIMITS, seed=0)
+    run_burst(fake)
+    assert sum(fake.get_stats()['throttled'].values()) > 0
+
+    fake = FakeKiteConnect(prices={'ITC': 430.0}, rate_limits=ACCOUNT_LIMITS, seed=0)
+    scheduler = KiteRequestScheduler(SCHEDULER_LIMITS)
+    run_burst(ScheduledKiteClient(fake, scheduler))
+
+    assert fake.get_stats()['throttled'] == {}
+    stats = scheduler.get_stats()
+    assert stats['quote']['calls'] == 24 and stats['default']['calls'] == 24
+    assert stats['quote']['waited_calls'] > 0
+    assert stats['quote']['throttled'] == 0 and stats['default']['throttled'] == 0
+
+
+def test_order_writes_are_served_before_waiting_polls():
+    scheduler = KiteRequestScheduler({'default': 5})
+    for _ in range(5):
+        scheduler.acquire('default')
+
+    served = []
+
+    def acquire(name, priority):
+        scheduler.acquire('default', priority)
+        served.append(name)
+
+    poll = threading.Thread(target=acquire, args=('poll', PRIORITY_POLL))
+    poll.start()
+    time.sleep(0.02)
+    order = threading.Thread(target=acquire, args=('order', PRIORITY_ORDER))
+    order.start()
+    time.sleep(0.02)
+    assert scheduler.queue_depth('default') == 2
+
+    poll.join()
+    order.join()
+    assert served == ['order', 'poll']
+
+
+def test_shared_bucket_state_file_is_never_seen_half_written(tmp_path):
+    state_file = str(tmp_path / 'default.json')
+    # Two processes' views of one limit, with enough tokens that nobody waits
+    buckets = [SharedTokenBucket(state_file, rate=1000, capacity=1000) for _ in range(2)]
+    stop = threading.Event()
+    unreadable = []
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with open(state_file) as f:
+                    json.load(f)
+            except FileNotFoundError:
+                pass
+            except ValueError:
+                unreadable.append(1)
+
+    def taker(bucket):
+        for _ in range(300):
+            bucket.acquire()
+
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    takers = [threading.Thread(target=taker, args=(bucket,)) for bucket in buckets]
+    for thread in takers:
+        thread.start()
+    for thread in takers:
+        thread.join()
+    stop.set()
+    watcher.join()
+
+    assert unreadable == []
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
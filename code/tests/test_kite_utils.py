@@ -0,0 +1,95 @@
+"""
+Kite Utils Tests
+
+Looks up instrument tokens through the kite_utils token cache against a FakeKiteConnect account.
+
+Usage:
+    python -m pytest code/tests/test_kite_utils.py -q
+"""
+import os
+import sys
+import threading
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import kite_utils
+from fake_kite import FakeKiteConnect
+from kite_utils import clear_instrument_token_cache, get_instrument_token
+
+PRICES = {'ITC': 430.0, 'ONGC': 250.0, 'BSE:ITC': 430.0}
+
+
+@pytest.fixture
+def kite(tmp_path, monkeypatch):
+    """Fake account with no instruments.csv in the working directory and an empty token cache"""
+    monkeypatch.chdir(tmp_path)
+    clear_instrument_token_cache()
+    yield FakeKiteConnect(prices=dict(PRICES), seed=0)
+    clear_instrument_token_cache()
+
+
+def downloads(kite: FakeKiteConnect) -> int:
+    return kite.get_stats()['calls'].get('market.instruments', 0)
+
+
+def test_concurrent_first_lookups_download_the_exchange_once(kite):
+    kite.latency = 0.1
+    tokens = []
+    workers = [threading.Thread(target=lambda: tokens.append(get_instrument_token(kite, 'ITC')))
+               for _ in range(6)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert downloads(kite) == 1
+    assert len(set(tokens)) == 1 and len(tokens) == 6
+
+
+def test_download_does_not_block_other_exchanges(kite):
+    bse_token = get_instrument_token(kite, 'ITC', 'BSE')
+    release = threading.Event()
+    instruments = kite.instruments
+
+    def slow_instruments(exchange=None):
+        release.wait(5)
+        return instruments(exchange)
+
+    kite.instruments = slow_instruments
+    nse = threading.Thread(target=get_instrument_token, args=(kite, 'ITC'))
+    nse.start()
+    try:
+        # The NSE download is in flight; cached BSE lookups are answered meanwhile
+        looked_up = []
+        bse = threading.Thread(target=lambda: looked_up.append(get_instrument_token(kite, 'ITC', 'BSE')))
+        bse.start()
+        bse.join(1)
+        assert looked_up == [bse_token]
+    finally:
+        release.set()
+        nse.join()
+
+
+def test_missing_symbol_reloads_the_list_once_per_interval(kite, monkeypatch):
+    get_instrument_token(kite, 'ITC')
+    # A symbol listed after the list was loaded is found by one reload
+    kite._instruments.append({'instrument_token': 99, 'exchange_token': '99', 'tradingsymbol': 'NEWCO',
+                              'name': 'NEWCO', 'last_price': 0.0, 'expiry': '', 'strike': 0.0,
+                              'tick_size': 0.05, 'lot_size': 1, 'instrument_type': 'EQ',
+                              'segment': 'NSE', 'exchange': 'NSE'})
+    assert get_instrument_token(kite, 'NEWCO') == 99
+    assert downloads(kite) == 2
+
+    # An unknown symbol does not download the list again within the interval
+    with pytest.raises(Exception, match="not found"):
+        get_instrument_token(kite, 'UNKNOWN')
+    assert downloads(kite) == 2
+
+    monkeypatch.setattr(kite_utils, 'INSTRUMENT_TOKEN_RELOAD_SECONDS', 0.0)
+    with pytest.raises(Exception, match="not found"):
+        get_instrument_token(kite, 'UNKNOWN')
+    assert downloads(kite) == 3
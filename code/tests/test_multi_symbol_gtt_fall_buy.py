@@ -0,0 +1,166 @@
+"""
+Multi-Symbol GTT Fall Buy Tests
+
+Runs MultiSymbolGTTFallBuy cycles for two symbols against one FakeKiteConnect account,
+with ticks streamed by FakeBreezeConnect.
+
+Usage:
+    python -m pytest code/tests/test_multi_symbol_gtt_fall_buy.py -q
+"""
+import logging
+import os
+import sys
+import time
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gtt_fall_buy
+import multi_symbol_gtt_fall_buy
+from breeze_sdk_api import BreezeApi
+from fake_breeze import FakeBreezeConnect
+from fake_kite import FakeKiteConnect
+from gtt_fall_buy import get_active_buy_orders, load_gtt_history
+from kite_connect_api import KiteConnectAPI
+from kite_request_scheduler import KiteRequestScheduler
+from multi_symbol_gtt_fall_buy import MultiSymbolGTTFallBuy
+
+PRICES = {'ITC': 430.0, 'ONGC': 250.0}
+NUM_ORDERS = 3
+
+
+def create_runner(tmp_path, monkeypatch) -> MultiSymbolGTTFallBuy:
+    """Create a runner whose shared Kite session is a fresh FakeKiteConnect account"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(multi_symbol_gtt_fall_buy, 'is_market_hours', lambda: True)
+    runner = MultiSymbolGTTFallBuy(list(PRICES), num_orders=NUM_ORDERS)
+    runner.kite_api = KiteConnectAPI(trading_symbol='ITC', request_scheduler=KiteRequestScheduler({'default': 1000}))
+    runner.kite_api.kite = FakeKiteConnect(prices=dict(PRICES), seed=0)
+    for company_name, price in PRICES.items():
+        runner.states[company_name].update_price(price)
+    return runner
+
+
+def create_breeze_api(breeze) -> BreezeApi:
+    """Create a BreezeApi around a fake client (skipping __init__, which reads the Breeze credentials)"""
+    breeze_api = BreezeApi.__new__(BreezeApi)
+    breeze_api.symbol = 'ITC'
+    breeze_api.logger = logging.getLogger(__name__)
+    breeze_api.breeze = breeze
+    return breeze_api
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def initialize(runner: MultiSymbolGTTFallBuy) -> None:
+    book = runner.poll_gtt_book()
+    for company_name, state in runner.states.items():
+        runner.initialize_symbol(state, book[company_name])
+
+
+def active_buys(runner: MultiSymbolGTTFallBuy, company_name: str) -> list:
+    return get_active_buy_orders(runner.kite_api.get_gtt_orders(max_age_seconds=0), company_name)
+
+
+def test_initialize_places_one_ladder_per_symbol_and_saves_it_once(tmp_path, monkeypatch):
+    runner = create_runner(tmp_path, monkeypatch)
+    saves = []
+    save_gtt_history = gtt_fall_buy.save_gtt_history
+
+    def counted_save(company_name, orders, logger):
+        saves.append(company_name)
+        save_gtt_history(company_name, orders, logger)
+
+    monkeypatch.setattr(gtt_fall_buy, 'save_gtt_history', counted_save)
+    monkeypatch.setattr(multi_symbol_gtt_fall_buy, 'save_gtt_history', counted_save, raising=False)
+
+    initialize(runner)
+
+    assert sorted(saves) == ['ITC', 'ONGC']
+    for company_name, price in PRICES.items():
+        history = load_gtt_history(company_name, runner.logger)
+        assert [order['quantity'] for order in history] == [1, 2, 3]
+        assert all(order['price'] < price for order in history)
+        assert len(active_buys(runner, company_name)) == NUM_ORDERS
+
+    # The next start finds the ladders in the book and places nothing
+    initialize(runner)
+    assert len(runner.kite_api.kite.get_gtts()) == 2 * NUM_ORDERS
+
+
+def test_cycle_sells_and_refills_only_the_symbol_that_filled(tmp_path, monkeypatch):
+    runner = create_runner(tmp_path, monkeypatch)
+    initialize(runner)
+    itc = runner.states['ITC']
+    first_trigger = itc.gtt_orders[0]['trigger_price']
+    ongc_triggers = [order['trigger_id'] for order in runner.states['ONGC'].gtt_orders]
+    refill_books = {}
+    get_active = multi_symbol_gtt_fall_buy.get_active_buy_orders
+
+    def recording_get_active(gtt_orders, company_name):
+        refill_books[company_name] = gtt_orders
+        return get_active(gtt_orders, company_name)
+
+    monkeypatch.setattr(multi_symbol_gtt_fall_buy, 'get_active_buy_orders', recording_get_active)
+
+    runner.kite_api.kite.client.set_price('ITC', first_trigger - 0.05)
+    itc.update_price(first_trigger - 0.05)
+    runner.run_cycle()
+
+    assert itc.gtt_orders[0]['status'] == 'COMPLETE'
+    sells = [gtt for gtt in runner.kite_api.kite.get_gtts()
+             if gtt['condition']['tradingsymbol'] == 'ITC' and gtt['orders'][0]['transaction_type'] == 'SELL'
+             and gtt['status'] == 'active']
+    assert len(sells) == 1 and sells[0]['orders'][0]['quantity'] == 1
+    # The refill sees the book after the sell GTT was placed and tops the ladder up once
+    assert sells[0]['id'] in [gtt['id'] for gtt in refill_books['ITC']]
+    assert len(active_buys(runner, 'ITC')) == NUM_ORDERS
+    assert sorted(order['id'] for order in active_buys(runner, 'ONGC')) == sorted(ongc_triggers)
+
+    # A second cycle with nothing filled places nothing
+    gtt_count = len(runner.kite_api.kite.get_gtts())
+    runner.run_cycle()
+    assert len(runner.kite_api.kite.get_gtts()) == gtt_count
+
+
+def test_breeze_ticks_update_each_symbol_and_sell_a_fill(tmp_path, monkeypatch):
+    runner = create_runner(tmp_path, monkeypatch)
+    initialize(runner)
+    breeze = FakeBreezeConnect(prices=dict(PRICES), tick_rate=None, seed=0)
+    runner.breeze_api = create_breeze_api(breeze)
+    runner.subscribe_ticks()
+    assert sorted(state.company_name for state in runner.states_by_token.values()) == sorted(PRICES)
+
+    try:
+        breeze.emit(200)
+        # Each symbol's worker ends on the latest tick of its own token
+        for token, state in runner.states_by_token.items():
+            latest = runner.tick_dispatcher.get_latest_tick(token)
+            assert wait_until(lambda: state.last_price == latest['last'])
+        metrics = runner.tick_dispatcher.get_metrics()
+        assert metrics['received'] == 200 and metrics['symbols'] == 2 and metrics['handler_errors'] == 0
+
+        itc = runner.states['ITC']
+        runner.kite_api.kite.client.set_price('ITC', itc.gtt_orders[0]['trigger_price'] - 0.05)
+        # The tick handler sees the fill once the cached GTT book is refreshed
+        runner.kite_api.gtt_cache.invalidate()
+        breeze.emit(2)
+
+        def itc_sells():
+            return [gtt for gtt in runner.kite_api.kite.get_gtts()
+                    if gtt['condition']['tradingsymbol'] == 'ITC' and gtt['status'] == 'active'
+                    and gtt['orders'][0]['transaction_type'] == 'SELL']
+
+        assert wait_until(lambda: len(itc_sells()) == 1)
+        assert wait_until(lambda: itc.gtt_orders[0]['status'] == 'COMPLETE')
+        assert all(order['status'] == 'ACTIVE' for order in runner.states['ONGC'].gtt_orders)
+    finally:
+        runner.tick_dispatcher.stop()
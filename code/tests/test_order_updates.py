@@ -0,0 +1,101 @@
+"""
+Order Update Tests
+
+Feeds order updates from a FakeKiteConnect account through FakeOrderUpdateSource and
+OrderUpdateListener into gtt_fall_buy.apply_order_update.
+
+Usage:
+    python -m pytest code/tests/test_order_updates.py -q
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_kite import FakeKiteConnect
+from gtt_fall_buy import (apply_order_update, get_active_buy_orders, load_gtt_history, place_buy_gtt_batch,
+                          start_order_updates)
+from kite_connect_api import KiteConnectAPI
+from kite_request_scheduler import KiteRequestScheduler
+from order_updates import FakeOrderUpdateSource, OrderUpdateListener
+
+SYMBOL = "ITC"
+START_PRICE = 430.0
+logger = logging.getLogger(__name__)
+
+
+def setup_strategy(tmp_path, monkeypatch, forward_updates: bool = True) -> tuple:
+    """Place a two-order buy ladder on a fake account and route its order updates to the history"""
+    monkeypatch.chdir(tmp_path)
+    kite_api = KiteConnectAPI(trading_symbol=SYMBOL, request_scheduler=KiteRequestScheduler({'default': 1000}))
+    kite_api.kite = FakeKiteConnect(prices={SYMBOL: START_PRICE}, seed=0)
+
+    gtt_orders = place_buy_gtt_batch(kite_api, SYMBOL, "NSE", [
+        {'order_number': 1, 'quantity': 1, 'price': 425.6, 'trigger_price': 425.5},
+        {'order_number': 2, 'quantity': 2, 'price': 421.4, 'trigger_price': 421.3}
+    ], START_PRICE, logger)
+
+    source = FakeOrderUpdateSource()
+    listener = OrderUpdateListener(source)
+    applied = []
+    listener.add_handler(lambda event: applied.append(apply_order_update(SYMBOL, gtt_orders, event, logger, kite_api)))
+    listener.start()
+    if forward_updates:
+        kite_api.kite.client.add_order_listener(lambda order: source.emit(**order))
+    return kite_api, gtt_orders, source, applied
+
+
+def test_gtt_fill_is_applied_to_its_history_order(tmp_path, monkeypatch):
+    kite_api, gtt_orders, source, applied = setup_strategy(tmp_path, monkeypatch)
+
+    kite_api.kite.client.set_price(SYMBOL, 425.4)
+
+    assert [order['status'] for order in gtt_orders] == ['COMPLETE', 'ACTIVE']
+    assert gtt_orders[0]['average_price'] == 425.4
+    assert [order for order in applied if order] == [gtt_orders[0]]
+    assert load_gtt_history(SYMBOL, logger)[0]['status'] == 'COMPLETE'
+
+
+def test_manual_order_with_the_same_price_is_ignored(tmp_path, monkeypatch):
+    kite_api, gtt_orders, source, applied = setup_strategy(tmp_path, monkeypatch)
+
+    # A manual buy filled with the same quantity and limit price as the first ladder order
+    source.emit(order_id='250000000099999', status='COMPLETE', tradingsymbol=SYMBOL, exchange='NSE',
+                transaction_type='BUY', quantity=1, filled_quantity=1, price=425.6, average_price=425.6)
+
+    assert applied == [None]
+    assert [order['status'] for order in gtt_orders] == ['ACTIVE', 'ACTIVE']
+
+
+def test_untagged_gtt_order_is_found_in_the_gtt_book(tmp_path, monkeypatch):
+    kite_api, gtt_orders, source, applied = setup_strategy(tmp_path, monkeypatch, forward_updates=False)
+    kite_api.kite.client.set_price(SYMBOL, 421.0)
+    gtt = next(gtt for gtt in kite_api.kite.get_gtts() if gtt['id'] == gtt_orders[1]['trigger_id'])
+    order_id = gtt['orders'][0]['result']['order_result']['order_id']
+
+    # Both ladder orders triggered; the update of the second one carries no GTT tag
+    source.emit(order_id=order_id, status='COMPLETE', tradingsymbol=SYMBOL, exchange='NSE',
+                transaction_type='BUY', quantity=2, filled_quantity=2, price=421.4, average_price=421.0)
+
+    assert [order['status'] for order in gtt_orders] == ['ACTIVE', 'COMPLETE']
+    assert gtt_orders[1]['order_id'] == order_id
+
+
+def test_single_symbol_order_updates_sell_and_refill_a_fill(tmp_path, monkeypatch):
+    kite_api, gtt_orders, source, applied = setup_strategy(tmp_path, monkeypatch, forward_updates=False)
+    strategy_source = FakeOrderUpdateSource()
+    order_updates = start_order_updates(kite_api, SYMBOL, "NSE", gtt_orders, logger, strategy_source)
+    kite_api.kite.client.add_order_listener(lambda order: strategy_source.emit(**order))
+
+    kite_api.kite.client.set_price(SYMBOL, 425.4)
+
+    book = kite_api.get_gtt_orders(max_age_seconds=0)
+    sells = [gtt for gtt in book if gtt['orders'][0]['transaction_type'] == 'SELL' and gtt['status'] == 'active']
+    assert len(sells) == 1 and sells[0]['orders'][0]['quantity'] == 1
+    # The ladder is refilled below the remaining order without waiting for a monitoring cycle
+    assert len(get_active_buy_orders(book, SYMBOL)) == 5
+    assert order_updates.get_stats()['handler_errors'] == 0
+    order_updates.stop()
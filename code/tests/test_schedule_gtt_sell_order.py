@@ -0,0 +1,66 @@
+"""
+Schedule GTT Sell Order Tests
+
+Checks the tick-aligned sell price solver against the charge model it solves.
+
+Usage:
+    python -m pytest code/tests/test_schedule_gtt_sell_order.py -q
+"""
+import os
+import random
+import sys
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from charges import calculate_profit_with_charges
+from schedule_gtt_sell_order import calculate_optimal_sell_price, calculate_optimal_sell_prices
+from tick_math import get_tick_grid
+
+
+def sell_cases(count: int = 300) -> list:
+    """Random (buy_price, quantity, target %, tick_size) orders across the price bands"""
+    rng = random.Random(0)
+    cases = [(425.7, 1, 1.0, 0.05), (100.0, 10, 0.0, 0.01), (2500.0, 3, 5.0, 0.1), (15000.0, 1, 0.5, 1.0)]
+    for _ in range(count):
+        tick_size = rng.choice([0.01, 0.05, 0.1, 0.5, 1.0])
+        buy_price = round(rng.uniform(10, 20000) / tick_size) * tick_size
+        cases.append((round(buy_price, 2), rng.randint(1, 500), round(rng.uniform(-2, 10), 2), tick_size))
+    return cases
+
+
+def net_profit_percentage(buy_price: float, sell_price: float, quantity: int) -> float:
+    return calculate_profit_with_charges(buy_price, sell_price, quantity)['net_profit_percentage']
+
+
+def test_solved_price_is_the_lowest_tick_reaching_the_target():
+    for buy_price, quantity, target, tick_size in sell_cases():
+        price = calculate_optimal_sell_price(buy_price, quantity, target, tick_size)
+        grid = get_tick_grid(tick_size)
+
+        assert grid.is_on_grid(price), (buy_price, quantity, target, tick_size, price)
+        assert net_profit_percentage(buy_price, price, quantity) >= target - 1e-9
+        lower = grid.offset(price, -1)
+        assert net_profit_percentage(buy_price, lower, quantity) < target, (buy_price, quantity, target, tick_size)
+
+
+def test_vectorised_prices_match_the_scalar_solver():
+    cases = sell_cases()
+    buy_prices, quantities, targets, tick_sizes = (np.array(column) for column in zip(*cases))
+
+    prices = calculate_optimal_sell_prices(buy_prices, quantities, targets, tick_sizes)
+
+    expected = [calculate_optimal_sell_price(*case) for case in cases]
+    assert prices.tolist() == expected
+
+
+def test_vectorised_prices_broadcast_and_mark_invalid_orders():
+    prices = calculate_optimal_sell_prices([425.7, 0.0, 430.0, 430.0], [1, 5, 0, 2], 1.0, [0.05, 0.05, 0.05, 0.0])
+
+    assert prices[0] == calculate_optimal_sell_price(425.7, 1, 1.0, 0.05)
+    assert np.isnan(prices[1:]).all()
+    with pytest.raises(ValueError):
+        calculate_optimal_sell_price(425.7, 0, 1.0)
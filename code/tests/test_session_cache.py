@@ -0,0 +1,109 @@
+"""
+Session Cache Tests
+
+Checks the trading-day session records and how initialize_kite uses them.
+
+Usage:
+    python -m pytest code/tests/test_session_cache.py -q
+"""
+import json
+import os
+import stat
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import kite_utils
+import session_cache
+from config_service import KiteCredentials
+from session_cache import IST, SessionCache, SessionExpiredError, get_trading_day
+
+API_KEY = 'test_api_key'
+TOKEN = 'test_access_token'
+
+
+def test_trading_day_starts_at_0600_ist():
+    assert get_trading_day(datetime(2026, 10, 19, 5, 59, 59, tzinfo=IST)) == '2026-10-18'
+    assert get_trading_day(datetime(2026, 10, 19, 6, 0, tzinfo=IST)) == '2026-10-19'
+    # 00:29 UTC is 05:59 IST, 00:30 UTC is 06:00 IST
+    assert get_trading_day(datetime(2026, 10, 19, 0, 29, tzinfo=timezone.utc)) == '2026-10-18'
+    assert get_trading_day(datetime(2026, 10, 19, 0, 30, tzinfo=timezone.utc)) == '2026-10-19'
+    assert get_trading_day(datetime(2026, 10, 18, 23, 0, tzinfo=IST) + timedelta(hours=7)) == '2026-10-19'
+
+
+def test_records_expire_with_the_trading_day(tmp_path, monkeypatch):
+    cache = SessionCache(str(tmp_path / 'session' / 'session_cache.json'))
+    monkeypatch.setattr(session_cache, 'get_trading_day', lambda now=None: '2026-10-18')
+    cache.record_valid('kite', API_KEY, TOKEN)
+    assert cache.is_valid('kite', API_KEY, TOKEN)
+
+    # After 06:00 IST the next day the record no longer counts
+    monkeypatch.setattr(session_cache, 'get_trading_day', lambda now=None: '2026-10-19')
+    assert cache.get_status('kite', API_KEY, TOKEN) is None
+
+
+def test_records_match_only_the_same_token_and_key(tmp_path):
+    path = tmp_path / 'session_cache.json'
+    cache = SessionCache(str(path))
+    cache.record_valid('kite', API_KEY, TOKEN)
+
+    assert cache.is_valid('kite', API_KEY, TOKEN)
+    # A new token (or another app / provider) has a different fingerprint and is checked again
+    assert cache.get_status('kite', API_KEY, 'new_access_token') is None
+    assert cache.get_status('kite', 'other_api_key', TOKEN) is None
+    assert cache.get_status('breeze', API_KEY, TOKEN) is None
+    assert cache.get_status('kite', API_KEY, '') is None
+
+    cache.record_expired('kite', API_KEY, TOKEN, 'Invalid access token')
+    assert cache.is_expired('kite', API_KEY, TOKEN) and not cache.is_valid('kite', API_KEY, TOKEN)
+    cache.invalidate('kite', API_KEY)
+    assert cache.get_status('kite', API_KEY, TOKEN) is None
+
+    # Only fingerprints are written, to an owner-only file
+    cache.record_valid('kite', API_KEY, TOKEN)
+    content = path.read_text()
+    assert TOKEN not in content and API_KEY not in content
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert list(json.loads(content).values())[0]['status'] == 'valid'
+
+
+def test_unreadable_cache_file_is_treated_as_empty(tmp_path):
+    path = tmp_path / 'session_cache.json'
+    path.write_text('{not json')
+    cache = SessionCache(str(path))
+
+    assert cache.get_status('kite', API_KEY, TOKEN) is None
+    cache.record_valid('kite', API_KEY, TOKEN)
+    assert cache.is_valid('kite', API_KEY, TOKEN)
+
+
+def test_expired_token_fails_at_once_with_the_login_url(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    credentials = KiteCredentials(api_key=API_KEY, access_token=TOKEN)
+    session_cache.get_session_cache().record_expired('kite', API_KEY, TOKEN, 'Invalid access token')
+
+    with pytest.raises(SessionExpiredError) as error:
+        kite_utils.initialize_kite(credentials)
+
+    assert error.value.provider == 'kite'
+    assert API_KEY in error.value.login_url
+    assert error.value.login_url in str(error.value)
+
+
+def test_token_validated_today_skips_the_margins_check(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    credentials = KiteCredentials(api_key=API_KEY, access_token=TOKEN)
+    session_cache.get_session_cache().record_valid('kite', API_KEY, TOKEN)
+
+    from kiteconnect import KiteConnect
+
+    def margins(self, *args, **kwargs):
+        raise AssertionError("margins() must not be called for a token validated today")
+
+    monkeypatch.setattr(KiteConnect, 'margins', margins)
+    kite = kite_utils.initialize_kite(credentials)
+    assert kite.access_token == TOKEN
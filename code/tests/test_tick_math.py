@@ -0,0 +1,99 @@
+"""
+Tick Math Tests
+
+Usage:
+    python -m pytest code/tests/test_tick_math.py -q
+"""
+import os
+import sys
+
+# Add parent directory to path to allow imports from code/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import tick_math
+from tick_math import (ROUND_DOWN, ROUND_NEAREST, ROUND_UP, TickGrid, get_symbol_tick_grid, get_tick_grid,
+                       nse_tick_size_for_price)
+
+
+def test_to_ticks_rounding_modes():
+    grid = TickGrid(0.05)
+
+    assert grid.to_ticks(425.72) == 8514
+    assert grid.to_ticks(425.725) == 8515          # halves round up
+    assert grid.to_ticks(425.72, ROUND_DOWN) == 8514
+    assert grid.to_ticks(425.72, ROUND_UP) == 8515
+    with pytest.raises(ValueError):
+        grid.to_ticks(425.72, 'sideways')
+
+
+def test_prices_with_float_drift_stay_on_the_grid():
+    grid = TickGrid(0.05)
+
+    # Dividing by the float tick size drifts off whole numbers (420.15 / 0.05 < 8403);
+    # the grid divides paise by integer paise, which still lands a hair off for some
+    # prices (1.15 -> 22.999..., 0.55 -> 11.000...1). Every mode must give the tick the
+    # price is on.
+    assert 420.15 / 0.05 < 8403
+    assert 1.15 * 100 / 5 < 23 and 0.55 * 100 / 5 > 11
+    for price, ticks in ((420.15, 8403), (1.15, 23), (0.55, 11), (0.15, 3), (425.7, 8514)):
+        for mode in (ROUND_NEAREST, ROUND_DOWN, ROUND_UP):
+            assert grid.to_ticks(price, mode) == ticks, (price, mode)
+        assert grid.to_price(ticks) == price
+        assert grid.is_on_grid(price)
+    # 432.5 * 0.98 is 423.84999999999997, a hair below the 423.85 tick
+    assert 432.5 * 0.98 < 423.85
+    for mode in (ROUND_NEAREST, ROUND_DOWN, ROUND_UP):
+        assert grid.round(432.5 * 0.98, mode) == 423.85
+    # Stepping tick by tick never leaves the grid
+    price = 0.05
+    for _ in range(1000):
+        price = grid.offset(price, 1)
+        assert grid.is_on_grid(price)
+    assert price == 50.05
+
+
+def test_shift_percent_and_is_on_grid():
+    grid = TickGrid(0.05)
+    ticks = grid.to_ticks(430.0)
+
+    assert grid.to_price(grid.shift_percent(ticks, -1.0)) == 425.7
+    assert grid.to_price(grid.shift_percent(ticks, 1.0)) == 434.3
+    assert grid.to_price(grid.shift_percent(ticks, -0.5, ROUND_DOWN)) == 427.85
+    assert grid.to_price(grid.shift_percent(ticks, -0.5, ROUND_UP)) == 427.85
+    assert grid.to_price(grid.shift_percent(ticks, -0.51, ROUND_DOWN)) == 427.8
+    assert grid.to_price(grid.shift_percent(ticks, -0.51, ROUND_UP)) == 427.85
+
+    assert grid.is_on_grid(425.7) and grid.is_on_grid(0.05)
+    assert not grid.is_on_grid(425.72) and not grid.is_on_grid(0.051)
+    assert TickGrid(0.01).is_on_grid(425.72)
+
+
+def test_invalid_tick_sizes_are_rejected():
+    for tick_size in (0, -0.05, 0.005):
+        with pytest.raises(ValueError):
+            TickGrid(tick_size)
+    assert get_tick_grid(0.05) is get_tick_grid(0.05)
+
+
+@pytest.mark.parametrize('price, tick_size', [
+    (249.99, 0.01), (250, 0.05), (250.01, 0.05),
+    (1000, 0.05), (1000.01, 0.10),
+    (5000, 0.10), (5000.01, 0.50),
+    (10000, 0.50), (10000.01, 1.00),
+    (20000, 1.00), (20000.01, 5.00)
+])
+def test_nse_tick_size_band_edges(price, tick_size):
+    assert nse_tick_size_for_price(price) == tick_size
+
+
+def test_symbol_missing_from_the_master_falls_back_to_the_price_band(tmp_path, monkeypatch):
+    monkeypatch.setattr(tick_math, '_symbol_grids', {})
+    instruments_file = str(tmp_path / 'instruments.csv')
+
+    assert get_symbol_tick_grid('NEWCO', current_price=430.0, instruments_file=instruments_file).tick_size == 0.05
+    assert get_symbol_tick_grid('NEWCO', current_price=6000.0, instruments_file=instruments_file).tick_size == 0.5
+    assert get_symbol_tick_grid('NEWCO', instruments_file=instruments_file).tick_size == 0.01
+    # The fallback depends on the price, so it is not cached
+    assert tick_math._symbol_grids == {}
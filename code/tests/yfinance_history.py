@@ -6,6 +6,7 @@ import logging
 import traceback
 import time
 from kite_utils import setup_logger
+from history_store import HistoryStore
 
 def fetch_stock_history(symbol: str, years: int = 5, max_retries: int = 3) -> dict:
     """
@@ -106,22 +107,57 @@ def save_history_to_json(data: dict, symbol: str, years: int) -> None:
         logger.error(f"Error saving historical data: {str(e)}\n{traceback.format_exc()}")
         raise
 
+def fetch_history_range(symbol: str, start_date: datetime, end_date: datetime) -> list:
+    """
+    Fetch daily bars of a date range using yfinance
+    
+    Parameters:
+    - symbol: Stock symbol (e.g., "SBIN.NS")
+    - start_date: Start of the range
+    - end_date: End of the range
+    
+    Returns:
+    List of daily bars with datetime, open, high, low, close and volume
+    """
+    hist = yf.Ticker(symbol).history(start=start_date, end=end_date)
+    return [
+        {
+            'datetime': index.strftime('%Y-%m-%d %H:%M:%S'),
+            'open': row['Open'],
+            'high': row['High'],
+            'low': row['Low'],
+            'close': row['Close'],
+            'volume': row['Volume']
+        }
+        for index, row in hist.iterrows()
+    ]
+
+def update_history_store(symbol: str, years: int = 5) -> int:
+    """
+    Bring the local history store of a symbol up to date, fetching only missing bars
+    
+    Parameters:
+    - symbol: Stock symbol (e.g., "SBIN.NS")
+    - years: Number of years of history the store should cover
+    
+    Returns:
+    Number of new bars stored
+    """
+    store = HistoryStore(source='yfinance')
+    start_date = datetime.now() - timedelta(days=years*365)
+    added = store.update(symbol, lambda start, end: fetch_history_range(symbol, start, end), start_date)
+    logger.info(f"History store {store.get_path(symbol)} updated with {added} new bars")
+    return added
+
 def main():
-    """Main function to fetch and save stock history"""
+    """Main function to bring the stock history store up to date"""
     try:
         # Set up logger
         global logger
         logger = setup_logger(__name__, "SBIN")
         
-        logger.info("Starting historical data fetch process...")
-        
-        # Fetch ITC stock history
-        logger.info("Fetching ITC stock history...")
-        history_data = fetch_stock_history("SBIN.NS", years=5)
-        
-        # Save to JSON file
-        logger.info("Saving historical data...")
-        save_history_to_json(history_data, "SBIN", 5)
+        logger.info("Starting historical data update process...")
+        update_history_store("SBIN.NS", years=5)
         
         logger.info("Process completed successfully")
         
@@ -130,4 +166,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
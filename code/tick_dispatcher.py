@@ -0,0 +1,208 @@
+"""
+Tick Dispatcher
+
+Decouples the Breeze websocket callback thread from the strategy code. The socket
+thread only stores each tick in a per-symbol slot (O(1), never blocks on I/O); a
+worker thread per symbol drains its slot and runs the handler. While a handler is
+busy (e.g. waiting on a Kite REST call), newer ticks for that symbol coalesce into
+the slot, so the handler always acts on the latest price. The high/low seen since the
+last drain and the number of coalesced ticks are attached to the delivered tick.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, List, Union
+
+
+class _TickSlot:
+    """Latest pending tick of one symbol plus the range seen since the last drain"""
+
+    def __init__(self):
+        self.tick: Optional[Dict[str, Any]] = None
+        self.high: Optional[float] = None
+        self.low: Optional[float] = None
+        self.pending_count = 0
+        self.first_enqueued_at: Optional[float] = None
+        self.latest_tick: Optional[Dict[str, Any]] = None
+        self.condition = threading.Condition()
+        self.worker: Optional[threading.Thread] = None
+
+
+class TickDispatcher:
+    """Class to dispatch ticks to per-symbol worker threads with latest-tick coalescing"""
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], None], name: str = "ticks",
+                 key_func: Optional[Callable[[Dict[str, Any]], Any]] = None, max_symbols: int = 500):
+        """
+        Initialize the dispatcher
+
+        Parameters:
+        - handler: Function called with each delivered tick (runs on a worker thread)
+        - name: Name used for worker threads and logs
+        - key_func: Function returning the dispatch key of a tick (default: tick['symbol'])
+        - max_symbols: Maximum number of per-symbol queues; ticks for further symbols are dropped
+        """
+        self.handler = handler
+        self.name = name
+        self.key_func = key_func or (lambda tick: tick.get('symbol'))
+        self.max_symbols = max_symbols
+        self._slots: Dict[Any, _TickSlot] = {}
+        self._slots_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        self._metrics_lock = threading.Lock()
+        self._received = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._dispatched = 0
+        self._handler_errors = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._last_lag = 0.0
+
+    @staticmethod
+    def _price(tick: Dict[str, Any]) -> Optional[float]:
+        try:
+            price = tick.get('last')
+            return float(price) if price is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _get_slot(self, key: Any) -> Optional[_TickSlot]:
+        """Get or create the slot and worker of a symbol"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        with self._slots_lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if len(self._slots) >= self.max_symbols:
+                    return None
+                slot = _TickSlot()
+                slot.worker = threading.Thread(target=self._worker, args=(key, slot),
+                                               name=f"{self.name}-{key}", daemon=True)
+                self._slots[key] = slot
+                slot.worker.start()
+            return slot
+
+    def submit(self, ticks: Union[Dict[str, Any], List[Dict[str, Any]]]) -> None:
+        """
+        Accept ticks from the socket callback (safe to pass to BreezeApi.set_on_ticks)
+
+        Parameters:
+        - ticks: A tick dictionary or a list of tick dictionaries
+        """
+        if isinstance(ticks, dict):
+            ticks = [ticks]
+        for tick in ticks:
+            self._submit_one(tick)
+
+    def _submit_one(self, tick: Dict[str, Any]) -> None:
+        with self._metrics_lock:
+            self._received += 1
+
+        key = self.key_func(tick) if isinstance(tick, dict) else None
+        slot = self._get_slot(key) if key is not None and not self._stopped.is_set() else None
+        if slot is None:
+            with self._metrics_lock:
+                self._dropped += 1
+            return
+
+        price = self._price(tick)
+        with slot.condition:
+            if slot.tick is not None:
+                with self._metrics_lock:
+                    self._coalesced += 1
+            else:
+                slot.first_enqueued_at = time.monotonic()
+            slot.tick = tick
+            slot.latest_tick = tick
+            slot.pending_count += 1
+            if price is not None:
+                slot.high = price if slot.high is None else max(slot.high, price)
+                slot.low = price if slot.low is None else min(slot.low, price)
+            slot.condition.notify()
+
+    def _worker(self, key: Any, slot: _TickSlot) -> None:
+        """Drain one symbol's slot and run the handler on the latest tick"""
+        while True:
+            with slot.condition:
+                while slot.tick is None and not self._stopped.is_set():
+                    slot.condition.wait()
+                if self._stopped.is_set():
+                    return
+                tick = dict(slot.tick)
+                tick['high_since_last'] = slot.high
+                tick['low_since_last'] = slot.low
+                tick['coalesced_ticks'] = slot.pending_count - 1
+                lag = time.monotonic() - slot.first_enqueued_at
+                slot.tick = None
+                slot.high = None
+                slot.low = None
+                slot.pending_count = 0
+                slot.first_enqueued_at = None
+
+            with self._metrics_lock:
+                self._dispatched += 1
+                self._total_lag += lag
+                self._last_lag = lag
+                self._max_lag = max(self._max_lag, lag)
+
+            try:
+                self.handler(tick)
+            except Exception as e:
+                with self._metrics_lock:
+                    self._handler_errors += 1
+                logging.error(f"Error in tick handler for {key}: {e}")
+
+    def get_latest_tick(self, key: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recently received tick of a symbol (delivered or not)
+
+        Parameters:
+        - key: Dispatch key of the symbol
+
+        Returns:
+        Latest tick or None if no tick was received
+        """
+        slot = self._slots.get(key)
+        return slot.latest_tick if slot else None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get dispatcher metrics
+
+        Returns:
+        Dictionary with received, dispatched, coalesced, dropped and handler_errors
+        counts, queue lag statistics in seconds and the number of pending symbols
+        """
+        with self._metrics_lock:
+            metrics = {
+                'received': self._received,
+                'dispatched': self._dispatched,
+                'coalesced': self._coalesced,
+                'dropped': self._dropped,
+                'handler_errors': self._handler_errors,
+                'avg_lag_seconds': self._total_lag / self._dispatched if self._dispatched else 0.0,
+                'max_lag_seconds': self._max_lag,
+                'last_lag_seconds': self._last_lag,
+                'symbols': len(self._slots)
+            }
+        metrics['pending'] = sum(1 for slot in list(self._slots.values()) if slot.tick is not None)
+        return metrics
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the workers; pending ticks are discarded
+
+        Parameters:
+        - timeout: Seconds to wait for each worker to finish its current handler call
+        """
+        self._stopped.set()
+        slots = list(self._slots.values())
+        for slot in slots:
+            with slot.condition:
+                slot.condition.notify_all()
+        for slot in slots:
+            if slot.worker and slot.worker is not threading.current_thread():
+                slot.worker.join(timeout=timeout)
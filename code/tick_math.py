@@ -0,0 +1,186 @@
+"""
+Tick Math
+
+Exact price arithmetic on an instrument's tick grid. A TickGrid holds the tick size
+as an integer number of paise, and prices are converted to integer tick counts once;
+offsets, percentage steps and comparisons are then integer operations, and converting
+back (ticks * tick_paise / 100) always gives the nearest float to a valid price. This
+avoids the float drift of price / tick_size rounding that can place a GTT off the tick
+grid.
+
+Example:
+    grid = get_symbol_tick_grid("ITC", current_price=430.0)   # 0.05 tick
+    trigger = grid.to_ticks(430.0 * 0.99)                      # 8514 ticks
+    limit = trigger + 2                                        # 2 ticks above the trigger
+    grid.to_price(trigger), grid.to_price(limit)               # (425.7, 425.8)
+"""
+import logging
+import math
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Slack for float noise when a raw price lands exactly on (or half way between) ticks
+_TICK_EPSILON = 1e-9
+
+# NSE equity tick size by price band: (upper bound of the band, tick size)
+NSE_TICK_BANDS = ((250, 0.01), (1000, 0.05), (5000, 0.10), (10000, 0.50), (20000, 1.00))
+NSE_MAX_TICK = 5.00
+
+ROUND_NEAREST = 'nearest'
+ROUND_DOWN = 'down'
+ROUND_UP = 'up'
+
+_symbol_grids: Dict[Tuple[str, str], 'TickGrid'] = {}
+_symbol_grids_lock = threading.Lock()
+
+
+def to_paise(price: float) -> int:
+    """Convert a price in rupees to integer paise (nearest paisa)"""
+    return int(round(price * 100))
+
+
+class TickGrid:
+    """Class to do exact price arithmetic in integer multiples of an instrument's tick size"""
+
+    def __init__(self, tick_size: float):
+        """
+        Initialize the grid
+
+        Parameters:
+        - tick_size: Minimum price increment in rupees (a whole number of paise, e.g. 0.05)
+
+        Raises:
+        - ValueError: If the tick size is not a positive whole number of paise
+        """
+        tick_paise = to_paise(tick_size) if tick_size > 0 else 0
+        if tick_paise <= 0 or abs(tick_paise - tick_size * 100) > 1e-6:
+            raise ValueError(f"Tick size must be a positive whole number of paise, got {tick_size}")
+        self.tick_paise = tick_paise
+        self.tick_size = tick_paise / 100
+
+    def __repr__(self) -> str:
+        return f"TickGrid({self.tick_size})"
+
+    def to_ticks(self, price: float, mode: str = ROUND_NEAREST) -> int:
+        """
+        Convert a price to a whole number of ticks
+
+        Parameters:
+        - price: Raw price in rupees
+        - mode: ROUND_NEAREST (halves round up), ROUND_DOWN or ROUND_UP
+
+        Returns:
+        - int: Number of ticks
+        """
+        ticks = price * 100 / self.tick_paise
+        if mode == ROUND_NEAREST:
+            return math.floor(ticks + 0.5 + _TICK_EPSILON)
+        if mode == ROUND_DOWN:
+            return math.floor(ticks + _TICK_EPSILON)
+        if mode == ROUND_UP:
+            return math.ceil(ticks - _TICK_EPSILON)
+        raise ValueError(f"Unknown rounding mode: {mode}")
+
+    def to_price(self, ticks: int) -> float:
+        """Convert a number of ticks to a price in rupees"""
+        return ticks * self.tick_paise / 100
+
+    def round(self, price: float, mode: str = ROUND_NEAREST) -> float:
+        """
+        Round a price to the grid
+
+        Parameters:
+        - price: Raw price in rupees
+        - mode: ROUND_NEAREST, ROUND_DOWN or ROUND_UP
+
+        Returns:
+        - float: Price on the grid
+        """
+        return self.to_price(self.to_ticks(price, mode))
+
+    def offset(self, price: float, ticks: int) -> float:
+        """Round a price to the grid and move it by a number of ticks"""
+        return self.to_price(self.to_ticks(price) + ticks)
+
+    def shift_percent(self, ticks: int, percent: float, mode: str = ROUND_NEAREST) -> int:
+        """
+        Move a price (in ticks) by a percentage and round the result to the grid
+
+        Parameters:
+        - ticks: Price in ticks
+        - percent: Percentage change (negative moves the price down, e.g. -1.0 for 1% lower)
+        - mode: ROUND_NEAREST, ROUND_DOWN or ROUND_UP
+
+        Returns:
+        - int: Shifted price in ticks
+        """
+        return self.to_ticks(self.to_price(ticks) * (1 + percent / 100), mode)
+
+    def is_on_grid(self, price: float) -> bool:
+        """Check whether a price is a whole number of ticks"""
+        return to_paise(price) % self.tick_paise == 0 and abs(to_paise(price) - price * 100) < 1e-6
+
+
+@lru_cache(maxsize=64)
+def get_tick_grid(tick_size: float) -> TickGrid:
+    """Get the shared TickGrid of a tick size"""
+    return TickGrid(tick_size)
+
+
+def nse_tick_size_for_price(price: float) -> float:
+    """
+    Get the NSE equity tick size of a price band
+
+    Parameters:
+    - price: Price of the stock
+
+    Returns:
+    - float: Tick size (₹0.01 below ₹250 up to ₹5.00 above ₹20,000)
+    """
+    if price < NSE_TICK_BANDS[0][0]:
+        return NSE_TICK_BANDS[0][1]
+    for upper, tick_size in NSE_TICK_BANDS[1:]:
+        if price <= upper:
+            return tick_size
+    return NSE_MAX_TICK
+
+
+def get_symbol_tick_grid(trading_symbol: str, current_price: Optional[float] = None, exchange: str = "NSE",
+                         instruments_file: str = "instruments.csv") -> TickGrid:
+    """
+    Get the tick grid of a symbol, looked up in the instrument master once per symbol
+
+    Symbols missing from the instrument master fall back to the NSE price band of
+    current_price (not cached, the band depends on the price), else a ₹0.01 tick.
+
+    Parameters:
+    - trading_symbol: Trading symbol of the stock
+    - current_price: Current price of the stock (used for the price band fallback)
+    - exchange: Exchange name
+    - instruments_file: Path to instruments.csv
+
+    Returns:
+    TickGrid of the symbol
+    """
+    key = (exchange.upper(), trading_symbol.upper())
+    grid = _symbol_grids.get(key)
+    if grid is not None:
+        return grid
+
+    try:
+        from instrument_master import get_shared_instrument_master
+
+        instrument = get_shared_instrument_master(instruments_file).get_instrument(key[0], key[1])
+        if instrument and instrument['tick_size'] > 0:
+            grid = get_tick_grid(instrument['tick_size'])
+            with _symbol_grids_lock:
+                _symbol_grids[key] = grid
+            return grid
+    except Exception as e:
+        logging.warning(f"Could not read tick size for {trading_symbol} from instrument master: {e}")
+
+    if current_price is not None and current_price > 0:
+        return get_tick_grid(nse_tick_size_for_price(current_price))
+    logging.warning(f"Using default tick size for {trading_symbol}: 0.01")
+    return get_tick_grid(0.01)
@@ -1,75 +1,12 @@
 #!/usr/bin/env python3
 
-def calculate_zerodha_charges(sell_value: float, quantity: int) -> dict:
-    """
-    Calculate all Zerodha charges for equity delivery sell orders
-    """
-    # Zerodha Equity Delivery Sell-Side Charges
-    brokerage = 0.00  # Zero for equity delivery
-    
-    # STT (Securities Transaction Tax): 0.1% of Sell Value
-    stt = sell_value * 0.001
-    
-    # Exchange Transaction Charges (NSE Equity): 0.00345% of Sell Value
-    exchange_charges = sell_value * 0.0000345
-    
-    # SEBI Turnover Fees: 0.0001% of Sell Value
-    sebi_fees = sell_value * 0.000001
-    
-    # DP (Depository Participant) Charges: ₹13.5 + 18% GST = ₹15.93
-    dp_charges = 15.93
-    
-    # GST: 18% on (Exchange Transaction Charges + SEBI Turnover Fees)
-    gst_base = exchange_charges + sebi_fees
-    gst = gst_base * 0.18
-    
-    # Calculate total charges
-    total_charges = brokerage + stt + exchange_charges + sebi_fees + dp_charges + gst
-    
-    return {
-        'brokerage': brokerage,
-        'stt': stt,
-        'exchange_charges': exchange_charges,
-        'sebi_fees': sebi_fees,
-        'dp_charges': dp_charges,
-        'gst': gst,
-        'total_charges': total_charges,
-        'charges_per_share': total_charges / quantity if quantity > 0 else 0
-    }
+import os
+import sys
 
-def calculate_profit_with_charges(buy_price: float, sell_price: float, quantity: int) -> dict:
-    """
-    Calculate profit after considering all Zerodha charges
-    """
-    # Calculate basic profit
-    buy_value = buy_price * quantity
-    sell_value = sell_price * quantity
-    gross_profit = sell_value - buy_value
-    
-    # Calculate charges
-    charges = calculate_zerodha_charges(sell_value, quantity)
-    total_charges = charges['total_charges']
-    
-    # Calculate net profit
-    net_profit = gross_profit - total_charges
-    
-    # Calculate profit percentages
-    gross_profit_percentage = (gross_profit / buy_value) * 100 if buy_value > 0 else 0
-    net_profit_percentage = (net_profit / buy_value) * 100 if buy_value > 0 else 0
-    charges_percentage = (total_charges / buy_value) * 100 if buy_value > 0 else 0
-    
-    return {
-        'buy_value': buy_value,
-        'sell_value': sell_value,
-        'gross_profit': gross_profit,
-        'gross_profit_percentage': gross_profit_percentage,
-        'charges': charges,
-        'total_charges': total_charges,
-        'charges_percentage': charges_percentage,
-        'net_profit': net_profit,
-        'net_profit_percentage': net_profit_percentage,
-        'break_even_price': buy_price + (total_charges / quantity) if quantity > 0 else buy_price
-    }
+# Add code/ to path to allow imports of the trading modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code'))
+
+from charges import calculate_profit_with_charges
 
 def calculate_optimal_sell_price(buy_price: float, quantity: int, target_net_profit_percentage: float = 2.0) -> float:
     """